@@ -3151,6 +3151,11 @@ if __name__ == "__main__":
         # Setup error handling
         ErrorHandler.setup_logging()
 
+        # Headless batch generation needs no display
+        if len(sys.argv) > 1 and sys.argv[1] == "--batch":
+            from src.workflow.batch_runner import main as batch_main
+            sys.exit(batch_main(sys.argv[2:]))
+
         # Check for automated novel mode
         if len(sys.argv) > 1 and sys.argv[1] == "--automated-novel":
             # Launch automated novel writing GUI
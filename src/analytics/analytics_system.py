@@ -4,7 +4,6 @@ Advanced analytics capabilities for the Fiction Author Novel Writing Software (F
 """
 
 import logging
-import sqlite3
 import datetime
 import json
 import statistics
@@ -12,6 +11,8 @@ from dataclasses import dataclass, field
 from enum import Enum
 from typing import List, Dict, Optional, Tuple, Any, Union
 
+from ..database.database_manager import DatabaseManager, SchemaStore
+
 # Import compatibility layer for optional dependencies
 from ..system.module_compatibility import (
     NLTK_AVAILABLE, nltk,
@@ -255,19 +256,21 @@ class TextAnalyzer:
 class WritingMetricsDatabase:
     """Database interface for writing metrics storage."""
 
-    def __init__(self, db_path: str = "analytics.db"):
+    def __init__(self, db_path: str = "analytics.db", storage: Optional[DatabaseManager] = None):
+        """With storage, db_path is attached to that database manager as the analytics schema."""
         self.db_path = db_path
+        self.store = SchemaStore(db_path, "analytics", storage)
+        self.sessions_table = self.store.table("writing_sessions")
+        self.goals_table = self.store.table("writing_goals")
         self.init_database()
 
     def init_database(self):
         """Initialize database tables."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-
-                # Create tables for analytics data
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS writing_sessions (
+            # Create tables for analytics data
+            self.store.execute_transaction([
+                (f'''
+                    CREATE TABLE IF NOT EXISTS {self.sessions_table} (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
                         start_time TEXT NOT NULL,
                         end_time TEXT,
@@ -276,10 +279,9 @@ class WritingMetricsDatabase:
                         notes TEXT,
                         created_at TEXT DEFAULT CURRENT_TIMESTAMP
                     )
-                ''')
-
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS writing_goals (
+                ''', ()),
+                (f'''
+                    CREATE TABLE IF NOT EXISTS {self.goals_table} (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
                         name TEXT NOT NULL,
                         goal_type TEXT NOT NULL,
@@ -290,10 +292,17 @@ class WritingMetricsDatabase:
                         created_date TEXT,
                         updated_at TEXT DEFAULT CURRENT_TIMESTAMP
                     )
-                ''')
-
-                conn.commit()
-                logger.info("Analytics database initialized successfully")
+                ''', ())
+            ])
+            self.store.migrate([
+                (1, "Index sessions by project and start time", [
+                    f"CREATE INDEX IF NOT EXISTS {self.store.table('idx_writing_sessions_project_start')} "
+                    "ON writing_sessions (project_id, start_time)",
+                    f"CREATE INDEX IF NOT EXISTS {self.store.table('idx_writing_sessions_start_time')} "
+                    "ON writing_sessions (start_time)"
+                ]),
+            ])
+            logger.info("Analytics database initialized successfully")
 
         except Exception as e:
             logger.error(f"Error initializing analytics database: {e}")
@@ -301,21 +310,18 @@ class WritingMetricsDatabase:
     def save_session(self, session: WritingSession) -> bool:
         """Save a writing session to database."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO writing_sessions
-                    (start_time, end_time, word_count, project_id, notes)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (
-                    session.start_time.isoformat(),
-                    session.end_time.isoformat() if session.end_time else None,
-                    session.word_count,
-                    session.project_id,
-                    session.notes
-                ))
-                conn.commit()
-                return True
+            self.store.execute(f'''
+                INSERT INTO {self.sessions_table}
+                (start_time, end_time, word_count, project_id, notes)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (
+                session.start_time.isoformat(),
+                session.end_time.isoformat() if session.end_time else None,
+                session.word_count,
+                session.project_id,
+                session.notes
+            ), fetch="none")
+            return True
         except Exception as e:
             logger.error(f"Error saving writing session: {e}")
             return False
@@ -324,26 +330,24 @@ class WritingMetricsDatabase:
         """Retrieve recent writing sessions."""
         sessions = []
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT start_time, end_time, word_count, project_id, notes
-                    FROM writing_sessions
-                    ORDER BY start_time DESC
-                    LIMIT ?
-                ''', (limit,))
-
-                for row in cursor.fetchall():
-                    start_time = datetime.datetime.fromisoformat(row[0])
-                    end_time = datetime.datetime.fromisoformat(row[1]) if row[1] else None
-                    session = WritingSession(
-                        start_time=start_time,
-                        end_time=end_time,
-                        word_count=row[2],
-                        project_id=row[3] or "",
-                        notes=row[4] or ""
-                    )
-                    sessions.append(session)
+            rows = self.store.execute(f'''
+                SELECT start_time, end_time, word_count, project_id, notes
+                FROM {self.sessions_table}
+                ORDER BY start_time DESC
+                LIMIT ?
+            ''', (limit,))
+
+            for row in rows:
+                start_time = datetime.datetime.fromisoformat(row[0])
+                end_time = datetime.datetime.fromisoformat(row[1]) if row[1] else None
+                session = WritingSession(
+                    start_time=start_time,
+                    end_time=end_time,
+                    word_count=row[2],
+                    project_id=row[3] or "",
+                    notes=row[4] or ""
+                )
+                sessions.append(session)
 
         except Exception as e:
             logger.error(f"Error retrieving sessions: {e}")
@@ -353,8 +357,8 @@ class WritingMetricsDatabase:
 class WritingAnalyticsDashboard:
     """Main analytics dashboard and controller."""
 
-    def __init__(self, db_path: str = "analytics.db"):
-        self.db = WritingMetricsDatabase(db_path)
+    def __init__(self, db_path: str = "analytics.db", storage: Optional[DatabaseManager] = None):
+        self.db = WritingMetricsDatabase(db_path, storage)
         self.text_analyzer = TextAnalyzer()
         self.current_project = None
         logger.info("Writing Analytics Dashboard initialized")
@@ -654,8 +658,8 @@ class AnalyticsEngine:
 class AnalyticsDashboard:
     """Advanced dashboard with enhanced analytics features."""
 
-    def __init__(self, db_path: str = "analytics.db"):
-        self.dashboard = WritingAnalyticsDashboard(db_path)
+    def __init__(self, db_path: str = "analytics.db", storage: Optional[DatabaseManager] = None):
+        self.dashboard = WritingAnalyticsDashboard(db_path, storage)
         self.engine = AnalyticsEngine(self.dashboard)
         self.widget = AnalyticsWidget(self.dashboard)
 
@@ -10,18 +10,18 @@ import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from collections import deque
-from ..database.database_manager import DatabaseManager
+from ..database.database_manager import DatabaseManager, get_db_manager, merge_rollups
 
 class PerformanceMonitor:
     """Monitor system and application performance."""
 
-    def __init__(self, update_interval: int = 60):
+    def __init__(self, update_interval: int = 60, db_manager: Optional[DatabaseManager] = None):
         """Initialize performance monitor."""
         self.update_interval = update_interval
         self.is_monitoring = False
         self.monitor_thread = None
         self.metrics_history = deque(maxlen=100)  # Keep last 100 measurements
-        self.db_manager = DatabaseManager()
+        self.db_manager = db_manager or get_db_manager()
         self._lock = threading.RLock()
 
         # Performance thresholds
@@ -119,16 +119,17 @@ class PerformanceMonitor:
             }
 
     def _store_metrics(self, metrics: Dict[str, Any]):
-        """Store metrics in memory and database."""
+        """Store metrics in memory and as time-series samples in the database."""
         with self._lock:
             self.metrics_history.append(metrics)
 
-            # Store in database (sample every 10 measurements to avoid too much data)
-            if len(self.metrics_history) % 10 == 0:
-                try:
-                    self.db_manager.store_performance_metrics(metrics)
-                except Exception as e:
-                    logging.error(f"Failed to store metrics in database: {str(e)}")
+        # Every measurement is stored; the database rolls samples up into
+        # minute, hour and day buckets and prunes old ones
+        if not metrics.get('is_event'):
+            try:
+                self.db_manager.store_performance_metrics(metrics)
+            except Exception as e:
+                logging.error(f"Failed to store metrics in database: {str(e)}")
 
     def _check_thresholds(self, metrics: Dict[str, Any]):
         """Check if metrics exceed thresholds and log warnings."""
@@ -231,42 +232,25 @@ class PerformanceMonitor:
             }
 
     def get_resource_usage_trend(self, resource: str, hours: int = 24) -> Dict[str, Any]:
-        """Get resource usage trend over time."""
+        """
+        Get resource usage trend over time from the stored time series, read
+        at a resolution that keeps the number of points small.
+        """
         try:
-            # Get metrics from database
-            metrics = self.db_manager.get_performance_metrics(hours * 60)  # Convert to minutes
-
-            if not metrics:
-                return {
-                    'resource': resource,
-                    'trend': 'stable',
-                    'data_points': 0,
-                    'current_value': 0,
-                    'min_value': 0,
-                    'max_value': 0,
-                    'average_value': 0
-                }
-
-            # Extract values for the specified resource
-            values = []
-            timestamps = []
-
-            for metric in metrics:
-                if resource in ['cpu_percent', 'memory_percent', 'disk_percent']:
-                    value = metric.get('system', {}).get(resource, 0)
-                elif resource.startswith('process_'):
-                    key = resource.replace('process_', '')
-                    value = metric.get('process', {}).get(key, 0)
-                else:
-                    continue
+            if resource in ['cpu_percent', 'memory_percent', 'disk_percent']:
+                metric = f"system.{resource}"
+            elif resource.startswith('process_'):
+                metric = f"process.{resource.replace('process_', '', 1)}"
+            else:
+                metric = None
 
-                values.append(value)
-                timestamps.append(metric['timestamp'])
+            end = time.time()
+            points = self.db_manager.metrics.query(metric, end - hours * 3600, end) if metric else []
 
-            if not values:
+            if not points:
                 return {
                     'resource': resource,
-                    'trend': 'no_data',
+                    'trend': 'no_data' if metric is None else 'stable',
                     'data_points': 0,
                     'current_value': 0,
                     'min_value': 0,
@@ -274,11 +258,17 @@ class PerformanceMonitor:
                     'average_value': 0
                 }
 
-            # Calculate statistics
-            current_value = values[-1] if values else 0
-            min_value = min(values)
-            max_value = max(values)
-            average_value = sum(values) / len(values)
+            # One value per point: the bucket average
+            values = [point['avg'] for point in points]
+            timestamps = [datetime.fromtimestamp(point['timestamp']).isoformat() for point in points]
+
+            # Calculate statistics over every sample the buckets hold
+            samples, min_value, max_value, total, p95_value = merge_rollups([
+                (point['count'], point['min'], point['max'], point['avg'] * point['count'], point['p95'])
+                for point in points
+            ])
+            current_value = values[-1]
+            average_value = total / samples
 
             # Determine trend
             if len(values) >= 2:
@@ -297,11 +287,12 @@ class PerformanceMonitor:
             return {
                 'resource': resource,
                 'trend': trend,
-                'data_points': len(values),
+                'data_points': samples,
                 'current_value': current_value,
                 'min_value': min_value,
                 'max_value': max_value,
                 'average_value': average_value,
+                'p95_value': p95_value,
                 'timestamps': timestamps[-20:],  # Return last 20 timestamps
                 'values': values[-20:]  # Return last 20 values
             }
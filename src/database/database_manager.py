@@ -7,15 +7,18 @@ import sqlite3
 import threading
 import time
 import logging
-import json
 import os
-from contextlib import contextmanager
-from typing import Dict, List, Optional, Any, Tuple, Union
+import re
+from contextlib import closing, contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Any, Sequence, Tuple, Union
 from datetime import datetime, timedelta
 from pathlib import Path
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 import weakref
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from itertools import islice
 from queue import Queue, Empty
 import hashlib
 
@@ -26,6 +29,16 @@ DEFAULT_CONNECTION_TIMEOUT = 30
 DEFAULT_QUERY_TIMEOUT = 30
 MIGRATION_VERSION_KEY = "schema_version"
 
+# Time-series rollup tiers and their bucket sizes in seconds, finest first
+METRIC_TIERS = (("1m", 60), ("1h", 3600), ("1d", 86400))
+# Seconds each tier is kept for; "raw" is the individual samples
+DEFAULT_METRICS_RETENTION = {
+    "raw": 2 * 86400,
+    "1m": 7 * 86400,
+    "1h": 90 * 86400,
+    "1d": 5 * 365 * 86400,
+}
+
 class ConnectionState(Enum):
     """Database connection states."""
     IDLE = "idle"
@@ -44,16 +57,30 @@ class DatabaseConfig:
     enable_wal_mode: bool = True
     enable_foreign_keys: bool = True
     enable_query_cache: bool = True
+    query_cache_entries: int = 256
+    query_cache_max_bytes: int = 8 * 1024 * 1024
+    query_cache_ttl: float = 300.0  # Seconds
+    cached_statements: int = 256  # Prepared statements kept per connection
+    bulk_chunk_size: int = 500  # Rows per executemany() call
+    write_batch_size: int = 256  # Queued writes committed per group transaction
+    slow_query_threshold: float = 0.1  # Seconds; slower queries are logged with their plan
+    slow_query_log_size: int = 1000  # Rows kept in the slow_queries table
+    index_advisor: bool = False  # Development aid: flag new query shapes that scan whole tables
+    # Seconds performance metric samples and rollups are kept, by tier
+    metrics_retention: Dict[str, int] = field(default_factory=lambda: dict(DEFAULT_METRICS_RETENTION))
     auto_vacuum: bool = True
     cache_size: int = 2000  # Pages
     journal_mode: str = "WAL"
     synchronous: str = "NORMAL"
     temp_store: str = "MEMORY"
+    mmap_size: int = 256 * 1024 * 1024  # Bytes
+    # Other SQLite files attached to every connection, by schema name
+    attached_databases: Dict[str, str] = field(default_factory=dict)
 
 @dataclass
 class QueryMetrics:
     """Query performance metrics."""
-    query_hash: str
+    query_hash: str  # Fingerprint of the normalized query
     execution_time: float
     rows_affected: int
     timestamp: datetime
@@ -61,12 +88,513 @@ class QueryMetrics:
     success: bool
     error_message: Optional[str] = None
 
+# Authorizer actions that change the named table (the table name is in arg1,
+# or arg2 for ALTER TABLE)
+WRITE_ACTIONS = {
+    sqlite3.SQLITE_INSERT, sqlite3.SQLITE_UPDATE, sqlite3.SQLITE_DELETE,
+    sqlite3.SQLITE_CREATE_TABLE, sqlite3.SQLITE_DROP_TABLE, sqlite3.SQLITE_CREATE_TEMP_TABLE,
+    sqlite3.SQLITE_DROP_TEMP_TABLE, sqlite3.SQLITE_ALTER_TABLE
+}
+
+# Authorizer actions a read-only statement may perform; anything else (including
+# statements such as VACUUM that report no actions) needs the write connection
+READ_ACTIONS = {
+    sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE
+}
+
+# Functions whose result changes between calls; queries using them are not cached
+VOLATILE_FUNCTIONS = {
+    'random', 'randomblob', 'changes', 'total_changes', 'last_insert_rowid',
+    'date', 'time', 'datetime', 'julianday', 'unixepoch', 'strftime', 'timediff'
+}
+
+
+@dataclass(frozen=True)
+class StatementTables:
+    """Tables a statement reads and writes, as reported by the SQLite authorizer."""
+    reads: frozenset
+    writes: frozenset
+    volatile: bool = False
+    read_only: bool = True
+
+    @property
+    def cacheable(self) -> bool:
+        return self.read_only and not self.volatile and bool(self.reads)
+
+
+def qualified_table(database: Optional[str], table: str) -> str:
+    """Table name for cache bookkeeping: bare in main, schema.table elsewhere."""
+    if database in (None, 'main', 'temp'):
+        return table.lower()
+    return f"{database.lower()}.{table.lower()}"
+
+
+def analyze_statement(connection: sqlite3.Connection, query: str,
+                      params: Tuple = None) -> Optional[StatementTables]:
+    """
+    Find the tables a statement touches by compiling it under EXPLAIN with an
+    authorizer installed. EXPLAIN always compiles afresh, so this works even
+    when the statement itself is in the connection's statement cache. Views,
+    triggers and CTEs are expanded to the tables they use. The statement is
+    read-only if every action it performs only reads. Returns None if the
+    statement does not compile.
+    """
+    reads, writes = set(), set()
+    volatile = False
+    authorized = False
+    read_only = True
+
+    def authorizer(action, arg1, arg2, database, source):
+        nonlocal volatile, authorized, read_only
+        authorized = True
+        # Pragmas only read when they are not given a value
+        if action not in READ_ACTIONS and not (action == sqlite3.SQLITE_PRAGMA and arg2 is None):
+            read_only = False
+
+        if action == sqlite3.SQLITE_READ and arg1:
+            reads.add(qualified_table(database, arg1))
+        elif action in WRITE_ACTIONS:
+            table = arg2 if action == sqlite3.SQLITE_ALTER_TABLE else arg1
+            if table:
+                writes.add(qualified_table(database, table))
+            if action not in (sqlite3.SQLITE_INSERT, sqlite3.SQLITE_UPDATE, sqlite3.SQLITE_DELETE):
+                writes.add('sqlite_master')  # Schema changed
+        elif action == sqlite3.SQLITE_FUNCTION and arg2 and arg2.lower() in VOLATILE_FUNCTIONS:
+            volatile = True
+        return sqlite3.SQLITE_OK
+
+    connection.set_authorizer(authorizer)
+    try:
+        connection.execute(f"EXPLAIN {query}", params or ()).fetchall()
+    except sqlite3.Error:
+        return None
+    finally:
+        connection.set_authorizer(None)
+
+    return StatementTables(frozenset(reads), frozenset(writes), volatile,
+                           read_only and authorized and not writes)
+
+
+class QueryCache:
+    """
+    Bounded LRU cache of query results.
+
+    Entries are keyed on the SQL text, its parameters and the fetch mode, and
+    remember the tables their query read. A write to any of those tables
+    drops the entry. Each table carries a generation number so that a result
+    read while a write to its tables was in progress is not stored.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 8 * 1024 * 1024,
+                 ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries: OrderedDict = OrderedDict()  # key -> (result, tables, size, stored_at)
+        self.table_keys: Dict[str, set] = {}
+        self.generations: Dict[str, int] = {}
+        self.memory_bytes = 0
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'evictions': 0}
+
+    @staticmethod
+    def make_key(query: str, params: Tuple, fetch: str) -> str:
+        return hashlib.md5(repr((query, tuple(params or ()), fetch)).encode()).hexdigest()
+
+    @staticmethod
+    def estimate_size(result: Any) -> int:
+        """Approximate memory used by a fetched result."""
+        rows = result if isinstance(result, list) else [result]
+        size = 64
+        for row in rows:
+            if row is None:
+                continue
+            size += 56
+            for value in row:
+                size += len(value) + 33 if isinstance(value, (str, bytes)) else 24
+        return size
+
+    def get(self, key: str) -> Optional[Any]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or time.time() - entry[3] > self.ttl:
+                if entry is not None:
+                    self._remove(key)
+                self.stats['misses'] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            result = entry[0]
+        return list(result) if isinstance(result, list) else result
+
+    def generation(self, tables: frozenset) -> Tuple:
+        """Snapshot of the tables' generations, taken before a query runs."""
+        with self.lock:
+            return tuple(self.generations.get(table, 0) for table in sorted(tables))
+
+    def put(self, key: str, result: Any, tables: frozenset, generation: Tuple):
+        size = self.estimate_size(result)
+        if size > self.max_bytes // 4:
+            return
+        stored = list(result) if isinstance(result, list) else result
+
+        with self.lock:
+            if generation != tuple(self.generations.get(table, 0) for table in sorted(tables)):
+                return  # A write to these tables happened while the query ran
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (stored, tables, size, time.time())
+            self.memory_bytes += size
+            for table in tables:
+                self.table_keys.setdefault(table, set()).add(key)
+
+            while len(self.entries) > self.max_entries or self.memory_bytes > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.stats['evictions'] += 1
+
+    def invalidate(self, tables) -> int:
+        """Drop every entry that read any of the tables."""
+        removed = 0
+        with self.lock:
+            for table in tables:
+                self.generations[table] = self.generations.get(table, 0) + 1
+                for key in list(self.table_keys.get(table, ())):
+                    self._remove(key)
+                    removed += 1
+            self.stats['invalidations'] += removed
+        return removed
+
+    def clear(self):
+        with self.lock:
+            for table in list(self.table_keys) + list(self.generations):
+                self.generations[table] = self.generations.get(table, 0) + 1
+            self.stats['invalidations'] += len(self.entries)
+            self.entries.clear()
+            self.table_keys.clear()
+            self.memory_bytes = 0
+
+    def _remove(self, key: str):
+        result, tables, size, _ = self.entries.pop(key)
+        self.memory_bytes -= size
+        for table in tables:
+            keys = self.table_keys.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.table_keys[table]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return dict(
+                self.stats,
+                entries=len(self.entries),
+                max_entries=self.max_entries,
+                memory_bytes=self.memory_bytes,
+                max_bytes=self.max_bytes,
+                hit_ratio=self.stats['hits'] / lookups if lookups else 0.0
+            )
+
+
+# Comments, literals and parameters in SQL, matched in one pass so that a
+# comment marker inside a string is not taken for a comment. Comments are
+# dropped and the rest replaced by ? when fingerprinting
+SQL_LITERAL = re.compile(
+    r"(--[^\n]*|/\*.*?\*/)"                # Comment
+    r"|\b[xX]'[0-9a-fA-F]*'"               # Blob
+    r"|'(?:[^']|'')*'"                      # String
+    r"|(?<![\w.])\d+(?:\.\d*)?(?:[eE][-+]?\d+)?"  # Number
+    r"|\?\d*|[:@$][A-Za-z_]\w*",           # Parameter
+    re.S
+)
+SQL_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+SQL_ROW_LIST = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+
+# Latency samples kept per fingerprint for percentiles
+QUERY_SAMPLE_SIZE = 1000
+
+
+def normalize_query(query: str) -> str:
+    """
+    Reduce a statement to its shape: comments, literals and parameters are
+    removed, value lists such as IN (1, 2, 3) or multi-row VALUES collapse
+    to (?), and whitespace and case are normalized. Statements that differ
+    only in their values share a fingerprint.
+    """
+    normalized = SQL_LITERAL.sub(lambda match: " " if match.group(1) else "?", query)
+    normalized = SQL_VALUE_LIST.sub("(?)", normalized)
+    normalized = SQL_ROW_LIST.sub("(?)", normalized)
+    return " ".join(normalized.split()).rstrip(";").strip().lower()
+
+
+def query_fingerprint(normalized: str) -> str:
+    return hashlib.md5(normalized.encode()).hexdigest()[:16]
+
+
+def nearest_rank(ordered: Sequence[float], percent: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    if not ordered:
+        return 0.0
+    rank = max(1, int(-(-percent * len(ordered) // 100)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def format_query_plan(rows: List[Tuple]) -> str:
+    """Indent EXPLAIN QUERY PLAN rows (id, parent, notused, detail) as a tree."""
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return "\n".join(lines)
+
+
+class QueryStats:
+    """Call count, timings and recent latencies for one query fingerprint."""
+
+    def __init__(self, fingerprint: str, query: str):
+        self.fingerprint = fingerprint
+        self.query = query
+        self.query_type = query.split(" ", 1)[0].upper() if query else ""
+        self.count = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.slow_count = 0
+        self.last_plan: Optional[str] = None
+        self.samples = deque(maxlen=QUERY_SAMPLE_SIZE)
+
+    def add(self, execution_time: float, rows_affected: int, success: bool):
+        self.count += 1
+        self.total_time += execution_time
+        self.max_time = max(self.max_time, execution_time)
+        self.rows += max(rows_affected, 0)
+        if not success:
+            self.errors += 1
+        self.samples.append(execution_time)
+
+    def percentile(self, percent: float) -> float:
+        """Nearest-rank percentile of the recent latencies."""
+        return nearest_rank(sorted(self.samples), percent)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'fingerprint': self.fingerprint,
+            'query': self.query,
+            'query_type': self.query_type,
+            'count': self.count,
+            'errors': self.errors,
+            'rows': self.rows,
+            'total_time': self.total_time,
+            'mean_time': self.total_time / self.count if self.count else 0.0,
+            'max_time': self.max_time,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'slow_count': self.slow_count,
+            'last_plan': self.last_plan
+        }
+
+
+class QueryProfiler:
+    """
+    Aggregates query timings by fingerprint.
+
+    Up to max_fingerprints statements are tracked; the least recently run
+    is dropped to make room for a new one.
+    """
+
+    def __init__(self, slow_threshold: float = 0.1, max_fingerprints: int = 500):
+        self.slow_threshold = slow_threshold
+        self.max_fingerprints = max_fingerprints
+        self.stats: OrderedDict = OrderedDict()
+        self.normalized: Dict[str, Tuple[str, str]] = {}
+        self.lock = threading.Lock()
+
+    def fingerprint(self, query: str) -> Tuple[str, str]:
+        """(fingerprint, normalized query), memoized per SQL text."""
+        result = self.normalized.get(query)
+        if result is None:
+            normalized = normalize_query(query)
+            result = (query_fingerprint(normalized), normalized)
+            if len(self.normalized) >= 4096:
+                self.normalized.clear()
+            self.normalized[query] = result
+        return result
+
+    def record(self, query: str, execution_time: float, rows_affected: int = 0,
+               success: bool = True) -> QueryStats:
+        fingerprint, normalized = self.fingerprint(query)
+        with self.lock:
+            stats = self.stats.get(fingerprint)
+            if stats is None:
+                stats = self.stats[fingerprint] = QueryStats(fingerprint, normalized)
+                if len(self.stats) > self.max_fingerprints:
+                    self.stats.popitem(last=False)
+            else:
+                self.stats.move_to_end(fingerprint)
+            stats.add(execution_time, rows_affected, success)
+        return stats
+
+    def is_slow(self, execution_time: float) -> bool:
+        return self.slow_threshold is not None and execution_time >= self.slow_threshold
+
+    def top_queries(self, limit: int = 10, order_by: str = 'total_time') -> List[Dict[str, Any]]:
+        """Statistics for the worst fingerprints by order_by (a to_dict() key)."""
+        with self.lock:
+            entries = [stats.to_dict() for stats in self.stats.values()]
+        entries.sort(key=lambda entry: entry[order_by], reverse=True)
+        return entries[:limit]
+
+    def reset(self):
+        with self.lock:
+            self.stats.clear()
+
+    def __len__(self) -> int:
+        return len(self.stats)
+
+
+# EXPLAIN QUERY PLAN detail for a full table scan: "SCAN t", or "SCAN TABLE t"
+# before SQLite 3.36. Scans using an index, of a subquery, of a virtual table or
+# of a constant row are not flagged
+FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(?!CONSTANT ROW|\()(\S+)(?:(?! USING | VIRTUAL TABLE).)*$")
+WHERE_CLAUSE = re.compile(r"\bwhere\b(.*?)(?:\bgroup by\b|\border by\b|\blimit\b|\)\s*$|$)")
+EQUALITY_FILTER = re.compile(r"([\w.]+)\s*(?:=|\bin\b)\s*\(?\?")
+RANGE_FILTER = re.compile(r"([\w.]+)\s*(?:>=|<=|>|<|\bbetween\b|\blike\b)\s*\?")
+
+
+def suggest_index_columns(normalized_query: str) -> List[str]:
+    """
+    Columns for an index serving a normalized query's WHERE clause: its
+    equality filters, then its first range filter. A heuristic for
+    single-table filters; joins and expressions need a human look.
+    """
+    match = WHERE_CLAUSE.search(normalized_query)
+    if not match:
+        return []
+    clause = match.group(1)
+    columns = []
+    for column in EQUALITY_FILTER.findall(clause):
+        if column.split('.')[-1] not in columns:
+            columns.append(column.split('.')[-1])
+    for column in RANGE_FILTER.findall(clause):
+        if column.split('.')[-1] not in columns:
+            columns.append(column.split('.')[-1])
+            break
+    return columns
+
+
+class IndexAdvisor:
+    """
+    Runs EXPLAIN QUERY PLAN once per query fingerprint and keeps the queries
+    whose plan scans a whole table, with suggested index columns. Meant for
+    development: enable it with DatabaseConfig.index_advisor.
+    """
+
+    def __init__(self, max_findings: int = 200):
+        self.max_findings = max_findings
+        self.checked = set()
+        self.findings: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+
+    def check(self, stats: QueryStats, query: str, params: Tuple,
+              connection: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+        """Explain a query the first time its fingerprint is seen; returns a new finding."""
+        with self.lock:
+            if stats.fingerprint in self.checked:
+                return None
+            self.checked.add(stats.fingerprint)
+        try:
+            rows = connection.execute(f"EXPLAIN QUERY PLAN {query}", params or ()).fetchall()
+        except sqlite3.Error:
+            return None
+
+        scans = [match.group(1) for match in (FULL_SCAN.match(row[3]) for row in rows) if match]
+        if not scans:
+            return None
+        finding = {
+            'fingerprint': stats.fingerprint,
+            'query': stats.query,
+            'tables': scans,
+            'suggested_columns': suggest_index_columns(stats.query),
+            'query_plan': format_query_plan(rows),
+        }
+        with self.lock:
+            self.findings[stats.fingerprint] = finding
+            if len(self.findings) > self.max_findings:
+                self.findings.popitem(last=False)
+        logging.warning(f"Full table scan of {', '.join(scans)}: {stats.query}")
+        return finding
+
+    def get_findings(self) -> List[Dict[str, Any]]:
+        """Flagged queries, oldest first."""
+        with self.lock:
+            return list(self.findings.values())
+
+    def reset(self):
+        with self.lock:
+            self.checked.clear()
+            self.findings.clear()
+
+SCHEMA_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def apply_schema_pragmas(connection: sqlite3.Connection, config: DatabaseConfig,
+                         schema: str = "main"):
+    """Apply the per-database PRAGMAs to one schema of a connection."""
+    connection.execute(f"PRAGMA {schema}.journal_mode = {config.journal_mode}").fetchall()
+    connection.execute(f"PRAGMA {schema}.synchronous = {config.synchronous}")
+    connection.execute(f"PRAGMA {schema}.cache_size = {config.cache_size}")
+    connection.execute(f"PRAGMA {schema}.mmap_size = {config.mmap_size}").fetchall()
+    if config.auto_vacuum:
+        connection.execute(f"PRAGMA {schema}.auto_vacuum = INCREMENTAL")
+
+
+def attach_schema(connection: sqlite3.Connection, config: DatabaseConfig, schema: str, path: str):
+    """Attach a SQLite file to a connection as schema, with the shared PRAGMAs."""
+    if not SCHEMA_NAME.match(schema) or schema.lower() in ('main', 'temp'):
+        raise ValueError(f"Invalid schema name: {schema!r}")
+    connection.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+    apply_schema_pragmas(connection, config, schema)
+
+
+def configure_sqlite_connection(connection: sqlite3.Connection, config: DatabaseConfig,
+                                read_only: bool = False):
+    """
+    Apply FANWS's SQLite settings to a new connection and attach the
+    configured databases, so every store shares the same journal, sync and
+    cache settings. Used for pooled and writer connections, and for the
+    SQLAlchemy engine's connections.
+    """
+    # Enable foreign keys
+    if config.enable_foreign_keys:
+        connection.execute("PRAGMA foreign_keys = ON")
+
+    # Set temp store
+    connection.execute(f"PRAGMA temp_store = {config.temp_store}")
+
+    # Journal mode, synchronous mode, cache size and auto vacuum are set per database
+    apply_schema_pragmas(connection, config)
+    for schema, path in config.attached_databases.items():
+        attach_schema(connection, config, schema, path)
+
+    # Pooled connections only read; writes go through the DatabaseWriter
+    if read_only:
+        connection.execute("PRAGMA query_only = ON")
+
+
 class DatabaseConnection:
     """Enhanced database connection with state management."""
 
-    def __init__(self, connection: sqlite3.Connection, config: DatabaseConfig):
+    def __init__(self, connection: sqlite3.Connection, config: DatabaseConfig,
+                 read_only: bool = False):
         self.connection = connection
         self.config = config
+        self.read_only = read_only
         self.state = ConnectionState.IDLE
         self.created_at = datetime.now()
         self.last_used = datetime.now()
@@ -77,33 +605,12 @@ class DatabaseConnection:
 
     def _configure_connection(self):
         """Configure connection with optimal settings."""
-        cursor = self.connection.cursor()
-
-        # Enable foreign keys
-        if self.config.enable_foreign_keys:
-            cursor.execute("PRAGMA foreign_keys = ON")
-
-        # Set journal mode
-        cursor.execute(f"PRAGMA journal_mode = {self.config.journal_mode}")
-
-        # Set synchronous mode
-        cursor.execute(f"PRAGMA synchronous = {self.config.synchronous}")
-
-        # Set cache size
-        cursor.execute(f"PRAGMA cache_size = {self.config.cache_size}")
-
-        # Set temp store
-        cursor.execute(f"PRAGMA temp_store = {self.config.temp_store}")
-
-        # Enable auto vacuum
-        if self.config.auto_vacuum:
-            cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        configure_sqlite_connection(self.connection, self.config, self.read_only)
+        self.attached = dict(self.config.attached_databases)
 
         # Set row factory for dict-like access
         self.connection.row_factory = sqlite3.Row
 
-        cursor.close()
-
     def is_healthy(self) -> bool:
         """Check if connection is healthy."""
         try:
@@ -111,6 +618,10 @@ class DatabaseConnection:
                 if self.state == ConnectionState.CLOSED:
                     return False
 
+                # Replace connections opened before a database was attached
+                if self.attached != self.config.attached_databases:
+                    return False
+
                 cursor = self.connection.cursor()
                 cursor.execute("SELECT 1")
                 cursor.close()
@@ -136,15 +647,16 @@ class DatabaseConnection:
                 self.state = ConnectionState.CLOSED
 
 class ConnectionPool:
-    """Advanced connection pool with health monitoring."""
+    """Pool of read-only connections with health monitoring."""
 
     def __init__(self, config: DatabaseConfig):
         self.config = config
         self.pool = Queue(maxsize=config.max_connections)
         self.active_connections = weakref.WeakSet()
         self.total_connections = 0
-        self.pool_lock = threading.Lock()
+        self.pool_lock = threading.RLock()
         self._shutdown = False
+        self._shutdown_event = threading.Event()
         self.metrics = {
             'connections_created': 0,
             'connections_reused': 0,
@@ -179,10 +691,11 @@ class ConnectionPool:
             sqlite_conn = sqlite3.connect(
                 self.config.database_path,
                 timeout=self.config.connection_timeout,
-                check_same_thread=False
+                check_same_thread=False,
+                cached_statements=self.config.cached_statements
             )
 
-            conn = DatabaseConnection(sqlite_conn, self.config)
+            conn = DatabaseConnection(sqlite_conn, self.config, read_only=True)
 
             with self.pool_lock:
                 self.total_connections += 1
@@ -212,6 +725,8 @@ class ConnectionPool:
             else:
                 # Connection is unhealthy, close it
                 conn.close()
+                with self.pool_lock:
+                    self.total_connections -= 1
 
         except Empty:
             # Pool is empty
@@ -250,7 +765,7 @@ class ConnectionPool:
         """Background health check for connections."""
         while not self._shutdown:
             try:
-                time.sleep(60)  # Check every minute
+                self._shutdown_event.wait(60)  # Check every minute
                 if not self._shutdown:
                     self._perform_health_check()
             except Exception as e:
@@ -299,6 +814,7 @@ class ConnectionPool:
         """Close all connections in the pool."""
         # Signal shutdown to health check thread
         self._shutdown = True
+        self._shutdown_event.set()
         
         # Close connections in pool
         while True:
@@ -319,20 +835,187 @@ class ConnectionPool:
         if self.health_check_thread.is_alive():
             self.health_check_thread.join(timeout=2)
 
+@dataclass
+class WriteRequest:
+    """A queued write for the DatabaseWriter."""
+    operation: Callable[[sqlite3.Connection], Any]
+    future: Future
+    on_commit: Optional[Callable[[], None]] = None
+    transactional: bool = True
+
+class DatabaseWriter:
+    """
+    Owns the only write connection and applies queued writes on one thread.
+
+    SQLite allows a single writer at a time, so concurrent writers on pooled
+    connections wait on its lock and fail with "database is locked". Here
+    callers queue an operation and get a Future instead. Writes that queue up
+    while a transaction is running are committed together in the next one
+    (group commit), each inside its own savepoint so that a failing write only
+    fails its own future. on_commit callbacks run after the commit and before
+    the futures resolve.
+
+    Operations that manage transactions themselves (migrations, VACUUM) are
+    submitted with transactional=False and run alone in autocommit mode.
+    """
+
+    def __init__(self, config: DatabaseConfig):
+        self.config = config
+        connection = sqlite3.connect(
+            config.database_path,
+            timeout=config.connection_timeout,
+            check_same_thread=False,
+            cached_statements=config.cached_statements,
+            isolation_level=None
+        )
+        self.connection = DatabaseConnection(connection, config)
+        self.queue = Queue()
+        self.lock = threading.Lock()
+        self._closed = False
+        self.metrics = {
+            'writes': 0,
+            'failed_writes': 0,
+            'transactions': 0,
+            'largest_batch': 0
+        }
+        self.thread = threading.Thread(target=self._run, name="DatabaseWriter", daemon=True)
+        self.thread.start()
+
+    def submit(self, operation: Callable[[sqlite3.Connection], Any],
+               on_commit: Optional[Callable[[], None]] = None,
+               transactional: bool = True) -> Future:
+        """Queue operation(connection); the future resolves once it is committed."""
+        future = Future()
+        with self.lock:
+            if self._closed:
+                raise RuntimeError("Database writer is closed")
+            self.queue.put(WriteRequest(operation, future, on_commit, transactional))
+        return future
+
+    def _run(self):
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            while (len(batch) < self.config.write_batch_size
+                   and batch[-1] is not None and batch[-1].transactional):
+                try:
+                    batch.append(self.queue.get_nowait())
+                except Empty:
+                    break
+
+            if batch[-1] is None:
+                batch.pop()
+                running = False
+            standalone = batch.pop() if batch and not batch[-1].transactional else None
+
+            if batch:
+                self._commit_batch(batch)
+            if standalone is not None:
+                self._run_standalone(standalone)
+
+        self.connection.close()
+
+    def _commit_batch(self, batch: List[WriteRequest]):
+        """Apply a batch of writes in one transaction."""
+        connection = self.connection.connection
+        applied = []
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            for request in batch:
+                if not request.future.set_running_or_notify_cancel():
+                    continue
+                connection.execute("SAVEPOINT queued_write")
+                try:
+                    result = request.operation(connection)
+                except Exception as e:
+                    connection.execute("ROLLBACK TO queued_write")
+                    connection.execute("RELEASE queued_write")
+                    request.future.set_exception(e)
+                    self.metrics['failed_writes'] += 1
+                else:
+                    connection.execute("RELEASE queued_write")
+                    applied.append((request, result))
+            connection.execute("COMMIT")
+        except Exception as e:
+            logging.error(f"Write transaction failed: {e}")
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            self.metrics['failed_writes'] += len(applied)
+            return
+
+        self.metrics['transactions'] += 1
+        self.metrics['writes'] += len(applied)
+        self.metrics['largest_batch'] = max(self.metrics['largest_batch'], len(batch))
+        for request, result in applied:
+            self._finish(request, result)
+
+    def _run_standalone(self, request: WriteRequest):
+        """Run an operation that manages its own transactions."""
+        if not request.future.set_running_or_notify_cancel():
+            return
+        connection = self.connection.connection
+        try:
+            result = request.operation(connection)
+            if connection.in_transaction:
+                connection.execute("COMMIT")
+        except Exception as e:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            request.future.set_exception(e)
+            self.metrics['failed_writes'] += 1
+            return
+        self.metrics['writes'] += 1
+        self._finish(request, result)
+
+    @staticmethod
+    def _finish(request: WriteRequest, result: Any):
+        if request.on_commit is not None:
+            try:
+                request.on_commit()
+            except Exception as e:
+                logging.error(f"Write commit callback failed: {e}")
+        request.future.set_result(result)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get writer statistics."""
+        return dict(self.metrics, queue_depth=self.queue.qsize())
+
+    def close(self):
+        """Apply the writes already queued, then stop the writer thread."""
+        with self.lock:
+            if self._closed:
+                return
+            self._closed = True
+            self.queue.put(None)
+        self.thread.join()
+
+MigrationSQL = Union[str, Callable[[sqlite3.Connection], str]]
+
+
 class DatabaseMigration:
-    """Database migration management."""
+    """
+    Database migration management. Migration SQL is a script, or a function
+    that builds the script for the connection it runs on.
+    """
 
-    def __init__(self, version: int, description: str, up_sql: str, down_sql: str = ""):
+    def __init__(self, version: int, description: str, up_sql: MigrationSQL, down_sql: MigrationSQL = ""):
         self.version = version
         self.description = description
         self.up_sql = up_sql
         self.down_sql = down_sql
 
+    @staticmethod
+    def _script(sql: MigrationSQL, connection: sqlite3.Connection) -> str:
+        return sql(connection) if callable(sql) else sql
+
     def apply(self, connection: sqlite3.Connection):
         """Apply migration."""
         cursor = connection.cursor()
         try:
-            cursor.executescript(self.up_sql)
+            cursor.executescript(self._script(self.up_sql, connection))
             connection.commit()
             logging.info(f"Applied migration {self.version}: {self.description}")
         except Exception as e:
@@ -349,7 +1032,7 @@ class DatabaseMigration:
 
         cursor = connection.cursor()
         try:
-            cursor.executescript(self.down_sql)
+            cursor.executescript(self._script(self.down_sql, connection))
             connection.commit()
             logging.info(f"Rolled back migration {self.version}: {self.description}")
         except Exception as e:
@@ -364,14 +1047,24 @@ class DatabaseManager:
 
     def __init__(self, config: DatabaseConfig = None):
         self.config = config or DatabaseConfig()
-        self.pool = ConnectionPool(self.config)
-        self.query_cache = {} if self.config.enable_query_cache else None
+        self.query_cache = QueryCache(
+            self.config.query_cache_entries, self.config.query_cache_max_bytes,
+            self.config.query_cache_ttl
+        ) if self.config.enable_query_cache else None
+        self.statement_tables: Dict[str, StatementTables] = {}
         self.migrations = self._load_migrations()
-        self.query_metrics = []
+        self.query_metrics = deque(maxlen=1000)
         self.metrics_lock = threading.Lock()
+        self.profiler = QueryProfiler(self.config.slow_query_threshold)
+        self.index_advisor = IndexAdvisor() if self.config.index_advisor else None
+        self.metrics = TimeSeriesStore(self, self.config.metrics_retention)
+        self.attach_lock = threading.Lock()
 
-        # Ensure database exists and is migrated
+        # Ensure database exists, open the write connection before the
+        # read-only pool, and migrate
         self._ensure_database()
+        self.writer = DatabaseWriter(self.config)
+        self.pool = ConnectionPool(self.config)
         self._run_migrations()
 
     def _ensure_database(self):
@@ -379,6 +1072,9 @@ class DatabaseManager:
         db_path = Path(self.config.database_path)
         db_path.parent.mkdir(parents=True, exist_ok=True)
 
+        for path in self.config.attached_databases.values():
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
         # Create database if it doesn't exist
         if not db_path.exists():
             with sqlite3.connect(str(db_path)) as conn:
@@ -481,41 +1177,133 @@ class DatabaseManager:
                 CREATE INDEX IF NOT EXISTS idx_projects_status ON projects(status);
                 CREATE INDEX IF NOT EXISTS idx_projects_last_modified ON projects(last_modified);
 
-                CREATE INDEX IF NOT EXISTS idx_api_usage_project_name ON api_usage(project_name);
+                CREATE INDEX IF NOT EXISTS idx_api_usage_project_id ON api_usage(project_id);
                 CREATE INDEX IF NOT EXISTS idx_api_usage_timestamp ON api_usage(timestamp);
                 CREATE INDEX IF NOT EXISTS idx_api_usage_api_type ON api_usage(api_type);
 
-                CREATE INDEX IF NOT EXISTS idx_content_cache_project_name ON content_cache(project_name);
+                CREATE INDEX IF NOT EXISTS idx_content_cache_project_id ON content_cache(project_id);
                 CREATE INDEX IF NOT EXISTS idx_content_cache_content_type ON content_cache(content_type);
                 CREATE INDEX IF NOT EXISTS idx_content_cache_created_date ON content_cache(created_date);
                 CREATE INDEX IF NOT EXISTS idx_content_cache_expires_date ON content_cache(expires_date);
 
-                CREATE INDEX IF NOT EXISTS idx_writing_sessions_project_name ON writing_sessions(project_name);
+                CREATE INDEX IF NOT EXISTS idx_writing_sessions_project_id ON writing_sessions(project_id);
                 CREATE INDEX IF NOT EXISTS idx_writing_sessions_start_time ON writing_sessions(start_time);
 
-                CREATE INDEX IF NOT EXISTS idx_performance_metrics_project_name ON performance_metrics(project_name);
+                CREATE INDEX IF NOT EXISTS idx_performance_metrics_project_id ON performance_metrics(project_id);
                 CREATE INDEX IF NOT EXISTS idx_performance_metrics_timestamp ON performance_metrics(timestamp);
                 CREATE INDEX IF NOT EXISTS idx_performance_metrics_metric_type ON performance_metrics(metric_type);
             """,
             down_sql="""
                 DROP INDEX IF EXISTS idx_performance_metrics_metric_type;
                 DROP INDEX IF EXISTS idx_performance_metrics_timestamp;
-                DROP INDEX IF EXISTS idx_performance_metrics_project_name;
+                DROP INDEX IF EXISTS idx_performance_metrics_project_id;
                 DROP INDEX IF EXISTS idx_writing_sessions_start_time;
-                DROP INDEX IF EXISTS idx_writing_sessions_project_name;
+                DROP INDEX IF EXISTS idx_writing_sessions_project_id;
                 DROP INDEX IF EXISTS idx_content_cache_expires_date;
                 DROP INDEX IF EXISTS idx_content_cache_created_date;
                 DROP INDEX IF EXISTS idx_content_cache_content_type;
-                DROP INDEX IF EXISTS idx_content_cache_project_name;
+                DROP INDEX IF EXISTS idx_content_cache_project_id;
                 DROP INDEX IF EXISTS idx_api_usage_api_type;
                 DROP INDEX IF EXISTS idx_api_usage_timestamp;
-                DROP INDEX IF EXISTS idx_api_usage_project_name;
+                DROP INDEX IF EXISTS idx_api_usage_project_id;
                 DROP INDEX IF EXISTS idx_projects_last_modified;
                 DROP INDEX IF EXISTS idx_projects_status;
                 DROP INDEX IF EXISTS idx_projects_name;
             """
         ))
 
+        # Migration 3: Slow query log
+        migrations.append(DatabaseMigration(
+            version=3,
+            description="Add slow query log",
+            up_sql="""
+                CREATE TABLE IF NOT EXISTS slow_queries (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    fingerprint TEXT NOT NULL,
+                    query_type TEXT,
+                    normalized_query TEXT NOT NULL,
+                    execution_time REAL NOT NULL,
+                    rows_affected INTEGER DEFAULT 0,
+                    query_plan TEXT,
+                    timestamp TEXT NOT NULL
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_slow_queries_fingerprint ON slow_queries(fingerprint);
+            """,
+            down_sql="""
+                DROP INDEX IF EXISTS idx_slow_queries_fingerprint;
+                DROP TABLE IF EXISTS slow_queries;
+            """
+        ))
+
+        # Migration 4: Composite indexes for filters on one column and a time
+        # range; they replace the single-column indexes on their first column.
+        # Databases from before projects were referenced by id have project_name
+        def project_column(connection: sqlite3.Connection) -> str:
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(writing_sessions)")}
+            return "project_id" if "project_id" in columns else "project_name"
+
+        migrations.append(DatabaseMigration(
+            version=4,
+            description="Add composite time-range indexes",
+            up_sql=lambda connection: f"""
+                CREATE INDEX IF NOT EXISTS idx_api_usage_type_timestamp ON api_usage(api_type, timestamp);
+                DROP INDEX IF EXISTS idx_api_usage_api_type;
+
+                CREATE INDEX IF NOT EXISTS idx_writing_sessions_project_start
+                    ON writing_sessions({project_column(connection)}, start_time);
+                DROP INDEX IF EXISTS idx_writing_sessions_{project_column(connection)};
+            """,
+            down_sql=lambda connection: f"""
+                CREATE INDEX IF NOT EXISTS idx_writing_sessions_{project_column(connection)}
+                    ON writing_sessions({project_column(connection)});
+                DROP INDEX IF EXISTS idx_writing_sessions_project_start;
+
+                CREATE INDEX IF NOT EXISTS idx_api_usage_api_type ON api_usage(api_type);
+                DROP INDEX IF EXISTS idx_api_usage_type_timestamp;
+            """
+        ))
+
+        # Migration 5: Typed time-series samples and their rollups, replacing
+        # JSON documents in performance_metrics
+        migrations.append(DatabaseMigration(
+            version=5,
+            description="Add metric samples and rollups",
+            up_sql="""
+                CREATE TABLE IF NOT EXISTS metric_samples (
+                    id INTEGER PRIMARY KEY,
+                    metric TEXT NOT NULL,
+                    timestamp REAL NOT NULL,
+                    value REAL NOT NULL
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_metric_samples_metric_timestamp
+                    ON metric_samples(metric, timestamp);
+                CREATE INDEX IF NOT EXISTS idx_metric_samples_timestamp ON metric_samples(timestamp);
+
+                CREATE TABLE IF NOT EXISTS metric_rollups (
+                    tier TEXT NOT NULL,
+                    metric TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    min REAL NOT NULL,
+                    max REAL NOT NULL,
+                    sum REAL NOT NULL,
+                    p95 REAL NOT NULL,
+                    PRIMARY KEY (tier, metric, bucket)
+                ) WITHOUT ROWID;
+
+                CREATE INDEX IF NOT EXISTS idx_metric_rollups_tier_bucket ON metric_rollups(tier, bucket);
+            """,
+            down_sql="""
+                DROP INDEX IF EXISTS idx_metric_rollups_tier_bucket;
+                DROP TABLE IF EXISTS metric_rollups;
+                DROP INDEX IF EXISTS idx_metric_samples_timestamp;
+                DROP INDEX IF EXISTS idx_metric_samples_metric_timestamp;
+                DROP TABLE IF EXISTS metric_samples;
+            """
+        ))
+
         return migrations
 
     def _get_schema_version(self) -> int:
@@ -529,31 +1317,59 @@ class DatabaseManager:
         except Exception:
             return 0
 
-    def _set_schema_version(self, version: int):
+    def _set_schema_version(self, connection: sqlite3.Connection, version: int):
         """Set schema version."""
-        with self.get_connection() as conn:
-            cursor = conn.connection.cursor()
-            cursor.execute(
-                "INSERT OR REPLACE INTO _metadata (key, value) VALUES (?, ?)",
-                (MIGRATION_VERSION_KEY, str(version))
-            )
-            conn.connection.commit()
+        connection.execute(
+            "INSERT OR REPLACE INTO _metadata (key, value) VALUES (?, ?)",
+            (MIGRATION_VERSION_KEY, str(version))
+        )
 
     def _run_migrations(self):
-        """Run pending migrations."""
+        """Run pending migrations on the writer."""
         current_version = self._get_schema_version()
 
         for migration in self.migrations:
             if migration.version > current_version:
                 logging.info(f"Running migration {migration.version}: {migration.description}")
 
-                with self.get_connection() as conn:
-                    migration.apply(conn.connection)
-                    self._set_schema_version(migration.version)
+                def apply(connection, migration=migration):
+                    migration.apply(connection)
+                    self._set_schema_version(connection, migration.version)
+
+                self.writer.submit(apply, self._invalidate_all, transactional=False).result()
+
+    def attach_database(self, schema: str, path: str):
+        """
+        Attach another SQLite file as schema on the writer and on every pooled
+        connection, with the same PRAGMAs as the main database. Its tables are
+        then queried as schema.table, and can be joined with the main tables
+        and written in the same transactions. Attaching an already attached
+        schema to the same file does nothing.
+        """
+        with self.attach_lock:
+            attached = self.config.attached_databases.get(schema)
+            if attached is not None:
+                if os.path.abspath(attached) != os.path.abspath(path):
+                    raise ValueError(f"Schema {schema!r} is already attached to {attached}")
+                return
+
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+            def attach(connection):
+                attach_schema(connection, self.config, schema, path)
+
+            self.writer.submit(attach, transactional=False).result()
+            # A new mapping, so pooled connections see they are out of date
+            self.config.attached_databases = dict(self.config.attached_databases, **{schema: path})
+            self.writer.connection.attached = dict(self.config.attached_databases)
+
+        # Unqualified names may now resolve differently
+        self.statement_tables.clear()
+        self._invalidate_all()
 
     @contextmanager
     def get_connection(self):
-        """Get a database connection from the pool."""
+        """Get a read-only database connection from the pool."""
         conn = self.pool.get_connection()
         try:
             conn.state = ConnectionState.ACTIVE
@@ -562,16 +1378,67 @@ class DatabaseManager:
             conn.state = ConnectionState.IDLE
             self.pool.return_connection(conn)
 
+    def _get_statement_tables(self, query: str, params: Tuple = None,
+                              connection: sqlite3.Connection = None) -> Optional[StatementTables]:
+        """Tables a statement reads and writes, analyzed once per SQL text."""
+        tables = self.statement_tables.get(query)
+        if tables is None and connection is not None:
+            tables = analyze_statement(connection, query, params)
+            if tables is not None:
+                if len(self.statement_tables) >= 1024:
+                    self.statement_tables.clear()
+                self.statement_tables[query] = tables
+        return tables
+
+    def _invalidate_tables(self, tables: Optional[StatementTables]):
+        """Drop cached results made stale by a statement; unknown statements drop everything."""
+        if self.query_cache is None:
+            return
+        if tables is None:
+            self.query_cache.clear()
+        elif tables.writes:
+            self.query_cache.invalidate(tables.writes)
+
+    def _invalidate_all(self):
+        if self.query_cache is not None:
+            self.query_cache.clear()
+
+    @staticmethod
+    def _fetch(cursor: sqlite3.Cursor, fetch: str) -> Any:
+        """Fetch results based on fetch parameter."""
+        if fetch == "all":
+            return cursor.fetchall()
+        elif fetch == "one":
+            return cursor.fetchone()
+        elif fetch == "many":
+            return cursor.fetchmany()
+        return cursor.rowcount
+
     def execute_query(self, query: str, params: Tuple = None, fetch: str = "all") -> Any:
-        """Execute a query with performance tracking."""
-        start_time = time.time()
-        query_hash = hashlib.md5(query.encode()).hexdigest()
+        """
+        Execute a query with performance tracking.
+
+        Reads run on a pooled read-only connection and are cached when
+        possible. Writes are queued on the writer and waited for.
+        """
+        tables = self._get_statement_tables(query)
+        if tables is None:
+            with self.get_connection() as conn:
+                tables = self._get_statement_tables(query, params, conn.connection)
+        if tables is None or not tables.read_only:
+            # Statements that write no tables (VACUUM, pragmas) may not run
+            # inside a transaction
+            transactional = tables is not None and bool(tables.writes)
+            return self.submit_query(query, params, fetch, transactional).result()
 
-        # Check query cache
-        if self.query_cache and params is None:
-            cached_result = self.query_cache.get(query_hash)
-            if cached_result:
+        start_time = time.time()
+        cacheable = self.query_cache is not None and fetch in ("all", "one") and tables.cacheable
+        if cacheable:
+            cache_key = self.query_cache.make_key(query, params, fetch)
+            cached_result = self.query_cache.get(cache_key)
+            if cached_result is not None:
                 return cached_result
+            generation = self.query_cache.generation(tables.reads)
 
         try:
             with self.get_connection() as conn:
@@ -582,58 +1449,190 @@ class DatabaseManager:
                 else:
                     cursor.execute(query)
 
-                # Fetch results based on fetch parameter
-                if fetch == "all":
-                    result = cursor.fetchall()
-                elif fetch == "one":
-                    result = cursor.fetchone()
-                elif fetch == "many":
-                    result = cursor.fetchmany()
-                else:
-                    result = cursor.rowcount
+                result = self._fetch(cursor, fetch)
 
-                # Cache result if caching is enabled
-                if self.query_cache and params is None and fetch in ["all", "one"]:
-                    self.query_cache[query_hash] = result
+                if cacheable:
+                    self.query_cache.put(cache_key, result, tables.reads, generation)
 
                 # Track metrics
                 execution_time = time.time() - start_time
-                self._track_query_metrics(query_hash, execution_time, cursor.rowcount, True)
+                self._track_query_metrics(query, execution_time, cursor.rowcount, True,
+                                          params=params, connection=conn.connection)
 
                 return result
 
         except Exception as e:
             execution_time = time.time() - start_time
-            self._track_query_metrics(query_hash, execution_time, 0, False, str(e))
+            self._track_query_metrics(query, execution_time, 0, False, str(e))
             raise
 
+    def _queue_write(self, query: Optional[str], operation: Callable,
+                     transactional: bool = True) -> Future:
+        """
+        Queue operation(connection, analyze) on the writer. The operation
+        returns (result, rows_affected) and calls analyze(query, params) for
+        each statement it runs, so that the cached reads of the tables those
+        statements write are dropped when the write commits. Its run time is
+        recorded against query; pass None if the operation records its own.
+        """
+        touched = []
+
+        def run(connection):
+            statement_params = []
+
+            def analyze(statement, params=None):
+                touched.append(self._get_statement_tables(statement, params, connection))
+                statement_params[:] = [params]
+
+            start_time = time.time()
+            try:
+                result, rows_affected = operation(connection, analyze)
+            except Exception as e:
+                if query is not None:
+                    self._track_query_metrics(query, time.time() - start_time, 0, False, str(e))
+                raise
+            if query is not None:
+                self._track_query_metrics(query, time.time() - start_time, rows_affected, True,
+                                          params=statement_params[0] if statement_params else None,
+                                          connection=connection)
+            return result
+
+        def on_commit():
+            for tables in touched:
+                self._invalidate_tables(tables)
+
+        return self.writer.submit(run, on_commit, transactional)
+
+    def submit_query(self, query: str, params: Tuple = None, fetch: str = "none",
+                     transactional: bool = True) -> Future:
+        """Queue a write; the future resolves to its result once committed."""
+        def operation(connection, analyze):
+            analyze(query, params)
+            cursor = connection.execute(query, params or ())
+            return self._fetch(cursor, fetch), cursor.rowcount
+
+        return self._queue_write(query, operation, transactional)
+
+    def submit_transaction(self, operations: List[Tuple[str, Tuple]]) -> Future:
+        """Queue operations to commit together; the future resolves to True."""
+        def operation(connection, analyze):
+            cursor = connection.cursor()
+            rows_affected = 0
+            for query, params in operations:
+                analyze(query, params)
+                start_time = time.time()
+                try:
+                    cursor.execute(query, params)
+                except Exception as e:
+                    self._track_query_metrics(query, time.time() - start_time, 0, False, str(e))
+                    raise
+                self._track_query_metrics(query, time.time() - start_time, cursor.rowcount, True,
+                                          params=params, connection=connection)
+                rows_affected += max(cursor.rowcount, 0)
+            return True, rows_affected
+
+        return self._queue_write(None, operation)
+
+    def submit_many(self, query: str, rows: Iterable[Sequence], chunk_size: int = None) -> Future:
+        """
+        Queue one statement for every row, committed together.
+
+        Rows may be any iterable, including a generator; they are passed to
+        executemany() in chunks of chunk_size so the statement is prepared
+        once and large batches are never held in memory at once. The future
+        resolves to the number of rows affected.
+        """
+        chunk_size = chunk_size or self.config.bulk_chunk_size
+
+        def operation(connection, analyze):
+            cursor = connection.cursor()
+            iterator = iter(rows)
+            affected = 0
+            first = True
+            while True:
+                chunk = list(islice(iterator, chunk_size))
+                if not chunk:
+                    break
+                if first:
+                    analyze(query, chunk[0])
+                    first = False
+                cursor.executemany(query, chunk)
+                affected += max(cursor.rowcount, 0)
+            return affected, affected
+
+        return self._queue_write(query, operation)
+
     def execute_transaction(self, operations: List[Tuple[str, Tuple]]) -> bool:
         """Execute multiple operations in a transaction."""
         try:
-            with self.get_connection() as conn:
-                conn.connection.execute("BEGIN")
-
-                for query, params in operations:
-                    cursor = conn.connection.cursor()
-                    cursor.execute(query, params)
-
-                conn.connection.commit()
-                return True
-
+            return self.submit_transaction(operations).result()
         except Exception as e:
-            conn.connection.rollback()
             logging.error(f"Transaction failed: {e}")
             raise
 
-    def _track_query_metrics(self, query_hash: str, execution_time: float,
-                            rows_affected: int, success: bool, error_message: str = None):
-        """Track query performance metrics."""
+    def execute_many(self, query: str, rows: Iterable[Sequence], chunk_size: int = None) -> int:
+        """Execute one statement for every row in a single transaction."""
+        try:
+            return self.submit_many(query, rows, chunk_size).result()
+        except Exception as e:
+            logging.error(f"Bulk execute failed: {e}")
+            raise
+
+    @staticmethod
+    def build_upsert(table: str, columns: Sequence[str], key_columns: Sequence[str],
+                     update_columns: Sequence[str] = None) -> str:
+        """INSERT ... ON CONFLICT statement for bulk_upsert()."""
+        def quote(name: str) -> str:
+            return '"' + name.replace('"', '""') + '"'
+
+        if update_columns is None:
+            update_columns = [column for column in columns if column not in key_columns]
+        query = (f"INSERT INTO {quote(table)} ({', '.join(quote(c) for c in columns)}) "
+                 f"VALUES ({', '.join('?' for _ in columns)}) "
+                 f"ON CONFLICT ({', '.join(quote(c) for c in key_columns)}) ")
+        if update_columns:
+            return query + "DO UPDATE SET " + ", ".join(
+                f"{quote(c)} = excluded.{quote(c)}" for c in update_columns)
+        return query + "DO NOTHING"
+
+    def bulk_upsert(self, table: str, rows: Iterable[Dict[str, Any]], key_columns: Sequence[str],
+                    update_columns: Sequence[str] = None, chunk_size: int = None) -> int:
+        """
+        Insert rows, updating the existing row when key_columns conflict.
+
+        key_columns must match a primary key or unique constraint. By default
+        every non-key column is updated; pass update_columns=[] to keep
+        existing rows unchanged. All rows must have the keys of the first.
+        """
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return 0
+        columns = list(first)
+        query = self.build_upsert(table, columns, key_columns, update_columns)
+
+        def values():
+            yield tuple(first[column] for column in columns)
+            for row in rows:
+                yield tuple(row[column] for column in columns)
+
+        return self.execute_many(query, values(), chunk_size)
+
+    def _track_query_metrics(self, query: str, execution_time: float,
+                             rows_affected: int, success: bool, error_message: str = None,
+                             params: Tuple = None, connection: sqlite3.Connection = None):
+        """
+        Track query performance metrics by fingerprint. Successful queries over
+        the slow query threshold are logged with their plan when the connection
+        that ran them is given, and new query shapes go to the index advisor.
+        """
+        stats = self.profiler.record(query, execution_time, rows_affected, success)
         metric = QueryMetrics(
-            query_hash=query_hash,
+            query_hash=stats.fingerprint,
             execution_time=execution_time,
             rows_affected=rows_affected,
             timestamp=datetime.now(),
-            query_type="SELECT" if query_hash.startswith("SELECT") else "OTHER",
+            query_type=stats.query_type,
             success=success,
             error_message=error_message
         )
@@ -641,14 +1640,81 @@ class DatabaseManager:
         with self.metrics_lock:
             self.query_metrics.append(metric)
 
-            # Keep only last 1000 metrics
-            if len(self.query_metrics) > 1000:
-                self.query_metrics = self.query_metrics[-1000:]
+        if success and connection is not None:
+            if self.index_advisor is not None:
+                self.index_advisor.check(stats, query, params, connection)
+            if self.profiler.is_slow(execution_time):
+                self._log_slow_query(query, stats, execution_time, rows_affected, params, connection)
+
+    def _log_slow_query(self, query: str, stats: QueryStats, execution_time: float,
+                        rows_affected: int, params: Tuple, connection: sqlite3.Connection):
+        """Capture the query plan and queue a row for the slow_queries table."""
+        try:
+            plan = format_query_plan(
+                connection.execute(f"EXPLAIN QUERY PLAN {query}", params or ()).fetchall())
+        except sqlite3.Error:
+            plan = None
+        with self.profiler.lock:
+            stats.slow_count += 1
+            stats.last_plan = plan
+
+        row = (stats.fingerprint, stats.query_type, stats.query, execution_time,
+               rows_affected, plan, datetime.now().isoformat())
+
+        def log(connection):
+            connection.execute(
+                "INSERT INTO slow_queries (fingerprint, query_type, normalized_query, "
+                "execution_time, rows_affected, query_plan, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                row
+            )
+            connection.execute(
+                "DELETE FROM slow_queries WHERE id <= (SELECT MAX(id) FROM slow_queries) - ?",
+                (self.config.slow_query_log_size,)
+            )
+
+        def on_commit():
+            if self.query_cache is not None:
+                self.query_cache.invalidate(['slow_queries'])
+
+        try:
+            self.writer.submit(log, on_commit)
+        except RuntimeError:
+            pass  # Writer closed
 
     def get_query_metrics(self) -> List[QueryMetrics]:
-        """Get query performance metrics."""
+        """Get the most recent query performance metrics."""
         with self.metrics_lock:
-            return self.query_metrics.copy()
+            return list(self.query_metrics)
+
+    def get_query_stats(self, limit: int = 10, order_by: str = 'total_time') -> List[Dict[str, Any]]:
+        """
+        Per-fingerprint statistics for the top offenders: count, errors,
+        total, mean, max and p50/p95/p99 times in seconds, and the last plan
+        captured for a slow run.
+        """
+        return self.profiler.top_queries(limit, order_by)
+
+    def get_index_advice(self) -> List[Dict[str, Any]]:
+        """
+        Queries the index advisor saw scanning whole tables, with the tables,
+        plan and suggested index columns. Empty unless index_advisor is on.
+        """
+        if self.index_advisor is None:
+            return []
+        advice = self.index_advisor.get_findings()
+        counts = {entry['fingerprint']: entry['count'] for entry in
+                  self.profiler.top_queries(len(self.profiler), 'count')}
+        return [dict(finding, count=counts.get(finding['fingerprint'], 0)) for finding in advice]
+
+    def get_slow_queries(self, limit: int = 50, fingerprint: str = None) -> List[Dict[str, Any]]:
+        """Most recent entries from the slow query log."""
+        query = "SELECT * FROM slow_queries"
+        params: Tuple = ()
+        if fingerprint:
+            query += " WHERE fingerprint = ?"
+            params = (fingerprint,)
+        rows = self.execute_query(query + " ORDER BY id DESC LIMIT ?", params + (limit,))
+        return [dict(row) for row in rows]
 
     def get_database_stats(self) -> Dict[str, Any]:
         """Get comprehensive database statistics."""
@@ -657,7 +1723,10 @@ class DatabaseManager:
             'database_path': self.config.database_path,
             'schema_version': self._get_schema_version(),
             'cache_enabled': self.config.enable_query_cache,
-            'cache_size': len(self.query_cache) if self.query_cache else 0
+            'cache_size': len(self.query_cache) if self.query_cache is not None else 0,
+            'query_cache': self.query_cache.get_stats() if self.query_cache is not None else {},
+            'writer': self.writer.get_stats(),
+            'attached_databases': dict(self.config.attached_databases)
         }
 
         # Add database size
@@ -672,60 +1741,372 @@ class DatabaseManager:
 
     def optimize_database(self):
         """Optimize database performance."""
-        try:
-            with self.get_connection() as conn:
-                cursor = conn.connection.cursor()
-
-                # Analyze tables for query optimization
-                cursor.execute("ANALYZE")
+        def optimize(connection):
+            # Analyze tables for query optimization
+            connection.execute("ANALYZE")
 
-                # Incremental vacuum
-                cursor.execute("PRAGMA incremental_vacuum")
+            # Incremental vacuum
+            connection.execute("PRAGMA incremental_vacuum").fetchall()
 
-                # Optimize indexes
-                cursor.execute("REINDEX")
+            # Optimize indexes
+            connection.execute("REINDEX")
 
-                conn.connection.commit()
-                logging.info("Database optimization completed")
+        try:
+            self.writer.submit(optimize, transactional=False).result()
+            logging.info("Database optimization completed")
 
         except Exception as e:
             logging.error(f"Database optimization failed: {e}")
             raise
 
-    def store_performance_metrics(self, metrics: dict):
-        """Store performance metrics in the database."""
-        try:
-            with self.get_connection() as conn:
-                cursor = conn.connection.cursor()
+    def log_api_usage(self, api_name: str, endpoint: str = None, success: bool = True,
+                      response_time: float = 0.0, status_code: int = None, tokens_used: int = 0,
+                      cost: float = 0.0, project_id: int = None) -> Optional[Future]:
+        """Queue a row for the api_usage table; failed calls record their HTTP status."""
+        error_message = None if success else f"HTTP {status_code}"
 
-                # Create table if it doesn't exist
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS performance_metrics (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                        metric_type TEXT,
-                        metric_data TEXT
-                    )
-                ''')
-
-                # Store metrics as JSON
-                import json
-                metric_data = json.dumps(metrics)
-                cursor.execute('''
-                    INSERT INTO performance_metrics (metric_type, metric_data)
-                    VALUES (?, ?)
-                ''', ('system_metrics', metric_data))
-
-                conn.connection.commit()
+        def log_failure(future):
+            if future.exception() is not None:
+                logging.error(f"Failed to log API usage: {future.exception()}")
 
+        try:
+            future = self.submit_query(
+                "INSERT INTO api_usage (project_id, api_type, endpoint, timestamp, tokens_used, "
+                "cost, response_time, success, error_message) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (project_id, api_name, endpoint, datetime.now().isoformat(), tokens_used, cost,
+                 response_time, success, error_message)
+            )
+        except Exception as e:
+            logging.error(f"Failed to log API usage: {e}")
+            return None
+        future.add_done_callback(log_failure)
+        return future
+
+    def get_api_usage_stats(self, api_name: Optional[str] = None, days: int = 30) -> Dict[str, Any]:
+        """Request counts, tokens, cost and mean response time per API over the last days."""
+        query = ("SELECT api_type, COUNT(*), SUM(success), SUM(tokens_used), SUM(cost), "
+                 "AVG(response_time) FROM api_usage WHERE {} GROUP BY api_type")
+        since = (datetime.now() - timedelta(days=days)).isoformat()
+        if api_name:
+            rows = self.execute_query(query.format("api_type = ? AND timestamp >= ?"), (api_name, since))
+        else:
+            rows = self.execute_query(query.format("timestamp >= ?"), (since,))
+
+        apis = {
+            api_type: {
+                'requests': requests,
+                'successful_requests': successful or 0,
+                'failed_requests': requests - (successful or 0),
+                'tokens_used': tokens or 0,
+                'cost': cost or 0.0,
+                'avg_response_time': response_time or 0.0,
+            }
+            for api_type, requests, successful, tokens, cost, response_time in rows
+        }
+        return {
+            'days': days,
+            'total_requests': sum(api['requests'] for api in apis.values()),
+            'total_tokens': sum(api['tokens_used'] for api in apis.values()),
+            'total_cost': sum(api['cost'] for api in apis.values()),
+            'apis': apis,
+        }
+
+    def store_performance_metrics(self, metrics: dict) -> Optional[Future]:
+        """
+        Queue one time-series sample for every numeric value in a metrics
+        dict such as PerformanceMonitor.collect_metrics() returns, named by
+        its path ('system.cpu_percent'). The dict's ISO 'timestamp' is used
+        when present.
+        """
+        try:
+            timestamp = metrics.get('timestamp')
+            timestamp = datetime.fromisoformat(timestamp).timestamp() if timestamp else None
+            return self.metrics.record(flatten_metrics(metrics), timestamp)
         except Exception as e:
             logging.error(f"Failed to store performance metrics: {e}")
+            return None
 
     def close(self):
         """Close database manager and all connections."""
+        self.writer.close()
         self.pool.close_all()
-        if self.query_cache:
-            self.query_cache.clear()
+        self._invalidate_all()
+
+def flatten_metrics(metrics: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """Numeric values of a nested dict, keyed by their dotted path."""
+    flat = {}
+    for key, value in metrics.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten_metrics(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def merge_rollups(rows: Sequence[Tuple[int, float, float, float, float]]) -> Tuple:
+    """
+    (count, min, max, sum, p95) of a bucket from the (count, min, max, sum,
+    p95) rows of the finer tier. The p95 is the count-weighted 95th
+    percentile of the finer buckets' p95s, an approximation: exact
+    percentiles would need every sample.
+    """
+    count = sum(row[0] for row in rows)
+    rank, seen = 0.95 * count, 0
+    for row in sorted(rows, key=lambda row: row[4]):
+        seen += row[0]
+        if seen >= rank:
+            p95 = row[4]
+            break
+    return (count, min(row[1] for row in rows), max(row[2] for row in rows),
+            sum(row[3] for row in rows), p95)
+
+
+class TimeSeriesStore:
+    """
+    Performance metrics as typed samples, rolled up into 1-minute, 1-hour
+    and 1-day buckets holding count, min, max, sum and p95.
+
+    Samples go to metric_samples. Whenever a sample starts a new minute,
+    the closed buckets of each tier are rolled up from the tier below and
+    everything older than its tier's retention is deleted, all in one
+    queued write. Queries read the coarsest tier that gives enough points
+    for their range, so trends over weeks read a few hundred rows.
+    """
+
+    MAX_POINTS = 500
+
+    def __init__(self, manager: 'DatabaseManager', retention: Dict[str, int] = None):
+        self.manager = manager
+        self.retention = dict(DEFAULT_METRICS_RETENTION, **(retention or {}))
+        self.last_rollup_minute: Optional[int] = None
+        self.lock = threading.Lock()
+
+    def record(self, samples: Dict[str, float], timestamp: float = None) -> Optional[Future]:
+        """Queue samples taken at timestamp (epoch seconds, default now)."""
+        timestamp = time.time() if timestamp is None else timestamp
+        rows = [(metric, timestamp, value) for metric, value in samples.items()]
+        if not rows:
+            return None
+        future = self.manager.submit_many(
+            "INSERT INTO metric_samples (metric, timestamp, value) VALUES (?, ?, ?)", rows)
+        future.add_done_callback(self._log_failure)
+
+        minute = int(timestamp // 60)
+        with self.lock:
+            roll_up = self.last_rollup_minute is None or minute > self.last_rollup_minute
+            if roll_up:
+                self.last_rollup_minute = minute
+        if roll_up:
+            self.rollup(timestamp).add_done_callback(self._log_failure)
+        return future
+
+    @staticmethod
+    def _log_failure(future: Future):
+        if future.exception() is not None:
+            logging.error(f"Failed to store performance metrics: {future.exception()}")
+
+    def rollup(self, now: float = None) -> Future:
+        """Queue rolling up every bucket closed by now and pruning by retention."""
+        now = time.time() if now is None else now
+
+        def operation(connection, analyze):
+            rows = 0
+            source = None
+            for tier, seconds in METRIC_TIERS:
+                rows += self._rollup_tier(connection, analyze, tier, seconds, source, now)
+                source = tier
+
+            prune = [("DELETE FROM metric_samples WHERE timestamp < ?", (now - self.retention['raw'],))]
+            prune += [("DELETE FROM metric_rollups WHERE tier = ? AND bucket < ?",
+                       (tier, now - self.retention[tier])) for tier, _ in METRIC_TIERS]
+            for query, params in prune:
+                analyze(query, params)
+                rows += connection.execute(query, params).rowcount
+            return rows, rows
+
+        return self.manager._queue_write(None, operation)
+
+    @staticmethod
+    def _rollup_tier(connection: sqlite3.Connection, analyze: Callable, tier: str, seconds: int,
+                     source: Optional[str], now: float) -> int:
+        """Roll up tier's buckets between its last bucket and now from source (None for samples)."""
+        last = connection.execute(
+            "SELECT MAX(bucket) FROM metric_rollups WHERE tier = ?", (tier,)).fetchone()[0]
+        start = 0 if last is None else last + seconds
+        end = int(now // seconds) * seconds
+        if start >= end:
+            return 0
+
+        if source is None:
+            rows = connection.execute(
+                "SELECT metric, timestamp, value FROM metric_samples "
+                "WHERE timestamp >= ? AND timestamp < ? ORDER BY metric, timestamp", (start, end))
+        else:
+            rows = connection.execute(
+                "SELECT metric, bucket, count, min, max, sum, p95 FROM metric_rollups "
+                "WHERE tier = ? AND bucket >= ? AND bucket < ? ORDER BY metric, bucket",
+                (source, start, end))
+
+        buckets: Dict[Tuple[str, int], List] = {}
+        for row in rows:
+            buckets.setdefault((row[0], int(row[1] // seconds) * seconds), []).append(row[2:])
+
+        rollups = []
+        for (metric, bucket), values in buckets.items():
+            if source is None:
+                ordered = sorted(value for value, in values)
+                merged = (len(ordered), ordered[0], ordered[-1], sum(ordered), nearest_rank(ordered, 95))
+            else:
+                merged = merge_rollups(values)
+            rollups.append((tier, metric, bucket) + merged)
+
+        # An empty range leaves the tier's last bucket where it was, so the
+        # next rollup reads the range again; it is indexed and stays empty
+        if rollups:
+            insert = ("INSERT OR REPLACE INTO metric_rollups (tier, metric, bucket, count, min, max, sum, p95) "
+                      "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+            analyze(insert, rollups[0])
+            connection.executemany(insert, rollups)
+        return len(rollups)
+
+    def choose_tier(self, start: float, end: float, now: float = None) -> str:
+        """
+        Finest tier giving fewer than MAX_POINTS points over start..end
+        (counting raw samples as up to one a second), or a coarser one if
+        that tier's retention no longer reaches back to start.
+        """
+        now = time.time() if now is None else now
+        tiers = [("raw", 1)] + list(METRIC_TIERS)
+        for tier, seconds in tiers:
+            if (end - start) / seconds < self.MAX_POINTS:
+                chosen = tier
+                break
+        else:
+            chosen = tiers[-1][0]
+        names = [tier for tier, _ in tiers]
+        for tier in names[names.index(chosen):]:
+            chosen = tier
+            if now - self.retention[tier] <= start:
+                break
+        return chosen
+
+    def query(self, metric: str, start: float, end: float = None,
+              tier: str = None) -> List[Dict[str, Any]]:
+        """
+        Points for metric between start and end (epoch seconds), oldest
+        first, each with timestamp, count, min, max, avg and p95. Read from
+        tier (default choose_tier()); the part of the range it has not
+        rolled up yet is read from the finer tiers.
+        """
+        end = time.time() if end is None else end
+        tier = tier or self.choose_tier(start, end)
+        sizes = dict(METRIC_TIERS)
+        names = ["raw"] + [name for name, _ in METRIC_TIERS]
+
+        points = []
+        for name in reversed(names[:names.index(tier) + 1]):
+            if start >= end:
+                break
+            if name == "raw":
+                rows = self.manager.execute_query(
+                    "SELECT timestamp, 1, value, value, value, value FROM metric_samples "
+                    "WHERE metric = ? AND timestamp >= ? AND timestamp < ? ORDER BY timestamp",
+                    (metric, start, end))
+                covered = end
+            else:
+                last = self.manager.execute_query(
+                    "SELECT MAX(bucket) FROM metric_rollups WHERE tier = ?", (name,))[0][0]
+                if last is None:
+                    continue
+                covered = min(end, last + sizes[name])
+                rows = self.manager.execute_query(
+                    "SELECT bucket, count, min, max, sum, p95 FROM metric_rollups "
+                    "WHERE tier = ? AND metric = ? AND bucket >= ? AND bucket < ? ORDER BY bucket",
+                    (name, metric, start - start % sizes[name], covered))
+            points += [{
+                'timestamp': timestamp, 'count': count, 'min': low, 'max': high,
+                'avg': total / count, 'p95': p95
+            } for timestamp, count, low, high, total, p95 in rows]
+            start = max(start, covered)
+        return points
+
+
+class SchemaStore:
+    """
+    SQL access for a component's tables, kept either in the component's own
+    SQLite file or, when a DatabaseManager is given, in that file attached to
+    the manager's connections as schema.
+
+    Statements name their tables and indexes through table(), which adds the
+    schema when attached, so a component's SQL works the same both ways.
+    Attached stores share the manager's pool, writer, PRAGMAs and query cache.
+    """
+
+    def __init__(self, db_path: str, schema: str, manager: Optional[DatabaseManager] = None):
+        self.db_path = str(db_path)
+        self.schema = schema
+        self.manager = manager
+        # Standalone connections get the same PRAGMAs as the manager's
+        self.config = DatabaseConfig(database_path=self.db_path)
+        if manager is not None:
+            manager.attach_database(schema, self.db_path)
+
+    @property
+    def attached(self) -> bool:
+        return self.manager is not None
+
+    def table(self, name: str) -> str:
+        return f"{self.schema}.{name}" if self.manager is not None else name
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a configured connection to the component's own file."""
+        connection = sqlite3.connect(
+            self.db_path,
+            timeout=self.config.connection_timeout,
+            cached_statements=self.config.cached_statements
+        )
+        try:
+            configure_sqlite_connection(connection, self.config)
+        except sqlite3.Error:
+            connection.close()
+            raise
+        return connection
+
+    def execute(self, query: str, params: Tuple = (), fetch: str = "all") -> Any:
+        """Run one statement, as DatabaseManager.execute_query()."""
+        if self.manager is not None:
+            return self.manager.execute_query(query, params, fetch)
+        with closing(self._connect()) as connection, connection:
+            connection.row_factory = sqlite3.Row
+            return DatabaseManager._fetch(connection.execute(query, params), fetch)
+
+    def execute_transaction(self, operations: List[Tuple[str, Tuple]]) -> bool:
+        """Run statements in one transaction."""
+        if self.manager is not None:
+            return self.manager.execute_transaction(operations)
+        with closing(self._connect()) as connection, connection:
+            connection.execute("BEGIN")  # Also covers DDL, which would otherwise autocommit
+            for query, params in operations:
+                connection.execute(query, params)
+        return True
+
+    def migrate(self, migrations: List[Tuple[int, str, List[str]]]):
+        """
+        Apply (version, description, statements) migrations newer than the
+        schema's user_version, each in one transaction that also records its
+        version. The version lives in the component's file, so it carries
+        over between standalone and attached use.
+        """
+        pragma = f"PRAGMA {self.table('user_version')}"
+        current = self.execute(pragma)[0][0]
+        for version, description, statements in sorted(migrations):
+            if version <= current:
+                continue
+            operations = [(statement, ()) for statement in statements]
+            operations.append((f"{pragma} = {int(version)}", ()))
+            self.execute_transaction(operations)
+            logging.info(f"Applied {self.schema} migration {version}: {description}")
 
 # Singleton instance
 _enhanced_db_manager = None
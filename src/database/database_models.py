@@ -3,16 +3,27 @@ Database management modules for FANWS
 Contains database connection, pooling, and management functionality
 """
 
-from .database_manager import DatabaseManager
-
-__all__ = [
-    'DatabaseManager'
-]
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import (Boolean, Column, DateTime, Integer, JSON, String, Text, bindparam,
+                        create_engine, delete, event, insert, update)
+from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker, Session, scoped_session
 from sqlalchemy.pool import StaticPool, QueuePool
 from sqlalchemy.exc import SQLAlchemyError
 import os
 
+from .database_manager import DatabaseConfig, configure_sqlite_connection
+
+__all__ = [
+    'DatabaseManager'
+]
+
 logger = logging.getLogger(__name__)
 
 Base = declarative_base()
@@ -64,7 +75,8 @@ class ProjectMetadata(Base):
 class DatabaseManager:
     """Enhanced database manager with SQLAlchemy connection pooling"""
 
-    def __init__(self, database_url: Optional[str] = None, pool_size: int = 5, max_overflow: int = 10):
+    def __init__(self, database_url: Optional[str] = None, pool_size: int = 5, max_overflow: int = 10,
+                 storage_config: Optional[DatabaseConfig] = None):
         """
         Initialize database manager with connection pooling
 
@@ -72,6 +84,8 @@ class DatabaseManager:
             database_url: Database URL (defaults to SQLite)
             pool_size: Number of connections to maintain in pool
             max_overflow: Maximum overflow connections beyond pool_size
+            storage_config: SQLite PRAGMAs and attached databases, shared with
+                the main database manager (defaults to DatabaseConfig())
         """
         if database_url is None:
             # Default to SQLite with WAL mode for better concurrency
@@ -83,22 +97,44 @@ class DatabaseManager:
         self._session_factory = None
         self._scoped_session = None
         self._lock = threading.RLock()
+        self._local = threading.local()
 
         # Configure engine based on database type
         if database_url.startswith('sqlite'):
-            # SQLite configuration for single-file database
+            # SQLite configuration for single-file database. Each thread's
+            # session checks out its own connection; an in-memory database
+            # exists only on one connection, so it is shared
+            in_memory = database_url in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in database_url
+            pool_options = {'poolclass': StaticPool} if in_memory else {
+                'poolclass': QueuePool,
+                'pool_size': pool_size,
+                'max_overflow': max_overflow,
+            }
             self._engine = create_engine(
                 database_url,
-                poolclass=StaticPool,
                 connect_args={
                     'check_same_thread': False,
                     'timeout': 30,
-                    'isolation_level': None  # Enable autocommit mode
+                    'isolation_level': None  # Driver autocommit; transactions begin below
                 },
                 echo=False,  # Set to True for SQL debugging
                 pool_pre_ping=True,  # Verify connections before use
-                pool_recycle=3600    # Recycle connections every hour
+                pool_recycle=3600,   # Recycle connections every hour
+                **pool_options
             )
+
+            # Same PRAGMAs and attached stores as the main database manager's connections
+            self.storage_config = storage_config or DatabaseConfig()
+
+            @event.listens_for(self._engine, "connect")
+            def configure_connection(dbapi_connection, connection_record):
+                configure_sqlite_connection(dbapi_connection, self.storage_config)
+
+            # With the driver in autocommit mode, sessions would commit every
+            # statement on its own; begin real transactions instead
+            @event.listens_for(self._engine, "begin")
+            def begin_transaction(connection):
+                connection.exec_driver_sql("BEGIN")
         else:
             # PostgreSQL/MySQL configuration with connection pooling
             self._engine = create_engine(
@@ -123,20 +159,9 @@ class DatabaseManager:
     def _init_database(self):
         """Initialize database tables"""
         try:
-            # Create all tables
+            # Create all tables; SQLite connections are tuned as they are opened
             Base.metadata.create_all(self._engine)
 
-            # Enable SQLite optimizations if using SQLite
-            if self.database_url.startswith('sqlite'):
-                with self._engine.connect() as conn:
-                    # Enable WAL mode for better concurrency
-                    conn.execute(text("PRAGMA journal_mode=WAL"))
-                    # Optimize SQLite settings
-                    conn.execute(text("PRAGMA synchronous=NORMAL"))
-                    conn.execute(text("PRAGMA cache_size=10000"))
-                    conn.execute(text("PRAGMA temp_store=MEMORY"))
-                    conn.execute(text("PRAGMA mmap_size=268435456"))  # 256MB
-
             logger.info("Database tables initialized successfully")
 
         except Exception as e:
@@ -144,15 +169,44 @@ class DatabaseManager:
             raise
 
     def get_session(self) -> Session:
-        """Get a database session from the pool"""
+        """Get this thread's database session"""
         return self._scoped_session()
 
     def close_session(self):
         """Close the current scoped session"""
         self._scoped_session.remove()
 
+    @contextmanager
+    def session_scope(self):
+        """
+        Run every operation in the block on this thread's session in one
+        transaction, committed when the block ends, instead of committing
+        each operation on its own. Scopes nest; only the outermost commits.
+        """
+        depth = getattr(self._local, 'depth', 0)
+        session = self.get_session()
+        self._local.depth = depth + 1
+        try:
+            yield session
+            if depth == 0:
+                session.commit()
+        except Exception:
+            if depth == 0:
+                session.rollback()
+            raise
+        finally:
+            self._local.depth = depth
+            if depth == 0:
+                session.close()
+
     def execute_with_retry(self, operation, max_retries: int = 3):
-        """Execute database operation with retry logic"""
+        """
+        Execute database operation with retry logic. Inside session_scope()
+        the operation joins the scope's transaction and is not retried alone.
+        """
+        if getattr(self._local, 'depth', 0):
+            return operation(self.get_session())
+
         for attempt in range(max_retries):
             try:
                 session = self.get_session()
@@ -185,7 +239,6 @@ class DatabaseManager:
 
             # Calculate checksum for conflict detection
             import hashlib
-            import json
             checksum = hashlib.sha256(
                 json.dumps(workflow_data, sort_keys=True).encode()
             ).hexdigest()
@@ -290,7 +343,8 @@ class DatabaseManager:
                 )
                 session.add(project)
             else:
-                project.settings.update(metadata)
+                # JSON columns only see assignments, not in-place changes
+                project.settings = dict(project.settings or {}, **metadata)
                 project.modified_at = datetime.utcnow()
 
             session.flush()
@@ -312,8 +366,8 @@ class DatabaseManager:
                 )
                 session.add(project)
             else:
-                if user_id not in project.active_users:
-                    project.active_users.append(user_id)
+                if user_id not in (project.active_users or []):
+                    project.active_users = (project.active_users or []) + [user_id]
                     project.modified_at = datetime.utcnow()
 
             session.flush()
@@ -327,8 +381,8 @@ class DatabaseManager:
             project = session.query(ProjectMetadata)\
                 .filter_by(project_name=project_name).first()
 
-            if project and user_id in project.active_users:
-                project.active_users.remove(user_id)
+            if project and user_id in (project.active_users or []):
+                project.active_users = [user for user in project.active_users if user != user_id]
                 project.modified_at = datetime.utcnow()
                 session.flush()
                 return True
@@ -346,13 +400,54 @@ class DatabaseManager:
 
         return self.execute_with_retry(operation)
 
+    def bulk_insert(self, model, rows: Iterable[Dict[str, Any]], chunk_size: int = 500) -> int:
+        """
+        Insert rows, dicts with the same keys, as multi-row INSERT ... VALUES
+        statements of up to chunk_size rows, in one transaction. Column
+        defaults apply as for single inserts. Returns the number of rows.
+        """
+        rows = list(rows)
+        if not rows:
+            return 0
+
+        def operation(session: Session):
+            for start in range(0, len(rows), chunk_size):
+                session.execute(insert(model).values(rows[start:start + chunk_size]))
+            return len(rows)
+
+        return self.execute_with_retry(operation)
+
+    def bulk_update(self, model, rows: Iterable[Dict[str, Any]], key: str = 'id') -> int:
+        """
+        Update rows, dicts with the same keys, matched on their key column,
+        with one UPDATE statement executed for all of them in one
+        transaction. Returns the number of rows updated.
+        """
+        rows = list(rows)
+        if not rows:
+            return 0
+        table = model.__table__
+        columns = [column for column in rows[0] if column != key]
+        # Bound names must differ from the column names UPDATE sets
+        statement = update(table)\
+            .where(table.c[key] == bindparam(f'key_{key}'))\
+            .values({column: bindparam(f'new_{column}') for column in columns})
+        params = [dict({f'key_{key}': row[key]}, **{f'new_{column}': row[column] for column in columns})
+                  for row in rows]
+
+        def operation(session: Session):
+            return session.execute(statement, params).rowcount
+
+        return self.execute_with_retry(operation)
+
     def cleanup_expired_cache(self):
-        """Clean up expired cache entries"""
+        """Clean up expired cache entries with one DELETE"""
         def operation(session: Session):
-            current_time = datetime.utcnow()
-            expired_count = session.query(ApiCache)\
-                .filter(ApiCache.expires_at < current_time)\
-                .delete()
+            result = session.execute(
+                delete(ApiCache).where(ApiCache.expires_at < datetime.utcnow()),
+                execution_options={'synchronize_session': False}
+            )
+            expired_count = result.rowcount
 
             logger.info(f"Cleaned up {expired_count} expired cache entries")
             return expired_count
@@ -15,6 +15,11 @@ from .validator import (
     validate_export_file,
     validate_export_files
 )
+from .engine import ExportEngine, ExportSnapshot, ExportChapter, ExportCancelled
+from .docx_writer import DOCXStreamWriter
+from .epub_writer import EPUBWriter
+from .fragment_cache import FragmentCache, get_fragment_cache
+from .writers import FORMAT_WRITERS, create_export_engine, get_supported_formats
 
 __all__ = [
     'ExportValidator',
@@ -24,5 +29,16 @@ __all__ = [
     'PDFValidator',
     'export_validator',
     'validate_export_file',
-    'validate_export_files'
+    'validate_export_files',
+    'ExportEngine',
+    'ExportSnapshot',
+    'ExportChapter',
+    'ExportCancelled',
+    'DOCXStreamWriter',
+    'EPUBWriter',
+    'FragmentCache',
+    'get_fragment_cache',
+    'FORMAT_WRITERS',
+    'create_export_engine',
+    'get_supported_formats'
 ]
@@ -0,0 +1,294 @@
+"""
+Parallel multi-format export engine for FANWS.
+
+The project's source files are read once into an immutable ExportSnapshot,
+so every format sees the same version of the manuscript even if the workflow
+keeps writing, and no writer goes back to disk for story.txt. The engine then
+runs one writer per format on a thread pool, reports per-format progress
+through a callback and supports cooperative cancellation: writers call the
+progress function they are given, which raises ExportCancelled once cancel()
+has been requested.
+
+Writers write to a temporary file that is renamed into place on success, so
+a failed or cancelled export never leaves a truncated file behind.
+"""
+
+import io
+import os
+import time
+import types
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from ..workflow.story_store import SECTION_HEADER, CHAPTER_HEADER
+
+logger = logging.getLogger(__name__)
+
+# Small project files loaded into every snapshot alongside story.txt
+SNAPSHOT_FILES = ('synopsis.txt', 'characters.txt', 'timeline.txt', 'themes.txt', 'notes.txt')
+
+SCENE_BREAK = "* * *"
+
+# progress(percent, message) - raises ExportCancelled when the export is cancelled
+ProgressFunction = Callable[[int, str], None]
+# writer(snapshot, output_path, options, progress) -> optional extra result fields
+FormatWriter = Callable[['ExportSnapshot', str, Dict[str, Any], ProgressFunction], Optional[Dict[str, Any]]]
+# progress_callback(format_name, percent, message)
+ProgressCallback = Callable[[str, int, str], None]
+
+
+class ExportCancelled(Exception):
+    """Raised inside a format writer when the export has been cancelled."""
+
+
+@dataclass(frozen=True)
+class ExportChapter:
+    """A chapter of the snapshot's story, as a byte range."""
+    number: int
+    title: str
+    start: int
+    end: int
+
+
+@dataclass(frozen=True)
+class ExportSnapshot:
+    """Read-only copy of the project sources shared by all format writers."""
+    project_name: str
+    project_path: str
+    story: bytes
+    files: Mapping[str, str]
+    chapters: Tuple[ExportChapter, ...]
+    created: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    @classmethod
+    def load(cls, project_path: str, project_name: Optional[str] = None,
+             file_names: Tuple[str, ...] = SNAPSHOT_FILES) -> 'ExportSnapshot':
+        """Read story.txt and the small project files once."""
+        story_path = os.path.join(project_path, "story.txt")
+        story = b""
+        if os.path.exists(story_path):
+            with open(story_path, 'rb') as f:
+                story = f.read()
+
+        files = {}
+        for name in file_names:
+            path = os.path.join(project_path, name)
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    files[name] = f.read()
+
+        return cls(
+            project_name=project_name or os.path.basename(os.path.normpath(project_path)),
+            project_path=project_path,
+            story=story,
+            files=types.MappingProxyType(files),
+            chapters=tuple(index_chapters(story))
+        )
+
+    def has_file(self, name: str) -> bool:
+        """Check whether a project file was present when the snapshot was taken."""
+        return name in self.files
+
+    def read_file(self, name: str) -> str:
+        """Get the contents of a snapshot file, or "" if it was missing."""
+        return self.files.get(name, "")
+
+    def iter_story_lines(self, transform: Optional[Callable[[str], str]] = None,
+                         start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+        """
+        Yield the story (or the byte range start:end, which must begin at a
+        line) line by line with universal newlines, like a text-mode read.
+        """
+        reader = io.TextIOWrapper(io.BytesIO(self.story[start:end]), encoding='utf-8')
+        for line in reader:
+            yield transform(line) if transform else line
+
+    def chapter_bytes(self, chapter: ExportChapter) -> bytes:
+        """Get the raw bytes of one chapter, including its headers."""
+        return self.story[chapter.start:chapter.end]
+
+    def chapter_text(self, chapter: ExportChapter) -> str:
+        """Get the raw text of one chapter, including its headers."""
+        return self.chapter_bytes(chapter).decode('utf-8')
+
+    def iter_paragraphs(self, chapter: ExportChapter) -> Iterator[str]:
+        """
+        Yield the paragraphs of a chapter for rendering.
+
+        Header lines are dropped; a section header after the first yields
+        SCENE_BREAK. Lines of one paragraph are joined with spaces.
+        """
+        lines = []
+        emitted = False
+        for raw_line in io.BytesIO(self.story[chapter.start:chapter.end]):
+            if SECTION_HEADER.match(raw_line) or CHAPTER_HEADER.match(raw_line):
+                if lines:
+                    yield " ".join(lines)
+                    lines = []
+                if SECTION_HEADER.match(raw_line) and emitted:
+                    yield SCENE_BREAK
+                continue
+
+            line = raw_line.decode('utf-8').strip()
+            if line:
+                lines.append(line)
+                emitted = True
+            elif lines:
+                yield " ".join(lines)
+                lines = []
+
+        if lines:
+            yield " ".join(lines)
+
+
+def index_chapters(story: bytes) -> List[ExportChapter]:
+    """Split a story into chapters at its chapter and section headers."""
+    chapters = []
+    current = None  # [number, title, start]
+    offset = 0
+
+    for line in io.BytesIO(story):
+        number = title = None
+        match = SECTION_HEADER.match(line)
+        if match:
+            number = int(match.group(1))
+        else:
+            match = CHAPTER_HEADER.match(line)
+            if match:
+                number = int(match.group(1))
+                title = line.decode('utf-8').strip().lstrip('#').strip()
+
+        if number is not None and (current is None or current[0] != number):
+            if current is not None:
+                chapters.append(ExportChapter(current[0], current[1], current[2], offset))
+            elif story[:offset].strip():
+                chapters.append(ExportChapter(0, "Front Matter", 0, offset))
+            current = [number, title or f"Chapter {number}", offset]
+        elif number is not None and title and current[1] == f"Chapter {number}":
+            current[1] = title
+
+        offset += len(line)
+
+    if current is not None:
+        chapters.append(ExportChapter(current[0], current[1], current[2], offset))
+    elif story.strip():
+        chapters.append(ExportChapter(0, "Manuscript", 0, offset))
+
+    return chapters
+
+
+@dataclass
+class ExportTask:
+    """One format to produce in an export run."""
+    name: str
+    writer: FormatWriter
+    output_path: str
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+class ExportEngine:
+    """Runs format writers concurrently over one snapshot."""
+
+    def __init__(self, snapshot: ExportSnapshot, max_workers: Optional[int] = None):
+        self.snapshot = snapshot
+        self.max_workers = max_workers
+        self.tasks: List[ExportTask] = []
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self._progress: Dict[str, int] = {}
+
+    def add_format(self, name: str, writer: FormatWriter, output_path: str,
+                   options: Optional[Dict[str, Any]] = None):
+        """Queue a format for the next run."""
+        self.tasks.append(ExportTask(name, writer, output_path, dict(options or {})))
+
+    def cancel(self):
+        """Ask running writers to stop and skip formats that have not started."""
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def get_overall_progress(self) -> int:
+        """Average progress across all queued formats."""
+        with self._lock:
+            if not self.tasks:
+                return 100
+            return sum(self._progress.get(task.name, 0) for task in self.tasks) // len(self.tasks)
+
+    def run(self, progress_callback: Optional[ProgressCallback] = None) -> List[Dict[str, Any]]:
+        """
+        Produce every queued format and return one result per format, in the
+        order they were added. progress_callback is called from worker threads.
+        """
+        if not self.tasks:
+            return []
+
+        workers = self.max_workers or min(len(self.tasks), os.cpu_count() or 1)
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, workers),
+                                thread_name_prefix="export") as executor:
+            futures = {
+                executor.submit(self._run_task, task, progress_callback): task
+                for task in self.tasks
+            }
+            for future in as_completed(futures):
+                task = futures[future]
+                results[task.name] = future.result()
+
+        return [results[task.name] for task in self.tasks]
+
+    def _run_task(self, task: ExportTask, progress_callback: Optional[ProgressCallback]) -> Dict[str, Any]:
+        """Run one writer into a temporary file and move it into place."""
+        result = {
+            'format': task.name,
+            'file_path': task.output_path,
+            'success': False,
+            'cancelled': False,
+            'error': None
+        }
+        started = time.perf_counter()
+
+        def progress(percent: int, message: str = ""):
+            if self._cancel_event.is_set():
+                raise ExportCancelled(f"{task.name} export cancelled")
+            percent = max(0, min(100, int(percent)))
+            with self._lock:
+                self._progress[task.name] = percent
+            if progress_callback:
+                progress_callback(task.name, percent, message)
+
+        # The temporary file keeps the extension so writers can validate it
+        root, extension = os.path.splitext(task.output_path)
+        temp_path = f"{root}.part{extension}"
+        try:
+            progress(0, f"Starting {task.name} export")
+            os.makedirs(os.path.dirname(task.output_path) or '.', exist_ok=True)
+            extra = task.writer(self.snapshot, temp_path, task.options, progress)
+            progress(100, f"{task.name} export complete")
+            os.replace(temp_path, task.output_path)
+
+            result.update(extra or {})
+            result.update({
+                'success': True,
+                'file_size': os.path.getsize(task.output_path),
+                'created': datetime.now().isoformat()
+            })
+
+        except ExportCancelled as e:
+            result['cancelled'] = True
+            result['error'] = str(e)
+        except Exception as e:
+            logger.error(f"{task.name} export failed: {e}")
+            result['error'] = str(e)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            result['seconds'] = round(time.perf_counter() - started, 4)
+
+        return result
@@ -0,0 +1,244 @@
+"""
+Streaming EPUB 3 writer for FANWS.
+
+EPUBWriter writes each chapter's XHTML straight into its zip entry and keeps
+only the chapter index (titles and file names) in memory, so memory use does
+not grow with the length of the book. When the writer is closed it adds the
+package document (OPF), the EPUB 3 navigation document and an NCX table of
+contents for older readers, all generated from that index.
+
+write_epub() is the export engine's EPUB format writer. Chapter bodies go
+through the fragment cache, and the finished file is checked with
+EPUBValidator before it is accepted.
+"""
+
+import uuid
+import zipfile
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+from xml.sax.saxutils import escape, quoteattr
+
+from .engine import ExportSnapshot, ProgressFunction, SCENE_BREAK
+from .fragment_cache import open_fragment_session
+from .validator import EPUBValidator
+
+CONTENT_DIR = "OEBPS"
+
+CONTAINER_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles>
+    <rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>
+  </rootfiles>
+</container>
+"""
+
+STYLESHEET = """body { font-family: serif; line-height: 1.5; margin: 0 5%; }
+h1 { text-align: center; margin: 2em 0 1em; }
+p { text-indent: 1.5em; margin: 0; }
+p.scene-break { text-indent: 0; text-align: center; margin: 1em 0; }
+"""
+
+
+def xhtml_head(title: str, language: str) -> str:
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<!DOCTYPE html>\n'
+        f'<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops" '
+        f'xml:lang={quoteattr(language)} lang={quoteattr(language)}>\n'
+        f'<head>\n<meta charset="utf-8"/>\n<title>{escape(title)}</title>\n'
+        '<link rel="stylesheet" type="text/css" href="style.css"/>\n</head>\n<body>\n'
+    )
+
+
+XHTML_TAIL = '</body>\n</html>\n'
+
+
+def render_paragraphs(title: str, paragraphs: Iterable[str]) -> Iterable[str]:
+    """XHTML markup for a chapter heading and its paragraphs."""
+    yield f'<h1>{escape(title)}</h1>\n'
+    for paragraph in paragraphs:
+        if paragraph == SCENE_BREAK:
+            yield f'<p class="scene-break">{escape(paragraph)}</p>\n'
+        else:
+            yield f'<p>{escape(paragraph)}</p>\n'
+
+
+class EPUBWriter:
+    """
+    Writes an EPUB 3 file chapter by chapter.
+
+    With split_chapters (the default) every chapter is its own XHTML
+    document; otherwise all chapters are streamed into one document and the
+    table of contents links to their anchors.
+    """
+
+    def __init__(self, path: str, title: str, author: str = "", language: str = "en",
+                 identifier: Optional[str] = None, split_chapters: bool = True,
+                 toc_in_spine: bool = True):
+        self.title = title
+        self.author = author
+        self.language = language
+        self.identifier = identifier or f"urn:uuid:{uuid.uuid4()}"
+        self.split_chapters = split_chapters
+        self.toc_in_spine = toc_in_spine
+
+        self.chapters: List[Dict[str, str]] = []  # title, href, document
+        self.documents: List[str] = []
+        self._book_stream = None
+
+        self._zip = zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED)
+        # The mimetype entry must come first and be stored uncompressed
+        self._zip.writestr(zipfile.ZipInfo("mimetype"), "application/epub+zip",
+                           compress_type=zipfile.ZIP_STORED)
+        self._zip.writestr("META-INF/container.xml", CONTAINER_XML)
+        self._zip.writestr(f"{CONTENT_DIR}/style.css", STYLESHEET)
+
+    def add_chapter(self, title: str, body: Iterable[str]):
+        """Stream one chapter's body markup (heading and paragraphs) into the book."""
+        number = len(self.chapters) + 1
+
+        if self.split_chapters:
+            document = f"chapter_{number:04d}.xhtml"
+            self.documents.append(document)
+            self.chapters.append({'title': title, 'href': document})
+            with self._zip.open(f"{CONTENT_DIR}/{document}", 'w') as stream:
+                stream.write(xhtml_head(title, self.language).encode('utf-8'))
+                self._write_section(stream, number, body)
+                stream.write(XHTML_TAIL.encode('utf-8'))
+        else:
+            if self._book_stream is None:
+                self.documents.append("book.xhtml")
+                self._book_stream = self._zip.open(f"{CONTENT_DIR}/book.xhtml", 'w')
+                self._book_stream.write(xhtml_head(self.title, self.language).encode('utf-8'))
+            self.chapters.append({'title': title, 'href': f"book.xhtml#chapter-{number}"})
+            self._write_section(self._book_stream, number, body)
+
+    @staticmethod
+    def _write_section(stream, number: int, body: Iterable[str]):
+        stream.write(f'<section epub:type="chapter" id="chapter-{number}">\n'.encode('utf-8'))
+        for chunk in body:
+            stream.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+        stream.write(b'</section>\n')
+
+    def close(self):
+        """Finish the book: navigation, NCX and package document."""
+        if self._zip is None:
+            return
+
+        if self._book_stream is not None:
+            self._book_stream.write(XHTML_TAIL.encode('utf-8'))
+            self._book_stream.close()
+            self._book_stream = None
+
+        self._zip.writestr(f"{CONTENT_DIR}/nav.xhtml", self.build_nav())
+        self._zip.writestr(f"{CONTENT_DIR}/toc.ncx", self.build_ncx())
+        self._zip.writestr(f"{CONTENT_DIR}/content.opf", self.build_opf())
+        self._zip.close()
+        self._zip = None
+
+    def abort(self):
+        """Close the zip without finishing the book."""
+        if self._book_stream is not None:
+            self._book_stream.close()
+            self._book_stream = None
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+    def __enter__(self) -> 'EPUBWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    # Generated documents
+
+    def build_nav(self) -> str:
+        items = "".join(
+            f'      <li><a href={quoteattr(chapter["href"])}>{escape(chapter["title"])}</a></li>\n'
+            for chapter in self.chapters
+        )
+        return (
+            xhtml_head("Contents", self.language)
+            + '<nav epub:type="toc" id="toc">\n  <h1>Contents</h1>\n  <ol>\n'
+            + items
+            + '  </ol>\n</nav>\n'
+            + XHTML_TAIL
+        )
+
+    def build_ncx(self) -> str:
+        points = "".join(
+            f'    <navPoint id="nav-{number}" playOrder="{number}">\n'
+            f'      <navLabel><text>{escape(chapter["title"])}</text></navLabel>\n'
+            f'      <content src={quoteattr(chapter["href"])}/>\n'
+            '    </navPoint>\n'
+            for number, chapter in enumerate(self.chapters, 1)
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<ncx xmlns="http://www.daisy.org/z3986/2005/ncx/" version="2005-1">\n'
+            f'  <head><meta name="dtb:uid" content={quoteattr(self.identifier)}/></head>\n'
+            f'  <docTitle><text>{escape(self.title)}</text></docTitle>\n'
+            '  <navMap>\n' + points + '  </navMap>\n</ncx>\n'
+        )
+
+    def build_opf(self) -> str:
+        modified = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        manifest = [
+            '    <item id="nav" href="nav.xhtml" media-type="application/xhtml+xml" properties="nav"/>',
+            '    <item id="ncx" href="toc.ncx" media-type="application/x-dtbncx+xml"/>',
+            '    <item id="css" href="style.css" media-type="text/css"/>',
+        ]
+        spine = ['    <itemref idref="nav"/>'] if self.toc_in_spine else []
+        for number, document in enumerate(self.documents, 1):
+            manifest.append(f'    <item id="doc-{number}" href="{document}" media-type="application/xhtml+xml"/>')
+            spine.append(f'    <itemref idref="doc-{number}"/>')
+
+        creator = f'    <dc:creator>{escape(self.author)}</dc:creator>\n' if self.author else ''
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="book-id">\n'
+            '  <metadata xmlns:dc="http://purl.org/dc/elements/1.1/">\n'
+            f'    <dc:identifier id="book-id">{escape(self.identifier)}</dc:identifier>\n'
+            f'    <dc:title>{escape(self.title)}</dc:title>\n'
+            f'    <dc:language>{escape(self.language)}</dc:language>\n'
+            + creator +
+            f'    <meta property="dcterms:modified">{modified}</meta>\n'
+            '  </metadata>\n'
+            '  <manifest>\n' + "\n".join(manifest) + '\n  </manifest>\n'
+            '  <spine toc="ncx">\n' + "\n".join(spine) + '\n  </spine>\n'
+            '</package>\n'
+        )
+
+
+def write_epub(snapshot: ExportSnapshot, output_path: str, options: Dict[str, Any],
+               progress: ProgressFunction) -> Dict[str, Any]:
+    """EPUB 3 book with one streamed XHTML document per chapter."""
+    chapters = snapshot.chapters
+
+    with open_fragment_session(snapshot.project_path, 'epub', 1,
+                               {'use_cache': options.get('use_cache', True)}) as fragments, \
+            EPUBWriter(output_path, snapshot.project_name,
+                       author=options.get('author', ''),
+                       language=options.get('language', 'en'),
+                       split_chapters=options.get('split_chapters', True),
+                       toc_in_spine=options.get('include_toc', True)) as epub:
+        for done, chapter in enumerate(chapters, 1):
+            body = fragments.render(
+                snapshot.chapter_bytes(chapter),
+                lambda: "".join(render_paragraphs(
+                    chapter.title, snapshot.iter_paragraphs(chapter))).encode('utf-8')
+            )
+            epub.add_chapter(chapter.title, [body])
+            progress(int(95 * done / max(1, len(chapters))), f"Rendered {chapter.title}")
+
+    validation = EPUBValidator.validate(output_path)
+    if not validation.is_valid:
+        raise ValueError(f"EPUB validation failed: {validation.message}")
+
+    return dict(fragments.get_stats(), chapters=len(chapters),
+                validation_warnings=validation.warnings)
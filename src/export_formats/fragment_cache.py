@@ -0,0 +1,177 @@
+"""
+Per-chapter fragment cache for exports.
+
+Format writers render each chapter into a fragment (a Markdown block, a DOCX
+body XML part, ...) and the cache stores it on disk under a key made from the
+chapter's bytes, the format, the writer's fragment version and the format
+options. Re-exporting a finished novel after editing one chapter then renders
+only that chapter; every other chapter is read back from the cache and the
+output is assembled from fragments.
+
+Fragments live in <project>/exports/.fragment_cache/<format>/. A render
+session prunes the fragments of its format that it did not use, so the cache
+holds roughly one copy of the book per format.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Optional, Set
+
+CACHE_DIRNAME = ".fragment_cache"
+
+logger = logging.getLogger(__name__)
+
+
+class FragmentCache:
+    """Content-addressed store of rendered chapter fragments."""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def make_key(format_name: str, version: int, options: Optional[Dict[str, Any]], content: bytes) -> str:
+        """Key for a fragment of content rendered by a format writer with options."""
+        digest = hashlib.sha256()
+        header = json.dumps([format_name, version, options or {}], sort_keys=True, default=str)
+        digest.update(header.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(content)
+        return digest.hexdigest()
+
+    def fragment_path(self, format_name: str, key: str) -> str:
+        return os.path.join(self.cache_dir, format_name, key)
+
+    def get(self, format_name: str, key: str) -> Optional[bytes]:
+        """Read a cached fragment, or None if it is not cached."""
+        try:
+            with open(self.fragment_path(format_name, key), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, format_name: str, key: str, data: bytes):
+        """Atomically store a fragment."""
+        directory = os.path.join(self.cache_dir, format_name)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, self.fragment_path(format_name, key))
+        except OSError as e:
+            # A cache that cannot be written only costs a re-render next time
+            logger.warning(f"Could not cache {format_name} fragment: {e}")
+
+    def session(self, format_name: str, version: int = 1,
+                options: Optional[Dict[str, Any]] = None) -> 'FragmentSession':
+        """Start rendering one export of a format."""
+        return FragmentSession(self, format_name, version, options)
+
+    def prune(self, format_name: str, keep: Set[str]) -> int:
+        """Delete the fragments of a format that are not in keep."""
+        directory = os.path.join(self.cache_dir, format_name)
+        removed = 0
+        if not os.path.isdir(directory):
+            return removed
+
+        for name in os.listdir(directory):
+            if name not in keep:
+                try:
+                    os.remove(os.path.join(directory, name))
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+
+class FragmentSession:
+    """
+    Renders the chapters of one export through the cache.
+
+    Used as a context manager; when the export finishes without an error,
+    fragments of this format that were not used are pruned. With no cache
+    every chapter is simply rendered.
+    """
+
+    def __init__(self, cache: Optional[FragmentCache], format_name: str, version: int,
+                 options: Optional[Dict[str, Any]]):
+        self.cache = cache
+        self.format_name = format_name
+        self.version = version
+        self.options = options
+        self.used: Set[str] = set()
+        self.rendered = 0
+        self.reused = 0
+
+    def render(self, content: bytes, render: Callable[[], bytes]) -> bytes:
+        """Get the fragment for content, calling render only on a cache miss."""
+        data = self.lookup(content)
+        if data is None:
+            data = render()
+            self.store(content, data)
+        return data
+
+    def lookup(self, content: bytes) -> Optional[bytes]:
+        """
+        Get the cached fragment for content, or None on a miss. Writers that
+        render misses elsewhere (in worker processes) pass the result to store().
+        """
+        if self.cache is None:
+            return None
+
+        key = self.cache.make_key(self.format_name, self.version, self.options, content)
+        self.used.add(key)
+
+        data = self.cache.get(self.format_name, key)
+        if data is not None:
+            self.reused += 1
+        return data
+
+    def store(self, content: bytes, data: bytes):
+        """Record a freshly rendered fragment for content."""
+        self.rendered += 1
+        if self.cache is not None:
+            self.cache.put(self.format_name, self.cache.make_key(
+                self.format_name, self.version, self.options, content), data)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {'fragments_rendered': self.rendered, 'fragments_reused': self.reused}
+
+    def __enter__(self) -> 'FragmentSession':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None and self.cache is not None:
+            self.cache.prune(self.format_name, self.used)
+        return False
+
+
+_caches: Dict[str, FragmentCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_fragment_cache(project_path: str) -> FragmentCache:
+    """Get the shared fragment cache of a project."""
+    cache_dir = os.path.abspath(os.path.join(project_path, "exports", CACHE_DIRNAME))
+    with _caches_lock:
+        cache = _caches.get(cache_dir)
+        if cache is None:
+            cache = FragmentCache(cache_dir)
+            _caches[cache_dir] = cache
+        return cache
+
+
+def open_fragment_session(project_path: str, format_name: str, version: int,
+                          options: Optional[Dict[str, Any]] = None) -> FragmentSession:
+    """
+    Fragment session for an export writer. options['use_cache'] = False
+    bypasses the cache; that flag is not part of the fragment key.
+    """
+    options = dict(options or {})
+    use_cache = options.pop('use_cache', True)
+    cache = get_fragment_cache(project_path) if use_cache else None
+    return FragmentSession(cache, format_name, version, options)
@@ -0,0 +1,354 @@
+"""
+Chapter-parallel PDF writer for FANWS.
+
+Laying out a long novel with reportlab's platypus happens in one thread and
+takes as long as the whole book. Here every chapter starts on a new page, so
+chapters can be laid out independently: layout_chapter() wraps a chapter's
+paragraphs into page content streams and runs in a pool of worker processes.
+The export thread then writes the pages in chapter order as they arrive and
+adds what depends on the whole book: page numbers, the table of contents and
+the outline (bookmarks).
+
+Text is set in the standard Times fonts, which every PDF reader has, so no
+fonts are embedded; reportlab is used only for their metrics. Laid-out
+chapters are kept in the fragment cache, so an unchanged chapter is not laid
+out again.
+"""
+
+import os
+import zlib
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+
+from .engine import ExportSnapshot, ProgressFunction, SCENE_BREAK
+from .fragment_cache import open_fragment_session
+
+# Letter paper with one inch margins, in points
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+MARGIN = 72
+TEXT_WIDTH = PAGE_WIDTH - 2 * MARGIN
+TOP = PAGE_HEIGHT - MARGIN
+BOTTOM = MARGIN
+
+# Resource name -> base font
+FONTS = {'F1': 'Times-Roman', 'F2': 'Times-Bold', 'F3': 'Times-Italic'}
+
+BODY_SIZE, BODY_LEADING, INDENT = 12, 16, 18
+HEADING_SIZE, HEADING_LEADING = 20, 26
+TOC_LINES_PER_PAGE = 36
+
+# Separates the page content streams of a chapter in its cached fragment
+PAGE_SEPARATOR = b"\n%%FANWS-PAGE\n"
+
+
+def pdf_text(text: str) -> str:
+    """Text as the fonts can show it: WinAnsi characters only."""
+    return text.encode('cp1252', 'replace').decode('cp1252')
+
+
+def pdf_string(text: str) -> bytes:
+    """A PDF literal string for text."""
+    data = text.encode('cp1252', 'replace')
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def text_width(text: str, font: str, size: float) -> float:
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    return stringWidth(text, FONTS[font], size)
+
+
+def wrap_text(text: str, font: str, size: float, width: float, indent: float = 0) -> List[str]:
+    """Greedily break text into lines no wider than width (the first line indented)."""
+    space = text_width(" ", font, size)
+    lines, line, line_width = [], [], indent
+    for word in text.split():
+        word_width = text_width(word, font, size)
+        if line and line_width + space + word_width > width:
+            lines.append(" ".join(line))
+            line, line_width = [], 0
+        line_width += (space if line else 0) + word_width
+        line.append(word)
+    if line:
+        lines.append(" ".join(line))
+    return lines
+
+
+class PageLayout:
+    """Collects positioned text lines into page content streams."""
+
+    def __init__(self):
+        self.pages: List[bytes] = []
+        self.lines: List[bytes] = []
+        self.y = TOP
+
+    def line(self, text: str, font: str, size: float, leading: float, x: float = MARGIN,
+             align: str = 'left'):
+        if self.y - leading < BOTTOM:
+            self.page_break()
+        self.y -= leading
+        if align == 'center':
+            x = (PAGE_WIDTH - text_width(text, font, size)) / 2
+        elif align == 'right':
+            x = PAGE_WIDTH - MARGIN - text_width(text, font, size)
+        self.lines.append(f"/{font} {size} Tf 1 0 0 1 {x:.2f} {self.y:.2f} Tm ".encode('ascii')
+                          + pdf_string(text) + b" Tj")
+
+    def space(self, points: float):
+        self.y -= points
+
+    def page_break(self):
+        if self.lines:
+            self.pages.append(b"BT\n" + b"\n".join(self.lines) + b"\nET")
+        self.lines = []
+        self.y = TOP
+
+    def finish(self) -> List[bytes]:
+        self.page_break()
+        return self.pages
+
+
+def layout_chapter(title: str, paragraphs: List[str]) -> List[bytes]:
+    """Lay out one chapter, starting on a new page. Runs in worker processes."""
+    layout = PageLayout()
+    for line in wrap_text(pdf_text(title), 'F2', HEADING_SIZE, TEXT_WIDTH):
+        layout.line(line, 'F2', HEADING_SIZE, HEADING_LEADING)
+    layout.space(HEADING_LEADING)
+
+    for paragraph in paragraphs:
+        if paragraph == SCENE_BREAK:
+            layout.space(BODY_LEADING / 2)
+            layout.line(paragraph, 'F1', BODY_SIZE, BODY_LEADING, align='center')
+            layout.space(BODY_LEADING / 2)
+            continue
+        lines = wrap_text(pdf_text(paragraph), 'F1', BODY_SIZE, TEXT_WIDTH, INDENT)
+        for number, line in enumerate(lines):
+            layout.line(line, 'F1', BODY_SIZE, BODY_LEADING, MARGIN + (INDENT if number == 0 else 0))
+
+    return layout.finish() or [b"BT\nET"]
+
+
+class PDFObjectWriter:
+    """Writes numbered PDF objects to a file and the cross-reference table at the end."""
+
+    def __init__(self, f, compress: bool = True):
+        self.f = f
+        self.compress = compress
+        self.offsets: Dict[int, int] = {}
+        self.next_id = 1
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def reserve(self) -> int:
+        object_id = self.next_id
+        self.next_id += 1
+        return object_id
+
+    def write_object(self, body: bytes, object_id: Optional[int] = None) -> int:
+        object_id = object_id or self.reserve()
+        self.offsets[object_id] = self.f.tell()
+        self.f.write(f"{object_id} 0 obj\n".encode('ascii') + body + b"\nendobj\n")
+        return object_id
+
+    def write_stream(self, data: bytes) -> int:
+        if self.compress:
+            data = zlib.compress(data)
+            header = f"<< /Length {len(data)} /Filter /FlateDecode >>"
+        else:
+            header = f"<< /Length {len(data)} >>"
+        return self.write_object(header.encode('ascii') + b"\nstream\n" + data + b"\nendstream")
+
+    def finish(self, root_id: int, info_id: int):
+        xref_offset = self.f.tell()
+        count = self.next_id
+        entries = [b"0000000000 65535 f \n"]
+        entries.extend(f"{self.offsets[i]:010d} 00000 n \n".encode('ascii') for i in range(1, count))
+        self.f.write(f"xref\n0 {count}\n".encode('ascii') + b"".join(entries))
+        self.f.write(f"trailer\n<< /Size {count} /Root {root_id} 0 R /Info {info_id} 0 R >>\n"
+                     f"startxref\n{xref_offset}\n%%EOF\n".encode('ascii'))
+
+
+class PDFBookWriter:
+    """
+    Assembles a book from laid-out chapters: title page, table of contents,
+    chapter pages with page numbers, and an outline entry per chapter.
+    """
+
+    def __init__(self, f, title: str, chapter_titles: List[str], include_toc: bool = True,
+                 include_bookmarks: bool = True, compress: bool = True):
+        self.objects = PDFObjectWriter(f, compress)
+        self.title = title
+        self.chapter_titles = chapter_titles
+        self.include_bookmarks = include_bookmarks
+        self.pages_id = self.objects.reserve()
+        self.font_ids = {
+            name: self.objects.write_object(
+                f"<< /Type /Font /Subtype /Type1 /BaseFont /{base} /Encoding /WinAnsiEncoding >>".encode('ascii'))
+            for name, base in FONTS.items()
+        }
+
+        self.toc_pages = -(-len(chapter_titles) // TOC_LINES_PER_PAGE) if include_toc else 0
+        self.page_count = 1 + self.toc_pages
+        self.chapter_pages: List[Tuple[int, int]] = []  # (first page number, first page object id)
+        self.body_page_ids: List[int] = []
+
+    def resources(self) -> str:
+        fonts = " ".join(f"/{name} {object_id} 0 R" for name, object_id in self.font_ids.items())
+        return f"/Resources << /Font << {fonts} >> >>"
+
+    def write_page(self, content: bytes, number: Optional[int] = None, annotations: str = "") -> int:
+        contents = [self.objects.write_stream(content)]
+        if number is not None:
+            x = (PAGE_WIDTH - text_width(str(number), 'F1', 10)) / 2
+            footer = f"BT\n/F1 10 Tf 1 0 0 1 {x:.2f} {BOTTOM / 2:.2f} Tm ({number}) Tj\nET"
+            contents.append(self.objects.write_stream(footer.encode('ascii')))
+
+        refs = " ".join(f"{object_id} 0 R" for object_id in contents)
+        return self.objects.write_object(
+            (f"<< /Type /Page /Parent {self.pages_id} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+             f"{self.resources()} /Contents [{refs}]{annotations} >>").encode('ascii'))
+
+    def add_chapter(self, pages: List[bytes]):
+        """Write the pages of the next chapter."""
+        first_id = None
+        for content in pages:
+            self.page_count += 1
+            page_id = self.write_page(content, self.page_count)
+            self.body_page_ids.append(page_id)
+            first_id = first_id or page_id
+        self.chapter_pages.append((self.page_count - len(pages) + 1, first_id))
+
+    def title_page(self) -> int:
+        layout = PageLayout()
+        layout.space(PAGE_HEIGHT / 4)
+        for line in wrap_text(pdf_text(self.title), 'F2', 28, TEXT_WIDTH):
+            layout.line(line, 'F2', 28, 36, align='center')
+        return self.write_page(layout.finish()[0])
+
+    def toc_page_ids(self) -> List[int]:
+        page_ids = []
+        entries = list(zip(self.chapter_titles, self.chapter_pages))
+        for page in range(self.toc_pages):
+            layout = PageLayout()
+            annotations = []
+            if page == 0:
+                layout.line("Contents", 'F2', HEADING_SIZE, HEADING_LEADING, align='center')
+                layout.space(HEADING_LEADING)
+            start = page * TOC_LINES_PER_PAGE
+            for title, (number, page_id) in entries[start:start + TOC_LINES_PER_PAGE]:
+                label = pdf_text(title)
+                while label and text_width(label, 'F1', BODY_SIZE) > TEXT_WIDTH - 48:
+                    label = label[:-1]
+                layout.line(label, 'F1', BODY_SIZE, BODY_LEADING)
+                layout.lines.append(f"1 0 0 1 {PAGE_WIDTH - MARGIN - text_width(str(number), 'F1', BODY_SIZE):.2f} "
+                                    f"{layout.y:.2f} Tm ({number}) Tj".encode('ascii'))
+                rect = f"{MARGIN} {layout.y - 4:.2f} {PAGE_WIDTH - MARGIN} {layout.y + BODY_SIZE:.2f}"
+                annotations.append(self.objects.write_object(
+                    f"<< /Type /Annot /Subtype /Link /Rect [{rect}] /Border [0 0 0] "
+                    f"/Dest [{page_id} 0 R /Fit] >>".encode('ascii')))
+            refs = " ".join(f"{object_id} 0 R" for object_id in annotations)
+            page_ids.append(self.write_page(layout.finish()[0], page + 2, f" /Annots [{refs}]"))
+        return page_ids
+
+    def write_outline(self) -> Optional[int]:
+        if not (self.include_bookmarks and self.chapter_pages):
+            return None
+        outline_id = self.objects.reserve()
+        item_ids = [self.objects.reserve() for _ in self.chapter_pages]
+        for index, (title, (_, page_id)) in enumerate(zip(self.chapter_titles, self.chapter_pages)):
+            links = f"/Parent {outline_id} 0 R"
+            if index > 0:
+                links += f" /Prev {item_ids[index - 1]} 0 R"
+            if index < len(item_ids) - 1:
+                links += f" /Next {item_ids[index + 1]} 0 R"
+            self.objects.write_object(b"<< /Title " + pdf_string(title)
+                                      + f" {links} /Dest [{page_id} 0 R /Fit] >>".encode('ascii'),
+                                      item_ids[index])
+        self.objects.write_object(
+            f"<< /Type /Outlines /First {item_ids[0]} 0 R /Last {item_ids[-1]} 0 R "
+            f"/Count {len(item_ids)} >>".encode('ascii'), outline_id)
+        return outline_id
+
+    def finish(self):
+        """Write the front matter, page tree, outline and trailer."""
+        kids = [self.title_page()] + self.toc_page_ids() + self.body_page_ids
+        refs = " ".join(f"{object_id} 0 R" for object_id in kids)
+        self.objects.write_object(f"<< /Type /Pages /Kids [{refs}] /Count {len(kids)} >>".encode('ascii'),
+                                  self.pages_id)
+
+        outline_id = self.write_outline()
+        outline = f" /Outlines {outline_id} 0 R /PageMode /UseOutlines" if outline_id else ""
+        root_id = self.objects.write_object(
+            f"<< /Type /Catalog /Pages {self.pages_id} 0 R{outline} >>".encode('ascii'))
+        info_id = self.objects.write_object(b"<< /Title " + pdf_string(self.title)
+                                            + b" /Producer (FANWS) >>")
+        self.objects.finish(root_id, info_id)
+
+
+def write_pdf_parallel(snapshot: ExportSnapshot, output_path: str, options: Dict[str, Any],
+                       progress: ProgressFunction) -> Dict[str, Any]:
+    """PDF with chapters laid out in worker processes."""
+    chapters = snapshot.chapters
+    total = len(chapters)
+    ready: Dict[int, List[bytes]] = {}
+    laid_out = 0
+
+    with open_fragment_session(snapshot.project_path, 'pdf', 1,
+                               {'use_cache': options.get('use_cache', True)}) as fragments:
+        missing = []
+        for index, chapter in enumerate(chapters):
+            data = fragments.lookup(snapshot.chapter_bytes(chapter))
+            if data is None:
+                missing.append(index)
+            else:
+                ready[index] = data.split(PAGE_SEPARATOR)
+                laid_out += 1
+
+        processes = min(len(missing), options.get('processes') or os.cpu_count() or 1)
+        executor = None
+        futures = {}
+        if processes > 1:
+            # Spawned workers are safe to start from the export thread of a Qt application
+            executor = ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn'))
+            futures = {
+                executor.submit(layout_chapter, chapters[index].title,
+                                list(snapshot.iter_paragraphs(chapters[index]))): index
+                for index in missing
+            }
+
+        def chapter_done(index: int, pages: List[bytes]):
+            nonlocal laid_out
+            fragments.store(snapshot.chapter_bytes(chapters[index]), PAGE_SEPARATOR.join(pages))
+            ready[index] = pages
+            laid_out += 1
+            progress(int(90 * laid_out / max(1, total)), f"Laid out {chapters[index].title}")
+
+        try:
+            with open(output_path, 'wb') as f:
+                book = PDFBookWriter(f, snapshot.project_name, [c.title for c in chapters],
+                                     options.get('include_toc', True),
+                                     options.get('include_bookmarks', True),
+                                     options.get('compress', True))
+                for index in range(total):
+                    while index not in ready:
+                        if executor is None:
+                            chapter = chapters[index]
+                            chapter_done(index, layout_chapter(chapter.title,
+                                                               list(snapshot.iter_paragraphs(chapter))))
+                            continue
+                        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            chapter_done(futures.pop(future), future.result())
+                    # Pages are written in chapter order and then released
+                    book.add_chapter(ready.pop(index))
+
+                progress(95, "Writing table of contents")
+                book.finish()
+        finally:
+            if executor is not None:
+                # shutdown(cancel_futures=True) needs Python 3.9
+                for future in futures:
+                    future.cancel()
+                executor.shutdown(wait=False)
+
+    return dict(fragments.get_stats(), chapters=total, pages=book.page_count,
+                processes=max(1, processes))
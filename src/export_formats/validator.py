@@ -9,7 +9,8 @@ import os
 import zipfile
 import logging
 import mimetypes
-from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Dict, Any, List, Optional, Tuple
 from pathlib import Path
 import xml.etree.ElementTree as ET
 import re
@@ -32,12 +33,82 @@ class ExportValidationResult:
     def __bool__(self):
         return self.is_valid
 
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def scan_document_text(stream: IO[bytes], text_tags: Optional[Tuple[str, ...]] = None) -> Optional[Dict[str, int]]:
+    """
+    Count the paragraphs, characters and words in the body of an XML document
+    (WordprocessingML or XHTML) in one streaming pass.
+
+    Tags are matched by local name, with or without a namespace. With
+    text_tags only the text of those elements is counted (w:t in DOCX);
+    otherwise all text in the body is. Characters and words are counted as if
+    all the text were joined together. Each element is emptied as soon as it
+    has been counted, so memory does not grow with the document.
+    Returns None if the document has no body.
+    """
+    counts = {'paragraph_count': 0, 'character_count': 0, 'word_count': 0, 'text_found': False}
+    in_word = False
+    stack = []
+    body_depth = None
+
+    def count(text: Optional[str]):
+        nonlocal in_word
+        if not text:
+            return
+        words = len(text.split())
+        if in_word and not text[0].isspace():
+            words -= 1  # continues the previous word
+        counts['word_count'] += words
+        counts['character_count'] += len(text)
+        counts['text_found'] = counts['text_found'] or bool(text.strip())
+        in_word = not text[-1].isspace()
+
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            stack.append(elem)
+            if body_depth is None and _local_name(elem.tag) == 'body':
+                body_depth = len(stack)
+            continue
+
+        stack.pop()
+        if body_depth is None or len(stack) < body_depth:
+            continue  # outside the body, or the body itself
+
+        name = _local_name(elem.tag)
+        if name == 'p':
+            counts['paragraph_count'] += 1
+        if text_tags is None:
+            count(elem.text)
+            for child in elem:
+                count(child.tail)
+        elif name in text_tags:
+            count(elem.text)
+        del elem[:]
+
+        # Earlier siblings' tails are complete once a later sibling has ended
+        parent = stack[-1]
+        if text_tags is None:
+            for sibling in parent[:-1]:
+                count(sibling.tail)
+        del parent[:-1]
+
+    if body_depth is None:
+        return None
+    return counts
+
+
 class DOCXValidator:
     """Validator for DOCX files."""
 
     @staticmethod
-    def validate(file_path: str) -> ExportValidationResult:
-        """Validate a DOCX file."""
+    def validate(file_path: str, quick: bool = False) -> ExportValidationResult:
+        """
+        Validate a DOCX file. A quick check only looks at the package
+        structure and skips reading the document text.
+        """
         try:
             if not os.path.exists(file_path):
                 return ExportValidationResult(
@@ -92,33 +163,23 @@ class DOCXValidator:
 
                         if doc_path is None:
                             warnings.append('No document.xml found')
+                        elif quick:
+                            metadata['quick'] = True
                         else:
-                            document_xml = docx_zip.read(doc_path)
-                            root = ET.fromstring(document_xml)
-
-                            # Try namespaced body first, then fallback to plain 'body'
-                            body = root.find('.//{http://schemas.openxmlformats.org/wordprocessingml/2006/main}body')
-                            if body is None:
-                                body = root.find('.//body')
+                            with docx_zip.open(doc_path) as document_xml:
+                                counts = scan_document_text(document_xml, text_tags=('t',))
 
-                            if body is None:
+                            if counts is None:
                                 warnings.append("Document body not found or malformed")
                             else:
-                                # Count paragraphs
-                                paragraphs = body.findall('.//{http://schemas.openxmlformats.org/wordprocessingml/2006/main}p')
-                                if not paragraphs:
-                                    paragraphs = body.findall('.//p')
-                                metadata['paragraph_count'] = len(paragraphs)
-
-                                # Check for text content
-                                text_elements = body.findall('.//{http://schemas.openxmlformats.org/wordprocessingml/2006/main}t')
-                                if not text_elements:
-                                    text_elements = body.findall('.//t')
-                                total_text = ''.join(elem.text or '' for elem in text_elements)
-                                metadata['character_count'] = len(total_text)
-                                metadata['word_count'] = len(total_text.split())
-
-                                if len(total_text.strip()) == 0:
+                                metadata['paragraph_count'] = counts['paragraph_count']
+                                metadata['docx_paragraphs'] = counts['paragraph_count']
+                                metadata['character_count'] = counts['character_count']
+                                metadata['word_count'] = counts['word_count']
+
+                                if counts['paragraph_count'] == 0:
+                                    warnings.append("No paragraphs found in document")
+                                if not counts['text_found']:
                                     warnings.append("Document appears to be empty")
 
                     except ET.ParseError as e:
@@ -164,22 +225,6 @@ class DOCXValidator:
             if file_size < 1000:  # Less than 1KB
                 warnings.append("File size is very small, may be corrupted")
 
-            # Try to validate with python-docx if available
-            try:
-                from docx import Document
-                doc = Document(file_path)
-
-                # Additional validation using python-docx
-                if len(doc.paragraphs) == 0:
-                    warnings.append("No paragraphs found in document")
-
-                metadata['docx_paragraphs'] = len(doc.paragraphs)
-
-            except ImportError:
-                warnings.append("python-docx not available for advanced validation")
-            except Exception as e:
-                warnings.append(f"python-docx validation failed: {e}")
-
             return ExportValidationResult(
                 True, "DOCX", file_path,
                 "Successfully validated DOCX",
@@ -197,8 +242,11 @@ class EPUBValidator:
     """Validator for EPUB files."""
 
     @staticmethod
-    def validate(file_path: str) -> ExportValidationResult:
-        """Validate an EPUB file."""
+    def validate(file_path: str, quick: bool = False) -> ExportValidationResult:
+        """
+        Validate an EPUB file. A quick check reads the container and package
+        document but not the content documents.
+        """
         try:
             if not os.path.exists(file_path):
                 return ExportValidationResult(
@@ -296,6 +344,12 @@ class EPUBValidator:
                                         if missing_manifest_files:
                                             warnings.append(f"Missing manifest files: {', '.join(missing_manifest_files[:5])}")
 
+                                        if quick:
+                                            metadata['quick'] = True
+                                        else:
+                                            EPUBValidator.scan_content(epub_zip, opf_path, items,
+                                                                       metadata, warnings)
+
                                 except ET.ParseError as e:
                                     warnings.append(f"Invalid OPF XML: {e}")
                             else:
@@ -333,12 +387,50 @@ class EPUBValidator:
                 f"Validation error: {e}"
             )
 
+    @staticmethod
+    def scan_content(epub_zip: zipfile.ZipFile, opf_path: str, items: List[ET.Element],
+                     metadata: Dict[str, Any], warnings: List[str]):
+        """Stream the XHTML content documents, counting paragraphs and words."""
+        opf_dir = os.path.dirname(opf_path)
+        totals = {'paragraph_count': 0, 'character_count': 0, 'word_count': 0}
+        documents = 0
+        text_found = False
+
+        for item in items:
+            href = item.get('href')
+            if (not href or item.get('media-type') != 'application/xhtml+xml'
+                    or 'nav' in (item.get('properties') or '').split()):
+                continue
+            path = os.path.join(opf_dir, href).replace('\\', '/')
+            try:
+                with epub_zip.open(path) as document:
+                    counts = scan_document_text(document)
+            except KeyError:
+                continue  # already reported as a missing manifest file
+            except ET.ParseError as e:
+                warnings.append(f"Invalid XHTML in {href}: {e}")
+                continue
+
+            documents += 1
+            if counts is not None:
+                text_found = text_found or counts['text_found']
+                for key in totals:
+                    totals[key] += counts[key]
+
+        metadata['content_documents'] = documents
+        metadata.update(totals)
+        if not text_found:
+            warnings.append("EPUB appears to be empty")
+
 class PDFValidator:
     """Validator for PDF files."""
 
     @staticmethod
-    def validate(file_path: str) -> ExportValidationResult:
-        """Validate a PDF file."""
+    def validate(file_path: str, quick: bool = False) -> ExportValidationResult:
+        """
+        Validate a PDF file. A quick check only reads the header and the end
+        of the file.
+        """
         try:
             if not os.path.exists(file_path):
                 return ExportValidationResult(
@@ -384,6 +476,17 @@ class PDFValidator:
                     except:
                         warnings.append("Could not determine PDF version")
 
+                    if quick:
+                        pdf_file.seek(max(0, file_size - 1024))
+                        if b'%%EOF' not in pdf_file.read():
+                            warnings.append("PDF may be truncated (no %%EOF found)")
+                        metadata['quick'] = True
+                        return ExportValidationResult(
+                            True, "PDF", file_path,
+                            "Successfully validated PDF",
+                            warnings, metadata
+                        )
+
                     # Read a bit more to check for basic structure
                     pdf_file.seek(0)
                     content = pdf_file.read(1024)
@@ -573,8 +676,9 @@ class ExportValidator:
             'pdf': PDFValidator
         }
 
-    def validate_file(self, file_path: str, format_type: str = None) -> ExportValidationResult:
-        """Validate an exported file."""
+    def validate_file(self, file_path: str, format_type: str = None,
+                      quick: bool = False) -> ExportValidationResult:
+        """Validate an exported file; quick checks only headers and structure."""
 
         if not format_type:
             # Determine format from file extension
@@ -590,7 +694,7 @@ class ExportValidator:
             )
 
         validator_class = self.validators[format_type]
-        return validator_class.validate(file_path)
+        return validator_class.validate(file_path, quick=quick)
 
     # Backwards-compatible convenience methods expected by older tests
     def validate_docx(self, file_path: str) -> ExportValidationResult:
@@ -605,22 +709,26 @@ class ExportValidator:
     def validate(self, file_path: str, format_type: str = None) -> ExportValidationResult:
         return self.validate_file(file_path, format_type)
 
-    def validate_multiple_files(self, file_paths: List[str]) -> Dict[str, ExportValidationResult]:
-        """Validate multiple exported files."""
-        results = {}
+    def validate_multiple_files(self, file_paths: List[str], quick: bool = False,
+                                max_workers: Optional[int] = None) -> Dict[str, ExportValidationResult]:
+        """Validate multiple exported files concurrently, keeping their order."""
 
-        for file_path in file_paths:
+        def validate_one(file_path: str) -> ExportValidationResult:
             try:
-                result = self.validate_file(file_path)
-                results[file_path] = result
+                return self.validate_file(file_path, quick=quick)
             except Exception as e:
                 logger.error(f"Error validating {file_path}: {e}")
-                results[file_path] = ExportValidationResult(
+                return ExportValidationResult(
                     False, "UNKNOWN", file_path,
                     f"Validation failed: {e}"
                 )
 
-        return results
+        if len(file_paths) <= 1:
+            return {file_path: validate_one(file_path) for file_path in file_paths}
+
+        workers = max_workers or min(len(file_paths), os.cpu_count() or 1, 8)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export-validate") as executor:
+            return dict(zip(file_paths, executor.map(validate_one, file_paths)))
 
     def get_validation_summary(self, results: Dict[str, ExportValidationResult]) -> Dict[str, Any]:
         """Get a summary of validation results."""
@@ -661,9 +769,9 @@ def validate_export_file(file_path: str, format_type: str = None) -> ExportValid
     """Convenience function to validate a single export file."""
     return export_validator.validate_file(file_path, format_type)
 
-def validate_export_files(file_paths: List[str]) -> Dict[str, ExportValidationResult]:
+def validate_export_files(file_paths: List[str], quick: bool = False) -> Dict[str, ExportValidationResult]:
     """Convenience function to validate multiple export files."""
-    return export_validator.validate_multiple_files(file_paths)
+    return export_validator.validate_multiple_files(file_paths, quick=quick)
 
 
 # Backwards-compatible module-level aliases
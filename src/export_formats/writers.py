@@ -0,0 +1,183 @@
+"""
+Format writers for the FANWS export engine.
+
+Each writer renders an ExportSnapshot chapter by chapter and reports progress
+after every chapter, which is also where cancellation takes effect. Chapters
+of the text, DOCX, EPUB and PDF formats are rendered through the project's
+fragment cache, so only chapters that changed since the last export are
+rendered again. DOCX is streamed as OOXML by docx_writer, with python-docx available
+as an option. PDF chapters are laid out in worker processes by pdf_writer,
+with reportlab's platypus as an option. python-docx and reportlab are
+imported when the format is first used so that the other formats work
+without them. EPUB is written by the streaming writer in epub_writer.
+"""
+
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from .engine import (
+    ExportChapter, ExportEngine, ExportSnapshot, FormatWriter, ProgressFunction, SCENE_BREAK
+)
+from .docx_writer import write_docx_stream
+from .epub_writer import write_epub
+from .fragment_cache import open_fragment_session
+from .pdf_writer import write_pdf_parallel
+
+
+def chapter_progress(progress: ProgressFunction, done: int, total: int, title: str):
+    """Report progress after a chapter, leaving the last few percent for saving."""
+    progress(int(95 * done / max(1, total)), f"Rendered {title}")
+
+
+def render_txt_chapter(snapshot: ExportSnapshot, chapter: ExportChapter) -> bytes:
+    """Plain text fragment for one chapter."""
+    parts = [f"\n{chapter.title}\n\n"]
+    parts.extend(f"{paragraph}\n\n" for paragraph in snapshot.iter_paragraphs(chapter))
+    return "".join(parts).encode('utf-8')
+
+
+def write_txt(snapshot: ExportSnapshot, output_path: str, options: Dict[str, Any],
+              progress: ProgressFunction) -> Dict[str, Any]:
+    """Plain text manuscript with chapter titles."""
+    chapters = snapshot.chapters
+    with open_fragment_session(snapshot.project_path, 'txt', 1, options) as fragments, \
+            open(output_path, 'wb') as f:
+        f.write(f"{snapshot.project_name}\n\n".encode('utf-8'))
+        for done, chapter in enumerate(chapters, 1):
+            f.write(fragments.render(snapshot.chapter_bytes(chapter),
+                                     lambda: render_txt_chapter(snapshot, chapter)))
+            chapter_progress(progress, done, len(chapters), chapter.title)
+
+    return dict(fragments.get_stats(), chapters=len(chapters))
+
+
+def render_docx_chapter(snapshot: ExportSnapshot, chapter: ExportChapter) -> bytes:
+    """WordprocessingML body elements for one chapter, rendered with python-docx."""
+    from docx import Document
+    from docx.oxml.ns import qn
+    from lxml import etree
+
+    document = Document()
+    document.add_heading(chapter.title, 1)
+    for paragraph in snapshot.iter_paragraphs(chapter):
+        document.add_paragraph(paragraph)
+
+    return b"".join(etree.tostring(element) for element in document.element.body
+                    if element.tag != qn('w:sectPr'))
+
+
+def write_docx(snapshot: ExportSnapshot, output_path: str, options: Dict[str, Any],
+               progress: ProgressFunction) -> Dict[str, Any]:
+    """
+    Word document. Streamed as OOXML by default; options['python_docx'] = True
+    builds it with the python-docx object model instead.
+    """
+    if options.get('python_docx', False):
+        return write_python_docx(snapshot, output_path, options, progress)
+    return write_docx_stream(snapshot, output_path, options, progress)
+
+
+def write_python_docx(snapshot: ExportSnapshot, output_path: str, options: Dict[str, Any],
+                      progress: ProgressFunction) -> Dict[str, Any]:
+    """Word document built with python-docx from cached chapter XML."""
+    from docx import Document
+    from docx.enum.text import WD_BREAK
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import qn
+
+    page_breaks = options.get('page_breaks', True)
+    chapters = snapshot.chapters
+
+    document = Document()
+    document.add_heading(snapshot.project_name, 0)
+    body = document.element.body
+    section_properties = body.find(qn('w:sectPr'))
+
+    with open_fragment_session(snapshot.project_path, 'docx', 1,
+                               {'use_cache': options.get('use_cache', True)}) as fragments:
+        for done, chapter in enumerate(chapters, 1):
+            if page_breaks and done > 1:
+                document.add_paragraph().add_run().add_break(WD_BREAK.PAGE)
+
+            fragment = fragments.render(snapshot.chapter_bytes(chapter),
+                                        lambda: render_docx_chapter(snapshot, chapter))
+            # Fragment elements carry their own namespace declarations
+            for element in list(parse_xml(b"<fragment>" + fragment + b"</fragment>")):
+                section_properties.addprevious(element)
+            chapter_progress(progress, done, len(chapters), chapter.title)
+
+    progress(96, "Saving document")
+    document.save(output_path)
+    return dict(fragments.get_stats(), chapters=len(chapters))
+
+
+def write_pdf(snapshot: ExportSnapshot, output_path: str, options: Dict[str, Any],
+              progress: ProgressFunction) -> Dict[str, Any]:
+    """
+    PDF with chapters laid out in parallel worker processes; options['platypus']
+    = True lays the whole book out with reportlab's platypus instead.
+    """
+    if options.get('platypus', False):
+        return write_platypus_pdf(snapshot, output_path, options, progress)
+    return write_pdf_parallel(snapshot, output_path, options, progress)
+
+
+def write_platypus_pdf(snapshot: ExportSnapshot, output_path: str, options: Dict[str, Any],
+                       progress: ProgressFunction) -> Dict[str, Any]:
+    """PDF laid out with reportlab."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    styles = getSampleStyleSheet()
+    chapters = snapshot.chapters
+
+    flowables = [Paragraph(escape(snapshot.project_name), styles['Title']), Spacer(1, 12)]
+    for done, chapter in enumerate(chapters, 1):
+        if done > 1:
+            flowables.append(PageBreak())
+        flowables.append(Paragraph(escape(chapter.title), styles['Heading1']))
+        for paragraph in snapshot.iter_paragraphs(chapter):
+            style = styles['Normal'] if paragraph != SCENE_BREAK else styles['Heading3']
+            flowables.append(Paragraph(escape(paragraph), style))
+            flowables.append(Spacer(1, 6))
+        # Collecting flowables is the cheap half; layout happens in build()
+        progress(int(40 * done / max(1, len(chapters))), f"Prepared {chapter.title}")
+
+    progress(45, "Laying out pages")
+    document = SimpleDocTemplate(output_path, pagesize=letter, title=snapshot.project_name)
+    document.build(flowables)
+    return {'chapters': len(chapters)}
+
+
+# Format name -> (writer, file extension)
+FORMAT_WRITERS: Dict[str, Tuple[FormatWriter, str]] = {
+    'txt': (write_txt, '.txt'),
+    'docx': (write_docx, '.docx'),
+    'pdf': (write_pdf, '.pdf'),
+    'epub': (write_epub, '.epub'),
+}
+
+
+def get_supported_formats() -> List[str]:
+    """Get the names of the formats the engine can write."""
+    return list(FORMAT_WRITERS)
+
+
+def create_export_engine(snapshot: ExportSnapshot, formats: Iterable[str], output_dir: str,
+                         filename_prefix: str = "",
+                         format_options: Optional[Dict[str, Dict[str, Any]]] = None,
+                         max_workers: Optional[int] = None) -> ExportEngine:
+    """Create an engine with the built-in writers for the requested formats."""
+    engine = ExportEngine(snapshot, max_workers=max_workers)
+    base_name = filename_prefix or snapshot.project_name
+
+    for name in formats:
+        if name not in FORMAT_WRITERS:
+            raise ValueError(f"Unsupported export format: {name}")
+        writer, extension = FORMAT_WRITERS[name]
+        engine.add_format(name, writer, os.path.join(output_dir, base_name + extension),
+                          (format_options or {}).get(name))
+
+    return engine
@@ -8,7 +8,6 @@ import json
 import time
 import logging
 import threading
-import sqlite3
 import hashlib
 import os
 from typing import Dict, Any, Optional, List, Callable
@@ -27,7 +26,7 @@ except ImportError:
     logging.warning("⚠ LZ4 not available - using no compression")
 
 from PyQt5.QtCore import QThread, pyqtSignal, QObject
-from ..database.database_manager import DatabaseManager
+from ..database.database_manager import DatabaseManager, SchemaStore, get_db_manager
 from ..core.error_handling_system import ErrorHandler, APIError
 # from ..core.error_handling_system import MemoryCache  # MemoryCache not available
 
@@ -91,8 +90,12 @@ class RateLimiter:
 class SQLiteCache:
     """SQLite-based cache with LZ4 compression for API responses"""
 
-    def __init__(self, cache_dir: str = "cache", max_age_days: int = 7):
-        """Initialize SQLite cache"""
+    def __init__(self, cache_dir: str = "cache", max_age_days: int = 7,
+                 storage: Optional[DatabaseManager] = None):
+        """
+        Initialize SQLite cache. With storage, the cache file is attached to
+        that database manager's connections instead of opened separately.
+        """
         self.cache_dir = cache_dir
         self.max_age_days = max_age_days
         self.db_path = os.path.join(cache_dir, "api_cache.db")
@@ -101,24 +104,28 @@ class SQLiteCache:
         # Ensure cache directory exists
         os.makedirs(cache_dir, exist_ok=True)
 
+        self.store = SchemaStore(self.db_path, "api_cache", storage)
+        self.table = self.store.table("api_cache")
+
         # Initialize database
         self._init_db()
 
     def _init_db(self):
         """Initialize the cache database"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS api_cache (
+        self.store.execute_transaction([
+            (f"""
+                CREATE TABLE IF NOT EXISTS {self.table} (
                     key TEXT PRIMARY KEY,
                     data BLOB,
                     timestamp REAL,
                     compressed INTEGER
                 )
-            """)
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_timestamp
+            """, ()),
+            (f"""
+                CREATE INDEX IF NOT EXISTS {self.store.table("idx_timestamp")}
                 ON api_cache(timestamp)
-            """)
+            """, ())
+        ])
 
     def _compress_data(self, data: str) -> tuple[bytes, bool]:
         """Compress data if LZ4 is available"""
@@ -146,27 +153,25 @@ class SQLiteCache:
         """Get cached data"""
         with self._lock:
             try:
-                with sqlite3.connect(self.db_path) as conn:
-                    cursor = conn.execute(
-                        "SELECT data, timestamp, compressed FROM api_cache WHERE key = ?",
-                        (key,)
-                    )
-                    result = cursor.fetchone()
+                result = self.store.execute(
+                    f"SELECT data, timestamp, compressed FROM {self.table} WHERE key = ?",
+                    (key,), fetch="one"
+                )
 
-                    if result is None:
-                        return None
+                if result is None:
+                    return None
 
-                    data_blob, timestamp, compressed = result
+                data_blob, timestamp, compressed = result
 
-                    # Check if data is expired
-                    age_days = (time.time() - timestamp) / (24 * 3600)
-                    if age_days > self.max_age_days:
-                        self.delete(key)
-                        return None
+                # Check if data is expired
+                age_days = (time.time() - timestamp) / (24 * 3600)
+                if age_days > self.max_age_days:
+                    self.delete(key)
+                    return None
 
-                    # Decompress and parse data
-                    data_str = self._decompress_data(data_blob, bool(compressed))
-                    return json.loads(data_str)
+                # Decompress and parse data
+                data_str = self._decompress_data(data_blob, bool(compressed))
+                return json.loads(data_str)
 
             except Exception as e:
                 logging.error(f"Cache get error: {e}")
@@ -179,11 +184,10 @@ class SQLiteCache:
                 data_str = json.dumps(data)
                 data_blob, compressed = self._compress_data(data_str)
 
-                with sqlite3.connect(self.db_path) as conn:
-                    conn.execute(
-                        "INSERT OR REPLACE INTO api_cache (key, data, timestamp, compressed) VALUES (?, ?, ?, ?)",
-                        (key, data_blob, time.time(), int(compressed))
-                    )
+                self.store.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, data, timestamp, compressed) VALUES (?, ?, ?, ?)",
+                    (key, data_blob, time.time(), int(compressed)), fetch="none"
+                )
 
             except Exception as e:
                 logging.error(f"Cache set error: {e}")
@@ -192,23 +196,25 @@ class SQLiteCache:
         """Delete cached data"""
         with self._lock:
             try:
-                with sqlite3.connect(self.db_path) as conn:
-                    conn.execute("DELETE FROM api_cache WHERE key = ?", (key,))
+                self.store.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,), fetch="none")
             except Exception as e:
                 logging.error(f"Cache delete error: {e}")
 
+    def clear(self):
+        """Delete all cached data"""
+        with self._lock:
+            self.store.execute(f"DELETE FROM {self.table}", fetch="none")
+
     def clear_expired(self):
         """Clear expired cache entries"""
         with self._lock:
             try:
                 cutoff_time = time.time() - (self.max_age_days * 24 * 3600)
-                with sqlite3.connect(self.db_path) as conn:
-                    cursor = conn.execute(
-                        "DELETE FROM api_cache WHERE timestamp < ?",
-                        (cutoff_time,)
-                    )
-                    deleted_count = cursor.rowcount
-                    logging.info(f"Cleared {deleted_count} expired cache entries")
+                deleted_count = self.store.execute(
+                    f"DELETE FROM {self.table} WHERE timestamp < ?",
+                    (cutoff_time,), fetch="none"
+                )
+                logging.info(f"Cleared {deleted_count} expired cache entries")
             except Exception as e:
                 logging.error(f"Cache cleanup error: {e}")
 
@@ -216,26 +222,18 @@ class SQLiteCache:
         """Get cache statistics"""
         with self._lock:
             try:
-                with sqlite3.connect(self.db_path) as conn:
-                    cursor = conn.execute("SELECT COUNT(*) FROM api_cache")
-                    total_entries = cursor.fetchone()[0]
-
-                    cursor = conn.execute(
-                        "SELECT SUM(LENGTH(data)) FROM api_cache"
-                    )
-                    total_size = cursor.fetchone()[0] or 0
-
-                    cursor = conn.execute(
-                        "SELECT COUNT(*) FROM api_cache WHERE compressed = 1"
-                    )
-                    compressed_entries = cursor.fetchone()[0]
-
-                    return {
-                        'total_entries': total_entries,
-                        'total_size_bytes': total_size,
-                        'compressed_entries': compressed_entries,
-                        'cache_file': self.db_path
-                    }
+                total_entries, total_size, compressed_entries = self.store.execute(
+                    f"SELECT COUNT(*), SUM(LENGTH(data)), "
+                    f"COUNT(CASE WHEN compressed = 1 THEN 1 END) FROM {self.table}",
+                    fetch="one"
+                )
+
+                return {
+                    'total_entries': total_entries,
+                    'total_size_bytes': total_size or 0,
+                    'compressed_entries': compressed_entries,
+                    'cache_file': self.db_path
+                }
             except Exception as e:
                 logging.error(f"Cache stats error: {e}")
                 return {}
@@ -328,9 +326,9 @@ class APIManager(QObject):
         """Initialize API manager."""
         super().__init__()
 
-        self.db_manager = DatabaseManager()
+        self.db_manager = get_db_manager()
         self.memory_cache = MemoryCache()  # In-memory cache wrapper
-        self.sqlite_cache = SQLiteCache()  # New SQLite cache with compression
+        self.sqlite_cache = SQLiteCache(storage=self.db_manager)  # Attached to fanws.db
         self.rate_limiters = {}
         self.api_keys = {}
         self.api_endpoints = {}
@@ -600,8 +598,7 @@ class APIManager(QObject):
         """Clear all caches"""
         self.memory_cache.clear()
         # Clear SQLite cache by deleting all entries
-        with sqlite3.connect(self.sqlite_cache.db_path) as conn:
-            conn.execute("DELETE FROM api_cache")
+        self.sqlite_cache.clear()
         logging.info("All caches cleared")
 
     def get_cache_stats(self) -> Dict[str, Any]:
@@ -21,7 +21,7 @@ from PyQt5.QtCore import (
 from PyQt5.QtWidgets import QProgressBar, QLabel, QWidget, QVBoxLayout, QProgressDialog
 
 from ..core.error_handling_system import ErrorHandler
-from ..database.database_manager import DatabaseManager
+from ..database.database_manager import get_db_manager
 from ..core.performance_monitor import PerformanceMonitor
 
 class AsyncTaskSignals(QObject):
@@ -250,7 +250,7 @@ class BackgroundTaskManager(QObject):
         self.performance_monitor = None
 
         # Database manager for persistence
-        self.db_manager = DatabaseManager()
+        self.db_manager = get_db_manager()
 
         # Thread synchronization
         self.mutex = QMutex()
@@ -11,11 +11,12 @@ from typing import Any, Dict, List, Optional, Union, Callable
 from dataclasses import dataclass, field
 from enum import Enum
 import hashlib
-import sqlite3
 from pathlib import Path
 import statistics
 from datetime import datetime, timedelta
 
+from ..database.database_manager import DatabaseManager, SchemaStore
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -104,18 +105,22 @@ class PromptExperiment:
 class PromptDatabase:
     """SQLite database for storing prompts and metrics."""
 
-    def __init__(self, db_path: str = "prompt_engineering.db"):
+    def __init__(self, db_path: str = "prompt_engineering.db",
+                 storage: Optional[DatabaseManager] = None):
+        """With storage, db_path is attached to that database manager as the prompts schema."""
         self.db_path = Path(db_path)
+        self.store = SchemaStore(self.db_path, "prompts", storage)
+        self.templates_table = self.store.table("prompt_templates")
+        self.metrics_table = self.store.table("prompt_metrics")
+        self.experiments_table = self.store.table("prompt_experiments")
         self._init_database()
 
     def _init_database(self):
         """Initialize the database schema."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-
+        self.store.execute_transaction([
             # Prompt templates table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS prompt_templates (
+            (f"""
+                CREATE TABLE IF NOT EXISTS {self.templates_table} (
                     id TEXT PRIMARY KEY,
                     name TEXT NOT NULL,
                     content TEXT NOT NULL,
@@ -133,11 +138,11 @@ class PromptDatabase:
                     avg_quality_score REAL DEFAULT 0.0,
                     avg_response_time REAL DEFAULT 0.0
                 )
-            """)
+            """, ()),
 
             # Prompt metrics table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS prompt_metrics (
+            (f"""
+                CREATE TABLE IF NOT EXISTS {self.metrics_table} (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     prompt_id TEXT,
                     response_time REAL,
@@ -149,11 +154,11 @@ class PromptDatabase:
                     timestamp TIMESTAMP,
                     FOREIGN KEY (prompt_id) REFERENCES prompt_templates (id)
                 )
-            """)
+            """, ()),
 
             # Experiments table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS prompt_experiments (
+            (f"""
+                CREATE TABLE IF NOT EXISTS {self.experiments_table} (
                     id TEXT PRIMARY KEY,
                     name TEXT NOT NULL,
                     description TEXT,
@@ -164,59 +169,57 @@ class PromptDatabase:
                     min_samples INTEGER,
                     confidence_level REAL
                 )
-            """)
-
-            conn.commit()
+            """, ())
+        ])
+        self.store.migrate([
+            (1, "Index metrics by prompt and time", [
+                f"CREATE INDEX IF NOT EXISTS {self.store.table('idx_prompt_metrics_prompt_timestamp')} "
+                "ON prompt_metrics (prompt_id, timestamp)"
+            ]),
+        ])
 
     def save_template(self, template: PromptTemplate):
         """Save a prompt template to the database."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO prompt_templates
-                (id, name, content, category, prompt_type, variables, description,
-                 tags, version, author, created_at, updated_at, is_active)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                template.id, template.name, template.content,
-                template.category.value, template.prompt_type.value,
-                json.dumps(template.variables), template.description,
-                json.dumps(template.tags), template.version, template.author,
-                template.created_at.isoformat(), template.updated_at.isoformat(),
-                template.is_active
-            ))
-            conn.commit()
+        self.store.execute(f"""
+            INSERT OR REPLACE INTO {self.templates_table}
+            (id, name, content, category, prompt_type, variables, description,
+             tags, version, author, created_at, updated_at, is_active)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            template.id, template.name, template.content,
+            template.category.value, template.prompt_type.value,
+            json.dumps(template.variables), template.description,
+            json.dumps(template.tags), template.version, template.author,
+            template.created_at.isoformat(), template.updated_at.isoformat(),
+            template.is_active
+        ), fetch="none")
 
     def load_template(self, template_id: str) -> Optional[PromptTemplate]:
         """Load a prompt template from the database."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM prompt_templates WHERE id = ?
-            """, (template_id,))
-            row = cursor.fetchone()
-
-            if row:
-                return PromptTemplate(
-                    id=row[0], name=row[1], content=row[2],
-                    category=PromptCategory(row[3]),
-                    prompt_type=PromptType(row[4]),
-                    variables=json.loads(row[5] or "[]"),
-                    description=row[6] or "",
-                    tags=json.loads(row[7] or "[]"),
-                    version=row[8], author=row[9],
-                    created_at=datetime.fromisoformat(row[10]),
-                    updated_at=datetime.fromisoformat(row[11]),
-                    is_active=bool(row[12])
-                )
+        row = self.store.execute(f"""
+            SELECT * FROM {self.templates_table} WHERE id = ?
+        """, (template_id,), fetch="one")
+
+        if row:
+            return PromptTemplate(
+                id=row[0], name=row[1], content=row[2],
+                category=PromptCategory(row[3]),
+                prompt_type=PromptType(row[4]),
+                variables=json.loads(row[5] or "[]"),
+                description=row[6] or "",
+                tags=json.loads(row[7] or "[]"),
+                version=row[8], author=row[9],
+                created_at=datetime.fromisoformat(row[10]),
+                updated_at=datetime.fromisoformat(row[11]),
+                is_active=bool(row[12])
+            )
         return None
 
     def record_metrics(self, prompt_id: str, metrics: PromptMetrics):
         """Record performance metrics for a prompt."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO prompt_metrics
+        self.store.execute_transaction([
+            (f"""
+                INSERT INTO {self.metrics_table}
                 (prompt_id, response_time, token_count, completion_length,
                  quality_score, user_rating, success_rate, timestamp)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
@@ -225,24 +228,23 @@ class PromptDatabase:
                 metrics.completion_length, metrics.quality_score,
                 metrics.user_rating, metrics.success_rate,
                 metrics.timestamp.isoformat()
-            ))
+            )),
 
             # Update template statistics
-            cursor.execute("""
-                UPDATE prompt_templates
+            (f"""
+                UPDATE {self.templates_table}
                 SET usage_count = usage_count + 1,
                     avg_quality_score = (
-                        SELECT AVG(quality_score) FROM prompt_metrics
+                        SELECT AVG(quality_score) FROM {self.metrics_table}
                         WHERE prompt_id = ?
                     ),
                     avg_response_time = (
-                        SELECT AVG(response_time) FROM prompt_metrics
+                        SELECT AVG(response_time) FROM {self.metrics_table}
                         WHERE prompt_id = ?
                     )
                 WHERE id = ?
             """, (prompt_id, prompt_id, prompt_id))
-
-            conn.commit()
+        ])
 
 class PromptOptimizer:
     """Advanced prompt optimization and analysis tools."""
@@ -256,48 +258,44 @@ class PromptOptimizer:
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days_back)
 
-        with sqlite3.connect(self.database.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT response_time, token_count, completion_length,
-                       quality_score, user_rating, success_rate
-                FROM prompt_metrics
-                WHERE prompt_id = ? AND timestamp >= ? AND timestamp <= ?
-            """, (prompt_id, start_date.isoformat(), end_date.isoformat()))
-
-            rows = cursor.fetchall()
-
-            if not rows:
-                return {"error": "No data found for the specified period"}
-
-            response_times = [r[0] for r in rows if r[0] is not None]
-            token_counts = [r[1] for r in rows if r[1] is not None]
-            completion_lengths = [r[2] for r in rows if r[2] is not None]
-            quality_scores = [r[3] for r in rows if r[3] is not None]
-            user_ratings = [r[4] for r in rows if r[4] is not None]
-            success_rates = [r[5] for r in rows if r[5] is not None]
-
-            return {
-                "total_uses": len(rows),
-                "response_time": {
-                    "avg": statistics.mean(response_times) if response_times else 0,
-                    "median": statistics.median(response_times) if response_times else 0,
-                    "std": statistics.stdev(response_times) if len(response_times) > 1 else 0
-                },
-                "token_efficiency": {
-                    "avg_tokens": statistics.mean(token_counts) if token_counts else 0,
-                    "avg_completion": statistics.mean(completion_lengths) if completion_lengths else 0,
-                    "efficiency_ratio": (
-                        statistics.mean(completion_lengths) / statistics.mean(token_counts)
-                        if token_counts and completion_lengths else 0
-                    )
-                },
-                "quality": {
-                    "avg_score": statistics.mean(quality_scores) if quality_scores else 0,
-                    "avg_rating": statistics.mean(user_ratings) if user_ratings else 0,
-                    "success_rate": statistics.mean(success_rates) if success_rates else 0
-                }
+        rows = self.database.store.execute(f"""
+            SELECT response_time, token_count, completion_length,
+                   quality_score, user_rating, success_rate
+            FROM {self.database.metrics_table}
+            WHERE prompt_id = ? AND timestamp >= ? AND timestamp <= ?
+        """, (prompt_id, start_date.isoformat(), end_date.isoformat()))
+
+        if not rows:
+            return {"error": "No data found for the specified period"}
+
+        response_times = [r[0] for r in rows if r[0] is not None]
+        token_counts = [r[1] for r in rows if r[1] is not None]
+        completion_lengths = [r[2] for r in rows if r[2] is not None]
+        quality_scores = [r[3] for r in rows if r[3] is not None]
+        user_ratings = [r[4] for r in rows if r[4] is not None]
+        success_rates = [r[5] for r in rows if r[5] is not None]
+
+        return {
+            "total_uses": len(rows),
+            "response_time": {
+                "avg": statistics.mean(response_times) if response_times else 0,
+                "median": statistics.median(response_times) if response_times else 0,
+                "std": statistics.stdev(response_times) if len(response_times) > 1 else 0
+            },
+            "token_efficiency": {
+                "avg_tokens": statistics.mean(token_counts) if token_counts else 0,
+                "avg_completion": statistics.mean(completion_lengths) if completion_lengths else 0,
+                "efficiency_ratio": (
+                    statistics.mean(completion_lengths) / statistics.mean(token_counts)
+                    if token_counts and completion_lengths else 0
+                )
+            },
+            "quality": {
+                "avg_score": statistics.mean(quality_scores) if quality_scores else 0,
+                "avg_rating": statistics.mean(user_ratings) if user_ratings else 0,
+                "success_rate": statistics.mean(success_rates) if success_rates else 0
             }
+        }
 
     def suggest_optimizations(self, prompt_id: str) -> List[str]:
         """Suggest optimizations based on performance analysis."""
@@ -331,8 +329,9 @@ class PromptOptimizer:
 class PromptEngineeringManager:
     """Main manager for prompt engineering tools."""
 
-    def __init__(self, db_path: str = "prompt_engineering.db"):
-        self.database = PromptDatabase(db_path)
+    def __init__(self, db_path: str = "prompt_engineering.db",
+                 storage: Optional[DatabaseManager] = None):
+        self.database = PromptDatabase(db_path, storage)
         self.optimizer = PromptOptimizer(self.database)
         self.active_experiments: Dict[str, PromptExperiment] = {}
 
@@ -415,29 +414,25 @@ class PromptEngineeringManager:
     def list_templates(self, category: Optional[PromptCategory] = None,
                       tags: List[str] = None) -> List[PromptTemplate]:
         """List available templates with optional filtering."""
-        with sqlite3.connect(self.database.db_path) as conn:
-            cursor = conn.cursor()
-
-            query = "SELECT id FROM prompt_templates WHERE is_active = 1"
-            params = []
+        query = f"SELECT id FROM {self.database.templates_table} WHERE is_active = 1"
+        params = []
 
-            if category:
-                query += " AND category = ?"
-                params.append(category.value)
+        if category:
+            query += " AND category = ?"
+            params.append(category.value)
 
-            cursor.execute(query, params)
-            template_ids = [row[0] for row in cursor.fetchall()]
+        template_ids = [row[0] for row in self.database.store.execute(query, tuple(params))]
 
-            templates = []
-            for template_id in template_ids:
-                template = self.database.load_template(template_id)
-                if template:
-                    # Filter by tags if specified
-                    if tags and not any(tag in template.tags for tag in tags):
-                        continue
-                    templates.append(template)
+        templates = []
+        for template_id in template_ids:
+            template = self.database.load_template(template_id)
+            if template:
+                # Filter by tags if specified
+                if tags and not any(tag in template.tags for tag in tags):
+                    continue
+                templates.append(template)
 
-            return templates
+        return templates
 
     def render_template(self, template_id: str, **kwargs) -> Optional[str]:
         """Render a template with provided variables."""
@@ -3,6 +3,8 @@ FANWS UI Package
 Modular UI components broken down from mega-file in cleanup
 """
 
+import os
+
 # Import modules directly to avoid naming conflicts
 from . import core_ui
 from . import analytics_ui
@@ -21,6 +23,15 @@ class UIComponents:
         self.modern_components = None
         self.modern_animations = None
 
+    def get_project_dir(self):
+        """Get the directory of the window's current project, or None."""
+        project = getattr(self.window, 'current_project', None)
+        if isinstance(project, dict):
+            return project.get('path')
+        if project:
+            return os.path.join(os.getcwd(), 'projects', project)
+        return None
+
     def create_ui(self):
         """Create UI widgets required by the main application"""
         if not self.window:
@@ -1012,14 +1023,11 @@ Performance Optimization Recommendations:
     def _create_export_status_content(self, layout, page_id):
         """Create export status content with enhanced export manager"""
         try:
-            from export_ui import ExportManagerWidget
-
-            # Create the export manager widget
-            export_manager = ExportManagerWidget()
+            # Create the export manager widget for the current project
+            export_manager = ExportManagerWidget(project_dir=self.get_project_dir())
 
-            # Store reference for later use
-            if not hasattr(self.window, 'export_manager'):
-                self.window.export_manager = export_manager
+            # Keep a reference to the displayed widget so project changes reach it
+            self.window.export_manager = export_manager
 
             layout.addWidget(export_manager)
 
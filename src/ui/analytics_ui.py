@@ -7,7 +7,8 @@ Consolidated from multiple dashboard files in cleanup
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QPushButton, QProgressBar, QGroupBox, QTextEdit,
                              QFormLayout, QSpinBox, QDoubleSpinBox, QFrame,
-                             QDialog, QTabWidget, QMessageBox)
+                             QDialog, QTabWidget, QMessageBox, QTableWidget,
+                             QTableWidgetItem, QHeaderView, QAbstractItemView)
 from PyQt5.QtCore import Qt, pyqtSignal, QTimer
 from PyQt5.QtGui import QFont, QColor
 import logging
@@ -136,6 +137,13 @@ class ProductivityDashboardWidget(QWidget):
 class DatabaseMonitoringWidget(QWidget):
     """Database monitoring widget consolidated from database_monitoring_ui.py"""
 
+    # (header, key) for the top queries table; times are shown in milliseconds
+    QUERY_COLUMNS = [
+        ("Query", 'query'), ("Type", 'query_type'), ("Count", 'count'),
+        ("Total ms", 'total_time'), ("p50 ms", 'p50'), ("p95 ms", 'p95'),
+        ("p99 ms", 'p99'), ("Slow", 'slow_count')
+    ]
+
     def __init__(self, db_integration=None, parent=None):
         super().__init__(parent)
         self.db_integration = db_integration
@@ -177,6 +185,63 @@ class DatabaseMonitoringWidget(QWidget):
 
         layout.addWidget(controls_group)
 
+        # Top queries by total time, with the plan of the last slow run
+        queries_group = QGroupBox("Top Queries")
+        queries_layout = QVBoxLayout(queries_group)
+
+        self.query_table = QTableWidget(0, len(self.QUERY_COLUMNS))
+        self.query_table.setHorizontalHeaderLabels([title for title, _ in self.QUERY_COLUMNS])
+        self.query_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.query_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.query_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.query_table.itemSelectionChanged.connect(self.show_query_plan)
+        queries_layout.addWidget(self.query_table)
+
+        self.query_plan = QTextEdit()
+        self.query_plan.setReadOnly(True)
+        self.query_plan.setMaximumHeight(100)
+        self.query_plan.setPlaceholderText("Select a query to see its last slow query plan")
+        queries_layout.addWidget(self.query_plan)
+
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self.refresh_query_stats)
+        queries_layout.addWidget(refresh_btn, alignment=Qt.AlignRight)
+
+        layout.addWidget(queries_group)
+        self.query_stats = []
+        self.refresh_query_stats()
+
+    def refresh_query_stats(self):
+        """Reload the top offenders from the database manager"""
+        if not self.db_integration or not hasattr(self.db_integration, 'get_query_stats'):
+            return
+        try:
+            self.query_stats = self.db_integration.get_query_stats(limit=20)
+        except Exception as e:
+            logging.error(f"Failed to load query statistics: {e}")
+            return
+
+        self.query_table.setRowCount(len(self.query_stats))
+        for row, stats in enumerate(self.query_stats):
+            for column, (_, key) in enumerate(self.QUERY_COLUMNS):
+                value = stats.get(key)
+                if key in ('total_time', 'p50', 'p95', 'p99'):
+                    value = f"{value * 1000:.1f}"
+                item = QTableWidgetItem(str(value))
+                if key == 'query':
+                    item.setToolTip(stats.get('query', ''))
+                self.query_table.setItem(row, column, item)
+        self.query_plan.clear()
+
+    def show_query_plan(self):
+        """Show the plan captured for the selected query's last slow run"""
+        rows = self.query_table.selectionModel().selectedRows()
+        if not rows or rows[0].row() >= len(self.query_stats):
+            self.query_plan.clear()
+            return
+        stats = self.query_stats[rows[0].row()]
+        self.query_plan.setPlainText(stats.get('last_plan') or "No slow run recorded")
+
     def create_backup(self):
         """Create database backup"""
         if self.db_integration:
@@ -27,12 +27,22 @@ from PyQt5.QtGui import QFont, QTextCharFormat, QColor, QSyntaxHighlighter
 
 # Import workflow backend
 try:
-    from ..workflow.automated_novel_workflow import AutomatedNovelWorkflowThread
+    from ..workflow.automated_novel_workflow import (
+        AutomatedNovelWorkflowThread, create_resumed_workflow_thread
+    )
     WORKFLOW_AVAILABLE = True
 except ImportError:
     WORKFLOW_AVAILABLE = False
     print("Warning: Automated novel workflow backend not available")
 
+# Import database monitoring
+try:
+    from ..database.database_manager import get_db_manager
+    from .analytics_ui import DatabaseMonitoringDialog
+    DATABASE_MONITORING_AVAILABLE = True
+except ImportError:
+    DATABASE_MONITORING_AVAILABLE = False
+
 
 class LogHighlighter(QSyntaxHighlighter):
     """Syntax highlighter for log files with color coding"""
@@ -81,6 +91,9 @@ class AutomatedNovelGUI(QMainWindow):
     pause_signal = pyqtSignal()
     resume_signal = pyqtSignal()
     
+    # Project files the workflow updates through its state journal
+    JOURNALED_FILES = ("config.txt",)
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         
@@ -148,6 +161,10 @@ class AutomatedNovelGUI(QMainWindow):
         export_action.triggered.connect(self.export_novel)
         file_menu.addAction(export_action)
         
+        resume_action = QAction("Resume Novel...", self)
+        resume_action.triggered.connect(self.resume_novel_generation)
+        file_menu.addAction(resume_action)
+        
         save_state_action = QAction("Save State", self)
         save_state_action.triggered.connect(self.save_state)
         file_menu.addAction(save_state_action)
@@ -165,6 +182,11 @@ class AutomatedNovelGUI(QMainWindow):
         toggle_theme_action.triggered.connect(self.toggle_theme)
         view_menu.addAction(toggle_theme_action)
         
+        db_monitor_action = QAction("Database Monitor...", self)
+        db_monitor_action.triggered.connect(self.show_database_monitor)
+        db_monitor_action.setEnabled(DATABASE_MONITORING_AVAILABLE)
+        view_menu.addAction(db_monitor_action)
+        
         # Help menu
         help_menu = menubar.addMenu("Help")
         
@@ -508,7 +530,13 @@ class AutomatedNovelGUI(QMainWindow):
         # Load file content
         if self.current_project_dir:
             filepath = os.path.join(self.current_project_dir, filename)
-            if os.path.exists(filepath):
+            journaled = None
+            if filename in self.JOURNALED_FILES and self.workflow_thread and self.workflow_thread.isRunning():
+                # A running workflow writes these at step boundaries; read its latest copy
+                journaled = self.workflow_thread.journal.read(filename)
+            if journaled is not None:
+                text_edit.setPlainText(journaled)
+            elif os.path.exists(filepath):
                 try:
                     with open(filepath, 'r', encoding='utf-8') as f:
                         content = f.read()
@@ -708,31 +736,7 @@ class AutomatedNovelGUI(QMainWindow):
                 tone,
                 target
             )
-            
-            # Connect signals
-            self.workflow_thread.log_update.connect(self.on_log_update)
-            self.workflow_thread.new_synopsis.connect(self.on_new_synopsis)
-            self.workflow_thread.new_outline.connect(self.on_new_outline)
-            self.workflow_thread.new_characters.connect(self.on_new_characters)
-            self.workflow_thread.new_world.connect(self.on_new_world)
-            self.workflow_thread.new_draft.connect(self.on_new_draft)
-            self.workflow_thread.progress_updated.connect(self.on_progress_updated)
-            self.workflow_thread.status_updated.connect(self.on_status_updated)
-            self.workflow_thread.error_signal.connect(self.on_error)
-            self.workflow_thread.waiting_approval.connect(self.on_waiting_approval)
-            self.workflow_thread.workflow_completed.connect(self.on_workflow_completed)
-            
-            # Connect GUI signals to workflow
-            self.approve_signal.connect(self.workflow_thread.approve_current_step)
-            self.adjust_signal.connect(self.workflow_thread.adjust_current_step)
-            self.pause_signal.connect(self.workflow_thread.pause)
-            self.resume_signal.connect(self.workflow_thread.resume)
-            
-            # Start workflow
-            self.workflow_thread.start()
-            self.stop_button.setEnabled(True)
-            self.pause_button.setEnabled(True)
-            
+            self.start_workflow_thread()
             self.add_notification("Workflow started - generating synopsis...")
         else:
             # Show demo message if workflow not available
@@ -742,6 +746,61 @@ class AutomatedNovelGUI(QMainWindow):
                 f"Novel generation started!\n\nIdea: {idea}\nTone: {tone}\nTarget: {target:,} words\n\nProject: {project_name}\n\n(Full workflow backend coming soon)"
             )
     
+    def resume_novel_generation(self):
+        """Resume a previous run from its last checkpoint"""
+        if not WORKFLOW_AVAILABLE:
+            QMessageBox.warning(self, "Unavailable", "Workflow backend not available.")
+            return
+        
+        project_dir = QFileDialog.getExistingDirectory(
+            self, "Select Novel Project", os.path.join(os.getcwd(), "projects")
+        )
+        if not project_dir:
+            return
+        
+        workflow_thread = create_resumed_workflow_thread(project_dir)
+        if workflow_thread is None:
+            QMessageBox.warning(self, "No Checkpoint", "No resumable checkpoint found in this project.")
+            return
+        
+        self.current_project_dir = project_dir
+        self.workflow_thread = workflow_thread
+        
+        self.central_tabs.clear()
+        self.central_tabs.addTab(self.writing_tab, "Writing")
+        
+        self.start_workflow_thread()
+        self.add_notification(
+            f"Resuming at Chapter {workflow_thread.current_chapter}, "
+            f"Section {workflow_thread.current_section}"
+        )
+    
+    def start_workflow_thread(self):
+        """Connect workflow thread signals and start it"""
+        # Connect signals
+        self.workflow_thread.log_update.connect(self.on_log_update)
+        self.workflow_thread.new_synopsis.connect(self.on_new_synopsis)
+        self.workflow_thread.new_outline.connect(self.on_new_outline)
+        self.workflow_thread.new_characters.connect(self.on_new_characters)
+        self.workflow_thread.new_world.connect(self.on_new_world)
+        self.workflow_thread.new_draft.connect(self.on_new_draft)
+        self.workflow_thread.progress_updated.connect(self.on_progress_updated)
+        self.workflow_thread.status_updated.connect(self.on_status_updated)
+        self.workflow_thread.error_signal.connect(self.on_error)
+        self.workflow_thread.waiting_approval.connect(self.on_waiting_approval)
+        self.workflow_thread.workflow_completed.connect(self.on_workflow_completed)
+        
+        # Connect GUI signals to workflow
+        self.approve_signal.connect(self.workflow_thread.approve_current_step)
+        self.adjust_signal.connect(self.workflow_thread.adjust_current_step)
+        self.pause_signal.connect(self.workflow_thread.pause)
+        self.resume_signal.connect(self.workflow_thread.resume)
+        
+        # Start workflow
+        self.workflow_thread.start()
+        self.stop_button.setEnabled(True)
+        self.pause_button.setEnabled(True)
+    
     def initialize_project_files(self, idea, tone, target):
         """Initialize project files as specified"""
         if not self.current_project_dir:
@@ -1024,6 +1083,18 @@ ToolWeights: Sassbook:0.5,DeepL:0.5,Thesaurus:0.5,Grammarly:0.5
         else:
             self.apply_light_theme()
     
+    def show_database_monitor(self):
+        """Show database status and the slowest queries"""
+        if not DATABASE_MONITORING_AVAILABLE:
+            QMessageBox.warning(self, "Unavailable", "Database monitoring not available.")
+            return
+        try:
+            dialog = DatabaseMonitoringDialog(get_db_manager(), self)
+        except Exception as e:
+            QMessageBox.critical(self, "Database Error", f"Could not open the database: {str(e)}")
+            return
+        dialog.exec_()
+        
     def show_user_guide(self):
         """Show user guide"""
         guide_text = """
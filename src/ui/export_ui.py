@@ -16,6 +16,9 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
 from PyQt5.QtGui import QFont, QColor, QPalette
 
+from ..export_formats.engine import ExportSnapshot
+from ..export_formats.writers import create_export_engine, get_supported_formats
+
 logger = logging.getLogger(__name__)
 
 class ExportProgressWidget(QWidget):
@@ -69,6 +72,13 @@ class ExportProgressWidget(QWidget):
 
         layout.addWidget(details_group)
 
+        # Per-format progress, filled in when an export starts
+        self.formats_group = QGroupBox("Formats")
+        self.formats_layout = QFormLayout(self.formats_group)
+        self.format_progress_bars = {}
+        self.formats_group.setVisible(False)
+        layout.addWidget(self.formats_group)
+
         # Export log
         log_group = QGroupBox("Export Log")
         log_layout = QVBoxLayout(log_group)
@@ -85,14 +95,15 @@ class ExportProgressWidget(QWidget):
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_time_display)
 
-    def start_export(self, total_steps: int = 100):
-        """Start export progress tracking."""
+    def start_export(self, total_steps: int = 100, formats: Optional[List[str]] = None):
+        """Start export progress tracking, with a progress bar per format if given."""
         self.overall_progress.setValue(0)
         self.overall_progress.setRange(0, total_steps)
         self.current_progress.setValue(0)
         self.overall_status_label.setText("Export in progress...")
         self.export_log.clear()
         self.add_log_entry("Export started")
+        self.set_formats(formats or [])
 
         # Start timing
         import time
@@ -131,6 +142,36 @@ class ExportProgressWidget(QWidget):
         self.current_progress.setValue(prog_val)
         self.add_log_entry(f"Starting: {op_text}")
 
+    def set_formats(self, formats: List[str]):
+        """Create one progress bar per export format."""
+        while self.formats_layout.rowCount():
+            self.formats_layout.removeRow(0)
+        self.format_progress_bars = {}
+
+        for format_name in formats:
+            bar = QProgressBar()
+            bar.setRange(0, 100)
+            bar.setValue(0)
+            self.formats_layout.addRow(f"{format_name.upper()}:", bar)
+            self.format_progress_bars[format_name] = bar
+
+        self.formats_group.setVisible(bool(formats))
+
+    def update_format_progress(self, format_name: str, progress: int, message: str = ""):
+        """Update one format's progress; overall progress is the sum over formats."""
+        bar = self.format_progress_bars.get(format_name)
+        if bar is not None:
+            bar.setValue(progress)
+            self.overall_progress.setValue(
+                sum(format_bar.value() for format_bar in self.format_progress_bars.values())
+            )
+
+        if message:
+            self.current_operation_label.setText(message)
+        self.current_progress.setValue(progress)
+        if progress in (0, 100) and message:
+            self.add_log_entry(message)
+
     def update_current_progress(self, value: int):
         """Update current operation progress."""
         self.current_progress.setValue(value)
@@ -490,6 +531,29 @@ class ExportValidationDisplay(QWidget):
 
         self.details_text.setText("\n".join(details))
 
+class ExportWorker(QThread):
+    """Runs an export engine off the GUI thread, relaying per-format progress."""
+
+    format_progress = pyqtSignal(str, int, str)  # format, percent, message
+    export_completed = pyqtSignal(list)  # one result dict per format
+    export_failed = pyqtSignal(str)
+
+    def __init__(self, engine, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+
+    def run(self):
+        try:
+            results = self.engine.run(self.format_progress.emit)
+            self.export_completed.emit(results)
+        except Exception as e:
+            logger.error(f"Export failed: {e}")
+            self.export_failed.emit(str(e))
+
+    def cancel(self):
+        """Stop running format writers at their next progress report."""
+        self.engine.cancel()
+
 class ExportManagerWidget(QWidget):
     """Main export manager widget combining all export functionality."""
 
@@ -497,10 +561,16 @@ class ExportManagerWidget(QWidget):
     export_started = pyqtSignal()
     export_finished = pyqtSignal(bool, str)  # success, message
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, project_dir: Optional[str] = None):
         super().__init__(parent)
+        self.project_dir = project_dir
+        self.export_worker = None
         self.setup_ui()
 
+    def set_project_dir(self, project_dir: str):
+        """Set the project whose manuscript is exported."""
+        self.project_dir = project_dir
+
     def setup_ui(self):
         """Set up the main export manager UI."""
         layout = QVBoxLayout(self)
@@ -531,6 +601,7 @@ class ExportManagerWidget(QWidget):
 
         self.cancel_button = QPushButton("Cancel")
         self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_export)
         button_layout.addWidget(self.cancel_button)
 
         button_layout.addStretch()
@@ -557,19 +628,77 @@ class ExportManagerWidget(QWidget):
                               "Please select an output directory.")
             return
 
+        if not self.project_dir:
+            QMessageBox.warning(self, "No Project",
+                              "Please open a project to export.")
+            return
+
+        supported = get_supported_formats()
+        unsupported = [name for name in formats if name not in supported]
+        formats = [name for name in formats if name in supported]
+        if not formats:
+            QMessageBox.warning(self, "Unsupported Formats",
+                              f"Export is not available for: {', '.join(unsupported)}")
+            return
+
+        # Sources are read once here and shared by all format writers
+        try:
+            snapshot = ExportSnapshot.load(self.project_dir)
+            engine = create_export_engine(
+                snapshot, formats, output_settings['directory'],
+                output_settings['filename_prefix'], self.format_selector.get_format_options()
+            )
+        except Exception as e:
+            QMessageBox.critical(self, "Export Error", f"Could not prepare export: {str(e)}")
+            return
+
         # Switch to progress tab
         self.tab_widget.setCurrentWidget(self.progress_widget)
 
         # Start progress tracking
-        self.progress_widget.start_export(len(formats) * 100)
+        self.progress_widget.start_export(len(formats) * 100, formats)
+        for name in unsupported:
+            self.progress_widget.add_log_entry(f"Skipping {name}: format not available")
 
         # Enable/disable buttons
         self.start_export_button.setEnabled(False)
         self.cancel_button.setEnabled(True)
 
+        self.export_worker = ExportWorker(engine, self)
+        self.export_worker.format_progress.connect(self.progress_widget.update_format_progress)
+        self.export_worker.export_completed.connect(self.on_export_completed)
+        self.export_worker.export_failed.connect(lambda message: self.finish_export(False, message))
+        self.export_worker.start()
+
         # Emit signal
         self.export_started.emit()
 
+    def cancel_export(self):
+        """Cancel the running export."""
+        if self.export_worker and self.export_worker.isRunning():
+            self.export_worker.cancel()
+            self.cancel_button.setEnabled(False)
+            self.progress_widget.add_log_entry("Cancelling export...")
+
+    def on_export_completed(self, results: List[Dict[str, Any]]):
+        """Summarise the per-format results of an export run."""
+        for result in results:
+            if result['success']:
+                self.progress_widget.add_log_entry(
+                    f"{result['format']}: {result['file_path']} ({result['seconds']:.1f}s)"
+                )
+            elif not result['cancelled']:
+                self.progress_widget.add_log_entry(f"{result['format']} failed: {result['error']}")
+
+        if any(result['cancelled'] for result in results):
+            self.finish_export(False, "Export cancelled")
+        else:
+            failed = [result['format'] for result in results if not result['success']]
+            if failed:
+                self.finish_export(False, f"Failed formats: {', '.join(failed)}")
+            else:
+                self.finish_export(True, f"Exported {len(results)} format(s)")
+
     def update_export_progress(self, operation: str, current_progress: int, overall_progress: int):
         """Update export progress."""
         self.progress_widget.update_current_operation(operation, current_progress)
@@ -618,8 +747,9 @@ class ExportManagerWidget(QWidget):
 
         # Validate files
         try:
+            # A directory scan only needs the quick structural check
             from src.export_formats.validator import validate_export_files
-            results = validate_export_files(export_files)
+            results = validate_export_files(export_files, quick=True)
 
             # Display results
             self.validation_widget.display_validation_results(results)
@@ -453,9 +453,9 @@ except ImportError:
     ConfigManager = None
 
 try:
-    from ..database.database_manager import DatabaseManager
+    from ..database.database_manager import get_db_manager
 except ImportError:
-    DatabaseManager = None
+    get_db_manager = None
 
 try:
     from ..core.performance_monitor import PerformanceMonitor
@@ -503,7 +503,7 @@ class MainWindow(QMainWindow):
 
         # Initialize components if available
         self.config = ConfigManager if ConfigManager else None
-        self.db_manager = DatabaseManager() if DatabaseManager else None
+        self.db_manager = get_db_manager() if get_db_manager else None
 
         # Initialize design system and UI components
         self.design_system = DesignSystem()
@@ -525,7 +525,7 @@ class MainWindow(QMainWindow):
         # Initialize analytics system for dashboard
         try:
             from ..analytics.analytics_system import WritingAnalyticsDashboard, AnalyticsWidget
-            self.analytics_manager = WritingAnalyticsDashboard()
+            self.analytics_manager = WritingAnalyticsDashboard(storage=self.db_manager)
             self.analytics_widget = AnalyticsWidget(self.analytics_manager)
             print("✓ Analytics system initialized")
         except ImportError as e:
@@ -257,6 +257,7 @@ class FANWSMainWindow(QMainWindow):
         # Populate project list after UI is created
         projects = get_project_list()
         self.project_selector.addItems(projects)
+        self.project_selector.currentTextChanged.connect(self.on_project_selected)
 
         # Also refresh the project selector to ensure consistency
         if hasattr(self.ui, '_refresh_project_selector'):
@@ -265,6 +266,15 @@ class FANWSMainWindow(QMainWindow):
         # Always start with Project section regardless of available projects
         self.ui._show_project_content()
 
+    def on_project_selected(self, project_name: str):
+        """Make the selected project current and point project-bound widgets at it."""
+        if project_name not in get_project_list():
+            return
+
+        self.current_project = project_name
+        if getattr(self, 'export_manager', None) is not None:
+            self.export_manager.set_project_dir(self.ui.get_project_dir())
+
     def setup_signals(self):
         """Connect signals to slots - to be implemented by subclasses"""
         pass
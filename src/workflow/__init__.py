@@ -5,8 +5,18 @@ Handles workflow coordination, version control, and step execution
 
 from .coordinator import WorkflowCoordinator
 from .manager import WorkflowManager
+from .novel_checkpoint import NovelCheckpoint
+from .story_store import StoryStore
+from .recovery_store import RecoveryStore
+from .state_journal import StateJournal, get_state_journal, release_state_journal
 
 __all__ = [
     'WorkflowCoordinator',
-    'WorkflowManager'
+    'WorkflowManager',
+    'NovelCheckpoint',
+    'StoryStore',
+    'RecoveryStore',
+    'StateJournal',
+    'get_state_journal',
+    'release_state_journal'
 ]
@@ -13,11 +13,17 @@ import os
 import json
 import time
 import random
+import threading
+from contextlib import nullcontext
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 
 from PyQt5.QtCore import QThread, pyqtSignal
 
+from .novel_checkpoint import NovelCheckpoint
+from .story_store import StoryStore
+from .state_journal import get_state_journal, release_state_journal
+
 # Import API manager for AI integration
 try:
     from ..system.api_manager import get_api_manager
@@ -48,7 +54,8 @@ class AutomatedNovelWorkflowThread(QThread):
     
     def __init__(self, project_dir: str, idea: str, tone: str, target_words: int, 
                  ai_provider: str = "openai", ollama_model: str = "llama2", 
-                 ollama_url: str = "http://localhost:11434"):
+                 ollama_url: str = "http://localhost:11434", auto_approve: bool = False,
+                 request_budget: Optional[threading.Semaphore] = None):
         super().__init__()
         
         self.project_dir = project_dir
@@ -60,6 +67,8 @@ class AutomatedNovelWorkflowThread(QThread):
         self.ai_provider = ai_provider  # "openai" or "ollama"
         self.ollama_model = ollama_model
         self.ollama_url = ollama_url
+        # As requested, before any fallback; checkpoints resume with these
+        self.requested_provider = (ai_provider, ollama_model, ollama_url)
         
         # Workflow state
         self.current_step = "initialization"
@@ -67,6 +76,11 @@ class AutomatedNovelWorkflowThread(QThread):
         self.should_stop = False
         self.approval_received = False
         self.adjustment_feedback = None
+        self.auto_approve = auto_approve  # Headless runs approve every step
+        
+        # Optional semaphore shared between threads to cap in-flight AI requests
+        self.request_budget = request_budget
+        self.token_usage = {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
         
         # Novel structure
         self.synopsis = ""
@@ -79,6 +93,13 @@ class AutomatedNovelWorkflowThread(QThread):
         self.current_section = 1
         self.sections_per_chapter = 5  # Default
         
+        # Crash-safe progress checkpoint
+        self.checkpoint = NovelCheckpoint(project_dir)
+        self.story_store = StoryStore(project_dir)
+        self.resuming = False
+        self._planning_hash = None
+        self._restored_draft = None  # ((chapter, section), content)
+        
         # Initialize API manager for AI integration
         if API_MANAGER_AVAILABLE:
             self.api_manager = get_api_manager()
@@ -107,19 +128,27 @@ class AutomatedNovelWorkflowThread(QThread):
             self.log("Automated novel writing workflow started")
             self.status_updated.emit("Initializing...")
             
-            # Step 2: Synopsis Generation
-            if not self.should_stop:
-                self.generate_synopsis()
-            
-            # Step 4: Structural Planning
-            if not self.should_stop and self.approval_received:
-                self.generate_outline()
-                self.generate_characters()
-                self.generate_world()
-            
-            # Step 5: Timeline Synchronization
-            if not self.should_stop and self.approval_received:
-                self.generate_timeline()
+            if self.resuming:
+                # Planning artifacts were restored from the checkpoint
+                self.log(f"Resuming at Chapter {self.current_chapter}, Section {self.current_section}")
+                self.approval_received = True
+            else:
+                # Step 2: Synopsis Generation
+                if not self.should_stop:
+                    self.generate_synopsis()
+                
+                # Step 4: Structural Planning
+                if not self.should_stop and self.approval_received:
+                    self.generate_outline()
+                    self.generate_characters()
+                    self.generate_world()
+                
+                # Step 5: Timeline Synchronization
+                if not self.should_stop and self.approval_received:
+                    self.generate_timeline()
+                
+                # Planning is done; bring config.txt up to date on disk
+                self.journal.materialize("config.txt")
             
             # Step 6-9: Iterative Writing Loop
             if not self.should_stop and self.approval_received:
@@ -134,6 +163,8 @@ class AutomatedNovelWorkflowThread(QThread):
         except Exception as e:
             self.error_signal.emit(f"Workflow error: {str(e)}")
             self.log(f"ERROR: {str(e)}")
+        finally:
+            release_state_journal(self.project_dir)
     
     def generate_synopsis(self):
         """Step 2: Generate synopsis using AI"""
@@ -153,12 +184,7 @@ class AutomatedNovelWorkflowThread(QThread):
         
         # Emit signal and wait for approval
         self.new_synopsis.emit(synopsis)
-        self.waiting_approval.emit("synopsis")
-        self.approval_received = False
-        
-        # Wait for approval
-        while not self.approval_received and not self.should_stop:
-            time.sleep(0.1)
+        self.wait_for_approval("synopsis")
         
         if self.adjustment_feedback:
             # Refine synopsis with feedback
@@ -255,11 +281,7 @@ Please revise the synopsis to address the feedback while maintaining coherence a
         
         # Re-emit for review
         self.new_synopsis.emit(self.synopsis)
-        self.waiting_approval.emit("synopsis")
-        self.approval_received = False
-        
-        while not self.approval_received and not self.should_stop:
-            time.sleep(0.1)
+        self.wait_for_approval("synopsis")
     
     def generate_outline(self):
         """Step 4: Generate outline using AI"""
@@ -279,11 +301,7 @@ Please revise the synopsis to address the feedback while maintaining coherence a
         
         # Emit and wait for approval
         self.new_outline.emit(outline)
-        self.waiting_approval.emit("outline")
-        self.approval_received = False
-        
-        while not self.approval_received and not self.should_stop:
-            time.sleep(0.1)
+        self.wait_for_approval("outline")
         
         # Update config with chapter count
         self.update_config("TotalChapters", self.total_chapters)
@@ -357,11 +375,7 @@ Format each chapter clearly and maintain narrative flow."""
         
         # Emit and wait for approval
         self.new_characters.emit(characters_json)
-        self.waiting_approval.emit("characters")
-        self.approval_received = False
-        
-        while not self.approval_received and not self.should_stop:
-            time.sleep(0.1)
+        self.wait_for_approval("characters")
     
     def generate_characters_with_ai(self) -> str:
         """Generate character profiles using AI"""
@@ -465,11 +479,7 @@ Return as a JSON array of character objects."""
         
         # Emit and wait for approval
         self.new_world.emit(world_json)
-        self.waiting_approval.emit("world")
-        self.approval_received = False
-        
-        while not self.approval_received and not self.should_stop:
-            time.sleep(0.1)
+        self.wait_for_approval("world")
     
     def generate_world_with_ai(self) -> str:
         """Generate world-building using AI"""
@@ -551,13 +561,17 @@ Return as a JSON object with detailed descriptions."""
         self.current_step = "writing"
         self.log("Starting writing loop...")
         
-        for chapter in range(1, self.total_chapters + 1):
+        start_chapter = self.current_chapter
+        start_section = self.current_section
+        
+        for chapter in range(start_chapter, self.total_chapters + 1):
             if self.should_stop:
                 break
             
             self.current_chapter = chapter
+            first_section = start_section if chapter == start_chapter else 1
             
-            for section in range(1, self.sections_per_chapter + 1):
+            for section in range(first_section, self.sections_per_chapter + 1):
                 if self.should_stop:
                     break
                 
@@ -584,13 +598,18 @@ Return as a JSON object with detailed descriptions."""
         self.status_updated.emit(f"Writing Chapter {chapter}, Section {section}...")
         self.log(f"Generating Chapter {chapter}, Section {section}...")
         
-        # Generate section using AI or fallback
-        if self.api_manager:
+        # Reuse a draft that was awaiting approval when the last run stopped
+        content = self.pop_in_flight_draft(chapter, section)
+        if content is not None:
+            self.log(f"Restored in-flight draft for Chapter {chapter}, Section {section}")
+        elif self.api_manager:
             content = self.generate_section_with_ai(chapter, section)
         else:
             self.log("API manager not available - using simulation")
             content = self.simulate_section_generation(chapter, section)
         
+        self.save_checkpoint(chapter, section, in_flight_draft=content)
+        
         # Save draft
         draft_dir = os.path.join(self.project_dir, "drafts", f"chapter{chapter}")
         os.makedirs(draft_dir, exist_ok=True)
@@ -601,16 +620,12 @@ Return as a JSON object with detailed descriptions."""
         
         # Emit for approval
         self.new_draft.emit(chapter, section, content)
-        self.waiting_approval.emit(f"section_{chapter}_{section}")
-        self.approval_received = False
-        
-        # Wait for approval
-        while not self.approval_received and not self.should_stop:
-            time.sleep(0.1)
+        self.wait_for_approval(f"section_{chapter}_{section}")
         
         # If approved, append to story
         if self.approval_received:
             self.append_to_story(f"\n\n=== Chapter {chapter}, Section {section} ===\n\n{content}")
+            self.save_checkpoint(*self.next_cursor(chapter, section))
             self.log(f"Chapter {chapter}, Section {section} approved and added to story")
         
         # Handle adjustment if needed
@@ -621,10 +636,7 @@ Return as a JSON object with detailed descriptions."""
             self.adjustment_feedback = None
             # Re-emit for review
             self.new_draft.emit(chapter, section, content)
-            self.waiting_approval.emit(f"section_{chapter}_{section}")
-            self.approval_received = False
-            while not self.approval_received and not self.should_stop:
-                time.sleep(0.1)
+            self.wait_for_approval(f"section_{chapter}_{section}")
     
     def generate_section_with_ai(self, chapter: int, section: int, feedback: str = None) -> str:
         """Generate section content using AI"""
@@ -686,15 +698,9 @@ Write only the prose content, no meta-commentary."""
     def get_story_context(self, current_chapter: int, current_section: int) -> str:
         """Get context from previous story sections"""
         try:
-            story_path = os.path.join(self.project_dir, "story.txt")
-            if os.path.exists(story_path):
-                with open(story_path, 'r', encoding='utf-8') as f:
-                    story = f.read()
-                    # Get last 500 words for context
-                    words = story.split()
-                    if len(words) > 500:
-                        return " ".join(words[-500:])
-                    return story
+            if os.path.exists(self.story_store.story_path):
+                # Get last 500 words for context without reading the whole story
+                return self.story_store.read_tail_words(500)
         except Exception as e:
             self.log(f"Error reading story context: {str(e)}")
         
@@ -755,6 +761,7 @@ timeline. Each section builds upon the previous one, creating a cohesive whole.
         # Update final config
         self.update_config("Progress", "100%")
         self.update_config("Status", "Complete")
+        self.checkpoint.clear()
         
         self.log("Novel generation complete!")
         self.status_updated.emit("Complete!")
@@ -781,36 +788,123 @@ timeline. Each section builds upon the previous one, creating a cohesive whole.
             f.write(content)
     
     def append_to_story(self, content: str):
-        """Append content to story.txt"""
-        story_path = os.path.join(self.project_dir, "story.txt")
-        with open(story_path, 'a', encoding='utf-8') as f:
-            f.write(content)
+        """Append content to story.txt, indexing any section headers"""
+        self.story_store.append(content)
+    
+    @property
+    def journal(self):
+        """The project's state journal; registered only while in use and released by run()"""
+        return get_state_journal(self.project_dir)
     
     def update_config(self, key: str, value: Any):
-        """Update a value in config.txt"""
-        config_path = os.path.join(self.project_dir, "config.txt")
+        """Update a value in config.txt through the project's state journal"""
+        # Written to disk at step boundaries; the GUI reads through the journal
+        self.journal.set("config.txt", key, value)
+    
+    # ============ Checkpoint Methods ============
+    
+    def next_cursor(self, chapter: int, section: int):
+        """Get the chapter/section that follows the given one"""
+        if section < self.sections_per_chapter:
+            return chapter, section + 1
+        return chapter + 1, 1
+    
+    def save_checkpoint(self, chapter: int, section: int, in_flight_draft: Optional[str] = None):
+        """Atomically record the writing cursor and committed story length"""
+        record = {
+            'idea': self.idea,
+            'tone': self.tone,
+            'target_words': self.target_words,
+            'ai_provider': self.requested_provider[0],
+            'ollama_model': self.requested_provider[1],
+            'ollama_url': self.requested_provider[2],
+            'total_chapters': self.total_chapters,
+            'sections_per_chapter': self.sections_per_chapter,
+            'chapter': chapter,
+            'section': section,
+            'story_offset': self.checkpoint.story_offset(),
+            'in_flight_draft': in_flight_draft,
+            'planning_hash': self.planning_hash,
+        }
+        if not self.checkpoint.save(record):
+            self.log("Warning: Failed to write checkpoint")
+    
+    @property
+    def planning_hash(self) -> str:
+        """Hash of the planning artifacts, computed once per run"""
+        if self._planning_hash is None:
+            self._planning_hash = self.checkpoint.hash_planning_artifacts()
+        return self._planning_hash
+    
+    def pop_in_flight_draft(self, chapter: int, section: int) -> Optional[str]:
+        """Take the restored in-flight draft if it belongs to this section"""
+        pending = self._restored_draft
+        if pending and pending[0] == (chapter, section):
+            self._restored_draft = None
+            return pending[1]
+        return None
+    
+    def resume_from_checkpoint(self) -> bool:
+        """
+        Restore state from the project checkpoint so run() continues writing.
         
-        # Read current config
-        if os.path.exists(config_path):
-            with open(config_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-        else:
-            lines = []
-        
-        # Update or add key
-        found = False
-        for i, line in enumerate(lines):
-            if line.startswith(f"{key}:"):
-                lines[i] = f"{key}: {value}\n"
-                found = True
-                break
+        story.txt is truncated to the last committed offset, discarding any
+        partially appended section. Returns False if there is nothing to resume.
+        """
+        record = self.checkpoint.load()
+        if not record:
+            self.log("No checkpoint found - cannot resume")
+            return False
+        
+        self.total_chapters = record.get('total_chapters', self.total_chapters)
+        self.sections_per_chapter = record.get('sections_per_chapter', self.sections_per_chapter)
+        self.current_chapter = record['chapter']
+        self.current_section = record['section']
+        
+        # Reload planning artifacts from disk
+        self.synopsis = self.read_project_file("synopsis.txt")
+        self.outline = self.read_project_file("outline.txt")
+        for filename, attr, default in (("characters.txt", 'characters', []),
+                                        ("world.txt", 'world', {}),
+                                        ("timeline.txt", 'timeline', {})):
+            try:
+                setattr(self, attr, json.loads(self.read_project_file(filename) or "null") or default)
+            except json.JSONDecodeError:
+                setattr(self, attr, default)
+        
+        if self.planning_hash != record.get('planning_hash'):
+            self.log("Warning: Planning files changed since checkpoint - continuing with current versions")
+        
+        removed = self.checkpoint.truncate_story(record.get('story_offset', 0))
+        if removed:
+            self.log(f"Discarded {removed} uncommitted bytes from story.txt")
+        
+        if record.get('in_flight_draft'):
+            self._restored_draft = ((self.current_chapter, self.current_section),
+                                    record['in_flight_draft'])
+        
+        self.resuming = True
+        return True
+    
+    def read_project_file(self, filename: str) -> str:
+        """Read a file from the project directory, returning empty string if missing"""
+        filepath = os.path.join(self.project_dir, filename)
+        if not os.path.exists(filepath):
+            return ""
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return f.read()
+    
+    def wait_for_approval(self, step_name: str):
+        """Signal that a step needs review and block until approved or stopped"""
+        self.waiting_approval.emit(step_name)
         
-        if not found:
-            lines.append(f"{key}: {value}\n")
+        if self.auto_approve:
+            self.approval_received = True
+            return
         
-        # Write back
-        with open(config_path, 'w', encoding='utf-8') as f:
-            f.writelines(lines)
+        self.approval_received = False
+        while not self.approval_received and not self.should_stop:
+            time.sleep(0.1)
     
     def approve_current_step(self):
         """Approve current step"""
@@ -853,34 +947,42 @@ timeline. Each section builds upon the previous one, creating a cohesive whole.
             return {'choices': []}
         
         try:
-            if self.ai_provider == "ollama":
-                self.log(f"Calling Ollama ({self.ollama_model})...")
-                response = self.api_manager.generate_text_ollama(
-                    prompt=prompt,
-                    max_tokens=max_tokens,
-                    model=self.ollama_model,
-                    temperature=temperature,
-                    base_url=self.ollama_url
-                )
-                return response
+            with self.request_budget or nullcontext():
+                if self.ai_provider == "ollama":
+                    self.log(f"Calling Ollama ({self.ollama_model})...")
+                    response = self.api_manager.generate_text_ollama(
+                        prompt=prompt,
+                        max_tokens=max_tokens,
+                        model=self.ollama_model,
+                        temperature=temperature,
+                        base_url=self.ollama_url
+                    )
+                    
+                elif self.ai_provider == "openai":
+                    self.log("Calling OpenAI...")
+                    response = self.api_manager.make_request('openai', '/chat/completions', 'POST', {
+                        'model': 'gpt-3.5-turbo',
+                        'messages': [{'role': 'user', 'content': prompt}],
+                        'max_tokens': max_tokens,
+                        'temperature': temperature
+                    })
                 
-            elif self.ai_provider == "openai":
-                self.log("Calling OpenAI...")
-                # Use OpenAI API
-                response = self.call_ai_api(
-                    prompt=prompt,
-                    max_tokens=max_tokens,
-                    temperature=temperature
-                )
-                return response
+                else:
+                    # Unknown provider
+                    return {'choices': []}
             
-            else:
-                # Unknown provider
-                return {'choices': []}
+            self.record_token_usage(response)
+            return response
                 
         except Exception as e:
             self.log(f"Error calling AI API: {str(e)}")
             return {'choices': []}
+    
+    def record_token_usage(self, response: Dict[str, Any]):
+        """Accumulate token counts reported by the provider"""
+        usage = (response or {}).get('usage') or {}
+        for key in self.token_usage:
+            self.token_usage[key] += int(usage.get(key, 0) or 0)
 
 
 # Factory function
@@ -894,3 +996,31 @@ def create_workflow_thread(project_dir: str, idea: str, tone: str, target_words:
         ollama_model=ollama_model,
         ollama_url=ollama_url
     )
+
+
+def create_resumed_workflow_thread(project_dir: str, ai_provider: Optional[str] = None,
+                                   ollama_model: Optional[str] = None,
+                                   ollama_url: Optional[str] = None,
+                                   auto_approve: bool = False,
+                                   request_budget: Optional[threading.Semaphore] = None):
+    """
+    Create a workflow thread that continues a crashed or stopped run.
+    
+    Provider settings not given default to those the run was started with.
+    Returns None if the project has no usable checkpoint.
+    """
+    record = NovelCheckpoint(project_dir).load()
+    if not record:
+        return None
+    
+    thread = AutomatedNovelWorkflowThread(
+        project_dir, record['idea'], record['tone'], record['target_words'],
+        ai_provider=ai_provider or record.get('ai_provider', "openai"),
+        ollama_model=ollama_model or record.get('ollama_model', "llama2"),
+        ollama_url=ollama_url or record.get('ollama_url', "http://localhost:11434"),
+        auto_approve=auto_approve,
+        request_budget=request_budget
+    )
+    if not thread.resume_from_checkpoint():
+        return None
+    return thread
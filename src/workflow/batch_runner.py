@@ -0,0 +1,342 @@
+"""
+Headless Batch Runner for Automated Novel Generation
+Runs many novels concurrently without a display, auto-approving every step.
+
+Each novel runs an AutomatedNovelWorkflowThread synchronously on a worker
+pool. Generation is dominated by waiting on the AI provider, so workers are
+threads; a per-provider semaphore shared by every novel caps the number of
+requests in flight regardless of how many novels are running.
+
+Usage:
+    python fanws.py --batch manifest.json [--output DIR] [--workers N]
+
+Manifest format (JSON):
+    {
+        "output_dir": "projects/batch",
+        "max_workers": 4,
+        "provider_limits": {"ollama": 2, "openai": 8},
+        "novels": [
+            {"name": "space_opera", "idea": "...", "tone": "epic",
+             "target_words": 90000, "provider": "ollama", "ollama_model": "llama2"}
+        ]
+    }
+A bare list of novel entries is also accepted.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Optional, List
+
+from .automated_novel_workflow import (
+    AutomatedNovelWorkflowThread, create_resumed_workflow_thread
+)
+from .novel_checkpoint import NovelCheckpoint
+
+try:
+    from ..system.api_manager import get_api_manager
+    API_MANAGER_AVAILABLE = True
+except ImportError:
+    API_MANAGER_AVAILABLE = False
+
+PROGRESS_FILENAME = "progress.json"
+DEFAULT_PROVIDER_LIMIT = 4
+
+
+class ProviderBudget:
+    """Global cap on concurrent AI requests, one semaphore per provider."""
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None,
+                 default_limit: int = DEFAULT_PROVIDER_LIMIT):
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def semaphore(self, provider: str) -> threading.BoundedSemaphore:
+        """Get the shared semaphore for a provider."""
+        with self._lock:
+            if provider not in self._semaphores:
+                limit = max(1, int(self.limits.get(provider, self.default_limit)))
+                self._semaphores[provider] = threading.BoundedSemaphore(limit)
+            return self._semaphores[provider]
+
+
+class HeadlessNovelRunner:
+    """Runs a manifest of novels concurrently with auto-approval."""
+
+    def __init__(self, novels: List[Dict[str, Any]], output_dir: str,
+                 max_workers: int = 4, provider_limits: Optional[Dict[str, int]] = None):
+        self.novels = [self._normalize_entry(entry, i) for i, entry in enumerate(novels)]
+        self._check_unique_names(self.novels)
+        self.output_dir = output_dir
+        self.max_workers = max(1, max_workers)
+        self.budget = ProviderBudget(provider_limits)
+        self.logger = logging.getLogger(__name__)
+
+        self._active_threads: Dict[str, AutomatedNovelWorkflowThread] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_manifest(cls, manifest_path: str, output_dir: Optional[str] = None,
+                      max_workers: Optional[int] = None,
+                      provider_limits: Optional[Dict[str, int]] = None) -> 'HeadlessNovelRunner':
+        """Create a runner from a JSON manifest file; explicit arguments override it."""
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        if isinstance(manifest, list):
+            manifest = {'novels': manifest}
+
+        limits = dict(manifest.get('provider_limits', {}))
+        limits.update(provider_limits or {})
+
+        return cls(
+            novels=manifest.get('novels', []),
+            output_dir=output_dir or manifest.get('output_dir', os.path.join("projects", "batch")),
+            max_workers=max_workers or manifest.get('max_workers', 4),
+            provider_limits=limits
+        )
+
+    @staticmethod
+    def _normalize_entry(entry: Dict[str, Any], index: int) -> Dict[str, Any]:
+        """Validate a manifest entry and fill in defaults."""
+        if not entry.get('idea'):
+            raise ValueError(f"Manifest entry {index} is missing 'idea'")
+
+        name = entry.get('name') or f"novel_{index + 1:03d}"
+        return {
+            'name': re.sub(r'[^\w\-]+', '_', name),
+            'idea': entry['idea'],
+            'tone': entry.get('tone', "neutral"),
+            'target_words': int(entry.get('target_words', 100000)),
+            'provider': entry.get('provider', "openai"),
+            'ollama_model': entry.get('ollama_model', "llama2"),
+            'ollama_url': entry.get('ollama_url', "http://localhost:11434"),
+        }
+
+    @staticmethod
+    def _check_unique_names(novels: List[Dict[str, Any]]):
+        """Reject entries that would share a project directory."""
+        seen = {}
+        for index, spec in enumerate(novels):
+            # Compare case-insensitively so names also collide on case-insensitive filesystems
+            key = spec['name'].casefold()
+            if key in seen:
+                raise ValueError(
+                    f"Manifest entries {seen[key]} and {index} both use the project "
+                    f"directory '{spec['name']}'"
+                )
+            seen[key] = index
+
+    def run(self) -> Dict[str, Any]:
+        """Run every novel in the manifest and return an aggregate report."""
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        # Create the shared API manager before workers race to do it
+        if API_MANAGER_AVAILABLE:
+            get_api_manager()
+
+        started = time.time()
+        results = []
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                      thread_name_prefix="fanws-novel")
+        try:
+            futures = {executor.submit(self.run_novel, spec): spec for spec in self.novels}
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                self.logger.info(
+                    f"{result['name']}: {result['status']} "
+                    f"({result['tokens']['completion_tokens']} completion tokens)"
+                )
+        except KeyboardInterrupt:
+            self.logger.warning("Interrupted - stopping all novels at their next checkpoint")
+            self.stop_all()
+            raise
+        finally:
+            executor.shutdown(wait=True)
+
+        return self._build_report(results, time.time() - started)
+
+    def run_novel(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a single novel to completion on the calling thread."""
+        project_dir = os.path.join(self.output_dir, spec['name'])
+        os.makedirs(project_dir, exist_ok=True)
+
+        progress = {
+            'name': spec['name'],
+            'project_dir': project_dir,
+            'provider': spec['provider'],
+            'status': "running",
+            'step': "initialization",
+            'chapter': 0,
+            'section': 0,
+            'progress': 0,
+            'tokens': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
+            'error': None,
+            'started_at': datetime.now().isoformat(),
+            'elapsed_seconds': 0.0,
+        }
+        started = time.time()
+
+        try:
+            # The thread must be created here so its signals are delivered
+            # directly on this worker rather than queued to a Qt event loop.
+            workflow = self._create_workflow(spec, project_dir)
+            with self._lock:
+                self._active_threads[spec['name']] = workflow
+
+            def update(**changes):
+                progress.update(changes)
+                progress['tokens'] = dict(workflow.token_usage)
+                progress['elapsed_seconds'] = round(time.time() - started, 2)
+                self._write_progress(project_dir, progress)
+
+            workflow.progress_updated.connect(lambda value: update(progress=value))
+            workflow.new_draft.connect(
+                lambda chapter, section, _content: update(chapter=chapter, section=section)
+            )
+            workflow.status_updated.connect(lambda _status: update(step=workflow.current_step))
+            workflow.error_signal.connect(lambda message: update(error=message))
+
+            update(step=workflow.current_step)
+            workflow.run()
+
+            if workflow.should_stop:
+                update(status="stopped")
+            elif progress['error']:
+                update(status="failed")
+            else:
+                update(status="completed", progress=100)
+
+        except Exception as e:
+            self.logger.error(f"Novel {spec['name']} failed: {e}")
+            progress.update(status="failed", error=str(e),
+                            elapsed_seconds=round(time.time() - started, 2))
+            self._write_progress(project_dir, progress)
+
+        finally:
+            with self._lock:
+                self._active_threads.pop(spec['name'], None)
+
+        return progress
+
+    def _create_workflow(self, spec: Dict[str, Any], project_dir: str) -> AutomatedNovelWorkflowThread:
+        """Create a fresh workflow thread, or resume one from its checkpoint."""
+        options = {
+            'ollama_model': spec['ollama_model'],
+            'ollama_url': spec['ollama_url'],
+            'auto_approve': True,
+            'request_budget': self.budget.semaphore(spec['provider']),
+        }
+
+        if NovelCheckpoint(project_dir).exists():
+            workflow = create_resumed_workflow_thread(project_dir, ai_provider=spec['provider'],
+                                                      **options)
+            if workflow is not None:
+                return workflow
+
+        with open(os.path.join(project_dir, "story.txt"), 'w', encoding='utf-8') as f:
+            f.write("")
+
+        return AutomatedNovelWorkflowThread(
+            project_dir, spec['idea'], spec['tone'], spec['target_words'],
+            ai_provider=spec['provider'], **options
+        )
+
+    def stop_all(self):
+        """Ask every running novel to stop."""
+        with self._lock:
+            for workflow in self._active_threads.values():
+                workflow.stop()
+
+    def _write_progress(self, project_dir: str, progress: Dict[str, Any]):
+        """Atomically write the per-novel progress file."""
+        path = os.path.join(project_dir, PROGRESS_FILENAME)
+        temp_path = path + ".tmp"
+        try:
+            progress['updated_at'] = datetime.now().isoformat()
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(progress, f, indent=2, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except OSError as e:
+            self.logger.error(f"Failed to write progress for {project_dir}: {e}")
+
+    def _build_report(self, results: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+        """Aggregate per-novel results and write batch_report.json."""
+        totals = {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+        for result in results:
+            for key in totals:
+                totals[key] += result['tokens'].get(key, 0)
+
+        statuses = [result['status'] for result in results]
+        report = {
+            'novels': len(results),
+            'completed': statuses.count("completed"),
+            'failed': statuses.count("failed"),
+            'stopped': statuses.count("stopped"),
+            'elapsed_seconds': round(elapsed, 2),
+            'tokens': totals,
+            'tokens_per_second': round(totals['completion_tokens'] / elapsed, 2) if elapsed > 0 else 0.0,
+            'results': sorted(results, key=lambda r: r['name']),
+        }
+
+        try:
+            with open(os.path.join(self.output_dir, "batch_report.json"), 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+        except OSError as e:
+            self.logger.error(f"Failed to write batch report: {e}")
+
+        return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for headless batch generation."""
+    parser = argparse.ArgumentParser(description="Generate many novels headlessly from a manifest")
+    parser.add_argument("manifest", help="JSON manifest of novels to generate")
+    parser.add_argument("--output", help="Directory for generated projects")
+    parser.add_argument("--workers", type=int, help="Number of novels to run concurrently")
+    parser.add_argument("--provider-limit", action="append", default=[], metavar="PROVIDER=N",
+                        help="Maximum concurrent requests for a provider (repeatable)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    limits = {}
+    for item in args.provider_limit:
+        provider, _, value = item.partition("=")
+        if not value.isdigit():
+            parser.error(f"Invalid --provider-limit '{item}', expected PROVIDER=N")
+        limits[provider] = int(value)
+
+    try:
+        runner = HeadlessNovelRunner.from_manifest(args.manifest, args.output, args.workers, limits)
+    except (OSError, ValueError, json.JSONDecodeError) as e:
+        print(f"Error loading manifest: {e}", file=sys.stderr)
+        return 2
+
+    try:
+        report = runner.run()
+    except KeyboardInterrupt:
+        return 130
+
+    print(f"Novels: {report['novels']} (completed {report['completed']}, "
+          f"failed {report['failed']}, stopped {report['stopped']})")
+    print(f"Elapsed: {report['elapsed_seconds']:.1f}s, "
+          f"tokens: {report['tokens']['total_tokens']:,}, "
+          f"throughput: {report['tokens_per_second']:.1f} tokens/s")
+
+    return 0 if report['failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
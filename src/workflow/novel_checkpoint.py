@@ -0,0 +1,139 @@
+"""
+Crash-safe checkpoints for the automated novel workflow.
+
+A checkpoint is a small JSON record describing how far a run has got:
+- the chapter/section cursor (the next section to write)
+- the committed byte length of story.txt
+- the draft currently awaiting approval, if any
+- a hash of the planning artifacts the run was built from
+
+Records are written to a temp file, fsynced and moved into place with
+os.replace(), so a crash leaves either the previous or the new checkpoint
+on disk, never a partial one.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+CHECKPOINT_FILENAME = "checkpoint.json"
+CHECKPOINT_VERSION = 1
+
+# Files produced by the planning stages; a resumed run must be writing
+# against the same synopsis/outline/cast it was checkpointed with.
+PLANNING_ARTIFACTS = [
+    "synopsis.txt",
+    "outline.txt",
+    "characters.txt",
+    "world.txt",
+    "timeline.txt",
+]
+
+
+class NovelCheckpoint:
+    """Atomic checkpoint record for a single novel project directory."""
+
+    def __init__(self, project_dir: str, filename: str = CHECKPOINT_FILENAME):
+        self.project_dir = project_dir
+        self.checkpoint_path = os.path.join(project_dir, filename)
+        self.story_path = os.path.join(project_dir, "story.txt")
+        self.logger = logging.getLogger(__name__)
+
+    def exists(self) -> bool:
+        """Check whether a checkpoint has been written for this project."""
+        return os.path.exists(self.checkpoint_path)
+
+    def save(self, record: Dict[str, Any]) -> bool:
+        """Atomically write a checkpoint record."""
+        record = dict(record)
+        record['version'] = CHECKPOINT_VERSION
+        record['timestamp'] = datetime.now().isoformat()
+
+        temp_path = self.checkpoint_path + ".tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(record, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.checkpoint_path)
+            return True
+        except OSError as e:
+            self.logger.error(f"Failed to write checkpoint {self.checkpoint_path}: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return False
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Load the last committed checkpoint record, if any."""
+        if not self.exists():
+            return None
+
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.error(f"Failed to read checkpoint {self.checkpoint_path}: {e}")
+            return None
+
+        if record.get('version') != CHECKPOINT_VERSION:
+            self.logger.warning(f"Unsupported checkpoint version: {record.get('version')}")
+            return None
+
+        return record
+
+    def clear(self):
+        """Remove the checkpoint once a run has completed."""
+        try:
+            if self.exists():
+                os.remove(self.checkpoint_path)
+        except OSError as e:
+            self.logger.warning(f"Failed to remove checkpoint {self.checkpoint_path}: {e}")
+
+    def story_offset(self) -> int:
+        """Get the current byte length of story.txt."""
+        try:
+            return os.path.getsize(self.story_path)
+        except OSError:
+            return 0
+
+    def truncate_story(self, offset: int) -> int:
+        """
+        Truncate story.txt to a committed byte offset.
+
+        Anything written after the last checkpoint (e.g. a section that was
+        being appended when the process died) is discarded. Returns the
+        number of bytes removed.
+        """
+        current = self.story_offset()
+        if current <= offset:
+            if current < offset:
+                self.logger.warning(
+                    f"story.txt is shorter ({current} bytes) than checkpoint offset ({offset})"
+                )
+            return 0
+
+        with open(self.story_path, 'r+b') as f:
+            f.truncate(offset)
+            f.flush()
+            os.fsync(f.fileno())
+
+        return current - offset
+
+    def hash_planning_artifacts(self) -> str:
+        """Hash the planning artifacts so a resume can detect edits since the checkpoint."""
+        digest = hashlib.sha256()
+        for filename in PLANNING_ARTIFACTS:
+            digest.update(filename.encode('utf-8'))
+            path = os.path.join(self.project_dir, filename)
+            if not os.path.exists(path):
+                digest.update(b'\0missing')
+                continue
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(65536), b''):
+                    digest.update(chunk)
+        return digest.hexdigest()
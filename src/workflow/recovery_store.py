@@ -0,0 +1,220 @@
+"""
+Content-addressed storage for recovery checkpoints.
+
+File contents are stored once under recovery/blobs/, named by their sha256
+digest, and checkpoints are small JSON manifests mapping project files to
+digests. A stat cache (size + mtime) means a file is only re-read and hashed
+when it has changed, so the cost of a checkpoint scales with what changed
+rather than with the size of the project.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Dict, Any, Iterable, List, Optional
+
+BLOBS_DIRNAME = "blobs"
+STAT_CACHE_FILENAME = "stat_cache.json"
+
+
+class RecoveryStore:
+    """Blob store and checkpoint manifests for one project's recovery directory."""
+
+    def __init__(self, project_dir: str, recovery_dir: str):
+        self.project_dir = project_dir
+        self.recovery_dir = recovery_dir
+        self.blobs_dir = os.path.join(recovery_dir, BLOBS_DIRNAME)
+        self.stat_cache_path = os.path.join(self.blobs_dir, STAT_CACHE_FILENAME)
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._stat_cache: Optional[Dict[str, List[Any]]] = None
+        self._stat_cache_dirty = False
+        self.files_hashed = 0
+
+    # File states
+
+    def file_state(self, relative_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Get size, mtime and digest of a project file, storing its blob.
+
+        The file is only read if its size or mtime changed since it was last
+        stored. Returns None if the file does not exist.
+        """
+        path = os.path.join(self.project_dir, relative_path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            cache = self._load_stat_cache()
+            cached = cache.get(relative_path)
+
+        if (cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns
+                and os.path.exists(self.blob_path(cached[2]))):
+            digest = cached[2]
+        else:
+            digest = self._store_blob(path)
+            with self._lock:
+                self._stat_cache[relative_path] = [stat.st_size, stat.st_mtime_ns, digest]
+                self._stat_cache_dirty = True
+
+        return {
+            'size': stat.st_size,
+            'modified': stat.st_mtime,
+            'checksum': digest
+        }
+
+    def snapshot(self, relative_paths: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Get the states of the given files that exist and persist the stat cache."""
+        states = {}
+        for relative_path in relative_paths:
+            state = self.file_state(relative_path)
+            if state is not None:
+                states[relative_path] = state
+
+        self.save_stat_cache()
+        return states
+
+    def _store_blob(self, path: str) -> str:
+        """Copy a file into the blob store in one read, returning its digest."""
+        os.makedirs(self.blobs_dir, exist_ok=True)
+        digest = hashlib.sha256()
+
+        fd, temp_path = tempfile.mkstemp(dir=self.blobs_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as temp_f, open(path, 'rb') as source_f:
+                for chunk in iter(lambda: source_f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+                    temp_f.write(chunk)
+
+            blob_path = self.blob_path(digest.hexdigest())
+            if os.path.exists(blob_path):
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                os.replace(temp_path, blob_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        self.files_hashed += 1
+        return digest.hexdigest()
+
+    def blob_path(self, digest: str) -> str:
+        """Path of the blob for a digest."""
+        return os.path.join(self.blobs_dir, digest[:2], digest)
+
+    # Manifests
+
+    def write_manifest(self, manifest_path: str, manifest: Dict[str, Any]):
+        """Atomically write a compact checkpoint manifest."""
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        temp_path = manifest_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, manifest_path)
+
+    def restore(self, manifest_path: str, target_dir: Optional[str] = None) -> List[str]:
+        """Restore the files recorded in a manifest; returns the restored paths."""
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        target_dir = target_dir or self.project_dir
+        restored = []
+        for relative_path, state in manifest.get('file_states', {}).items():
+            blob_path = self.blob_path(state['checksum'])
+            if not os.path.exists(blob_path):
+                self.logger.warning(f"Missing blob for {relative_path} in {manifest_path}")
+                continue
+
+            destination = os.path.join(target_dir, relative_path)
+            os.makedirs(os.path.dirname(destination) or '.', exist_ok=True)
+            temp_path = destination + ".restore"
+            with open(blob_path, 'rb') as source_f, open(temp_path, 'wb') as dest_f:
+                for chunk in iter(lambda: source_f.read(1024 * 1024), b''):
+                    dest_f.write(chunk)
+            os.replace(temp_path, destination)
+            restored.append(destination)
+
+        return restored
+
+    def prune_manifests(self, manifest_dir: str, prefix: str, keep: int) -> int:
+        """Delete all but the newest keep manifests whose names start with prefix."""
+        if not os.path.isdir(manifest_dir):
+            return 0
+
+        # Names carry a sortable timestamp after the prefix
+        manifests = sorted(filename for filename in os.listdir(manifest_dir)
+                           if filename.startswith(prefix) and filename.endswith('.json'))
+        stale = manifests[:-keep] if keep > 0 else manifests
+        for filename in stale:
+            os.remove(os.path.join(manifest_dir, filename))
+        return len(stale)
+
+    def collect_garbage(self, manifest_dirs: Iterable[str]) -> int:
+        """Delete blobs not referenced by any manifest in the given directories."""
+        referenced = set()
+        for manifest_dir in manifest_dirs:
+            if not os.path.isdir(manifest_dir):
+                continue
+            for filename in os.listdir(manifest_dir):
+                if not filename.endswith('.json'):
+                    continue
+                try:
+                    with open(os.path.join(manifest_dir, filename), 'r', encoding='utf-8') as f:
+                        manifest = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    continue
+                for state in manifest.get('file_states', {}).values():
+                    referenced.add(state.get('checksum'))
+
+        with self._lock:
+            referenced.update(entry[2] for entry in self._load_stat_cache().values())
+
+        removed = 0
+        if os.path.isdir(self.blobs_dir):
+            for prefix in os.listdir(self.blobs_dir):
+                prefix_dir = os.path.join(self.blobs_dir, prefix)
+                if not os.path.isdir(prefix_dir):
+                    continue
+                for digest in os.listdir(prefix_dir):
+                    if digest not in referenced:
+                        os.remove(os.path.join(prefix_dir, digest))
+                        removed += 1
+
+        return removed
+
+    # Stat cache
+
+    def _load_stat_cache(self) -> Dict[str, List[Any]]:
+        """Load the stat cache once."""
+        if self._stat_cache is None:
+            self._stat_cache = {}
+            if os.path.exists(self.stat_cache_path):
+                try:
+                    with open(self.stat_cache_path, 'r', encoding='utf-8') as f:
+                        self._stat_cache = json.load(f)
+                except (OSError, json.JSONDecodeError) as e:
+                    self.logger.warning(f"Ignoring unreadable recovery stat cache: {e}")
+        return self._stat_cache
+
+    def save_stat_cache(self):
+        """Persist the stat cache if it changed."""
+        with self._lock:
+            if not self._stat_cache_dirty:
+                return
+            try:
+                os.makedirs(self.blobs_dir, exist_ok=True)
+                temp_path = self.stat_cache_path + ".tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._stat_cache, f)
+                os.replace(temp_path, self.stat_cache_path)
+                self._stat_cache_dirty = False
+            except OSError as e:
+                self.logger.error(f"Failed to save recovery stat cache: {e}")
@@ -0,0 +1,319 @@
+"""
+Write-ahead journal for a project's workflow state files.
+
+Instead of rewriting a whole JSON or config file on every change, writers
+append one small record per change to state_journal.log and keep the current
+document in memory. Records are flushed to the OS immediately and fsync'd in
+groups - once sync_every records are pending, or when a record arrives more
+than sync_interval seconds after the oldest pending one - so a process crash
+loses nothing and a power loss loses at most one unsynced group.
+
+Documents are written back to their own files ("materialized") when a caller
+asks for it - e.g. at a step boundary, before another component reads them -
+and all at once when the journal is compacted. Compaction writes every changed
+document atomically, fsyncs it and then truncates the journal. Every record is
+idempotent (put a document, set a key, store a list item at an index), so
+replaying the journal tail over files that were already partly materialized
+gives the same result; a journal left behind by a crash is replayed and
+compacted the next time the project is opened.
+
+Files ending in .json hold JSON documents. Any other file is treated as a
+"Key: value" text file like config.txt.
+"""
+
+import os
+import copy
+import json
+import time
+import atexit
+import logging
+import threading
+from typing import Dict, Any, List, Optional
+
+JOURNAL_FILENAME = "state_journal.log"
+
+
+class StateJournal:
+    """Append-only journal of state mutations for one project directory."""
+
+    def __init__(self, project_dir: str, sync_every: int = 32, sync_interval: float = 0.5,
+                 compact_every: int = 1000):
+        self.project_dir = project_dir
+        self.journal_path = os.path.join(project_dir, JOURNAL_FILENAME)
+        self.sync_every = max(1, sync_every)
+        self.sync_interval = sync_interval
+        self.compact_every = compact_every
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.RLock()
+        self._documents: Dict[str, Any] = {}
+        self._stats: Dict[str, Optional[List[int]]] = {}
+        self._dirty = set()
+        self._file = None
+        self._seq = 0
+        self._records_since_compact = 0
+        self._unsynced = 0
+        self._first_unsynced_at = 0.0
+
+        self.replayed = 0
+        self.syncs = 0
+
+        self._replay()
+
+    # Mutations
+
+    def put(self, path: str, value: Any, materialize: bool = False):
+        """Replace a whole document."""
+        self._record({'op': 'put', 'file': path, 'value': value}, materialize)
+
+    def set(self, path: str, key: str, value: Any, materialize: bool = False):
+        """Set one key of a JSON object or one "Key: value" line of a text file."""
+        self._record({'op': 'set', 'file': path, 'key': key, 'value': value}, materialize)
+
+    def append(self, path: str, item: Any, materialize: bool = False):
+        """Append an item to a JSON list."""
+        with self._lock:
+            document = self._document(path)
+            index = len(document) if isinstance(document, list) else 0
+            self._record({'op': 'append', 'file': path, 'index': index, 'value': item}, materialize)
+
+    def _record(self, record: Dict[str, Any], materialize: bool):
+        """Journal a record, apply it in memory and compact when the journal is long."""
+        with self._lock:
+            self._seq += 1
+            line = json.dumps(dict(record, seq=self._seq), ensure_ascii=False, separators=(',', ':'))
+            self._write_record(line)
+            # Apply the decoded record so memory matches what a replay would build
+            self._apply(json.loads(line))
+
+            if materialize:
+                self.materialize(record['file'])
+
+            self._records_since_compact += 1
+            if self.compact_every and self._records_since_compact >= self.compact_every:
+                self.compact()
+
+    # Reading
+
+    def read(self, path: str, default: Any = None) -> Any:
+        """Get a copy of the current document, including unmaterialized changes."""
+        with self._lock:
+            document = self._document(path)
+            if document is None:
+                return default
+            return copy.deepcopy(document)
+
+    def exists(self, path: str) -> bool:
+        """Check whether a document exists in the journal or on disk."""
+        with self._lock:
+            return self._document(path) is not None
+
+    # Durability
+
+    def sync(self):
+        """fsync any journal records not yet on disk."""
+        with self._lock:
+            if self._file is not None and self._unsynced:
+                os.fsync(self._file.fileno())
+                self._unsynced = 0
+                self.syncs += 1
+
+    def materialize(self, *paths: str):
+        """Write the given documents (or every changed one) back to their files."""
+        with self._lock:
+            for path in (paths or sorted(self._dirty)):
+                if path in self._dirty:
+                    self._write_document(path)
+
+    def compact(self):
+        """Materialize every changed document durably, then truncate the journal."""
+        with self._lock:
+            try:
+                for path in sorted(self._dirty):
+                    self._write_document(path, durable=True)
+
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                if os.path.exists(self.journal_path):
+                    with open(self.journal_path, 'wb') as f:
+                        os.fsync(f.fileno())
+
+                self._records_since_compact = 0
+                self._unsynced = 0
+            except OSError as e:
+                self.logger.error(f"Failed to compact state journal {self.journal_path}: {e}")
+
+    def close(self):
+        """Compact the journal and release its file handle."""
+        with self._lock:
+            # Nothing to do for a project directory that has since been removed
+            if os.path.isdir(self.project_dir or '.'):
+                self.compact()
+            elif self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # Internals
+
+    def _write_record(self, line: str):
+        """Append an encoded record to the journal, fsyncing in groups."""
+        if self._file is None:
+            self._file = open(self.journal_path, 'a', encoding='utf-8')
+
+        self._file.write(line + '\n')
+        self._file.flush()
+
+        now = time.monotonic()
+        if not self._unsynced:
+            self._first_unsynced_at = now
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every or now - self._first_unsynced_at >= self.sync_interval:
+            self.sync()
+
+    def _apply(self, record: Dict[str, Any]):
+        """Apply a record to the in-memory document."""
+        path = record['file']
+        op = record['op']
+        document = self._document(path)
+
+        if op == 'put':
+            document = record['value']
+        elif op == 'set':
+            if self._is_json(path):
+                document = document if isinstance(document, dict) else {}
+                document[record['key']] = record['value']
+            else:
+                document = self._set_line(document or '', record['key'], record['value'])
+        elif op == 'append':
+            document = document if isinstance(document, list) else []
+            index = record.get('index', len(document))
+            # Replaying over an already materialized list must not duplicate items
+            if index < len(document):
+                document[index] = record['value']
+            else:
+                document.append(record['value'])
+        else:
+            raise ValueError(f"Unknown state journal operation: {op}")
+
+        self._documents[path] = document
+        self._dirty.add(path)
+
+    def _document(self, path: str) -> Any:
+        """Get the in-memory document, loading it from disk when needed."""
+        # Pick up changes made outside the journal unless ours are pending
+        if path in self._documents and (path in self._dirty
+                                        or self._stats.get(path) == self._file_stat(path)):
+            return self._documents[path]
+
+        file_path = os.path.join(self.project_dir, path)
+        document = None
+        if os.path.exists(file_path):
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    document = json.load(f) if self._is_json(path) else f.read()
+            except (OSError, json.JSONDecodeError) as e:
+                self.logger.warning(f"Ignoring unreadable state file {file_path}: {e}")
+
+        self._documents[path] = document
+        self._stats[path] = self._file_stat(path)
+        return document
+
+    def _write_document(self, path: str, durable: bool = False):
+        """Atomically write one document to its file."""
+        document = self._documents.get(path)
+        file_path = os.path.join(self.project_dir, path)
+        os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+
+        temp_path = file_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            if self._is_json(path):
+                json.dump(document, f, indent=2, ensure_ascii=False)
+            else:
+                f.write(document or '')
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, file_path)
+
+        self._stats[path] = self._file_stat(path)
+        self._dirty.discard(path)
+
+    def _replay(self):
+        """Apply records left in the journal by a previous run, then compact."""
+        if not os.path.exists(self.journal_path):
+            return
+
+        with self._lock:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final record was never acknowledged as written
+                        self.logger.warning(f"Ignoring incomplete record in {self.journal_path}")
+                        break
+                    self._apply(record)
+                    self._seq = max(self._seq, record.get('seq', 0))
+                    self.replayed += 1
+
+            if self.replayed:
+                self.logger.info(f"Replayed {self.replayed} state journal records in {self.project_dir}")
+            self.compact()
+
+    def _file_stat(self, path: str) -> Optional[List[int]]:
+        """Get [size, mtime_ns] of a document's file, or None if it does not exist."""
+        try:
+            stat = os.stat(os.path.join(self.project_dir, path))
+            return [stat.st_size, stat.st_mtime_ns]
+        except OSError:
+            return None
+
+    @staticmethod
+    def _is_json(path: str) -> bool:
+        return path.endswith('.json')
+
+    @staticmethod
+    def _set_line(text: str, key: str, value: Any) -> str:
+        """Update or add a "Key: value" line."""
+        lines = text.splitlines(keepends=True)
+        for i, line in enumerate(lines):
+            if line.startswith(f"{key}:"):
+                lines[i] = f"{key}: {value}\n"
+                break
+        else:
+            if lines and not lines[-1].endswith('\n'):
+                lines[-1] += '\n'
+            lines.append(f"{key}: {value}\n")
+        return ''.join(lines)
+
+
+_journals: Dict[str, StateJournal] = {}
+_journals_lock = threading.Lock()
+
+
+def get_state_journal(project_dir: str) -> StateJournal:
+    """Get the shared journal for a project directory."""
+    key = os.path.abspath(project_dir)
+    with _journals_lock:
+        journal = _journals.get(key)
+        if journal is None:
+            journal = StateJournal(project_dir)
+            _journals[key] = journal
+        return journal
+
+
+def release_state_journal(project_dir: str):
+    """Close a project's journal and drop it from the registry when its workflow ends."""
+    with _journals_lock:
+        journal = _journals.pop(os.path.abspath(project_dir), None)
+    if journal is not None:
+        journal.close()
+
+
+@atexit.register
+def close_state_journals():
+    """Compact every open journal."""
+    with _journals_lock:
+        for journal in _journals.values():
+            journal.close()
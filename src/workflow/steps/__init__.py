@@ -6,6 +6,7 @@ Modular workflow step implementations for the FANWS novel writing system.
 
 from .base_step import BaseWorkflowStep
 from .step_manager import WorkflowStepManager
+from .stage_pipeline import StagePipeline
 from .step_01_initialization import Step01Initialization
 from .step_02_synopsis_generation import Step02SynopsisGeneration
 from .step_03_synopsis_refinement import Step03SynopsisRefinement
@@ -21,6 +22,7 @@ from .step_11_completion_export import Step11CompletionExport
 __all__ = [
     'BaseWorkflowStep',
     'WorkflowStepManager',
+    'StagePipeline',
     'Step01Initialization',
     'Step02SynopsisGeneration',
     'Step03SynopsisRefinement',
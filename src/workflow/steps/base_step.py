@@ -6,17 +6,36 @@ Provides common functionality for all workflow steps.
 
 import os
 import json
+import hashlib
+import inspect
 import logging
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Any
 from abc import ABC, abstractmethod
 
+from ..state_journal import get_state_journal
+
 class BaseWorkflowStep(ABC):
     """
     Abstract base class for all workflow steps.
     Provides common functionality and interface.
     """
 
+    # Project-relative paths this step reads and writes; a trailing "/" marks
+    # a directory. WorkflowStepManager orders steps by these declarations and
+    # runs steps with no conflicting artifacts concurrently. Steps that leave
+    # input_artifacts as None are treated as depending on every earlier step.
+    input_artifacts: Optional[List[str]] = None
+    output_artifacts: List[str] = []
+
+    # Workflow attributes (e.g. novel_tone) that change this step's result.
+    # Together with input_artifacts and the step code they decide whether a
+    # memoized result can be reused on a rerun.
+    input_settings: List[str] = []
+
+    # Bump to invalidate memoized results when behaviour changes outside this module
+    step_version = 1
+
     def __init__(self, workflow_instance):
         """Initialize the base step with reference to main workflow."""
         self.workflow = workflow_instance
@@ -65,6 +84,7 @@ class BaseWorkflowStep(ABC):
     def end_step(self, success: bool = True):
         """Mark the end of step execution."""
         self.end_time = datetime.now()
+        self.materialize_step_data()
         duration = (self.end_time - self.start_time).total_seconds() if self.start_time else 0
 
         status = "completed successfully" if success else "failed"
@@ -81,16 +101,23 @@ class BaseWorkflowStep(ABC):
 
         return success
 
+    def get_step_data_filename(self, step_number: Optional[int] = None) -> str:
+        """Get the project-relative name of a step's data file."""
+        return f"step_{step_number or self.step_number:02d}_data.json"
+
+    def get_journal(self):
+        """Get the project's state journal."""
+        return get_state_journal(self.workflow.project_path)
+
     def save_step_data(self, data: Dict[str, Any]):
-        """Save step-specific data to project directory."""
-        try:
-            step_data_file = os.path.join(
-                self.workflow.project_path,
-                f"step_{self.step_number:02d}_data.json"
-            )
+        """
+        Save step-specific data to the project's state journal.
 
-            with open(step_data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+        The data file itself is written when the step ends.
+        """
+        try:
+            step_data_file = self.get_step_data_filename()
+            self.get_journal().put(step_data_file, data)
 
             self.log_action(f"Step data saved to {step_data_file}")
             return True
@@ -100,16 +127,12 @@ class BaseWorkflowStep(ABC):
             return False
 
     def load_step_data(self) -> Dict[str, Any]:
-        """Load step-specific data from project directory."""
+        """Load step-specific data, including changes not yet written to its file."""
         try:
-            step_data_file = os.path.join(
-                self.workflow.project_path,
-                f"step_{self.step_number:02d}_data.json"
-            )
-
-            if os.path.exists(step_data_file):
-                with open(step_data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+            step_data_file = self.get_step_data_filename()
+            data = self.get_journal().read(step_data_file)
+
+            if data is not None:
                 self.log_action(f"Step data loaded from {step_data_file}")
                 return data
             else:
@@ -120,6 +143,51 @@ class BaseWorkflowStep(ABC):
             self.log_action(f"Error loading step data: {e}", "ERROR")
             return {}
 
+    def materialize_step_data(self):
+        """Write journaled step data to its file so later steps can read it."""
+        if not getattr(self.workflow, 'project_path', None):
+            return
+        try:
+            self.get_journal().materialize(self.get_step_data_filename())
+        except Exception as e:
+            self.log_action(f"Error writing step data: {e}", "ERROR")
+
+    def get_code_version(self) -> str:
+        """Get a fingerprint of this step's implementation for memoization."""
+        digest = hashlib.sha256(f"{self.step_name}:{self.step_version}".encode('utf-8'))
+        try:
+            source_file = inspect.getsourcefile(type(self))
+            if source_file:
+                with open(source_file, 'rb') as f:
+                    digest.update(f.read())
+        except (OSError, TypeError):
+            pass
+        return digest.hexdigest()
+
+    def get_input_settings(self) -> Dict[str, Any]:
+        """Get the current values of the workflow settings this step depends on."""
+        return {name: getattr(self.workflow, name, None) for name in self.input_settings}
+
+    def restore_from_artifacts(self):
+        """
+        Reload in-memory workflow state from this step's saved artifacts.
+        Called instead of execute() when a memoized result is reused.
+        """
+        pass
+
+    def load_artifact(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Load a JSON artifact from the project, or None if it does not exist."""
+        artifact_path = os.path.join(self.workflow.project_path, filename)
+        if not os.path.exists(artifact_path):
+            return None
+        with open(artifact_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Rough token count (about four characters per token)."""
+        return max(1, len(text or '') // 4)
+
     def validate_prerequisites(self) -> bool:
         """Validate that prerequisites for this step are met."""
         # Check if project path exists
@@ -129,11 +197,8 @@ class BaseWorkflowStep(ABC):
 
         # Check if previous steps completed (if not step 1)
         if self.step_number > 1:
-            previous_step_file = os.path.join(
-                self.workflow.project_path,
-                f"step_{self.step_number-1:02d}_data.json"
-            )
-            if not os.path.exists(previous_step_file):
+            previous_step_file = self.get_step_data_filename(self.step_number - 1)
+            if not self.get_journal().exists(previous_step_file):
                 self.log_action(f"Previous step data not found: {previous_step_file}", "ERROR")
                 return False
 
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Stage Pipeline
+Runs items through a fixed sequence of stages with a worker queue per stage,
+so item N+1 can be in an early stage while item N is in a later one.
+"""
+
+import time
+import queue
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Stage functions take an item and return it (or a replacement) for the next stage
+StageFunction = Callable[[Any], Any]
+
+_STOP = object()
+
+
+class StagePipeline:
+    """
+    Pipelined executor for multi-stage processing.
+
+    Each stage has its own input queue and a configurable number of worker
+    threads. Completed items are handed to on_complete in their original
+    order, whatever order they finish in. Queue depth and busy time are
+    recorded per stage and returned by get_stats().
+    """
+
+    def __init__(self, stages: List[Tuple[str, StageFunction]],
+                 concurrency: Optional[Dict[str, int]] = None, default_concurrency: int = 1):
+        if not stages:
+            raise ValueError("StagePipeline requires at least one stage")
+
+        self.stages = stages
+        self.concurrency = {
+            name: max(1, int((concurrency or {}).get(name, default_concurrency)))
+            for name, _ in stages
+        }
+        self._lock = threading.Lock()
+        self._reset_stats()
+
+    def _reset_stats(self):
+        """Reset per-stage statistics before a run."""
+        self.stats = {
+            name: {
+                'workers': self.concurrency[name],
+                'processed': 0,
+                'busy_seconds': 0.0,
+                'max_queue_depth': 0,
+                'queue_depth_samples': []
+            }
+            for name, _ in self.stages
+        }
+        self.wall_seconds = 0.0
+
+    def run(self, items: List[Any], on_complete: Optional[Callable[[int, Any], None]] = None) -> List[Any]:
+        """
+        Process items through every stage and return the final results in order.
+
+        on_complete(index, result) is called from the calling thread as soon as
+        all earlier items have completed. If any stage raises, no new work is
+        started and the first exception is re-raised once the workers stop.
+        """
+        self._reset_stats()
+        started = time.perf_counter()
+
+        queues = [queue.Queue() for _ in self.stages]
+        done = queue.Queue()
+        errors = []
+        workers = []
+
+        for stage_index, (name, function) in enumerate(self.stages):
+            if stage_index + 1 < len(self.stages):
+                next_stage = (self.stages[stage_index + 1][0], queues[stage_index + 1])
+            else:
+                next_stage = (None, done)
+            for worker_index in range(self.concurrency[name]):
+                worker = threading.Thread(
+                    target=self._worker,
+                    args=(name, function, queues[stage_index], next_stage, errors),
+                    name=f"pipeline-{name}-{worker_index}",
+                    daemon=True
+                )
+                worker.start()
+                workers.append(worker)
+
+        for index, item in enumerate(items):
+            self._put(queues[0], self.stages[0][0], (index, item))
+
+        results = [None] * len(items)
+        pending = {}
+        next_index = 0
+
+        try:
+            while next_index < len(items) and not errors:
+                try:
+                    index, result = done.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+
+                pending[index] = result
+                # Release completed items strictly in input order
+                while next_index in pending:
+                    results[next_index] = pending.pop(next_index)
+                    if on_complete:
+                        on_complete(next_index, results[next_index])
+                    next_index += 1
+        finally:
+            self._shutdown(queues)
+            for worker in workers:
+                worker.join()
+            self.wall_seconds = time.perf_counter() - started
+
+        if errors:
+            raise errors[0]
+
+        return results
+
+    def _worker(self, name: str, function: StageFunction, in_queue: queue.Queue,
+                next_stage: Tuple[Optional[str], queue.Queue], errors: List[Exception]):
+        """Take items from a stage queue, process them and pass them on."""
+        while True:
+            task = in_queue.get()
+            if task is _STOP:
+                return
+            if errors:
+                continue
+
+            index, item = task
+            stage_start = time.perf_counter()
+            try:
+                result = function(item)
+            except Exception as e:
+                logging.error(f"Pipeline stage '{name}' failed for item {index}: {e}")
+                with self._lock:
+                    errors.append(e)
+                continue
+
+            with self._lock:
+                self.stats[name]['processed'] += 1
+                self.stats[name]['busy_seconds'] += time.perf_counter() - stage_start
+
+            next_name, out_queue = next_stage
+            if next_name:
+                self._put(out_queue, next_name, (index, result))
+            else:
+                out_queue.put((index, result))
+
+    def _put(self, stage_queue: queue.Queue, name: str, task: Tuple[int, Any]):
+        """Queue a task for a stage and sample its queue depth."""
+        stage_queue.put(task)
+        depth = stage_queue.qsize()
+        with self._lock:
+            stats = self.stats[name]
+            stats['queue_depth_samples'].append(depth)
+            stats['max_queue_depth'] = max(stats['max_queue_depth'], depth)
+
+    def _shutdown(self, queues: List[queue.Queue]):
+        """Queue a stop marker behind any remaining work for every worker."""
+        for stage_index, (name, _) in enumerate(self.stages):
+            for _ in range(self.concurrency[name]):
+                queues[stage_index].put(_STOP)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-stage queue depth and utilisation for the last run."""
+        with self._lock:
+            stages = {}
+            for name, stats in self.stats.items():
+                samples = stats['queue_depth_samples']
+                busy = stats['busy_seconds']
+                stages[name] = {
+                    'workers': stats['workers'],
+                    'processed': stats['processed'],
+                    'busy_seconds': round(busy, 4),
+                    'max_queue_depth': stats['max_queue_depth'],
+                    'avg_queue_depth': round(sum(samples) / len(samples), 2) if samples else 0.0,
+                    'utilization': round(busy / (self.wall_seconds * stats['workers']), 3)
+                    if self.wall_seconds > 0 else 0.0
+                }
+
+            return {
+                'wall_seconds': round(self.wall_seconds, 4),
+                'stages': stages
+            }
@@ -21,6 +21,13 @@ class Step01Initialization(BaseWorkflowStep):
     Creates project structure, files, and configuration.
     """
 
+    # Project artifacts this step reads and writes, used for scheduling
+    input_artifacts = []
+    output_artifacts = [
+        "step_01_data.json", "story.txt", "characters.txt", "world.txt", "themes.txt", "notes.txt",
+        "timeline.txt", "synopsis.txt", "summaries.txt", "project_metadata.json"
+    ]
+
     def __init__(self, workflow_instance):
         """Initialize Step 1 with workflow instance."""
         super().__init__(workflow_instance)
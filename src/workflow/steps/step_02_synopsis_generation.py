@@ -16,6 +16,11 @@ class Step02SynopsisGeneration(BaseWorkflowStep):
     Uses AI to generate a comprehensive synopsis based on the novel idea.
     """
 
+    # Project artifacts this step reads and writes, used for scheduling
+    input_artifacts = ["step_01_data.json"]
+    output_artifacts = ["step_02_data.json", "synopsis.txt"]
+    input_settings = ["genre", "novel_tone", "novel_idea", "target_word_count"]
+
     def __init__(self, workflow_instance):
         """Initialize Step 2 with workflow instance."""
         super().__init__(workflow_instance)
@@ -281,6 +286,13 @@ This {word_count}-word novel promises to deliver an engaging {genre} experience
 
         return validation
 
+    def restore_from_artifacts(self):
+        """Reload the synopsis produced by a previous run."""
+        synopsis_path = os.path.join(self.workflow.project_path, "synopsis.txt")
+        if os.path.exists(synopsis_path):
+            with open(synopsis_path, 'r', encoding='utf-8') as f:
+                self.workflow.synopsis = f.read()
+
     def validate_prerequisites(self) -> bool:
         """Validate prerequisites for Step 2."""
         # Check if Step 1 completed successfully
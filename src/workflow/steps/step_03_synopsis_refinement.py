@@ -20,6 +20,10 @@ class Step03SynopsisRefinement(BaseWorkflowStep):
     Refines the synopsis based on user feedback and quality analysis.
     """
 
+    # Project artifacts this step reads and writes, used for scheduling
+    input_artifacts = ["step_02_data.json", "synopsis.txt"]
+    output_artifacts = ["step_03_data.json", "synopsis.txt", "metadata/refinement_history.json"]
+
     def __init__(self, workflow_instance):
         """Initialize Step 3 with workflow instance."""
         super().__init__(workflow_instance)
@@ -244,6 +248,13 @@ REVISED SYNOPSIS:"""
             self.log_action(f"Synopsis refinement failed: {str(e)}", "ERROR")
             return synopsis
 
+    def restore_from_artifacts(self):
+        """Reload the synopsis produced by a previous run."""
+        synopsis_path = os.path.join(self.workflow.project_path, "synopsis.txt")
+        if os.path.exists(synopsis_path):
+            with open(synopsis_path, 'r', encoding='utf-8') as f:
+                self.workflow.synopsis = f.read()
+
     def validate_prerequisites(self) -> bool:
         """Validate prerequisites for Step 3."""
         # Check if Step 2 completed successfully
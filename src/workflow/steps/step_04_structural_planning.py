@@ -10,6 +10,14 @@ import logging
 from .base_step import BaseWorkflowStep
 
 class Step04StructuralPlanning(BaseWorkflowStep):
+    # Project artifacts this step reads and writes, used for scheduling
+    input_artifacts = ["synopsis.txt"]
+    output_artifacts = [
+        "metadata/outline.json", "metadata/characters.json", "metadata/world_details.json",
+        "metadata/structural_planning.json"
+    ]
+    input_settings = ["genre", "novel_tone", "target_word_count", "project_name"]
+
     def execute(self) -> dict:
         """Execute Step 4: Structural Planning Automation with comprehensive component generation."""
         planning_results = {
@@ -274,6 +282,19 @@ Return only the JSON, no additional text."""
 
         return result
 
+    def restore_from_artifacts(self):
+        """Reload the outline, characters and world details saved by a previous run."""
+        components = [
+            ("outline.json", 'outline'),
+            ("characters.json", 'characters'),
+            ("world_details.json", 'world_details')
+        ]
+        for filename, attribute in components:
+            component_path = os.path.join(self.workflow.project_path, "metadata", filename)
+            if os.path.exists(component_path):
+                with open(component_path, 'r', encoding='utf-8') as f:
+                    setattr(self.workflow, attribute, json.load(f))
+
     def validate_outline(self, outline: dict) -> bool:
         """Validate outline structure."""
         try:
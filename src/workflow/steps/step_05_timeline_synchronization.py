@@ -11,6 +11,10 @@ from datetime import datetime
 from .base_step import BaseWorkflowStep
 
 class Step05TimelineSynchronization(BaseWorkflowStep):
+    # Project artifacts this step reads and writes, used for scheduling
+    input_artifacts = ["metadata/outline.json", "metadata/characters.json"]
+    output_artifacts = ["timeline.json", "timeline.txt"]
+
     def execute(self) -> dict:
         """Execute Step 5: Timeline Synchronization - Generate and synchronize chronological events."""
         timeline_results = {
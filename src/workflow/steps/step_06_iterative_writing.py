@@ -6,11 +6,41 @@ Step 6: Iterative Writing
 
 import json
 import os
+import re
+import time
 import logging
 from datetime import datetime
 from .base_step import BaseWorkflowStep
+from .stage_pipeline import StagePipeline
 
 class Step06IterativeWriting(BaseWorkflowStep):
+    # Project artifacts this step reads and writes, used for scheduling
+    input_artifacts = [
+        "synopsis.txt", "outline.txt", "characters.txt", "themes.txt", "metadata/outline.json",
+        "metadata/characters.json", "timeline.txt"
+    ]
+    output_artifacts = ["sections/", "manuscript.txt", "writing_results.json"]
+    input_settings = ["refinement_mode"]
+
+    # Worker count per writing stage. Sections are pipelined through the stages,
+    # so section N+1 is drafted while section N is polished. Override with a
+    # stage_concurrency dict on the workflow instance.
+    stage_concurrency = {
+        'drafting': 1,
+        'polishing': 1,
+        'enhancement': 1,
+        'vocabulary': 1,
+        'refinement': 1
+    }
+
+    # "staged" runs polish, enhancement and vocabulary as separate AI calls;
+    # "fused" does all three in one call with a sectioned response. Override
+    # with a refinement_mode attribute on the workflow instance.
+    refinement_mode = 'staged'
+
+    # Section markers for the fused refinement response, in stage order
+    FUSED_SECTIONS = [('POLISHED', 'polished'), ('ENHANCED', 'enhanced'), ('FINAL', 'final')]
+
     def execute(self) -> dict:
         """Execute Step 6: Iterative Writing Loop with 4-stage process."""
         writing_results = {
@@ -40,41 +70,63 @@ class Step06IterativeWriting(BaseWorkflowStep):
 
                 # Extract chapters/sections from outline
                 sections = self.extract_sections_from_outline(outline_content)
+                for number, section in enumerate(sections, 1):
+                    section['number'] = number
                 writing_results['total_sections'] = len(sections)
 
                 self.workflow.log_action(f"Found {len(sections)} sections to process")
 
-                # Process each section through 4-stage writing loop
-                for i, section in enumerate(sections):
-                    self.workflow.status_updated.emit(f"Status: Processing section {i+1}/{len(sections)}: {section['title']}")
-
-                    # Stage 1: Drafting
-                    draft_result = self.execute_drafting_stage(section)
-                    section['draft'] = draft_result['content']
-
-                    # Stage 2: Polishing
-                    polish_result = self.execute_polishing_stage(section)
-                    section['polished'] = polish_result['content']
-
-                    # Stage 3: Enhancement
-                    enhance_result = self.execute_enhancement_stage(section)
-                    section['enhanced'] = enhance_result['content']
-
-                    # Stage 4: Vocabulary
-                    vocab_result = self.execute_vocabulary_stage(section)
-                    section['final'] = vocab_result['content']
-
+                # Process sections through the 4-stage writing pipeline
+                refinement_mode = self.get_refinement_mode()
+                if refinement_mode == 'fused':
+                    stages = [
+                        ('drafting', self.draft_section),
+                        ('refinement', self.fused_refine_section)
+                    ]
+                    writing_results['fused_refinement'] = {
+                        'tokens_saved': 0,
+                        'seconds_saved': 0.0,
+                        'sections': []
+                    }
+                else:
+                    stages = [
+                        ('drafting', self.draft_section),
+                        ('polishing', self.polish_section),
+                        ('enhancement', self.enhance_section),
+                        ('vocabulary', self.refine_section_vocabulary)
+                    ]
+                writing_results['refinement_mode'] = refinement_mode
+                pipeline = StagePipeline(stages, self.get_stage_concurrency())
+
+                def section_completed(index, section):
                     writing_results['sections_processed'] += 1
 
+                    savings = section.pop('refinement_savings', None)
+                    if savings:
+                        fused = writing_results['fused_refinement']
+                        fused['tokens_saved'] += savings['tokens_saved']
+                        fused['seconds_saved'] = round(fused['seconds_saved'] + savings['seconds_saved'], 3)
+                        fused['sections'].append(dict(savings, section=index + 1))
+
                     # Save section progress
-                    self.save_section_progress(section, i+1)
+                    self.save_section_progress(section, index + 1)
 
                     # Update progress
-                    progress = int((i + 1) / len(sections) * 80)
+                    progress = int((index + 1) / len(sections) * 80)
                     self.workflow.progress_updated.emit(progress)
 
                     # Log section completion
-                    self.workflow.log_action(f"Section {i+1} completed: {section['title']}")
+                    self.workflow.log_action(f"Section {index + 1} completed: {section['title']}")
+
+                self.workflow.status_updated.emit(f"Status: Processing {len(sections)} sections")
+                pipeline.run(sections, section_completed)
+
+                writing_results['pipeline'] = pipeline.get_stats()
+                self.workflow.log_action(
+                    f"Writing pipeline finished in {writing_results['pipeline']['wall_seconds']:.2f}s; "
+                    + ", ".join(f"{name} max queue {stats['max_queue_depth']}"
+                                for name, stats in writing_results['pipeline']['stages'].items())
+                )
 
                 # Mark stages as completed
                 writing_results['drafting_completed'] = True
@@ -84,21 +136,17 @@ class Step06IterativeWriting(BaseWorkflowStep):
 
                 self.workflow.progress_updated.emit(85)
 
-                # Compile final manuscript
-                final_manuscript = self.compile_final_manuscript(sections)
-                writing_results['final_word_count'] = len(final_manuscript.split())
-
-                # Save complete manuscript
+                # Compile and save the final manuscript, streamed part by part
                 manuscript_path = os.path.join(self.workflow.project_path, "manuscript.txt")
-                with open(manuscript_path, 'w', encoding='utf-8') as f:
-                    f.write(final_manuscript)
+                manuscript_metrics = self.write_final_manuscript(sections, manuscript_path)
+                writing_results['final_word_count'] = manuscript_metrics['word_count']
 
                 self.workflow.log_action(f"Final manuscript saved: {writing_results['final_word_count']} words")
 
                 self.workflow.progress_updated.emit(95)
 
                 # Quality assessment
-                quality_analysis = self.assess_manuscript_quality(final_manuscript)
+                quality_analysis = self.assess_manuscript_metrics(manuscript_metrics)
                 writing_results['quality_score'] = quality_analysis['score']
                 writing_results['writing_history'] = quality_analysis['history']
 
@@ -198,6 +246,51 @@ class Step06IterativeWriting(BaseWorkflowStep):
                 'stage': 'planning'
             }]
 
+    def get_refinement_mode(self):
+        """Get the refinement mode, 'staged' or 'fused'."""
+        mode = getattr(self.workflow, 'refinement_mode', None) or self.refinement_mode
+        if mode not in ('staged', 'fused'):
+            self.log_action(f"Unknown refinement mode '{mode}', using staged", "WARNING")
+            return 'staged'
+        return mode
+
+    def get_stage_concurrency(self):
+        """Get the worker count for each writing stage."""
+        concurrency = dict(self.stage_concurrency)
+        concurrency.update(getattr(self.workflow, 'stage_concurrency', None) or {})
+        return concurrency
+
+    # Pipeline stage adapters; each runs one stage and passes the section on
+    def draft_section(self, section):
+        """Pipeline stage 1: drafting."""
+        section['draft'] = self.execute_drafting_stage(section)['content']
+        return section
+
+    def polish_section(self, section):
+        """Pipeline stage 2: polishing."""
+        section['polished'] = self.execute_polishing_stage(section)['content']
+        return section
+
+    def enhance_section(self, section):
+        """Pipeline stage 3: enhancement."""
+        section['enhanced'] = self.execute_enhancement_stage(section)['content']
+        return section
+
+    def refine_section_vocabulary(self, section):
+        """Pipeline stage 4: vocabulary refinement."""
+        section['final'] = self.execute_vocabulary_stage(section)['content']
+        return section
+
+    def fused_refine_section(self, section):
+        """Pipeline stage 2 in fused mode: polish, enhancement and vocabulary at once."""
+        result = self.execute_fused_refinement_stage(section)
+        section['polished'] = result['polished']
+        section['enhanced'] = result['enhanced']
+        section['final'] = result['final']
+        if result['savings']:
+            section['refinement_savings'] = result['savings']
+        return section
+
     def execute_drafting_stage(self, section):
         """Stage 1: Initial drafting of section content."""
         result = {
@@ -219,7 +312,7 @@ class Step06IterativeWriting(BaseWorkflowStep):
                 'project_name': self.workflow.project_name,
                 'characters': self.load_characters_summary(),
                 'themes': self.load_themes_summary(),
-                'previous_content': self.get_previous_sections_summary()
+                'previous_content': self.get_previous_sections_summary(section.get('number'))
             }
 
             # Try AI-powered drafting first
@@ -268,12 +361,7 @@ class Step06IterativeWriting(BaseWorkflowStep):
                 return result
 
             # Prepare polishing context
-            context = {
-                'title': section['title'],
-                'draft_content': draft_content,
-                'target_quality': 'professional',
-                'focus_areas': ['clarity', 'flow', 'grammar', 'style']
-            }
+            context = self.build_polishing_context(section['title'], draft_content)
 
             # Try AI-powered polishing
             if self.workflow.api_manager and self.workflow.api_manager.is_available():
@@ -321,12 +409,7 @@ class Step06IterativeWriting(BaseWorkflowStep):
                 return result
 
             # Prepare enhancement context
-            context = {
-                'title': section['title'],
-                'polished_content': polished_content,
-                'enhancement_focus': ['imagery', 'dialogue', 'character_depth', 'emotional_impact'],
-                'literary_devices': ['metaphor', 'symbolism', 'foreshadowing', 'tension']
-            }
+            context = self.build_enhancement_context(section['title'], polished_content)
 
             # Try AI-powered enhancement
             if self.workflow.api_manager and self.workflow.api_manager.is_available():
@@ -374,13 +457,7 @@ class Step06IterativeWriting(BaseWorkflowStep):
                 return result
 
             # Prepare vocabulary context
-            context = {
-                'title': section['title'],
-                'enhanced_content': enhanced_content,
-                'vocabulary_focus': ['word_choice', 'redundancy', 'rhythm', 'tone'],
-                'style_consistency': True,
-                'reading_level': 'adult'
-            }
+            context = self.build_vocabulary_context(section['title'], enhanced_content)
 
             # Try AI-powered vocabulary refinement
             if self.workflow.api_manager and self.workflow.api_manager.is_available():
@@ -409,6 +486,120 @@ class Step06IterativeWriting(BaseWorkflowStep):
 
         return result
 
+    def execute_fused_refinement_stage(self, section):
+        """Stages 2-4 in a single AI call, falling back to the staged calls."""
+        result = {
+            'success': False,
+            'polished': '',
+            'enhanced': '',
+            'final': '',
+            'savings': None,
+            'errors': [],
+            'stage': 'refinement'
+        }
+
+        try:
+            self.workflow.status_updated.emit(f"Status: Refining {section['title']}")
+
+            draft_content = section.get('draft', '')
+            if not draft_content:
+                result['errors'].append("No draft content to refine")
+                return result
+
+            if self.workflow.api_manager and self.workflow.api_manager.is_available():
+                prompt = self.build_fused_refinement_prompt(section['title'], draft_content)
+
+                started = time.perf_counter()
+                response = self.workflow.api_manager.generate_text(prompt)
+                elapsed = time.perf_counter() - started
+
+                outputs = self.parse_fused_response(response)
+                if outputs:
+                    result.update(outputs)
+                    result['savings'] = self.estimate_fused_savings(
+                        section['title'], draft_content, prompt, response, outputs, elapsed
+                    )
+                    result['success'] = True
+                    section['stage'] = 'final'
+                    self.workflow.log_action(
+                        f"Fused refinement completed for {section['title']} "
+                        f"(~{result['savings']['tokens_saved']} tokens saved)"
+                    )
+                    return result
+
+                self.workflow.log_action(
+                    f"Fused refinement response for {section['title']} was incomplete, "
+                    "running stages separately"
+                )
+
+            # Staged fallback; without an AI provider this is the manual path
+            for stage, key in [(self.execute_polishing_stage, 'polished'),
+                               (self.execute_enhancement_stage, 'enhanced'),
+                               (self.execute_vocabulary_stage, 'final')]:
+                stage_result = stage(section)
+                section[key] = stage_result['content']
+                result[key] = stage_result['content']
+                result['errors'].extend(stage_result['errors'])
+
+            result['success'] = bool(result['final'])
+
+        except Exception as e:
+            result['errors'].append(str(e))
+            self.workflow.log_action(f"Fused refinement stage failed: {str(e)}")
+
+        return result
+
+    def parse_fused_response(self, response):
+        """Split a fused refinement response into its per-stage outputs."""
+        if not response:
+            return None
+
+        markers = '|'.join(marker for marker, _ in self.FUSED_SECTIONS)
+        parts = re.split(rf'^\s*\[({markers})\]\s*$', response.strip(), flags=re.MULTILINE)
+
+        # parts = [preamble, marker, text, marker, text, ...]
+        found = {}
+        for marker, text in zip(parts[1::2], parts[2::2]):
+            found[marker] = text.strip()
+
+        outputs = {}
+        for marker, key in self.FUSED_SECTIONS:
+            if not found.get(marker):
+                return None
+            outputs[key] = found[marker]
+
+        if len(outputs['final']) <= 100:
+            return None
+
+        return outputs
+
+    def estimate_fused_savings(self, title, draft_content, prompt, response, outputs, elapsed):
+        """
+        Estimate the tokens and time saved against the staged calls.
+
+        The staged prompts are rebuilt from the fused outputs, so the estimate
+        covers the section text each staged call would have resent. Staged
+        time is extrapolated from the fused call's seconds per token.
+        """
+        staged_prompts = [
+            self.build_polish_prompt(self.build_polishing_context(title, draft_content)),
+            self.build_enhancement_prompt(self.build_enhancement_context(title, outputs['polished'])),
+            self.build_vocabulary_prompt(self.build_vocabulary_context(title, outputs['enhanced']))
+        ]
+        staged_tokens = (sum(self.estimate_tokens(p) for p in staged_prompts) +
+                         sum(self.estimate_tokens(outputs[key]) for _, key in self.FUSED_SECTIONS))
+        fused_tokens = self.estimate_tokens(prompt) + self.estimate_tokens(response)
+
+        staged_seconds = elapsed * staged_tokens / max(fused_tokens, 1)
+
+        return {
+            'staged_tokens': staged_tokens,
+            'fused_tokens': fused_tokens,
+            'tokens_saved': staged_tokens - fused_tokens,
+            'fused_seconds': round(elapsed, 3),
+            'seconds_saved': round(staged_seconds - elapsed, 3)
+        }
+
     def save_section_progress(self, section, section_number):
         """Save individual section progress."""
         try:
@@ -445,47 +636,78 @@ class Step06IterativeWriting(BaseWorkflowStep):
     def compile_final_manuscript(self, sections):
         """Compile all sections into final manuscript."""
         try:
-            manuscript_parts = []
-
-            # Add manuscript header
-            manuscript_parts.append(f"# {self.workflow.project_name}")
-            manuscript_parts.append("")
-            manuscript_parts.append("*A Novel*")
-            manuscript_parts.append("")
-            manuscript_parts.append("=" * 50)
-            manuscript_parts.append("")
-
-            # Add each section
-            for i, section in enumerate(sections):
-                # Add section title
-                manuscript_parts.append(f"## {section['title']}")
-                manuscript_parts.append("")
-
-                # Add final content
-                final_content = section.get('final', section.get('enhanced', section.get('polished', section.get('draft', ''))))
-                if final_content:
-                    manuscript_parts.append(final_content)
-                else:
-                    manuscript_parts.append("[Section content pending]")
-
-                manuscript_parts.append("")
-                manuscript_parts.append("=" * 30)
-                manuscript_parts.append("")
-
-            # Add manuscript footer
-            manuscript_parts.append("")
-            manuscript_parts.append("THE END")
-            manuscript_parts.append("")
-            manuscript_parts.append(f"Completed: {datetime.now().strftime('%B %d, %Y')}")
-
-            return '\n'.join(manuscript_parts)
+            return '\n'.join(self.iter_manuscript_parts(sections))
 
         except Exception as e:
             self.workflow.log_action(f"Error compiling manuscript: {str(e)}")
             return f"Error compiling manuscript: {str(e)}"
 
+    def iter_manuscript_parts(self, sections):
+        """Yield the manuscript one part at a time; parts are joined by newlines."""
+        # Manuscript header
+        yield f"# {self.workflow.project_name}"
+        yield ""
+        yield "*A Novel*"
+        yield ""
+        yield "=" * 50
+        yield ""
+
+        # Each section
+        for section in sections:
+            yield f"## {section['title']}"
+            yield ""
+
+            # Final content
+            final_content = section.get('final', section.get('enhanced', section.get('polished', section.get('draft', ''))))
+            yield final_content if final_content else "[Section content pending]"
+
+            yield ""
+            yield "=" * 30
+            yield ""
+
+        # Manuscript footer
+        yield ""
+        yield "THE END"
+        yield ""
+        yield f"Completed: {datetime.now().strftime('%B %d, %Y')}"
+
+    def write_final_manuscript(self, sections, manuscript_path):
+        """
+        Stream the manuscript to a file without building it in memory.
+
+        Returns the metrics assess_manuscript_metrics needs, gathered while writing.
+        """
+        metrics = {
+            'word_count': 0,
+            'heading_markers': 0,
+            'sentence_marks': 0,
+            'has_pending': False
+        }
+
+        with open(manuscript_path, 'w', encoding='utf-8') as f:
+            for i, part in enumerate(self.iter_manuscript_parts(sections)):
+                if i:
+                    f.write('\n')
+                f.write(part)
+
+                metrics['word_count'] += len(part.split())
+                metrics['heading_markers'] += part.count('##')
+                metrics['sentence_marks'] += part.count('.')
+                metrics['has_pending'] = metrics['has_pending'] or '[Section content pending]' in part
+
+        return metrics
+
     def assess_manuscript_quality(self, manuscript_content):
         """Assess the quality of the completed manuscript."""
+        return self.assess_manuscript_metrics({
+            'word_count': len(manuscript_content.split()),
+            'heading_markers': manuscript_content.count('##'),
+            'sentence_marks': manuscript_content.count('.'),
+            'has_pending': '[Section content pending]' in manuscript_content
+        })
+
+    def assess_manuscript_metrics(self, metrics):
+        """Assess manuscript quality from counts gathered while it was written."""
         quality_analysis = {
             'score': 0,
             'word_count': 0,
@@ -499,23 +721,21 @@ class Step06IterativeWriting(BaseWorkflowStep):
 
         try:
             # Basic metrics
-            words = manuscript_content.split()
-            quality_analysis['word_count'] = len(words)
+            word_count = metrics['word_count']
+            quality_analysis['word_count'] = word_count
 
-            # Structure analysis
-            sections = manuscript_content.split('##')
-            quality_analysis['structure_score'] = min(100, len(sections) * 10)
+            # Structure analysis ('##' separated parts)
+            quality_analysis['structure_score'] = min(100, (metrics['heading_markers'] + 1) * 10)
 
             # Completeness check
-            if '[Section content pending]' in manuscript_content:
+            if metrics['has_pending']:
                 quality_analysis['completeness_score'] = 50
                 quality_analysis['recommendations'].append("Complete all pending sections")
             else:
                 quality_analysis['completeness_score'] = 100
 
-            # Basic readability (simplified)
-            sentences = manuscript_content.split('.')
-            avg_sentence_length = len(words) / max(len(sentences), 1)
+            # Basic readability (simplified, '.' separated sentences)
+            avg_sentence_length = word_count / max(metrics['sentence_marks'] + 1, 1)
             quality_analysis['readability'] = max(0, min(100, 100 - (avg_sentence_length - 15)))
 
             # Consistency score (placeholder)
@@ -636,26 +856,7 @@ class Step06IterativeWriting(BaseWorkflowStep):
     def generate_ai_polish(self, context):
         """Polish draft using AI."""
         try:
-            prompt = f"""
-            Polish and refine the following draft section:
-
-            Title: {context['title']}
-            Focus Areas: {', '.join(context['focus_areas'])}
-
-            Draft Content:
-            {context['draft_content']}
-
-            Polishing Instructions:
-            1. Improve clarity and readability
-            2. Enhance sentence flow and rhythm
-            3. Correct grammar and punctuation
-            4. Strengthen word choice
-            5. Maintain the original voice and style
-            6. Ensure consistent tone throughout
-
-            Return the polished version:
-            """
-
+            prompt = self.build_polish_prompt(context)
             response = self.workflow.api_manager.generate_text(prompt)
             if response and len(response.strip()) > 100:
                 return response.strip()
@@ -686,27 +887,7 @@ class Step06IterativeWriting(BaseWorkflowStep):
     def generate_ai_enhancement(self, context):
         """Enhance content using AI."""
         try:
-            prompt = f"""
-            Enhance the following polished section with literary depth:
-
-            Title: {context['title']}
-            Enhancement Focus: {', '.join(context['enhancement_focus'])}
-            Literary Devices: {', '.join(context['literary_devices'])}
-
-            Polished Content:
-            {context['polished_content']}
-
-            Enhancement Instructions:
-            1. Add vivid imagery and sensory details
-            2. Deepen character development and emotional resonance
-            3. Incorporate subtle literary devices
-            4. Enhance dialogue authenticity
-            5. Increase narrative tension and pacing
-            6. Add symbolic elements where appropriate
-
-            Return the enhanced version:
-            """
-
+            prompt = self.build_enhancement_prompt(context)
             response = self.workflow.api_manager.generate_text(prompt)
             if response and len(response.strip()) > 100:
                 return response.strip()
@@ -733,28 +914,7 @@ class Step06IterativeWriting(BaseWorkflowStep):
     def generate_ai_vocabulary_refinement(self, context):
         """Refine vocabulary using AI."""
         try:
-            prompt = f"""
-            Perform final vocabulary refinement on the following enhanced section:
-
-            Title: {context['title']}
-            Vocabulary Focus: {', '.join(context['vocabulary_focus'])}
-            Style Consistency: {context['style_consistency']}
-            Reading Level: {context['reading_level']}
-
-            Enhanced Content:
-            {context['enhanced_content']}
-
-            Refinement Instructions:
-            1. Optimize word choice for precision and impact
-            2. Eliminate redundancy and repetition
-            3. Improve sentence rhythm and flow
-            4. Ensure consistent tone and voice
-            5. Adjust vocabulary for target reading level
-            6. Maintain literary quality while ensuring readability
-
-            Return the refined version:
-            """
-
+            prompt = self.build_vocabulary_prompt(context)
             response = self.workflow.api_manager.generate_text(prompt)
             if response and len(response.strip()) > 100:
                 return response.strip()
@@ -778,6 +938,137 @@ class Step06IterativeWriting(BaseWorkflowStep):
             self.workflow.log_action(f"Manual vocabulary refinement failed: {str(e)}")
             return context['enhanced_content']
 
+    # Stage contexts and prompts
+    def build_polishing_context(self, title, draft_content):
+        """Build the context for the polishing stage."""
+        return {
+            'title': title,
+            'draft_content': draft_content,
+            'target_quality': 'professional',
+            'focus_areas': ['clarity', 'flow', 'grammar', 'style']
+        }
+
+    def build_enhancement_context(self, title, polished_content):
+        """Build the context for the enhancement stage."""
+        return {
+            'title': title,
+            'polished_content': polished_content,
+            'enhancement_focus': ['imagery', 'dialogue', 'character_depth', 'emotional_impact'],
+            'literary_devices': ['metaphor', 'symbolism', 'foreshadowing', 'tension']
+        }
+
+    def build_vocabulary_context(self, title, enhanced_content):
+        """Build the context for the vocabulary stage."""
+        return {
+            'title': title,
+            'enhanced_content': enhanced_content,
+            'vocabulary_focus': ['word_choice', 'redundancy', 'rhythm', 'tone'],
+            'style_consistency': True,
+            'reading_level': 'adult'
+        }
+
+    def build_polish_prompt(self, context):
+        """Build the prompt for AI polishing."""
+        return f"""
+        Polish and refine the following draft section:
+
+        Title: {context['title']}
+        Focus Areas: {', '.join(context['focus_areas'])}
+
+        Draft Content:
+        {context['draft_content']}
+
+        Polishing Instructions:
+        1. Improve clarity and readability
+        2. Enhance sentence flow and rhythm
+        3. Correct grammar and punctuation
+        4. Strengthen word choice
+        5. Maintain the original voice and style
+        6. Ensure consistent tone throughout
+
+        Return the polished version:
+        """
+
+    def build_enhancement_prompt(self, context):
+        """Build the prompt for AI enhancement."""
+        return f"""
+        Enhance the following polished section with literary depth:
+
+        Title: {context['title']}
+        Enhancement Focus: {', '.join(context['enhancement_focus'])}
+        Literary Devices: {', '.join(context['literary_devices'])}
+
+        Polished Content:
+        {context['polished_content']}
+
+        Enhancement Instructions:
+        1. Add vivid imagery and sensory details
+        2. Deepen character development and emotional resonance
+        3. Incorporate subtle literary devices
+        4. Enhance dialogue authenticity
+        5. Increase narrative tension and pacing
+        6. Add symbolic elements where appropriate
+
+        Return the enhanced version:
+        """
+
+    def build_vocabulary_prompt(self, context):
+        """Build the prompt for AI vocabulary refinement."""
+        return f"""
+        Perform final vocabulary refinement on the following enhanced section:
+
+        Title: {context['title']}
+        Vocabulary Focus: {', '.join(context['vocabulary_focus'])}
+        Style Consistency: {context['style_consistency']}
+        Reading Level: {context['reading_level']}
+
+        Enhanced Content:
+        {context['enhanced_content']}
+
+        Refinement Instructions:
+        1. Optimize word choice for precision and impact
+        2. Eliminate redundancy and repetition
+        3. Improve sentence rhythm and flow
+        4. Ensure consistent tone and voice
+        5. Adjust vocabulary for target reading level
+        6. Maintain literary quality while ensuring readability
+
+        Return the refined version:
+        """
+
+    def build_fused_refinement_prompt(self, title, draft_content):
+        """Build the single prompt for fused polish, enhancement and vocabulary."""
+        polishing = self.build_polishing_context(title, draft_content)
+        enhancement = self.build_enhancement_context(title, '')
+        vocabulary = self.build_vocabulary_context(title, '')
+
+        return f"""
+        Revise the following draft section in three successive passes.
+
+        Title: {title}
+
+        Draft Content:
+        {draft_content}
+
+        Pass 1 - Polish ({', '.join(polishing['focus_areas'])}):
+        Improve clarity, flow, grammar and word choice while keeping the original voice.
+
+        Pass 2 - Enhance ({', '.join(enhancement['enhancement_focus'])};
+        devices: {', '.join(enhancement['literary_devices'])}):
+        Starting from the polished text, add imagery, emotional depth, authentic dialogue and tension.
+
+        Pass 3 - Vocabulary ({', '.join(vocabulary['vocabulary_focus'])}; reading level: {vocabulary['reading_level']}):
+        Starting from the enhanced text, refine word choice, remove redundancy and keep tone consistent.
+
+        Return the result of every pass, each under its own marker line, exactly in this format:
+        [POLISHED]
+        <polished text>
+        [ENHANCED]
+        <enhanced text>
+        [FINAL]
+        <final text>
+        """
+
     # Helper methods for context loading
     def load_characters_summary(self):
         """Load character summary for context."""
@@ -801,8 +1092,14 @@ class Step06IterativeWriting(BaseWorkflowStep):
         except Exception:
             return "Themes not available"
 
-    def get_previous_sections_summary(self):
+    def get_previous_sections_summary(self, section_number=None):
         """Get summary of previous sections for context."""
+        # Sections are pipelined, so earlier ones may not be saved yet
+        if section_number is not None:
+            if section_number > 1:
+                return f"Previous sections: {section_number - 1} sections completed"
+            return "This is the opening section"
+
         try:
             sections_dir = os.path.join(self.workflow.project_path, "sections")
             if os.path.exists(sections_dir):
@@ -11,6 +11,10 @@ from datetime import datetime
 from .base_step import BaseWorkflowStep
 
 class Step07UserReview(BaseWorkflowStep):
+    # Project artifacts this step reads and writes, used for scheduling
+    input_artifacts = ["writing_results.json", "story.txt", "sections/"]
+    output_artifacts = ["review_results.json"]
+
     def execute(self) -> dict:
         """
         Execute Step 7: Comprehensive User Review System
@@ -212,6 +216,12 @@ class Step07UserReview(BaseWorkflowStep):
             self.workflow.log_action(f"Error calculating review quality score: {e}")
             return 0
 
+    def restore_from_artifacts(self):
+        """Re-apply the step change made by a previous successful review."""
+        review_results = self.load_artifact("review_results.json") or {}
+        if review_results.get('sections_reviewed') and hasattr(self.workflow, 'current_step'):
+            self.workflow.current_step = 8
+
     def save_review_results(self, review_results):
         """Save user review results to disk."""
         try:
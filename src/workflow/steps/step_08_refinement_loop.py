@@ -10,8 +10,32 @@ import logging
 import re
 from datetime import datetime
 from .base_step import BaseWorkflowStep
+from ..story_store import StoryStore
 
 class Step08RefinementLoop(BaseWorkflowStep):
+    # Project artifacts this step reads and writes, used for scheduling
+    input_artifacts = ["review_results.json", "story.txt", "sections/"]
+    output_artifacts = ["story.txt", "sections/", "refinement_results.json"]
+    input_settings = ["refinement_scope"]
+
+    # "full" sends the whole section for every refinement; "targeted" sends only
+    # the paragraphs feedback points at and patches them back in. Override with
+    # a refinement_scope attribute on the workflow instance.
+    refinement_scope = 'full'
+
+    # Improvement areas that concern the section as a whole and cannot be
+    # narrowed to paragraphs
+    WHOLE_SECTION_AREAS = ('too short', 'too long')
+
+    # Blank-line paragraph separator, captured so a split can be rejoined exactly
+    PARAGRAPH_SEPARATOR = re.compile(r'(\n[ \t]*\n\s*)')
+
+    def __init__(self, workflow_instance):
+        """Initialize Step 8 with workflow instance."""
+        super().__init__(workflow_instance)
+        # Sections loaded from story.txt rather than sections/
+        self.story_sections = set()
+
     def execute(self) -> dict:
         """
         Execute Step 8: Refinement Loop
@@ -27,9 +51,13 @@ class Step08RefinementLoop(BaseWorkflowStep):
             'manual_refinements_applied': [],
             'total_sections': 0,
             'quality_score': 0,
+            'targeted_refinements': [],
+            'prompt_tokens_avoided': 0,
             'errors': []
         }
 
+        self.story_sections.clear()
+
         try:
             review_results = self.load_review_results()
             sections_to_refine = self.identify_sections_for_refinement(review_results)
@@ -43,9 +71,21 @@ class Step08RefinementLoop(BaseWorkflowStep):
                 section_content = self.load_section_content(section_id)
                 feedback = self.get_section_feedback(section_id, review_results)
 
-                refined_content, ai_applied, manual_applied = self.refine_section_based_on_feedback(section_content, feedback)
+                targeted = None
+                if self.get_refinement_scope() == 'targeted':
+                    targeted = self.refine_paragraphs_based_on_feedback(section_content, feedback)
+
+                if targeted:
+                    refined_content, ai_applied, manual_applied, targeted_stats = targeted
+                    targeted_stats['section_id'] = section_id
+                    refinement_results['targeted_refinements'].append(targeted_stats)
+                    refinement_results['prompt_tokens_avoided'] += targeted_stats['prompt_tokens_avoided']
+                else:
+                    refined_content, ai_applied, manual_applied = self.refine_section_based_on_feedback(section_content, feedback)
 
-                self.save_refined_section(section_id, refined_content)
+                # Manual fallbacks add editing notes, so only AI output reaches the story
+                self.save_refined_section(section_id, refined_content,
+                                          write_back=ai_applied and not manual_applied)
                 refinement_results['sections_refined'].append(section_id)
 
                 if ai_applied:
@@ -142,8 +182,17 @@ class Step08RefinementLoop(BaseWorkflowStep):
                     section_data = json.load(f)
                     return section_data.get('content', '')
 
-            # Try to extract from main story file
+            # Seek straight to an indexed chapter in the main story file
             story_file = os.path.join(self.workflow.project_path, "story.txt")
+            if section_id.startswith('chapter_') and os.path.exists(story_file):
+                chapter_content = StoryStore(self.workflow.project_path).read_chapter(
+                    int(section_id.split('_')[1])
+                )
+                if chapter_content is not None:
+                    self.story_sections.add(section_id)
+                    return chapter_content
+
+            # Fall back to scanning the main story file
             if os.path.exists(story_file):
                 with open(story_file, 'r', encoding='utf-8') as f:
                     content = f.read()
@@ -225,6 +274,138 @@ class Step08RefinementLoop(BaseWorkflowStep):
             self.workflow.log_action(f"Error refining section: {e}")
             return section_content, False, False
 
+    def get_refinement_scope(self):
+        """Get the refinement scope, 'full' or 'targeted'."""
+        scope = getattr(self.workflow, 'refinement_scope', None) or self.refinement_scope
+        if scope not in ('full', 'targeted'):
+            self.log_action(f"Unknown refinement scope '{scope}', using full", "WARNING")
+            return 'full'
+        return scope
+
+    def refine_paragraphs_based_on_feedback(self, section_content, feedback):
+        """
+        Refine only the paragraphs feedback points at.
+
+        Returns (refined_content, ai_applied, manual_applied, stats), or None when
+        the feedback cannot be narrowed to paragraphs or the AI response could not
+        be used, in which case the caller refines the whole section.
+        """
+        try:
+            if not feedback.get('revision_requested'):
+                return None
+            if not (self.workflow.api_manager and self.workflow.api_manager.is_available()):
+                return None
+
+            improvement_areas = feedback.get('areas_for_improvement', [])
+            if any(area in self.WHOLE_SECTION_AREAS for area in improvement_areas):
+                return None
+
+            paragraphs, separators = self.split_paragraphs(section_content)
+            flagged = self.map_feedback_to_paragraphs(paragraphs, feedback)
+            if not flagged or len(flagged) == len(paragraphs):
+                return None
+
+            comments = feedback.get('comments', '')
+            prompt = self.create_paragraph_refinement_prompt(paragraphs, flagged, improvement_areas, comments)
+            response = self.workflow.api_manager.generate_text(prompt)
+
+            replacements = self.parse_paragraph_response(response, flagged)
+            if not replacements:
+                self.workflow.log_action("Targeted refinement response unusable, refining whole section")
+                return None
+
+            refined_content = self.patch_paragraphs(paragraphs, separators, replacements)
+
+            full_prompt = self.create_refinement_prompt(section_content, improvement_areas, comments)
+            stats = {
+                'paragraphs': sorted(replacements),
+                'paragraph_count': len(paragraphs),
+                'prompt_tokens': self.estimate_tokens(prompt),
+                'full_prompt_tokens': self.estimate_tokens(full_prompt),
+            }
+            stats['prompt_tokens_avoided'] = max(0, stats['full_prompt_tokens'] - stats['prompt_tokens'])
+
+            return refined_content, True, False, stats
+
+        except Exception as e:
+            self.workflow.log_action(f"Targeted refinement failed: {e}")
+            return None
+
+    def split_paragraphs(self, content):
+        """Split content into paragraphs and the exact separators between them."""
+        parts = self.PARAGRAPH_SEPARATOR.split(content)
+        return parts[0::2], parts[1::2]
+
+    def map_feedback_to_paragraphs(self, paragraphs, feedback):
+        """Get the indices of paragraphs the feedback refers to."""
+        flagged = set()
+
+        # Explicit 0-based paragraph indices from the review
+        for index in feedback.get('paragraphs', []):
+            if isinstance(index, int) and 0 <= index < len(paragraphs):
+                flagged.add(index)
+
+        # Passages quoted in the comments
+        quotes = [q for q in re.findall(r'"([^"]{8,})"', feedback.get('comments', '')) if q.strip()]
+        for index, paragraph in enumerate(paragraphs):
+            if any(quote in paragraph for quote in quotes):
+                flagged.add(index)
+
+        # Placeholders are local to the paragraphs that contain them
+        if 'placeholder' in feedback.get('areas_for_improvement', []):
+            for index, paragraph in enumerate(paragraphs):
+                if re.search(r'\[placeholder\]|\[todo\]|todo:', paragraph, flags=re.IGNORECASE):
+                    flagged.add(index)
+
+        return sorted(flagged)
+
+    def create_paragraph_refinement_prompt(self, paragraphs, flagged, improvement_areas, comments):
+        """Create AI prompt with the flagged paragraphs and their neighbours as context."""
+        flagged_set = set(flagged)
+        context = sorted({neighbour for index in flagged for neighbour in (index - 1, index + 1)
+                          if 0 <= neighbour < len(paragraphs)} - flagged_set)
+
+        prompt = "Please refine only the marked paragraphs of a text section based on the feedback provided.\n\n"
+
+        if context:
+            prompt += "SURROUNDING CONTEXT (do not rewrite):\n"
+            for index in context:
+                prompt += f"(paragraph {index}) {paragraphs[index]}\n\n"
+
+        prompt += "PARAGRAPHS TO REFINE:\n"
+        for index in flagged:
+            prompt += f"[PARAGRAPH {index}]\n{paragraphs[index]}\n\n"
+
+        prompt += f"""IMPROVEMENT AREAS: {', '.join(improvement_areas)}
+FEEDBACK: {comments}
+
+Return each refined paragraph under its original marker line, e.g. [PARAGRAPH {flagged[0]}], and nothing else."""
+
+        return prompt
+
+    def parse_paragraph_response(self, response, flagged):
+        """Get {index: refined paragraph} for the flagged paragraphs in an AI response."""
+        if not response:
+            return {}
+
+        parts = re.split(r'^\s*\[PARAGRAPH (\d+)\]\s*$', response.strip(), flags=re.MULTILINE)
+        replacements = {}
+        for index, text in zip(parts[1::2], parts[2::2]):
+            index = int(index)
+            if index in flagged and text.strip():
+                replacements[index] = text.strip()
+
+        return replacements
+
+    def patch_paragraphs(self, paragraphs, separators, replacements):
+        """Rejoin paragraphs with replacements applied; all other text is kept byte for byte."""
+        patched = []
+        for index, paragraph in enumerate(paragraphs):
+            patched.append(replacements.get(index, paragraph))
+            if index < len(separators):
+                patched.append(separators[index])
+        return ''.join(patched)
+
     def create_refinement_prompt(self, content, improvement_areas, comments):
         """Create AI prompt for section refinement."""
         prompt = f"""Please refine the following text section based on the feedback provided:
@@ -318,8 +499,8 @@ Please provide a refined version that addresses the specific issues mentioned wh
         """Add development notes for specific areas."""
         return content + f"\n\n[DEVELOPMENT NOTE: Address {area} in this section]"
 
-    def save_refined_section(self, section_id, refined_content):
-        """Save refined section content to disk."""
+    def save_refined_section(self, section_id, refined_content, write_back=False):
+        """Save refined section content to disk, and to story.txt if write_back is set."""
         try:
             # Save to sections directory
             sections_dir = os.path.join(self.workflow.project_path, "sections")
@@ -339,6 +520,14 @@ Please provide a refined version that addresses the specific issues mentioned wh
 
             self.workflow.log_action(f"Refined section saved: {section_file}")
 
+            # Chapters read from the story index are patched back into story.txt
+            if write_back and section_id in self.story_sections:
+                chapter = int(section_id.split('_')[1])
+                if StoryStore(self.workflow.project_path).replace_chapter(chapter, refined_content):
+                    self.workflow.log_action(f"Chapter {chapter} updated in story.txt")
+                else:
+                    self.workflow.log_action(f"Chapter {chapter} headers changed, story.txt left as is")
+
         except Exception as e:
             self.workflow.log_action(f"Error saving refined section: {e}")
 
@@ -414,6 +603,12 @@ Please provide a refined version that addresses the specific issues mentioned wh
             self.workflow.log_action(f"Error assessing manuscript quality: {e}")
             return 0
 
+    def restore_from_artifacts(self):
+        """Re-apply the step change made by a previous successful refinement loop."""
+        refinement_results = self.load_artifact("refinement_results.json") or {}
+        if refinement_results.get('sections_refined') and hasattr(self.workflow, 'current_step'):
+            self.workflow.current_step = 9
+
     def save_refinement_results(self, refinement_results):
         """Save refinement results to disk."""
         try:
@@ -11,6 +11,13 @@ from datetime import datetime
 from .base_step import BaseWorkflowStep
 
 class Step09ProgressionManagement(BaseWorkflowStep):
+    # Project artifacts this step reads and writes, used for scheduling
+    input_artifacts = [
+        "story.txt", "characters.txt", "timeline.txt", "project_metadata.json",
+        "review_results.json", "refinement_results.json"
+    ]
+    output_artifacts = ["progression_results.json"]
+
     def execute(self) -> dict:
         """
         Execute Step 9: Progression Management
@@ -454,6 +461,12 @@ class Step09ProgressionManagement(BaseWorkflowStep):
             self.workflow.log_action(f"Error generating recommendations: {e}")
             return ["Continue workflow development"]
 
+    def restore_from_artifacts(self):
+        """Re-apply the completion decision recorded by a previous run."""
+        progression_results = self.load_artifact("progression_results.json") or {}
+        if hasattr(self.workflow, 'current_step'):
+            self.workflow.current_step = 10 if progression_results.get('completion_decision') else 3
+
     def save_progression_results(self, progression_results):
         """Save progression management results to disk."""
         try:
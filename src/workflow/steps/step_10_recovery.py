@@ -12,6 +12,11 @@ import pickle
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 from .base_step import BaseWorkflowStep
+from ..recovery_store import RecoveryStore
+from ..state_journal import get_state_journal
+
+STATE_FILENAME = "workflow_state.json"
+RECOVERY_STATE_FILENAME = os.path.join("recovery", "latest_state.json")
 
 class Step10Recovery(BaseWorkflowStep):
     """
@@ -19,6 +24,28 @@ class Step10Recovery(BaseWorkflowStep):
     Handles pause/resume, crash recovery, and state persistence.
     """
 
+    # Project artifacts this step reads and writes, used for scheduling.
+    # Steps 4-9 leave results files rather than step data; reading them also
+    # orders this step after the current_step changes those steps make.
+    input_artifacts = [
+        "step_01_data.json", "step_02_data.json", "step_03_data.json", "metadata/",
+        "timeline.json", "writing_results.json", "review_results.json",
+        "refinement_results.json", "progression_results.json", "story.txt", "synopsis.txt",
+        "characters.txt", "world.txt", "timeline.txt", "themes.txt", "notes.txt",
+        "summaries.txt", "project_metadata.json"
+    ]
+    output_artifacts = ["step_10_data.json", "workflow_state.json", "recovery/"]
+
+    # Timestamped checkpoints kept per project; older ones are pruned
+    MAX_CHECKPOINTS = 10
+
+    # Project files captured by recovery checkpoints
+    KEY_FILES = [
+        'story.txt', 'synopsis.txt', 'characters.txt', 'world.txt',
+        'timeline.txt', 'themes.txt', 'notes.txt', 'summaries.txt',
+        'project_metadata.json'
+    ]
+
     def __init__(self, workflow_instance):
         """Initialize Step 10 with workflow instance."""
         super().__init__(workflow_instance)
@@ -32,6 +59,14 @@ class Step10Recovery(BaseWorkflowStep):
             self.state_file = "workflow_state.json"
             self.recovery_dir = "recovery"
 
+        # File contents are stored once by digest; checkpoints are manifests
+        project_path = getattr(self.workflow, 'project_path', None) or ''
+        self.recovery_store = RecoveryStore(project_path, self.recovery_dir)
+
+    def get_journal(self):
+        """Get the project's state journal (the working directory if no project is loaded)."""
+        return get_state_journal(getattr(self.workflow, 'project_path', None) or '')
+
     def execute(self) -> bool:
         """Execute Step 10: Recovery System."""
         recovery_results = {
@@ -58,6 +93,9 @@ class Step10Recovery(BaseWorkflowStep):
                 recovery_results['state_saved'] = True
                 self.log_action("Workflow state saved successfully")
 
+            # Checkpoints capture files, so write out everything journaled so far
+            self.get_journal().compact()
+
             self.update_progress(20)
 
             # Create recovery checkpoints
@@ -78,6 +116,9 @@ class Step10Recovery(BaseWorkflowStep):
                 recovery_results['backup_system_active'] = True
                 self.log_action("Backup system initialized")
 
+            # Drop old checkpoints and the blobs only they referenced
+            self.clean_up_recovery_store()
+
             self.update_progress(80)
 
             # Test crash recovery scenarios
@@ -114,6 +155,11 @@ class Step10Recovery(BaseWorkflowStep):
             self.save_step_data(recovery_results)
             return False
 
+    def restore_from_artifacts(self):
+        """Re-apply the step change made by a previous successful run."""
+        if self.load_step_data().get('success') and hasattr(self.workflow, 'current_step'):
+            self.workflow.current_step = 11
+
     def create_recovery_structure(self) -> bool:
         """Create the recovery directory structure."""
         try:
@@ -157,14 +203,10 @@ class Step10Recovery(BaseWorkflowStep):
                 'chapters': getattr(self.workflow, 'chapters', {})
             }
 
-            # Save to main state file
-            with open(self.state_file, 'w', encoding='utf-8') as f:
-                json.dump(state_data, f, indent=2, ensure_ascii=False)
-
-            # Save to recovery directory
-            recovery_state_file = os.path.join(self.recovery_dir, "latest_state.json")
-            with open(recovery_state_file, 'w', encoding='utf-8') as f:
-                json.dump(state_data, f, indent=2, ensure_ascii=False)
+            # Journal the main state file and its recovery copy
+            journal = self.get_journal()
+            journal.put(STATE_FILENAME, state_data)
+            journal.put(RECOVERY_STATE_FILENAME, state_data)
 
             return True
 
@@ -175,10 +217,8 @@ class Step10Recovery(BaseWorkflowStep):
     def load_workflow_state(self) -> Optional[Dict[str, Any]]:
         """Load the workflow state from file."""
         try:
-            if os.path.exists(self.state_file):
-                with open(self.state_file, 'r', encoding='utf-8') as f:
-                    state_data = json.load(f)
-
+            state_data = self.get_journal().read(STATE_FILENAME)
+            if state_data is not None:
                 self.log_action("Workflow state loaded successfully")
                 return state_data
             else:
@@ -196,17 +236,19 @@ class Step10Recovery(BaseWorkflowStep):
         try:
             checkpoints_dir = os.path.join(self.recovery_dir, "checkpoints")
 
+            # Hash the project files once; every checkpoint below shares the result
+            file_states = self.get_file_states()
+
             # Create checkpoint for current state
             checkpoint_data = {
                 'timestamp': datetime.now().isoformat(),
                 'checkpoint_type': 'current_state',
                 'workflow_state': self.get_current_workflow_state(),
-                'file_states': self.get_file_states()
+                'file_states': file_states
             }
 
             checkpoint_file = os.path.join(checkpoints_dir, f"checkpoint_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
-            with open(checkpoint_file, 'w', encoding='utf-8') as f:
-                json.dump(checkpoint_data, f, indent=2, ensure_ascii=False)
+            self.recovery_store.write_manifest(checkpoint_file, checkpoint_data)
 
             checkpoint_count += 1
 
@@ -214,26 +256,47 @@ class Step10Recovery(BaseWorkflowStep):
             for step_num in range(1, 10):  # Steps 1-9
                 step_data_file = os.path.join(self.workflow.project_path, f"step_{step_num:02d}_data.json")
                 if os.path.exists(step_data_file):
+                    checkpoint_count += 1
+
+                    # Unchanged since the last run - keep the existing manifest
+                    checkpoint_file = os.path.join(checkpoints_dir, f"step_{step_num:02d}_checkpoint.json")
+                    if self.load_checkpoint_file_states(checkpoint_file) == file_states:
+                        continue
+
                     checkpoint_data = {
                         'timestamp': datetime.now().isoformat(),
                         'checkpoint_type': f'step_{step_num}_completion',
                         'step_number': step_num,
-                        'file_states': self.get_file_states()
+                        'file_states': file_states
                     }
+                    self.recovery_store.write_manifest(checkpoint_file, checkpoint_data)
 
-                    checkpoint_file = os.path.join(checkpoints_dir, f"step_{step_num:02d}_checkpoint.json")
-                    with open(checkpoint_file, 'w', encoding='utf-8') as f:
-                        json.dump(checkpoint_data, f, indent=2, ensure_ascii=False)
-
-                    checkpoint_count += 1
-
-            self.log_action(f"Created {checkpoint_count} recovery checkpoints")
+            self.log_action(f"Created {checkpoint_count} recovery checkpoints "
+                            f"({self.recovery_store.files_hashed} files hashed)")
             return checkpoint_count
 
         except Exception as e:
             self.log_action(f"Error creating recovery checkpoints: {e}", "ERROR")
             return checkpoint_count
 
+    def clean_up_recovery_store(self) -> int:
+        """Prune old timestamped checkpoints, then delete unreferenced blobs."""
+        try:
+            checkpoints_dir = os.path.join(self.recovery_dir, "checkpoints")
+            pruned = self.recovery_store.prune_manifests(
+                checkpoints_dir, "checkpoint_", self.MAX_CHECKPOINTS
+            )
+            removed = self.recovery_store.collect_garbage([
+                checkpoints_dir, os.path.join(self.recovery_dir, "backups")
+            ])
+
+            self.log_action(f"Pruned {pruned} old checkpoints and {removed} unreferenced blobs")
+            return removed
+
+        except Exception as e:
+            self.log_action(f"Error cleaning up recovery store: {e}", "ERROR")
+            return 0
+
     def get_current_workflow_state(self) -> Dict[str, Any]:
         """Get the current workflow state as a dictionary."""
         return {
@@ -249,49 +312,41 @@ class Step10Recovery(BaseWorkflowStep):
         }
 
     def get_file_states(self) -> Dict[str, Any]:
-        """Get the current state of all project files."""
-        file_states = {}
+        """
+        Get the current state of all project files.
 
+        Contents are stored in the recovery blob store; files whose size and
+        mtime are unchanged since they were last stored are not re-read.
+        """
         try:
             if not os.path.exists(self.workflow.project_path):
-                return file_states
+                return {}
 
-            # Get key project files
-            key_files = [
-                'story.txt', 'synopsis.txt', 'characters.txt', 'world.txt',
-                'timeline.txt', 'themes.txt', 'notes.txt', 'summaries.txt',
-                'project_metadata.json'
-            ]
-
-            for filename in key_files:
-                file_path = os.path.join(self.workflow.project_path, filename)
-                if os.path.exists(file_path):
-                    file_states[filename] = {
-                        'size': os.path.getsize(file_path),
-                        'modified': os.path.getmtime(file_path),
-                        'checksum': self.calculate_file_checksum(file_path)
-                    }
-
-            return file_states
+            return self.recovery_store.snapshot(self.KEY_FILES)
 
         except Exception as e:
             self.log_action(f"Error getting file states: {e}", "ERROR")
-            return file_states
+            return {}
 
-    def calculate_file_checksum(self, file_path: str) -> str:
-        """Calculate a simple checksum for a file."""
+    def load_checkpoint_file_states(self, checkpoint_file: str) -> Optional[Dict[str, Any]]:
+        """Get the file states recorded in an existing checkpoint manifest."""
         try:
-            import hashlib
-            with open(file_path, 'rb') as f:
-                return hashlib.md5(f.read()).hexdigest()
-        except Exception:
-            return "unknown"
+            with open(checkpoint_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get('file_states')
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def restore_checkpoint(self, checkpoint_file: str) -> List[str]:
+        """Restore project files from a checkpoint manifest."""
+        restored = self.recovery_store.restore(checkpoint_file)
+        self.log_action(f"Restored {len(restored)} files from {os.path.basename(checkpoint_file)}")
+        return restored
 
     def validate_state_integrity(self) -> bool:
         """Validate the integrity of the current state."""
         try:
             # Check if state file exists and is valid
-            if not os.path.exists(self.state_file):
+            if not self.get_journal().exists(STATE_FILENAME):
                 self.log_action("State file does not exist", "ERROR")
                 return False
 
@@ -400,8 +455,7 @@ class Step10Recovery(BaseWorkflowStep):
                 shutil.copy2(self.state_file, state_backup)
 
             # Test recovery mechanism
-            recovery_state = os.path.join(self.recovery_dir, "latest_state.json")
-            if os.path.exists(recovery_state):
+            if self.get_journal().exists(RECOVERY_STATE_FILENAME):
                 # Simulate recovery
                 self.log_action("State file recovery test passed")
                 return True
@@ -449,6 +503,8 @@ class Step10Recovery(BaseWorkflowStep):
         try:
             # Save current state
             if self.save_workflow_state():
+                self.get_journal().compact()
+
                 # Set pause flag
                 if hasattr(self.workflow, 'workflow_paused'):
                     self.workflow.workflow_paused = True
@@ -10,10 +10,22 @@ import logging
 import shutil
 import zipfile
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, Iterator, List, Optional
 from .base_step import BaseWorkflowStep
+from ...export_formats.engine import ExportEngine, ExportSnapshot
+from ...export_formats.fragment_cache import open_fragment_session
 
 class Step11CompletionExport(BaseWorkflowStep):
+    # Project artifacts this step reads and writes, used for scheduling
+    input_artifacts = [
+        "story.txt", "synopsis.txt", "characters.txt", "themes.txt", "timeline.txt",
+        "project_metadata.json", "progression_results.json", "workflow_state.json"
+    ]
+    output_artifacts = [
+        "exports/", "archives/", "final_validation.json", "completion_report.md",
+        "final_project_state.json"
+    ]
+
     def execute(self) -> dict:
         """
         Execute Step 11: Completion and Export
@@ -101,12 +113,11 @@ class Step11CompletionExport(BaseWorkflowStep):
             story_file = os.path.join(self.workflow.project_path, "story.txt")
             if os.path.exists(story_file):
                 validation_checks['story_exists'] = True
-                with open(story_file, 'r', encoding='utf-8') as f:
-                    story_content = f.read()
-                    if len(story_content.strip()) > 1000:
-                        validation_checks['story_has_content'] = True
-                    if len(story_content.split()) >= 5000:
-                        validation_checks['minimum_word_count'] = True
+                story_metrics = self.scan_story()
+                if story_metrics['stripped_length'] > 1000:
+                    validation_checks['story_has_content'] = True
+                if story_metrics['word_count'] >= 5000:
+                    validation_checks['minimum_word_count'] = True
 
             # Check characters file
             characters_file = os.path.join(self.workflow.project_path, "characters.txt")
@@ -170,12 +181,11 @@ class Step11CompletionExport(BaseWorkflowStep):
             # Story statistics
             story_file = os.path.join(self.workflow.project_path, "story.txt")
             if os.path.exists(story_file):
-                with open(story_file, 'r', encoding='utf-8') as f:
-                    story_content = f.read()
-                    stats['total_word_count'] = len(story_content.split())
-                    stats['chapter_count'] = story_content.count("Chapter")
-                    # Estimate pages (250 words per page)
-                    stats['page_count_estimate'] = max(1, stats['total_word_count'] // 250)
+                story_metrics = self.scan_story()
+                stats['total_word_count'] = story_metrics['word_count']
+                stats['chapter_count'] = story_metrics['chapter_count']
+                # Estimate pages (250 words per page)
+                stats['page_count_estimate'] = max(1, stats['total_word_count'] // 250)
 
             # Character count
             characters_file = os.path.join(self.workflow.project_path, "characters.txt")
@@ -274,8 +284,22 @@ class Step11CompletionExport(BaseWorkflowStep):
             self.workflow.log_action(f"Error creating project summary: {e}")
             return {}
 
+    # (format name, file name suffix, writer method name)
+    EXPORT_FORMATS = [
+        ('txt', '_novel.txt', 'write_text_export'),
+        ('formatted_txt', '_formatted.txt', 'write_formatted_export'),
+        ('json', '_project.json', 'write_json_export'),
+        ('markdown', '_novel.md', 'write_markdown_export'),
+        ('zip_package', '_complete_package.zip', 'write_package_export'),
+    ]
+
     def create_all_exports(self) -> List[Dict[str, Any]]:
-        """Create exports in multiple formats."""
+        """
+        Create exports in multiple formats.
+
+        The project sources are read once into a snapshot and the formats are
+        written concurrently; self.export_engine can be cancelled meanwhile.
+        """
         exports_created = []
 
         try:
@@ -283,232 +307,226 @@ class Step11CompletionExport(BaseWorkflowStep):
             exports_dir = os.path.join(self.workflow.project_path, "exports")
             os.makedirs(exports_dir, exist_ok=True)
 
-            # 1. Plain Text Export
-            txt_export = self.create_text_export(exports_dir)
-            if txt_export:
-                exports_created.append(txt_export)
-
-            # 2. Formatted Text Export
-            formatted_export = self.create_formatted_export(exports_dir)
-            if formatted_export:
-                exports_created.append(formatted_export)
-
-            # 3. JSON Project Export
-            json_export = self.create_json_export(exports_dir)
-            if json_export:
-                exports_created.append(json_export)
+            self.export_engine = ExportEngine(ExportSnapshot.load(self.workflow.project_path))
+            for name, suffix, writer_name in self.EXPORT_FORMATS:
+                self.export_engine.add_format(name, getattr(self, writer_name),
+                                              self.get_export_path(exports_dir, suffix))
 
-            # 4. Markdown Export
-            md_export = self.create_markdown_export(exports_dir)
-            if md_export:
-                exports_created.append(md_export)
-
-            # 5. Project Package Export
-            package_export = self.create_package_export(exports_dir)
-            if package_export:
-                exports_created.append(package_export)
+            for result in self.export_engine.run():
+                if result['success']:
+                    exports_created.append(result)
+                else:
+                    self.workflow.log_action(f"{result['format']} export error: {result['error']}")
 
         except Exception as e:
             self.workflow.log_action(f"Error creating exports: {e}")
 
         return exports_created
 
-    def create_text_export(self, exports_dir: str) -> Dict[str, Any]:
-        """Create plain text export of the novel."""
-        try:
-            export_file = os.path.join(exports_dir, f"{os.path.basename(self.workflow.project_path)}_novel.txt")
-
-            with open(export_file, 'w', encoding='utf-8') as f:
-                # Write header
-                f.write(f"NOVEL EXPORT\n")
-                f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Project: {os.path.basename(self.workflow.project_path)}\n")
-                f.write("=" * 50 + "\n\n")
-
-                # Write story content
-                story_file = os.path.join(self.workflow.project_path, "story.txt")
-                if os.path.exists(story_file):
-                    with open(story_file, 'r', encoding='utf-8') as story_f:
-                        f.write(story_f.read())
-
-            return {
-                'format': 'txt',
-                'file_path': export_file,
-                'file_size': os.path.getsize(export_file),
-                'created': datetime.now().isoformat()
-            }
+    def get_export_path(self, exports_dir: str, suffix: str) -> str:
+        """Path of an export file named after the project."""
+        return os.path.join(exports_dir, f"{os.path.basename(self.workflow.project_path)}{suffix}")
 
-        except Exception as e:
-            self.workflow.log_action(f"Text export error: {e}")
-            return None
+    def create_single_export(self, name: str, exports_dir: str,
+                             snapshot: Optional[ExportSnapshot] = None) -> Optional[Dict[str, Any]]:
+        """Create one export format; returns its result, or None if it failed."""
+        _, suffix, writer_name = next(entry for entry in self.EXPORT_FORMATS if entry[0] == name)
+        engine = ExportEngine(snapshot or ExportSnapshot.load(self.workflow.project_path))
+        engine.add_format(name, getattr(self, writer_name), self.get_export_path(exports_dir, suffix))
 
-    def create_formatted_export(self, exports_dir: str) -> Dict[str, Any]:
-        """Create formatted text export with proper formatting."""
-        try:
-            export_file = os.path.join(exports_dir, f"{os.path.basename(self.workflow.project_path)}_formatted.txt")
-
-            with open(export_file, 'w', encoding='utf-8') as f:
-                # Write title page
-                project_name = os.path.basename(self.workflow.project_path)
-                f.write(f"\n\n\n{project_name.upper()}\n\n")
-                f.write(f"A Novel\n\n")
-                f.write(f"Generated by FANWS\n")
-                f.write(f"{datetime.now().strftime('%B %Y')}\n")
-                f.write("\n" + "=" * 50 + "\n\n")
-
-                # Write synopsis
-                synopsis_file = os.path.join(self.workflow.project_path, "synopsis.txt")
-                if os.path.exists(synopsis_file):
-                    f.write("SYNOPSIS\n\n")
-                    with open(synopsis_file, 'r', encoding='utf-8') as synopsis_f:
-                        f.write(synopsis_f.read())
-                    f.write("\n\n" + "=" * 50 + "\n\n")
-
-                # Write story with proper formatting
-                story_file = os.path.join(self.workflow.project_path, "story.txt")
-                if os.path.exists(story_file):
-                    with open(story_file, 'r', encoding='utf-8') as story_f:
-                        story_content = story_f.read()
-                        # Add proper chapter formatting
-                        formatted_content = story_content.replace("Chapter", "\n\nChapter")
-                        f.write(formatted_content)
-
-            return {
-                'format': 'formatted_txt',
-                'file_path': export_file,
-                'file_size': os.path.getsize(export_file),
-                'created': datetime.now().isoformat()
-            }
-
-        except Exception as e:
-            self.workflow.log_action(f"Formatted export error: {e}")
+        result = engine.run()[0]
+        if not result['success']:
+            self.workflow.log_action(f"{name} export error: {result['error']}")
             return None
+        return result
 
-    def create_json_export(self, exports_dir: str) -> Dict[str, Any]:
-        """Create JSON export with all project data."""
-        try:
-            export_file = os.path.join(exports_dir, f"{os.path.basename(self.workflow.project_path)}_project.json")
-
-            project_data = {
-                'metadata': {
-                    'project_name': os.path.basename(self.workflow.project_path),
-                    'export_date': datetime.now().isoformat(),
-                    'export_version': '1.0',
-                    'workflow_system': 'FANWS'
-                },
-                'content': {},
-                'statistics': self.gather_final_statistics(),
-                'summary': self.create_project_summary()
-            }
-
-            # Load all content files
-            content_files = ['story.txt', 'synopsis.txt', 'characters.txt', 'timeline.txt', 'themes.txt', 'notes.txt']
-
-            for filename in content_files:
-                file_path = os.path.join(self.workflow.project_path, filename)
-                if os.path.exists(file_path):
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        project_data['content'][filename.replace('.txt', '')] = f.read()
-
-            # Save JSON export
-            with open(export_file, 'w', encoding='utf-8') as f:
-                json.dump(project_data, f, indent=2, ensure_ascii=False)
+    def create_text_export(self, exports_dir: str, snapshot: Optional[ExportSnapshot] = None) -> Dict[str, Any]:
+        """Create plain text export of the novel."""
+        return self.create_single_export('txt', exports_dir, snapshot)
 
-            return {
-                'format': 'json',
-                'file_path': export_file,
-                'file_size': os.path.getsize(export_file),
-                'created': datetime.now().isoformat()
-            }
+    def create_formatted_export(self, exports_dir: str, snapshot: Optional[ExportSnapshot] = None) -> Dict[str, Any]:
+        """Create formatted text export with proper formatting."""
+        return self.create_single_export('formatted_txt', exports_dir, snapshot)
 
-        except Exception as e:
-            self.workflow.log_action(f"JSON export error: {e}")
-            return None
+    def create_json_export(self, exports_dir: str, snapshot: Optional[ExportSnapshot] = None) -> Dict[str, Any]:
+        """Create JSON export with all project data."""
+        return self.create_single_export('json', exports_dir, snapshot)
 
-    def create_markdown_export(self, exports_dir: str) -> Dict[str, Any]:
+    def create_markdown_export(self, exports_dir: str, snapshot: Optional[ExportSnapshot] = None) -> Dict[str, Any]:
         """Create Markdown export for easy viewing and publishing."""
-        try:
-            export_file = os.path.join(exports_dir, f"{os.path.basename(self.workflow.project_path)}_novel.md")
-
-            with open(export_file, 'w', encoding='utf-8') as f:
-                project_name = os.path.basename(self.workflow.project_path)
-
-                # Write markdown header
-                f.write(f"# {project_name}\n\n")
-                f.write(f"*Generated by FANWS on {datetime.now().strftime('%B %d, %Y')}*\n\n")
-                f.write("---\n\n")
-
-                # Write synopsis
-                synopsis_file = os.path.join(self.workflow.project_path, "synopsis.txt")
-                if os.path.exists(synopsis_file):
-                    f.write("## Synopsis\n\n")
-                    with open(synopsis_file, 'r', encoding='utf-8') as synopsis_f:
-                        f.write(synopsis_f.read())
-                    f.write("\n\n---\n\n")
-
-                # Write characters
-                characters_file = os.path.join(self.workflow.project_path, "characters.txt")
-                if os.path.exists(characters_file):
-                    f.write("## Characters\n\n")
-                    with open(characters_file, 'r', encoding='utf-8') as char_f:
-                        characters_content = char_f.read()
-                        # Convert to markdown list format
-                        for line in characters_content.split('\n'):
-                            if ':' in line:
-                                f.write(f"- **{line}**\n")
-                            elif line.strip():
-                                f.write(f"  {line}\n")
-                    f.write("\n---\n\n")
-
-                # Write story content
-                f.write("## Story\n\n")
-                story_file = os.path.join(self.workflow.project_path, "story.txt")
-                if os.path.exists(story_file):
-                    with open(story_file, 'r', encoding='utf-8') as story_f:
-                        story_content = story_f.read()
-                        # Convert chapters to markdown headers
-                        formatted_content = story_content.replace("Chapter", "### Chapter")
-                        f.write(formatted_content)
-
-            return {
-                'format': 'markdown',
-                'file_path': export_file,
-                'file_size': os.path.getsize(export_file),
-                'created': datetime.now().isoformat()
-            }
-
-        except Exception as e:
-            self.workflow.log_action(f"Markdown export error: {e}")
-            return None
+        return self.create_single_export('markdown', exports_dir, snapshot)
 
-    def create_package_export(self, exports_dir: str) -> Dict[str, Any]:
+    def create_package_export(self, exports_dir: str, snapshot: Optional[ExportSnapshot] = None) -> Dict[str, Any]:
         """Create a complete project package with all files."""
-        try:
-            export_file = os.path.join(exports_dir, f"{os.path.basename(self.workflow.project_path)}_complete_package.zip")
-
-            with zipfile.ZipFile(export_file, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                # Add all project files
-                for root, dirs, files in os.walk(self.workflow.project_path):
-                    # Skip the exports directory to avoid recursion
-                    if 'exports' in root:
-                        continue
-
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        # Get relative path for archive
-                        arcname = os.path.relpath(file_path, self.workflow.project_path)
-                        zipf.write(file_path, arcname)
-
-            return {
-                'format': 'zip_package',
-                'file_path': export_file,
-                'file_size': os.path.getsize(export_file),
-                'created': datetime.now().isoformat()
-            }
+        return self.create_single_export('zip_package', exports_dir, snapshot)
+
+    # Format writers, run by the export engine
+
+    def write_text_export(self, snapshot: ExportSnapshot, export_file: str,
+                          options: Dict[str, Any], progress: Callable[[int, str], None]):
+        """Write the plain text export."""
+        with open(export_file, 'w', encoding='utf-8') as f:
+            # Write header
+            f.write(f"NOVEL EXPORT\n")
+            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write(f"Project: {os.path.basename(self.workflow.project_path)}\n")
+            f.write("=" * 50 + "\n\n")
+
+            # Write story content
+            f.writelines(snapshot.iter_story_lines())
+
+    def write_formatted_export(self, snapshot: ExportSnapshot, export_file: str,
+                               options: Dict[str, Any], progress: Callable[[int, str], None]):
+        """Write the formatted text export."""
+        with open(export_file, 'w', encoding='utf-8') as f:
+            # Write title page
+            project_name = os.path.basename(self.workflow.project_path)
+            f.write(f"\n\n\n{project_name.upper()}\n\n")
+            f.write(f"A Novel\n\n")
+            f.write(f"Generated by FANWS\n")
+            f.write(f"{datetime.now().strftime('%B %Y')}\n")
+            f.write("\n" + "=" * 50 + "\n\n")
+
+            # Write synopsis
+            if snapshot.has_file("synopsis.txt"):
+                f.write("SYNOPSIS\n\n")
+                f.write(snapshot.read_file("synopsis.txt"))
+                f.write("\n\n" + "=" * 50 + "\n\n")
+
+            # Write story with proper chapter formatting
+            f.writelines(snapshot.iter_story_lines(lambda line: line.replace("Chapter", "\n\nChapter")))
+
+    def write_json_export(self, snapshot: ExportSnapshot, export_file: str,
+                          options: Dict[str, Any], progress: Callable[[int, str], None]):
+        """Write the JSON export with all project data."""
+        project_data = {
+            'metadata': {
+                'project_name': os.path.basename(self.workflow.project_path),
+                'export_date': datetime.now().isoformat(),
+                'export_version': '1.0',
+                'workflow_system': 'FANWS'
+            },
+            'content': {},
+            'statistics': self.gather_final_statistics(),
+            'summary': self.create_project_summary()
+        }
 
-        except Exception as e:
-            self.workflow.log_action(f"Package export error: {e}")
-            return None
+        # Include all content files
+        if snapshot.story:
+            project_data['content']['story'] = "".join(snapshot.iter_story_lines())
+        for filename in ['synopsis.txt', 'characters.txt', 'timeline.txt', 'themes.txt', 'notes.txt']:
+            if snapshot.has_file(filename):
+                project_data['content'][filename.replace('.txt', '')] = snapshot.read_file(filename)
+
+        with open(export_file, 'w', encoding='utf-8') as f:
+            json.dump(project_data, f, indent=2, ensure_ascii=False)
+
+    def write_markdown_export(self, snapshot: ExportSnapshot, export_file: str,
+                              options: Dict[str, Any], progress: Callable[[int, str], None]):
+        """Write the Markdown export."""
+        with open(export_file, 'w', encoding='utf-8') as f:
+            project_name = os.path.basename(self.workflow.project_path)
+
+            # Write markdown header
+            f.write(f"# {project_name}\n\n")
+            f.write(f"*Generated by FANWS on {datetime.now().strftime('%B %d, %Y')}*\n\n")
+            f.write("---\n\n")
+
+            # Write synopsis
+            if snapshot.has_file("synopsis.txt"):
+                f.write("## Synopsis\n\n")
+                f.write(snapshot.read_file("synopsis.txt"))
+                f.write("\n\n---\n\n")
+
+            # Write characters
+            if snapshot.has_file("characters.txt"):
+                f.write("## Characters\n\n")
+                # Convert to markdown list format
+                for line in snapshot.read_file("characters.txt").split('\n'):
+                    if ':' in line:
+                        f.write(f"- **{line}**\n")
+                    elif line.strip():
+                        f.write(f"  {line}\n")
+                f.write("\n---\n\n")
+
+            # Write story content
+            f.write("## Story\n\n")
+            return self.write_markdown_story(snapshot, f, options)
+
+    def write_markdown_story(self, snapshot: ExportSnapshot, f, options: Dict[str, Any]) -> Dict[str, int]:
+        """Write the story as Markdown, reusing cached fragments for unchanged chapters."""
+        def to_markdown(line: str) -> str:
+            # Convert chapters to markdown headers
+            return line.replace("Chapter", "### Chapter")
+
+        chapters = snapshot.chapters
+        story_start = chapters[0].start if chapters else len(snapshot.story)
+        f.writelines(snapshot.iter_story_lines(to_markdown, end=story_start))
+
+        with open_fragment_session(snapshot.project_path, 'markdown', 1, options) as fragments:
+            for chapter in chapters:
+                fragment = fragments.render(
+                    snapshot.chapter_bytes(chapter),
+                    lambda: "".join(snapshot.iter_story_lines(
+                        to_markdown, chapter.start, chapter.end)).encode('utf-8')
+                )
+                f.write(fragment.decode('utf-8'))
+
+        return fragments.get_stats()
+
+    def write_package_export(self, snapshot: ExportSnapshot, export_file: str,
+                             options: Dict[str, Any], progress: Callable[[int, str], None]):
+        """Write a zip package of all project files."""
+        with zipfile.ZipFile(export_file, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            # Add all project files
+            for root, dirs, files in os.walk(self.workflow.project_path):
+                # Skip the exports directory to avoid recursion
+                if 'exports' in root:
+                    continue
+
+                for file in files:
+                    file_path = os.path.join(root, file)
+                    # Get relative path for archive
+                    arcname = os.path.relpath(file_path, self.workflow.project_path)
+                    zipf.write(file_path, arcname)
+
+    # Streaming story access for validation and statistics
+
+    def iter_story_lines(self, transform: Optional[Callable[[str], str]] = None) -> Iterator[str]:
+        """Yield story.txt line by line, optionally transforming each line."""
+        story_file = os.path.join(self.workflow.project_path, "story.txt")
+        if not os.path.exists(story_file):
+            return
+
+        with open(story_file, 'r', encoding='utf-8') as story_f:
+            for line in story_f:
+                yield transform(line) if transform else line
+
+    def scan_story(self) -> Dict[str, int]:
+        """Count words, chapters and non-blank length of the story in one pass."""
+        metrics = {'word_count': 0, 'chapter_count': 0, 'stripped_length': 0}
+        total = leading = trailing = 0
+        seen_text = False
+
+        for line in self.iter_story_lines():
+            total += len(line)
+            metrics['word_count'] += len(line.split())
+            metrics['chapter_count'] += line.count("Chapter")
+
+            # Track surrounding whitespace so the result matches len(story.strip())
+            if line.strip():
+                if not seen_text:
+                    leading += len(line) - len(line.lstrip())
+                    seen_text = True
+                trailing = len(line) - len(line.rstrip())
+            elif seen_text:
+                trailing += len(line)
+            else:
+                leading += len(line)
+
+        if seen_text:
+            metrics['stripped_length'] = total - leading - trailing
+        return metrics
 
     def create_project_archive(self) -> bool:
         """Create a complete project archive for backup."""
@@ -597,6 +615,13 @@ class Step11CompletionExport(BaseWorkflowStep):
         except Exception as e:
             self.workflow.log_action(f"Error generating completion report: {e}")
 
+    def restore_from_artifacts(self):
+        """Mark the workflow completed again from the saved final project state."""
+        final_state = self.load_artifact("final_project_state.json") or {}
+        if final_state.get('workflow_complete') and hasattr(self.workflow, 'current_step'):
+            self.workflow.current_step = 11
+            self.workflow.workflow_completed = True
+
     def save_final_project_state(self, completion_results: Dict[str, Any]):
         """Save the final project state."""
         try:
@@ -6,9 +6,15 @@ Manages the execution and coordination of all workflow steps.
 
 import os
 import json
+import time
+import hashlib
 import logging
+import threading
 from datetime import datetime
-from typing import Dict, List, Optional, Type, Any
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Iterable, List, Optional, Set, Type, Any, Union
+
+from ..state_journal import get_state_journal, release_state_journal
 
 # Import all step classes
 from .step_01_initialization import Step01Initialization
@@ -23,13 +29,16 @@ from .step_09_progression_management import Step09ProgressionManagement
 from .step_10_recovery import Step10Recovery
 from .step_11_completion_export import Step11CompletionExport
 
+MEMO_FILENAME = "step_memo.json"
+HISTORY_FILENAME = "execution_history.json"
+
 class WorkflowStepManager:
     """
     Manages the execution and coordination of all workflow steps.
     Provides a centralized interface for step management.
     """
 
-    def __init__(self, workflow_instance):
+    def __init__(self, workflow_instance, max_workers: int = 4, memoize: bool = True):
         """Initialize the step manager with workflow instance."""
         self.workflow = workflow_instance
         self.steps = {}
@@ -37,6 +46,18 @@ class WorkflowStepManager:
         self.current_step_number = 0
         self.execution_history = []
 
+        # Independent steps run concurrently on up to max_workers threads
+        self.max_workers = max(1, max_workers)
+        self.last_schedule = {}
+        self._lock = threading.RLock()
+
+        # Steps whose declared inputs and code are unchanged since their last
+        # successful run are skipped; see execute_step(force=...)
+        self.memoize = memoize
+        self.skipped_steps = set()
+        self._memo = None
+        self._hash_cache = {}
+
         # Register all steps
         self._register_steps()
 
@@ -79,14 +100,23 @@ class WorkflowStepManager:
         """Get all registered steps in order."""
         return [self.steps[num] for num in self.step_order if num in self.steps]
 
-    def execute_step(self, step_number: int) -> bool:
-        """Execute a specific step."""
+    def execute_step(self, step_number: int, force: bool = False) -> bool:
+        """
+        Execute a specific step.
+
+        If memoization is enabled and the step's inputs and code are unchanged
+        since its last successful run, the step is skipped unless force is set.
+        """
         step = self.get_step(step_number)
         if not step:
             logging.error(f"Step {step_number} not found")
             return False
 
-        self.current_step_number = step_number
+        with self._lock:
+            self.current_step_number = step_number
+
+        if self.memoize and not force and self._reuse_memoized_result(step):
+            return True
 
         # Record execution start
         execution_record = {
@@ -108,40 +138,30 @@ class WorkflowStepManager:
             execution_record['errors'] = step.errors
             execution_record['warnings'] = step.warnings
 
-            # Add to history
-            self.execution_history.append(execution_record)
+            if success and self.memoize:
+                self._record_memo(step)
 
-            # Save execution history
-            self._save_execution_history()
+            # Add to history and save
+            with self._lock:
+                self.skipped_steps.discard(step_number)
+                self._record_execution(execution_record)
 
             return success
 
         except Exception as e:
             execution_record['end_time'] = datetime.now().isoformat()
             execution_record['errors'].append(str(e))
-            self.execution_history.append(execution_record)
-            self._save_execution_history()
+            with self._lock:
+                self._record_execution(execution_record)
 
             logging.error(f"Error executing step {step_number}: {e}")
             return False
 
-    def execute_all_steps(self) -> bool:
-        """Execute all steps in order."""
+    def execute_all_steps(self, force_steps: Union[bool, Iterable[int], None] = None) -> bool:
+        """Execute all steps, running independent steps concurrently."""
         logging.info("Starting execution of all workflow steps")
 
-        all_successful = True
-
-        for step_number in self.step_order:
-            logging.info(f"Executing step {step_number}")
-
-            success = self.execute_step(step_number)
-
-            if not success:
-                logging.error(f"Step {step_number} failed, stopping workflow")
-                all_successful = False
-                break
-
-            logging.info(f"Step {step_number} completed successfully")
+        all_successful = self.execute_scheduled_steps(self.step_order, force_steps)
 
         if all_successful:
             logging.info("All workflow steps completed successfully")
@@ -150,7 +170,8 @@ class WorkflowStepManager:
 
         return all_successful
 
-    def execute_steps_from(self, start_step: int) -> bool:
+    def execute_steps_from(self, start_step: int,
+                           force_steps: Union[bool, Iterable[int], None] = None) -> bool:
         """Execute steps starting from a specific step number."""
         logging.info(f"Starting execution from step {start_step}")
 
@@ -161,23 +182,10 @@ class WorkflowStepManager:
             logging.error(f"No steps found from step {start_step}")
             return False
 
-        all_successful = True
+        return self.execute_scheduled_steps(steps_to_execute, force_steps)
 
-        for step_number in steps_to_execute:
-            logging.info(f"Executing step {step_number}")
-
-            success = self.execute_step(step_number)
-
-            if not success:
-                logging.error(f"Step {step_number} failed, stopping workflow")
-                all_successful = False
-                break
-
-            logging.info(f"Step {step_number} completed successfully")
-
-        return all_successful
-
-    def execute_steps_range(self, start_step: int, end_step: int) -> bool:
+    def execute_steps_range(self, start_step: int, end_step: int,
+                            force_steps: Union[bool, Iterable[int], None] = None) -> bool:
         """Execute steps within a specific range."""
         logging.info(f"Executing steps {start_step} to {end_step}")
 
@@ -188,21 +196,168 @@ class WorkflowStepManager:
             logging.error(f"No steps found in range {start_step} to {end_step}")
             return False
 
+        return self.execute_scheduled_steps(steps_to_execute, force_steps)
+
+    def build_dependency_graph(self, step_numbers: List[int]) -> Dict[int, Set[int]]:
+        """
+        Build the dependency graph for a set of steps from their declared artifacts.
+
+        A step depends on an earlier step when it reads something the earlier
+        step writes, writes something the earlier step reads or writes, or
+        either step has not declared its inputs. This keeps the result of a
+        concurrent run identical to running the steps in numeric order.
+        """
+        ordered = sorted(step_numbers)
+        graph = {num: set() for num in ordered}
+
+        for index, later in enumerate(ordered):
+            later_step = self.steps[later]
+            for earlier in ordered[:index]:
+                if self._steps_conflict(self.steps[earlier], later_step):
+                    graph[later].add(earlier)
+
+        return graph
+
+    def _steps_conflict(self, earlier, later) -> bool:
+        """Check whether two steps must not run concurrently."""
+        if earlier.input_artifacts is None or later.input_artifacts is None:
+            return True
+
+        return (self._artifacts_overlap(earlier.output_artifacts, later.input_artifacts) or
+                self._artifacts_overlap(earlier.output_artifacts, later.output_artifacts) or
+                self._artifacts_overlap(earlier.input_artifacts, later.output_artifacts))
+
+    @staticmethod
+    def _artifacts_overlap(first: List[str], second: List[str]) -> bool:
+        """Check whether two artifact lists share a file or directory."""
+        for a in first:
+            for b in second:
+                if a == b:
+                    return True
+                if a.endswith('/') and b.startswith(a):
+                    return True
+                if b.endswith('/') and a.startswith(b):
+                    return True
+        return False
+
+    def execute_scheduled_steps(self, step_numbers: List[int],
+                                force_steps: Union[bool, Iterable[int], None] = None) -> bool:
+        """
+        Execute steps in dependency order on a worker pool.
+
+        A step starts as soon as all of its dependencies have succeeded. After a
+        failure no new steps are started, but steps already running finish.
+        Timings and the critical path are stored in last_schedule.
+
+        force_steps bypasses memoization: True forces every step, or pass the
+        step numbers to rerun even if their inputs are unchanged.
+        """
+        step_numbers = [num for num in step_numbers if num in self.steps]
+        if force_steps is True:
+            forced = set(step_numbers)
+        else:
+            forced = set(force_steps or [])
+        graph = self.build_dependency_graph(step_numbers)
+        # Dependencies outside the requested set are assumed to have run already
+        pending = {num: set(deps) for num, deps in graph.items()}
+        timings = {}
+        completed = set()
         all_successful = True
+        schedule_start = time.perf_counter()
 
-        for step_number in steps_to_execute:
+        def run_step(step_number):
+            started = time.perf_counter()
             logging.info(f"Executing step {step_number}")
+            success = self.execute_step(step_number, force=step_number in forced)
+            timings[step_number] = {
+                'start': started - schedule_start,
+                'end': time.perf_counter() - schedule_start
+            }
+            return success
 
-            success = self.execute_step(step_number)
-
-            if not success:
-                logging.error(f"Step {step_number} failed, stopping workflow")
-                all_successful = False
-                break
-
-            logging.info(f"Step {step_number} completed successfully")
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix="workflow-step") as executor:
+            running = {}
+
+            while pending or running:
+                if all_successful:
+                    ready = sorted(num for num, deps in pending.items() if not deps)
+                    for step_number in ready:
+                        del pending[step_number]
+                        running[executor.submit(run_step, step_number)] = step_number
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step_number = running.pop(future)
+                    try:
+                        success = future.result()
+                    except Exception as e:
+                        logging.error(f"Error executing step {step_number}: {e}")
+                        success = False
+
+                    if success:
+                        logging.info(f"Step {step_number} completed successfully")
+                        completed.add(step_number)
+                        for deps in pending.values():
+                            deps.discard(step_number)
+                    else:
+                        logging.error(f"Step {step_number} failed, stopping workflow")
+                        all_successful = False
+
+        self.last_schedule = self._summarize_schedule(
+            graph, timings, time.perf_counter() - schedule_start
+        )
+        self._save_schedule_report()
+        self.release_journal()
+        logging.info(
+            f"Executed {len(timings)} steps in {self.last_schedule['wall_seconds']:.2f}s, "
+            f"critical path {self.last_schedule['critical_path']} "
+            f"({self.last_schedule['critical_path_seconds']:.2f}s)"
+        )
+        return all_successful and len(completed) == len(graph)
+
+    def _summarize_schedule(self, graph: Dict[int, Set[int]], timings: Dict[int, Dict[str, float]],
+                            wall_seconds: float) -> Dict[str, Any]:
+        """Compute per-step durations and the critical path of a finished run."""
+        durations = {num: t['end'] - t['start'] for num, t in timings.items()}
+
+        # Longest path through the executed steps; numeric order is topological
+        path_length = {}
+        previous = {}
+        for step_number in sorted(durations):
+            best_dep = max((dep for dep in graph[step_number] if dep in path_length),
+                           key=lambda dep: path_length[dep], default=None)
+            base = path_length[best_dep] if best_dep is not None else 0.0
+            path_length[step_number] = base + durations[step_number]
+            previous[step_number] = best_dep
+
+        critical_path = []
+        if path_length:
+            step_number = max(path_length, key=path_length.get)
+            while step_number is not None:
+                critical_path.append(step_number)
+                step_number = previous[step_number]
+            critical_path.reverse()
 
-        return all_successful
+        return {
+            'dependencies': {num: sorted(deps) for num, deps in graph.items()},
+            'timings': {
+                num: {
+                    'start_seconds': round(t['start'], 4),
+                    'end_seconds': round(t['end'], 4),
+                    'duration_seconds': round(durations[num], 4),
+                    'skipped': num in self.skipped_steps
+                }
+                for num, t in sorted(timings.items())
+            },
+            'critical_path': critical_path,
+            'critical_path_seconds': round(path_length[critical_path[-1]], 4) if critical_path else 0.0,
+            'wall_seconds': round(wall_seconds, 4),
+            'max_workers': self.max_workers
+        }
 
     def get_step_status(self, step_number: int) -> Optional[Dict[str, Any]]:
         """Get the status of a specific step."""
@@ -219,7 +374,7 @@ class WorkflowStepManager:
 
         for step_number in self.step_order:
             step = self.get_step(step_number)
-            if step and step.end_time:
+            if step and (step.end_time or step_number in self.skipped_steps):
                 completed_steps += 1
 
         progress_percentage = (completed_steps / total_steps * 100) if total_steps > 0 else 0
@@ -229,7 +384,8 @@ class WorkflowStepManager:
             'completed_steps': completed_steps,
             'progress_percentage': progress_percentage,
             'current_step': self.current_step_number,
-            'execution_history': self.execution_history
+            'execution_history': self.execution_history,
+            'last_schedule': self.last_schedule
         }
 
     def pause_workflow(self):
@@ -248,6 +404,7 @@ class WorkflowStepManager:
         """Reset the workflow to initial state."""
         self.current_step_number = 0
         self.execution_history.clear()
+        self.skipped_steps.clear()
 
         # Reset all steps
         for step in self.steps.values():
@@ -258,31 +415,225 @@ class WorkflowStepManager:
 
         logging.info("Workflow reset to initial state")
 
-    def _save_execution_history(self):
-        """Save execution history to file."""
+    # Memoization
+
+    def _reuse_memoized_result(self, step) -> bool:
+        """Skip a step whose recorded inputs, settings and code still match."""
+        if step.input_artifacts is None or not self.workflow.project_path:
+            return False
+
+        with self._lock:
+            entry = self._load_memo().get(str(step.step_number))
+        if not entry:
+            return False
+
+        try:
+            if entry.get('code_version') != step.get_code_version():
+                return False
+            if entry.get('settings') != self._hash_settings(step):
+                return False
+            if entry.get('inputs') != self._hash_inputs(step):
+                return False
+            for artifact in step.output_artifacts:
+                if not os.path.exists(os.path.join(self.workflow.project_path, artifact)):
+                    return False
+
+            # Put back step data that was recorded but has since been removed
+            step_data_file = self._step_data_path(step)
+            if entry.get('step_data') is not None and not os.path.exists(step_data_file):
+                with open(step_data_file, 'w', encoding='utf-8') as f:
+                    json.dump(entry['step_data'], f, indent=2, ensure_ascii=False)
+
+            step.restore_from_artifacts()
+
+        except Exception as e:
+            logging.warning(f"Cannot reuse memoized result for step {step.step_number}: {e}")
+            return False
+
+        logging.info(f"Step {step.step_number} inputs unchanged since "
+                     f"{entry.get('recorded_at')}, skipping")
+
+        with self._lock:
+            self.skipped_steps.add(step.step_number)
+            now = datetime.now().isoformat()
+            self._record_execution({
+                'step_number': step.step_number,
+                'start_time': now,
+                'success': True,
+                'end_time': now,
+                'skipped': True,
+                'errors': [],
+                'warnings': []
+            })
+
+        return True
+
+    def _record_memo(self, step):
+        """Record the inputs a successful step ran against."""
+        if step.input_artifacts is None or not self.workflow.project_path:
+            return
+
+        try:
+            step_data = None
+            step_data_file = self._step_data_path(step)
+            if os.path.exists(step_data_file):
+                with open(step_data_file, 'r', encoding='utf-8') as f:
+                    step_data = json.load(f)
+
+            # Hashed after the run so steps that rewrite their own inputs
+            # (e.g. synopsis refinement) are reusable on the next run
+            entry = {
+                'code_version': step.get_code_version(),
+                'settings': self._hash_settings(step),
+                'inputs': self._hash_inputs(step),
+                'step_data': step_data,
+                'recorded_at': datetime.now().isoformat()
+            }
+
+            with self._lock:
+                self._load_memo()[str(step.step_number)] = entry
+                self._save_memo()
+
+        except Exception as e:
+            logging.error(f"Error recording memo for step {step.step_number}: {e}")
+
+    def invalidate_step(self, step_number: int):
+        """Forget the memoized result of a step so it runs next time."""
+        with self._lock:
+            if self._load_memo().pop(str(step_number), None) is not None:
+                self._save_memo()
+
+    def clear_memo(self):
+        """Forget all memoized step results."""
+        with self._lock:
+            self._memo = {}
+            self._save_memo()
+
+    def _step_data_path(self, step) -> str:
+        """Get the path of a step's step_XX_data.json file."""
+        return os.path.join(self.workflow.project_path, f"step_{step.step_number:02d}_data.json")
+
+    def _hash_settings(self, step) -> str:
+        """Hash the workflow settings a step depends on."""
+        settings = json.dumps(step.get_input_settings(), sort_keys=True, default=str)
+        return hashlib.sha256(settings.encode('utf-8')).hexdigest()
+
+    def _hash_inputs(self, step) -> Dict[str, Optional[str]]:
+        """Hash each declared input artifact of a step."""
+        return {artifact: self._hash_artifact(artifact) for artifact in step.input_artifacts}
+
+    def _hash_artifact(self, artifact: str) -> Optional[str]:
+        """Hash a project file or directory; None if it does not exist."""
+        path = os.path.join(self.workflow.project_path, artifact)
+
+        if artifact.endswith('/'):
+            if not os.path.isdir(path):
+                return None
+            digest = hashlib.sha256()
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for filename in sorted(files):
+                    file_path = os.path.join(root, filename)
+                    digest.update(os.path.relpath(file_path, path).encode('utf-8'))
+                    digest.update((self._hash_file(file_path) or '').encode('ascii'))
+            return digest.hexdigest()
+
+        return self._hash_file(path)
+
+    def _hash_file(self, path: str) -> Optional[str]:
+        """Hash a file, reusing the previous digest if size and mtime are unchanged."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            cached = self._hash_cache.get(path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+
+        with self._lock:
+            self._hash_cache[path] = (stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+        return digest.hexdigest()
+
+    def _load_memo(self) -> Dict[str, Any]:
+        """Load the memo table from the project, once."""
+        if self._memo is None:
+            self._memo = {}
+            memo_file = os.path.join(self.workflow.project_path or '', MEMO_FILENAME)
+            if self.workflow.project_path and os.path.exists(memo_file):
+                try:
+                    with open(memo_file, 'r', encoding='utf-8') as f:
+                        self._memo = json.load(f)
+                except (OSError, json.JSONDecodeError) as e:
+                    logging.warning(f"Ignoring unreadable step memo: {e}")
+        return self._memo
+
+    def _save_memo(self):
+        """Atomically write the memo table."""
+        if not self.workflow.project_path:
+            return
+
+        memo_file = os.path.join(self.workflow.project_path, MEMO_FILENAME)
+        temp_file = memo_file + ".tmp"
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(self._memo, f, indent=2, ensure_ascii=False)
+            os.replace(temp_file, memo_file)
+        except OSError as e:
+            logging.error(f"Error saving step memo: {e}")
+
+    def _record_execution(self, execution_record: Dict[str, Any]):
+        """Add a record to the execution history and append it to the state journal."""
+        self.execution_history.append(execution_record)
         try:
             if not self.workflow.project_path:
                 return
 
-            history_file = os.path.join(self.workflow.project_path, "execution_history.json")
-
-            with open(history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.execution_history, f, indent=2, ensure_ascii=False)
+            get_state_journal(self.workflow.project_path).append(HISTORY_FILENAME, execution_record)
 
         except Exception as e:
             logging.error(f"Error saving execution history: {e}")
 
+    def _save_schedule_report(self):
+        """Save timings and critical path of the last scheduled run."""
+        try:
+            if not self.workflow.project_path:
+                return
+
+            report_file = os.path.join(self.workflow.project_path, "execution_schedule.json")
+
+            with open(report_file, 'w', encoding='utf-8') as f:
+                json.dump(self.last_schedule, f, indent=2, ensure_ascii=False)
+
+        except Exception as e:
+            logging.error(f"Error saving execution schedule: {e}")
+
+    def compact_journal(self):
+        """Write all journaled state to its files and truncate the journal."""
+        if self.workflow.project_path:
+            get_state_journal(self.workflow.project_path).compact()
+
+    def release_journal(self):
+        """Compact the project's journal and close it until the next run needs it."""
+        if self.workflow.project_path:
+            release_state_journal(self.workflow.project_path)
+
     def load_execution_history(self):
         """Load execution history from file."""
         try:
             if not self.workflow.project_path:
                 return
 
-            history_file = os.path.join(self.workflow.project_path, "execution_history.json")
+            history = get_state_journal(self.workflow.project_path).read(HISTORY_FILENAME)
 
-            if os.path.exists(history_file):
-                with open(history_file, 'r', encoding='utf-8') as f:
-                    self.execution_history = json.load(f)
+            if history is not None:
+                self.execution_history = history
 
                 logging.info(f"Loaded {len(self.execution_history)} execution records")
 
@@ -0,0 +1,321 @@
+"""
+Section-addressable access to story.txt.
+
+The store keeps story_index.json next to the story: the byte offsets of every
+chapter/section header, plus the size and mtime of the story it describes.
+Readers seek straight to a section instead of reading and splitting the whole
+manuscript, and a section can be replaced by rewriting only the bytes from
+that section to the end of the file.
+
+Two header styles are indexed:
+- "=== Chapter N, Section M ===" written by the automated novel workflow
+- "Chapter N..." (optionally "#"-prefixed) chapter headings, indexed as section 0
+
+If story.txt is modified by anything other than the store, the size/mtime
+check fails and the index is rebuilt with a single streaming pass.
+"""
+
+import os
+import re
+import json
+import logging
+import threading
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+INDEX_FILENAME = "story_index.json"
+INDEX_VERSION = 1
+
+SECTION_HEADER = re.compile(rb'^=== Chapter (\d+), Section (\d+) ===[ \t]*\r?$')
+CHAPTER_HEADER = re.compile(rb'^(?:#+[ \t]*)?Chapter (\d+)\b')
+
+
+class StoryStore:
+    """Byte-offset index over a project's story.txt."""
+
+    def __init__(self, project_dir: str, filename: str = "story.txt",
+                 index_filename: str = INDEX_FILENAME):
+        self.project_dir = project_dir
+        self.story_path = os.path.join(project_dir, filename)
+        self.index_path = os.path.join(project_dir, index_filename)
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.RLock()
+        self._index: Optional[Dict[str, Any]] = None
+
+    # Index maintenance
+
+    def get_sections(self) -> List[Dict[str, Any]]:
+        """Get the indexed headers in file order."""
+        with self._lock:
+            return [dict(entry) for entry in self._load_index()['sections']]
+
+    def rebuild_index(self) -> Dict[str, Any]:
+        """Rebuild the index with one streaming pass over story.txt."""
+        with self._lock:
+            sections = []
+            offset = 0
+            if os.path.exists(self.story_path):
+                with open(self.story_path, 'rb') as f:
+                    for line in f:
+                        entry = self._parse_header(line, offset)
+                        if entry:
+                            sections.append(entry)
+                        offset += len(line)
+
+            self._index = {'version': INDEX_VERSION, 'sections': sections}
+            self._save_index()
+            return self._index
+
+    def _load_index(self) -> Dict[str, Any]:
+        """Get the index, rebuilding it if story.txt changed behind our back."""
+        if self._index is None and os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+                if index.get('version') == INDEX_VERSION:
+                    self._index = index
+            except (OSError, json.JSONDecodeError) as e:
+                self.logger.warning(f"Ignoring unreadable story index: {e}")
+
+        if self._index is None or self._index.get('story_stat') != self._story_stat():
+            return self.rebuild_index()
+
+        return self._index
+
+    def _save_index(self):
+        """Atomically write the index, stamped with the current story size/mtime."""
+        self._index['story_stat'] = self._story_stat()
+        temp_path = self.index_path + ".tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._index, f)
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            self.logger.error(f"Failed to write story index {self.index_path}: {e}")
+
+    def _story_stat(self) -> Optional[List[int]]:
+        """Get [size, mtime_ns] of story.txt, or None if it does not exist."""
+        try:
+            stat = os.stat(self.story_path)
+            return [stat.st_size, stat.st_mtime_ns]
+        except OSError:
+            return None
+
+    @staticmethod
+    def _parse_header(line: bytes, offset: int) -> Optional[Dict[str, Any]]:
+        """Index entry for a header line starting at offset, if it is one."""
+        match = SECTION_HEADER.match(line)
+        if match:
+            chapter, section = int(match.group(1)), int(match.group(2))
+        else:
+            match = CHAPTER_HEADER.match(line)
+            if not match:
+                return None
+            chapter, section = int(match.group(1)), 0
+
+        return {
+            'chapter': chapter,
+            'section': section,
+            'offset': offset,
+            'content_offset': offset + len(line)
+        }
+
+    # Writing
+
+    def append(self, text: str) -> int:
+        """
+        Append text to story.txt and index any headers it contains.
+
+        Returns the byte offset the text was written at.
+        """
+        data = text.encode('utf-8')
+        with self._lock:
+            index = self._load_index()
+            start = os.path.getsize(self.story_path) if os.path.exists(self.story_path) else 0
+
+            # A header only counts at the start of a line
+            at_line_start = start == 0 or self._read_bytes(start - 1, 1) == b'\n'
+
+            with open(self.story_path, 'ab') as f:
+                f.write(data)
+
+            offset = start
+            for line in data.splitlines(keepends=True):
+                if at_line_start:
+                    entry = self._parse_header(line, offset)
+                    if entry:
+                        index['sections'].append(entry)
+                offset += len(line)
+                at_line_start = line.endswith(b'\n')
+
+            self._save_index()
+            return start
+
+    def append_section(self, chapter: int, section: int, content: str) -> int:
+        """Append a section with a standard header."""
+        return self.append(f"\n\n=== Chapter {chapter}, Section {section} ===\n\n{content}")
+
+    def replace_section(self, chapter: int, section: int, content: str) -> bool:
+        """
+        Replace the body of one section in place.
+
+        Only the bytes from the section to the end of the file are rewritten,
+        and later index entries are shifted by the change in length. Newlines
+        separating the section from its neighbours are preserved.
+        """
+        with self._lock:
+            index = self._load_index()
+            position = self._find(index, chapter, section)
+            if position is None:
+                return False
+
+            start, end = self._body_range(index, position)
+            body = self._read_bytes(start, end - start)
+            leading = body[:len(body) - len(body.lstrip(b'\r\n'))]
+            trailing = body[len(body.rstrip(b'\r\n')):] if body.strip(b'\r\n') else b''
+            new_body = leading + content.encode('utf-8') + trailing
+
+            with open(self.story_path, 'r+b') as f:
+                f.seek(end)
+                tail = f.read()
+                f.seek(start)
+                f.write(new_body)
+                f.write(tail)
+                f.truncate()
+                f.flush()
+                os.fsync(f.fileno())
+
+            delta = len(new_body) - len(body)
+            for entry in index['sections'][position + 1:]:
+                entry['offset'] += delta
+                entry['content_offset'] += delta
+
+            self._save_index()
+            return True
+
+    def replace_chapter(self, chapter: int, content: str) -> bool:
+        """
+        Write an edited copy of read_chapter() back section by section.
+
+        The content must keep the chapter's headers in order; only sections
+        whose body changed are replaced. Returns False and leaves the story
+        untouched if the headers do not match the index.
+        """
+        bodies = []
+        offset = 0
+        for line in content.encode('utf-8').splitlines(keepends=True):
+            entry = self._parse_header(line, offset)
+            if entry:
+                bodies.append([(entry['chapter'], entry['section']), b''])
+            elif bodies:
+                bodies[-1][1] += line
+            elif line.strip():
+                return False  # Text before the first header has nowhere to go
+            offset += len(line)
+
+        with self._lock:
+            expected = [(entry['chapter'], entry['section'])
+                        for entry in self._load_index()['sections'] if entry['chapter'] == chapter]
+            # Repeated headers cannot be addressed individually
+            if not expected or len(set(expected)) != len(expected):
+                return False
+            if [key for key, _ in bodies] != expected:
+                return False
+
+            for (chapter_number, section), body in bodies:
+                text = body.decode('utf-8').strip('\r\n')
+                if self.read_section(chapter_number, section) != text:
+                    self.replace_section(chapter_number, section, text)
+            return True
+
+    # Reading
+
+    def has_section(self, chapter: int, section: int) -> bool:
+        """Check whether a section is indexed."""
+        with self._lock:
+            return self._find(self._load_index(), chapter, section) is not None
+
+    def read_section(self, chapter: int, section: int) -> Optional[str]:
+        """Read the body of one section without its header, or None if absent."""
+        with self._lock:
+            index = self._load_index()
+            position = self._find(index, chapter, section)
+            if position is None:
+                return None
+            start, end = self._body_range(index, position)
+            return self._read_bytes(start, end - start).decode('utf-8').strip('\r\n')
+
+    def read_chapter(self, chapter: int) -> Optional[str]:
+        """Read a whole chapter including its headers, or None if absent."""
+        with self._lock:
+            sections = self._load_index()['sections']
+            positions = [i for i, entry in enumerate(sections) if entry['chapter'] == chapter]
+            if not positions:
+                return None
+
+            start = sections[positions[0]]['offset']
+            end = self._entry_end(sections, self._chapter_end(sections, positions[-1]))
+            return self._read_bytes(start, end - start).decode('utf-8').rstrip('\r\n')
+
+    def iter_sections(self) -> Iterator[Tuple[int, int, str]]:
+        """Yield (chapter, section, body) for every indexed section in file order."""
+        for entry in self.get_sections():
+            body = self.read_section(entry['chapter'], entry['section'])
+            if body is not None:
+                yield entry['chapter'], entry['section'], body
+
+    def read_tail_words(self, count: int, chunk_size: int = 8192) -> str:
+        """Read the last count words, reading backwards from the end of the file."""
+        with self._lock:
+            if not os.path.exists(self.story_path):
+                return ""
+
+            size = os.path.getsize(self.story_path)
+            read = min(size, chunk_size)
+            while True:
+                text = self._read_bytes(size - read, read).decode('utf-8', errors='ignore')
+                if read == size:
+                    words = text.split()
+                    return " ".join(words[-count:]) if len(words) > count else text
+
+                # Drop a word that may have been cut by the read boundary
+                words = text.split()[1:]
+                if len(words) >= count:
+                    return " ".join(words[-count:])
+                read = min(size, read * 2)
+
+    # Helpers
+
+    @staticmethod
+    def _find(index: Dict[str, Any], chapter: int, section: int) -> Optional[int]:
+        """Position of the last entry for a chapter/section in the index."""
+        found = None
+        for position, entry in enumerate(index['sections']):
+            if entry['chapter'] == chapter and entry['section'] == section:
+                found = position
+        return found
+
+    @staticmethod
+    def _chapter_end(sections: List[Dict[str, Any]], position: int) -> int:
+        """Position of the last entry before the next chapter starts."""
+        chapter = sections[position]['chapter']
+        while position + 1 < len(sections) and sections[position + 1]['chapter'] == chapter:
+            position += 1
+        return position
+
+    def _entry_end(self, sections: List[Dict[str, Any]], position: int) -> int:
+        """Byte offset where an entry's body ends."""
+        if position + 1 < len(sections):
+            return sections[position + 1]['offset']
+        return os.path.getsize(self.story_path)
+
+    def _body_range(self, index: Dict[str, Any], position: int) -> Tuple[int, int]:
+        """Byte range of an entry's body (after the header line)."""
+        sections = index['sections']
+        return sections[position]['content_offset'], self._entry_end(sections, position)
+
+    def _read_bytes(self, offset: int, length: int) -> bytes:
+        """Read length bytes of story.txt starting at offset."""
+        with open(self.story_path, 'rb') as f:
+            f.seek(offset)
+            return f.read(length)
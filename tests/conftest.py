@@ -164,6 +164,17 @@ def assert_directory_exists(dir_path):
     """Assert that a directory exists"""
     assert os.path.isdir(dir_path), f"Directory should exist: {dir_path}"
 
+def export_project(project, formats, options=None, progress_callback=None):
+    """Export a project's story to <project>/out/novel.* and assert every format succeeded"""
+    from src.export_formats.engine import ExportSnapshot
+    from src.export_formats.writers import create_export_engine
+
+    engine = create_export_engine(ExportSnapshot.load(project), formats,
+                                  os.path.join(project, "out"), "novel", options)
+    results = engine.run(progress_callback)
+    assert all(result['success'] for result in results), results
+    return results
+
 
 # Database cleanup fixture
 @pytest.fixture(scope="function", autouse=True)
@@ -8,6 +8,7 @@ import os
 import sys
 import tempfile
 import shutil
+import json
 from datetime import datetime
 
 # Add parent directory to path
@@ -83,18 +84,16 @@ class TestAutomatedNovelWorkflow:
                 target_words=100000
             )
             
-            # Update config
+            # Update config; the file is only written at step boundaries
             workflow.update_config("TestKey", "TestValue")
             
             config_file = os.path.join(tmpdir, "config.txt")
-            assert os.path.exists(config_file)
-            
-            with open(config_file, 'r') as f:
-                content = f.read()
-                assert "TestKey: TestValue" in content
+            assert not os.path.exists(config_file)
+            assert "TestKey: TestValue" in workflow.journal.read("config.txt")
             
             # Update existing key
             workflow.update_config("TestKey", "NewValue")
+            workflow.journal.materialize("config.txt")
             
             with open(config_file, 'r') as f:
                 content = f.read()
@@ -102,6 +101,149 @@ class TestAutomatedNovelWorkflow:
                 # Should not have duplicate keys
                 assert content.count("TestKey:") == 1
 
+    def test_checkpoint_resume(self):
+        """Test resuming from a checkpoint truncates uncommitted story text"""
+        from src.workflow.automated_novel_workflow import (
+            AutomatedNovelWorkflowThread, create_resumed_workflow_thread
+        )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            workflow = AutomatedNovelWorkflowThread(
+                project_dir=tmpdir,
+                idea="Test",
+                tone="test",
+                target_words=100000
+            )
+            workflow.save_to_file("synopsis.txt", "A synopsis")
+            workflow.save_to_file("characters.txt", '[{"Name": "Hero"}]')
+
+            # Chapter 1, Section 5 approved -> cursor moves to Chapter 2, Section 1
+            workflow.append_to_story("Committed section")
+            workflow.save_checkpoint(*workflow.next_cursor(1, 5))
+            workflow.save_checkpoint(2, 1, in_flight_draft="Pending draft")
+
+            # Simulate a crash halfway through the next append
+            workflow.append_to_story("Partial sect")
+
+            resumed = create_resumed_workflow_thread(tmpdir)
+            assert resumed is not None
+            assert resumed.resuming
+            assert (resumed.current_chapter, resumed.current_section) == (2, 1)
+            assert resumed.synopsis == "A synopsis"
+            assert resumed.characters == [{"Name": "Hero"}]
+            assert resumed.pop_in_flight_draft(2, 1) == "Pending draft"
+
+            with open(os.path.join(tmpdir, "story.txt"), 'r') as f:
+                assert f.read() == "Committed section"
+
+    def test_resume_keeps_requested_provider(self):
+        """Test a resumed run uses the provider settings it was started with"""
+        from src.workflow.automated_novel_workflow import (
+            AutomatedNovelWorkflowThread, create_resumed_workflow_thread
+        )
+        from src.workflow.state_journal import _journals
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            workflow = AutomatedNovelWorkflowThread(
+                project_dir=tmpdir, idea="Test", tone="test", target_words=100000,
+                ai_provider="ollama", ollama_model="mistral", ollama_url="http://gpu:11434"
+            )
+            workflow.save_to_file("synopsis.txt", "A synopsis")
+            workflow.save_checkpoint(1, 1)
+
+            resumed = create_resumed_workflow_thread(tmpdir)
+            assert resumed.requested_provider == ("ollama", "mistral", "http://gpu:11434")
+
+            # Threads that never run do not hold the project's journal open
+            assert os.path.abspath(tmpdir) not in _journals
+
+    def test_resume_without_checkpoint(self):
+        """Test resume returns None when no checkpoint exists"""
+        from src.workflow.automated_novel_workflow import create_resumed_workflow_thread
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            assert create_resumed_workflow_thread(tmpdir) is None
+
+    def test_auto_approve_does_not_block(self):
+        """Test auto-approval returns immediately without GUI interaction"""
+        from src.workflow.automated_novel_workflow import AutomatedNovelWorkflowThread
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            workflow = AutomatedNovelWorkflowThread(
+                project_dir=tmpdir,
+                idea="Test",
+                tone="test",
+                target_words=100000,
+                auto_approve=True
+            )
+            workflow.wait_for_approval("synopsis")
+            assert workflow.approval_received
+
+
+class TestHeadlessBatchRunner:
+    """Test the headless batch runner"""
+
+    def test_manifest_entries_normalized(self):
+        """Test manifest entries get defaults and safe directory names"""
+        from src.workflow.batch_runner import HeadlessNovelRunner
+
+        runner = HeadlessNovelRunner([{"name": "My Novel!", "idea": "Test"}], "unused")
+        spec = runner.novels[0]
+        assert spec['name'] == "My_Novel_"
+        assert spec['provider'] == "openai"
+        assert spec['target_words'] == 100000
+
+        with pytest.raises(ValueError):
+            HeadlessNovelRunner([{"name": "No idea"}], "unused")
+
+    def test_duplicate_project_names_rejected(self):
+        """Test entries that would share a project directory are rejected"""
+        from src.workflow.batch_runner import HeadlessNovelRunner
+
+        for names in (["same", "same"], ["a b", "a_b"], [None, "novel_001"]):
+            with pytest.raises(ValueError):
+                HeadlessNovelRunner([{"name": name, "idea": "Test"} for name in names], "unused")
+
+        runner = HeadlessNovelRunner([{"idea": "One"}, {"idea": "Two"}], "unused")
+        assert [spec['name'] for spec in runner.novels] == ["novel_001", "novel_002"]
+
+    def test_provider_budget_shared(self):
+        """Test the same semaphore is handed out per provider"""
+        from src.workflow.batch_runner import ProviderBudget
+
+        budget = ProviderBudget({"ollama": 2})
+        assert budget.semaphore("ollama") is budget.semaphore("ollama")
+        assert budget.semaphore("ollama") is not budget.semaphore("openai")
+
+    def test_batch_run_writes_progress(self):
+        """Test a small batch completes and writes per-novel progress"""
+        from src.workflow.batch_runner import HeadlessNovelRunner
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            runner = HeadlessNovelRunner(
+                [{"name": "one", "idea": "A", "provider": "simulation"},
+                 {"name": "two", "idea": "B", "provider": "simulation"}],
+                tmpdir, max_workers=2
+            )
+            create_workflow = runner._create_workflow
+
+            def small_workflow(spec, project_dir):
+                workflow = create_workflow(spec, project_dir)
+                workflow.total_chapters = 1
+                workflow.sections_per_chapter = 2
+                return workflow
+
+            runner._create_workflow = small_workflow
+            report = runner.run()
+
+            assert report['completed'] == 2
+            assert os.path.exists(os.path.join(tmpdir, "batch_report.json"))
+            for name in ("one", "two"):
+                with open(os.path.join(tmpdir, name, "progress.json"), 'r') as f:
+                    progress = json.load(f)
+                assert progress['status'] == "completed"
+                assert progress['progress'] == 100
+
 
 class TestAutomatedNovelGUI:
     """Test the automated novel GUI (without display)"""
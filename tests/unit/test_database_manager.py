@@ -0,0 +1,483 @@
+"""
+Unit tests for the DatabaseManager query cache, bulk writes, single writer,
+query profiling, index advice, metric rollups and attached component stores
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.database.database_manager import (
+    DatabaseConfig, DatabaseManager, QueryCache, QueryStats, SchemaStore, merge_rollups,
+    normalize_query, suggest_index_columns
+)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = DatabaseManager(DatabaseConfig(database_path=str(tmp_path / "test.db"), pool_size=2))
+    manager.execute_query(
+        "INSERT INTO projects (name, created_date, last_modified) VALUES (?, ?, ?)",
+        ("Novel", "2024-01-01", "2024-01-01"), fetch="none"
+    )
+    yield manager
+    manager.close()
+
+
+def count_queries(manager):
+    return len(manager.get_query_metrics())
+
+
+class TestQueryCache:
+    """Bounded LRU behaviour"""
+
+    def test_lru_eviction_and_memory_bound(self):
+        cache = QueryCache(max_entries=2)
+        for n in range(3):
+            key = cache.make_key("SELECT ?", (n,), "all")
+            cache.put(key, [(n,)], frozenset({'t'}), cache.generation(frozenset({'t'})))
+
+        assert len(cache) == 2
+        assert cache.get(cache.make_key("SELECT ?", (0,), "all")) is None
+        assert cache.get(cache.make_key("SELECT ?", (2,), "all")) == [(2,)]
+        assert cache.get_stats()['evictions'] == 1
+
+        small = QueryCache(max_bytes=4000)
+        key = small.make_key("SELECT big", None, "all")
+        small.put(key, [("x" * 2000,)], frozenset({'t'}), small.generation(frozenset({'t'})))
+        assert small.get(key) is None  # larger than a quarter of the budget
+
+    def test_write_during_read_is_not_cached(self):
+        cache = QueryCache()
+        tables = frozenset({'t'})
+        generation = cache.generation(tables)
+        cache.invalidate(['t'])
+        cache.put("key", [(1,)], tables, generation)
+        assert cache.get("key") is None
+
+    def test_ttl(self):
+        cache = QueryCache(ttl=0)
+        cache.put("key", [(1,)], frozenset({'t'}), cache.generation(frozenset({'t'})))
+        assert cache.get("key") is None
+
+
+class TestDatabaseManagerCache:
+    """Caching and invalidation through execute_query"""
+
+    def test_parameterized_queries_are_cached(self, manager):
+        query = "SELECT name, word_count FROM projects WHERE name = ?"
+        first = manager.execute_query(query, ("Novel",))
+        executed = count_queries(manager)
+
+        assert manager.execute_query(query, ("Novel",)) == first
+        assert count_queries(manager) == executed
+        assert manager.execute_query(query, ("Other",)) == []
+        assert count_queries(manager) == executed + 1
+
+    def test_writes_invalidate_readers(self, manager):
+        query = "SELECT word_count FROM projects WHERE name = ?"
+        unrelated = "SELECT COUNT(*) FROM api_usage"
+        assert manager.execute_query(query, ("Novel",), fetch="one")[0] == 0
+        manager.execute_query(unrelated)
+
+        manager.execute_query("UPDATE projects SET word_count = ? WHERE name = ?",
+                              (500, "Novel"), fetch="none")
+
+        assert manager.execute_query(query, ("Novel",), fetch="one")[0] == 500
+        stats = manager.get_database_stats()['query_cache']
+        assert stats['invalidations'] == 1
+        assert stats['entries'] == 2  # the api_usage count survived
+
+    def test_transactions_and_views_invalidate(self, manager):
+        manager.execute_query("CREATE VIEW active_projects AS SELECT name FROM projects "
+                              "WHERE status = 'active'", fetch="none")
+        assert len(manager.execute_query("SELECT * FROM active_projects")) == 1
+
+        manager.execute_transaction([
+            ("INSERT INTO projects (name, created_date, last_modified) VALUES (?, ?, ?)",
+             ("Sequel", "2024-02-01", "2024-02-01"))
+        ])
+        assert len(manager.execute_query("SELECT * FROM active_projects")) == 2
+
+    def test_volatile_queries_are_not_cached(self, manager):
+        manager.execute_query("SELECT name, random() FROM projects")
+        manager.execute_query("SELECT name, random() FROM projects")
+        assert manager.get_database_stats()['query_cache']['entries'] == 0
+
+    def test_cached_results_are_copies(self, manager):
+        query = "SELECT name FROM projects"
+        manager.execute_query(query).clear()
+        assert len(manager.execute_query(query)) == 1
+
+    def test_stats(self, manager):
+        query = "SELECT name FROM projects"
+        for _ in range(4):
+            manager.execute_query(query)
+
+        stats = manager.get_database_stats()
+        assert stats['cache_size'] == 1
+        assert stats['query_cache']['hit_ratio'] == pytest.approx(3 / 4)
+        assert stats['query_cache']['memory_bytes'] > 0
+
+
+API_USAGE_INSERT = ("INSERT INTO api_usage (project_id, api_type, timestamp, tokens_used) "
+                    "VALUES (?, ?, ?, ?)")
+
+
+def usage_rows(count):
+    return ((1, "openai", f"2024-01-01T00:00:{n:06d}", n) for n in range(count))
+
+
+class TestBulkWrites:
+    """execute_many and bulk_upsert"""
+
+    def test_execute_many_chunks_in_one_transaction(self, manager):
+        count_query = "SELECT COUNT(*) FROM api_usage"
+        assert manager.execute_query(count_query, fetch="one")[0] == 0
+
+        assert manager.execute_many(API_USAGE_INSERT, usage_rows(1050), chunk_size=100) == 1050
+        # The cached count was invalidated by the bulk insert
+        assert manager.execute_query(count_query, fetch="one")[0] == 1050
+
+    def test_execute_many_rolls_back_on_error(self, manager):
+        rows = list(usage_rows(10)) + [(1, None, "2024-01-02", 0)]  # api_type is NOT NULL
+        with pytest.raises(Exception):
+            manager.execute_many(API_USAGE_INSERT, rows, chunk_size=4)
+        assert not manager.get_query_metrics()[-1].success
+        assert manager.execute_query("SELECT COUNT(*) FROM api_usage", fetch="one")[0] == 0
+
+    def test_bulk_upsert(self, manager):
+        rows = [{'name': name, 'created_date': "2024-01-01", 'last_modified': "2024-01-01",
+                 'word_count': words} for name, words in (("Novel", 100), ("Sequel", 5))]
+        assert manager.bulk_upsert("projects", rows, ["name"], ["word_count"]) == 2
+
+        result = manager.execute_query("SELECT name, word_count FROM projects ORDER BY id")
+        assert [tuple(row) for row in result] == [("Novel", 100), ("Sequel", 5)]
+
+        rows[0]['word_count'] = 999
+        manager.bulk_upsert("projects", rows, ["name"], update_columns=[])
+        assert manager.execute_query("SELECT word_count FROM projects WHERE name = ?",
+                                     ("Novel",), fetch="one")[0] == 100
+        assert manager.bulk_upsert("projects", [], ["name"]) == 0
+
+    def test_build_upsert_quotes_identifiers(self):
+        query = DatabaseManager.build_upsert("t", ["k", 'odd"name'], ["k"])
+        assert query == ('INSERT INTO "t" ("k", "odd""name") VALUES (?, ?) ON CONFLICT ("k") '
+                         'DO UPDATE SET "odd""name" = excluded."odd""name"')
+
+    @pytest.mark.slow
+    def test_benchmark_rows_per_second(self, manager):
+        rows = 5000
+
+        start = time.perf_counter()
+        for row in usage_rows(rows):
+            manager.execute_query(API_USAGE_INSERT, row, fetch="none")
+        single = rows / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        manager.execute_many(API_USAGE_INSERT, usage_rows(rows))
+        bulk = rows / (time.perf_counter() - start)
+
+        print(f"\nexecute_query: {single:,.0f} rows/s, execute_many: {bulk:,.0f} rows/s")
+        assert bulk > 5 * single
+
+
+class TestSingleWriter:
+    """Queued group-commit writes and read-only pooled connections"""
+
+    def test_pooled_connections_are_read_only(self, manager):
+        with manager.get_connection() as conn:
+            with pytest.raises(sqlite3.OperationalError, match="readonly"):
+                conn.connection.execute("DELETE FROM projects")
+
+    def test_concurrent_writers_share_transactions(self, manager):
+        futures = []
+        lock = threading.Lock()
+
+        def log_usage(worker):
+            for n in range(50):
+                future = manager.submit_query(API_USAGE_INSERT, (1, f"api{worker}", f"t{n}", n))
+                with lock:
+                    futures.append(future)
+
+        threads = [threading.Thread(target=log_usage, args=(worker,)) for worker in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert all(future.result(timeout=10) == 1 for future in futures)
+        assert manager.execute_query("SELECT COUNT(*) FROM api_usage", fetch="one")[0] == 400
+        stats = manager.get_database_stats()['writer']
+        assert stats['writes'] >= 400
+        assert stats['transactions'] < stats['writes']
+
+    def test_failed_write_only_fails_its_future(self, manager):
+        release = threading.Event()
+        manager.writer.submit(lambda connection: release.wait(10))
+        good = manager.submit_query(API_USAGE_INSERT, (1, "openai", "t1", 1))
+        bad = manager.submit_query(API_USAGE_INSERT, (1, None, "t2", 2))
+        also_good = manager.submit_transaction([(API_USAGE_INSERT, (1, "openai", "t3", 3))])
+        release.set()
+
+        assert good.result(timeout=10) == 1 and also_good.result(timeout=10)
+        with pytest.raises(sqlite3.IntegrityError):
+            bad.result(timeout=10)
+        rows = manager.execute_query("SELECT timestamp FROM api_usage ORDER BY id")
+        assert [row[0] for row in rows] == ["t1", "t3"]
+        assert manager.get_database_stats()['writer']['largest_batch'] >= 3
+
+    def test_statements_outside_transactions(self, manager):
+        manager.execute_query("VACUUM", fetch="none")
+        manager.execute_query("PRAGMA user_version = 7", fetch="none")
+        assert manager.execute_query("PRAGMA user_version", fetch="one")[0] == 7
+
+    def test_closed_writer_rejects_writes(self, manager):
+        future = manager.submit_query(API_USAGE_INSERT, (1, "openai", "t1", 1))
+        manager.writer.close()
+        assert future.result(timeout=0) == 1
+        with pytest.raises(RuntimeError):
+            manager.submit_query(API_USAGE_INSERT, (1, "openai", "t2", 2))
+
+
+class TestQueryProfiling:
+    """Fingerprints, percentiles and the slow query log"""
+
+    def test_normalize_query(self):
+        assert normalize_query(
+            "SELECT * FROM t1 WHERE a = 5 AND b = 'it''s -- not a comment' "
+            "AND c IN (1, 2.5, 3) -- trailing\n"
+        ) == "select * from t1 where a = ? and b = ? and c in (?)"
+        assert normalize_query("INSERT INTO t (a, b) VALUES (?, ?), (:x, X'00');") == \
+            normalize_query("insert into t (a, b)\n  values (1, 'two')")
+
+    def test_percentiles(self):
+        stats = QueryStats("f", "select ?")
+        for n in range(1, 101):
+            stats.add(n / 1000, 1, True)
+        summary = stats.to_dict()
+        assert (summary['p50'], summary['p95'], summary['p99']) == (0.05, 0.095, 0.099)
+        assert summary['count'] == 100 and summary['max_time'] == 0.1
+
+    def test_stats_are_grouped_by_fingerprint(self, manager):
+        for name in ("Novel", "Other", "Third"):
+            manager.execute_query("SELECT * FROM projects WHERE name = ?", (name,))
+            manager.execute_query(f"SELECT * FROM projects WHERE name = '{name}'")
+
+        top = manager.get_query_stats(limit=10, order_by='count')
+        assert top[0]['query'] == "select * from projects where name = ?"
+        assert top[0]['count'] == 6
+        assert top[0]['query_type'] == "SELECT"
+        assert manager.get_query_metrics()[-1].query_type == "SELECT"
+        assert {entry['query_type'] for entry in top} >= {"SELECT", "INSERT"}
+
+    def test_slow_queries_are_logged_with_plan(self, tmp_path):
+        manager = DatabaseManager(DatabaseConfig(database_path=str(tmp_path / "slow.db"),
+                                                 pool_size=1, slow_query_threshold=0.0))
+        try:
+            manager.execute_query("SELECT * FROM api_usage WHERE api_type = ?", ("openai",))
+            manager.writer.submit(lambda connection: None).result()  # flush the log write
+
+            logged = manager.get_slow_queries(fingerprint=manager.get_query_metrics()[-1].query_hash)
+            assert logged[0]['normalized_query'] == "select * from api_usage where api_type = ?"
+            assert "idx_api_usage_type_timestamp" in logged[0]['query_plan']
+            top = manager.get_query_stats(order_by='slow_count')[0]
+            assert top['last_plan'] == logged[0]['query_plan']
+        finally:
+            manager.close()
+
+
+class TestAttachedStores:
+    """Component databases attached to the shared connections"""
+
+    SCHEMA = "CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, note TEXT)"
+
+    def test_attached_schema_on_every_connection(self, manager, tmp_path):
+        path = str(tmp_path / "cache.db")
+        manager.attach_database("cache", path)
+        manager.execute_query("CREATE TABLE cache.entries (id INTEGER PRIMARY KEY)", fetch="none")
+        manager.execute_query("INSERT INTO cache.entries (id) VALUES (1)", fetch="none")
+
+        # Pooled readers opened before the attach are replaced with attached ones
+        assert manager.execute_query("SELECT COUNT(*) FROM cache.entries")[0][0] == 1
+        assert manager.execute_query("PRAGMA cache.journal_mode")[0][0] == "wal"
+        assert manager.get_database_stats()['attached_databases'] == {"cache": path}
+
+        manager.attach_database("cache", path)
+        with pytest.raises(ValueError):
+            manager.attach_database("cache", str(tmp_path / "other.db"))
+
+    def test_writes_invalidate_qualified_tables(self, manager, tmp_path):
+        manager.attach_database("cache", str(tmp_path / "cache.db"))
+        manager.execute_query("CREATE TABLE cache.projects (id INTEGER PRIMARY KEY)", fetch="none")
+        main_query = "SELECT COUNT(*) FROM projects"
+        attached_query = "SELECT COUNT(*) FROM cache.projects"
+        assert manager.execute_query(main_query)[0][0] == 1
+        assert manager.execute_query(attached_query)[0][0] == 0
+
+        manager.execute_query("INSERT INTO cache.projects (id) VALUES (1)", fetch="none")
+        queries = count_queries(manager)
+        assert manager.execute_query(main_query)[0][0] == 1
+        assert count_queries(manager) == queries  # main table result still cached
+        assert manager.execute_query(attached_query)[0][0] == 1
+
+    def test_schema_store_standalone_and_attached(self, manager, tmp_path):
+        path = str(tmp_path / "component.db")
+        standalone = SchemaStore(path, "component")
+        attached = SchemaStore(path, "component", manager)
+        assert not standalone.attached and attached.attached
+        assert standalone.table("notes") == "notes"
+        assert attached.table("notes") == "component.notes"
+
+        standalone.execute(self.SCHEMA.format(table=standalone.table("notes")), fetch="none")
+        standalone.execute_transaction([
+            ("INSERT INTO notes (note) VALUES (?)", ("first",)),
+            ("INSERT INTO notes (note) VALUES (?)", ("second",)),
+        ])
+        attached.execute(f"INSERT INTO {attached.table('notes')} (note) VALUES (?)", ("third",),
+                         fetch="none")
+
+        rows = standalone.execute("SELECT note FROM notes ORDER BY id")
+        assert [row['note'] for row in rows] == ["first", "second", "third"]
+        assert attached.execute(f"SELECT COUNT(*) FROM {attached.table('notes')}")[0][0] == 3
+        # Standalone connections use the same journal settings as the manager's
+        assert standalone.execute("PRAGMA journal_mode")[0][0] == "wal"
+
+
+class TestIndexes:
+    """Composite index migrations and the index advisor"""
+
+    def plan(self, manager, query, params):
+        return " ".join(row[3] for row in manager.execute_query(f"EXPLAIN QUERY PLAN {query}", params))
+
+    def test_api_usage_stats_use_composite_index(self, manager):
+        for success in (True, False, True):
+            manager.log_api_usage("openai", "/completions", success, 0.5, 500).result()
+        manager.log_api_usage("claude", "/messages", True, 1.0, 200).result()
+
+        stats = manager.get_api_usage_stats("openai", days=1)
+        assert stats['total_requests'] == 3
+        assert stats['apis']['openai']['failed_requests'] == 1
+        assert set(manager.get_api_usage_stats()['apis']) == {"openai", "claude"}
+        assert "idx_api_usage_type_timestamp" in self.plan(
+            manager, "SELECT COUNT(*) FROM api_usage WHERE api_type = ? AND timestamp >= ?", ("a", "b"))
+        assert "idx_writing_sessions_project_start" in self.plan(
+            manager, "SELECT * FROM writing_sessions WHERE project_id = ? AND start_time >= ?", (1, "b"))
+
+    def test_suggest_index_columns(self):
+        query = "select * from t where a = ? and b in (?) and c >= ? and d < ? order by e"
+        assert suggest_index_columns(query) == ["a", "b", "c"]
+        assert suggest_index_columns("select * from t") == []
+
+    def test_advisor_flags_full_scans_once(self, tmp_path):
+        manager = DatabaseManager(DatabaseConfig(database_path=str(tmp_path / "dev.db"),
+                                                 pool_size=1, index_advisor=True))
+        try:
+            manager.execute_query("SELECT * FROM api_usage WHERE api_type = ?", ("openai",))
+            for tokens in (1, 2):
+                manager.execute_query("SELECT * FROM api_usage WHERE tokens_used > ?", (tokens,))
+
+            advice = manager.get_index_advice()
+            assert len(advice) == 1
+            assert advice[0]['tables'] == ["api_usage"]
+            assert advice[0]['suggested_columns'] == ["tokens_used"]
+            assert advice[0]['count'] == 2
+        finally:
+            manager.close()
+
+    def test_schema_store_migrations(self, manager, tmp_path):
+        path = str(tmp_path / "component.db")
+        index = "CREATE INDEX IF NOT EXISTS {index} ON notes (note)"
+        standalone = SchemaStore(path, "component")
+        standalone.execute(TestAttachedStores.SCHEMA.format(table="notes"), fetch="none")
+        standalone.migrate([(1, "Index notes", [index.format(index="idx_notes_note")])])
+        assert standalone.execute("PRAGMA user_version")[0][0] == 1
+
+        # The version is kept in the file: attached, only newer migrations run
+        attached = SchemaStore(path, "component", manager)
+        attached.migrate([
+            (1, "Index notes", ["CREATE INDEX this is not run"]),
+            (2, "Index notes again", [index.format(index=attached.table("idx_notes_note_2"))]),
+        ])
+        assert manager.execute_query("PRAGMA component.user_version")[0][0] == 2
+        indexes = {row['name'] for row in standalone.execute("PRAGMA index_list(notes)")}
+        assert indexes == {"idx_notes_note", "idx_notes_note_2"}
+
+
+DAY = 86400
+EPOCH = 1_700_006_400  # Midnight UTC
+
+
+class TestTimeSeries:
+    """Metric samples, rollups and retention"""
+
+    def record_days(self, manager, days, interval=60):
+        for offset in range(0, days * DAY, interval):
+            manager.metrics.record({"cpu": float(offset // interval % 10)}, EPOCH + offset)
+        manager.writer.submit(lambda connection: None).result()
+
+    def counts(self, manager):
+        rows = manager.execute_query("SELECT tier, COUNT(*) FROM metric_rollups GROUP BY tier")
+        return dict((tier, count) for tier, count in rows)
+
+    def test_rollups_and_retention(self, manager):
+        self.record_days(manager, 3)
+
+        # Closed buckets only; samples and minutes are pruned by retention
+        assert self.counts(manager) == {"1d": 2, "1h": 71, "1m": 3 * 24 * 60 - 1}
+        oldest = manager.execute_query("SELECT MIN(timestamp) FROM metric_samples")[0][0]
+        assert oldest == EPOCH + 3 * DAY - 60 - 2 * DAY
+
+        day = manager.metrics.query("cpu", EPOCH, EPOCH + DAY, tier="1d")[0]
+        assert (day['count'], day['min'], day['max'], day['avg']) == (1440, 0.0, 9.0, 4.5)
+        assert day['p95'] == 9.0
+
+    def test_retention_is_configurable(self, tmp_path):
+        manager = DatabaseManager(DatabaseConfig(database_path=str(tmp_path / "metrics.db"), pool_size=1,
+                                                 metrics_retention={"raw": 3600, "1m": DAY}))
+        try:
+            self.record_days(manager, 2)
+            assert manager.execute_query("SELECT COUNT(*) FROM metric_samples")[0][0] == 61
+            assert self.counts(manager)["1m"] == 24 * 60
+        finally:
+            manager.close()
+
+    def test_query_fills_in_from_finer_tiers(self, manager):
+        self.record_days(manager, 1, interval=30)
+        end = EPOCH + DAY
+        assert manager.metrics.choose_tier(end - 3600, end, end) == "1m"
+        assert manager.metrics.choose_tier(end - 7 * DAY, end, end) == "1h"
+
+        points = manager.metrics.query("cpu", EPOCH, end, tier="1h")
+        assert [point['count'] for point in points] == [120] * 23 + [2] * 59 + [1] * 2
+        assert points[-1]['timestamp'] == end - 30
+        assert sum(point['count'] for point in points) == 2880
+
+    def test_merge_rollups(self):
+        rows = [(10, 1.0, 5.0, 30.0, 5.0), (90, 0.0, 2.0, 90.0, 1.0)]
+        assert merge_rollups(rows) == (100, 0.0, 5.0, 120.0, 5.0)
+        assert merge_rollups(rows[1:] * 19 + rows[:1])[4] == 1.0
+
+    def test_performance_monitor_trend(self, manager):
+        pytest.importorskip("psutil")
+        from src.core.performance_monitor import PerformanceMonitor
+
+        monitor = PerformanceMonitor(db_manager=manager)
+        now = time.time()
+        for minute in range(30):
+            metrics = {'timestamp': datetime.fromtimestamp(now - (30 - minute) * 60).isoformat(),
+                       'system': {'cpu_percent': float(minute)}, 'process': {'num_threads': 4}}
+            manager.store_performance_metrics(metrics)
+        manager.writer.submit(lambda connection: None).result()
+
+        trend = monitor.get_resource_usage_trend('cpu_percent', hours=1)
+        assert trend['data_points'] == 30 and trend['trend'] == 'increasing'
+        assert (trend['min_value'], trend['max_value']) == (0.0, 29.0)
+        assert monitor.get_resource_usage_trend('process_num_threads', hours=1)['average_value'] == 4
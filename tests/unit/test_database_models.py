@@ -0,0 +1,103 @@
+"""
+Unit tests for the SQLAlchemy DatabaseManager: thread-scoped sessions,
+transactions and bulk operations
+"""
+
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+pytest.importorskip("sqlalchemy")
+
+from src.database.database_models import ApiCache, DatabaseManager, WorkflowVersion
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = DatabaseManager(f"sqlite:///{tmp_path / 'models.db'}")
+    yield manager
+    manager.close()
+
+
+def count(manager, model):
+    return manager.execute_with_retry(lambda session: session.query(model).count())
+
+
+class TestSessions:
+    """Thread-scoped sessions and transactions"""
+
+    def test_threads_use_their_own_sessions_and_connections(self, manager):
+        sessions, connections = {}, {}
+        barrier = threading.Barrier(3)
+
+        def work(worker):
+            with manager.session_scope() as session:
+                sessions[worker] = session
+                connections[worker] = session.connection().connection.dbapi_connection
+                barrier.wait(timeout=5)  # Every thread holds its connection at once
+                assert manager.get_workflow_versions("w", "Novel") == []
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len({id(session) for session in sessions.values()}) == 3
+        assert len({id(connection) for connection in connections.values()}) == 3
+
+    def test_session_scope_commits_once_and_rolls_back(self, manager):
+        with manager.session_scope():
+            manager.create_workflow_version("w", "Novel", {})
+            manager.create_workflow_version("w", "Novel", {})
+        assert count(manager, WorkflowVersion) == 2
+
+        with pytest.raises(RuntimeError):
+            with manager.session_scope():
+                manager.create_workflow_version("w", "Novel", {})
+                raise RuntimeError("abandon")
+        assert count(manager, WorkflowVersion) == 2
+
+    def test_json_changes_are_saved(self, manager):
+        manager.add_active_user("Novel", "ann")
+        manager.add_active_user("Novel", "bo")
+        manager.update_project_metadata("Novel", {"genre": "noir"})
+        manager.update_project_metadata("Novel", {"words": 1000})
+        manager.remove_active_user("Novel", "ann")
+        manager.close_session()
+
+        assert manager.get_active_users("Novel") == ["bo"]
+
+
+class TestBulkOperations:
+    """Core multi-row INSERT, executemany UPDATE and set-based DELETE"""
+
+    def test_bulk_insert_and_update(self, manager):
+        rows = [{'workflow_id': "w", 'project_name': "Novel", 'version_number': n,
+                 'workflow_data': {'n': n}} for n in range(1, 1201)]
+        assert manager.bulk_insert(WorkflowVersion, rows) == 1200
+
+        versions = manager.get_workflow_versions("w", "Novel")
+        assert len(versions) == 1200
+        assert versions[-1]['workflow_data'] == {'n': 1} and versions[-1]['is_active']
+
+        updated = manager.bulk_update(WorkflowVersion, [
+            {'id': n, 'checksum': f"sum{n}", 'is_active': False} for n in range(1, 11)])
+        assert updated == 10
+        inactive = manager.execute_with_retry(lambda session: session.query(WorkflowVersion)
+                                              .filter_by(is_active=False).count())
+        assert inactive == 10
+
+    def test_cleanup_expired_cache(self, manager):
+        now = datetime.utcnow()
+        manager.bulk_insert(ApiCache, [
+            {'cache_key': f"key{n}", 'response_data': "{}",
+             'expires_at': now + timedelta(hours=1 if n % 2 else -1)} for n in range(10)])
+
+        assert manager.cleanup_expired_cache() == 5
+        assert count(manager, ApiCache) == 5
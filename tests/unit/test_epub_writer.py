@@ -0,0 +1,99 @@
+"""
+Unit tests for the streaming EPUB writer
+"""
+
+import os
+import sys
+import zipfile
+import tracemalloc
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.export_formats.epub_writer import EPUBWriter
+from src.export_formats.validator import EPUBValidator
+from tests.conftest import export_project
+
+STORY = (
+    "=== Chapter 1, Section 1 ===\n\nChapter 1: Arrival\n\nThe train was late & it rained.\n\n"
+    "=== Chapter 1, Section 2 ===\n\nMorning came.\n\n"
+    "=== Chapter 2, Section 1 ===\n\nA <letter> arrived.\n"
+)
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "story.txt").write_text(STORY, encoding='utf-8')
+    return str(tmp_path)
+
+
+class TestEPUBWriter:
+    """Book structure"""
+
+    def test_package_layout(self, tmp_path):
+        path = str(tmp_path / "book.epub")
+        with EPUBWriter(path, "Rain & Trains", author="Ann") as epub:
+            epub.add_chapter("One", ["<h1>One</h1>\n<p>First.</p>\n"])
+            epub.add_chapter("Two", [b"<h1>Two</h1>\n"])
+
+        with zipfile.ZipFile(path) as epub_zip:
+            first = epub_zip.infolist()[0]
+            assert first.filename == "mimetype"
+            assert first.compress_type == zipfile.ZIP_STORED
+
+            opf = epub_zip.read("OEBPS/content.opf").decode('utf-8')
+            assert "<dc:title>Rain &amp; Trains</dc:title>" in opf
+            assert 'href="chapter_0002.xhtml"' in opf
+            assert 'href="chapter_0001.xhtml"' in epub_zip.read("OEBPS/nav.xhtml").decode('utf-8')
+            assert b'src="chapter_0002.xhtml"' in epub_zip.read("OEBPS/toc.ncx")
+
+        result = EPUBValidator.validate(path)
+        assert result.is_valid and not result.warnings, result.message
+
+    def test_single_document(self, tmp_path):
+        path = str(tmp_path / "book.epub")
+        with EPUBWriter(path, "Book", split_chapters=False) as epub:
+            epub.add_chapter("One", ["<p>a</p>"])
+            epub.add_chapter("Two", ["<p>b</p>"])
+
+        with zipfile.ZipFile(path) as epub_zip:
+            assert 'href="book.xhtml#chapter-2"' in epub_zip.read("OEBPS/nav.xhtml").decode('utf-8')
+            assert not any(name.startswith("OEBPS/chapter_") for name in epub_zip.namelist())
+        assert EPUBValidator.validate(path).is_valid
+
+
+class TestEPUBExport:
+    """EPUB through the export engine"""
+
+    def test_export_is_validated(self, project):
+        result = export_project(project, ['epub'])[0]
+
+        assert result['chapters'] == 2
+        assert result['validation_warnings'] == []
+        with zipfile.ZipFile(result['file_path']) as epub_zip:
+            chapter = epub_zip.read("OEBPS/chapter_0001.xhtml").decode('utf-8')
+        assert "<h1>Chapter 1: Arrival</h1>" in chapter
+        assert "The train was late &amp; it rained." in chapter
+        assert '<p class="scene-break">* * *</p>' in chapter
+
+    def test_fragments_are_reused(self, project):
+        export_project(project, ['epub'])
+        second = export_project(project, ['epub'])[0]
+        assert (second['fragments_rendered'], second['fragments_reused']) == (0, 2)
+
+    def test_memory_does_not_grow_with_book(self, tmp_path):
+        paragraph = "word " * 200 + "\n\n"
+
+        def peak_memory(chapters):
+            path = str(tmp_path / f"book_{chapters}.epub")
+            body = "<p>" + paragraph * 50 + "</p>"
+            tracemalloc.start()
+            with EPUBWriter(path, "Book") as epub:
+                for number in range(chapters):
+                    epub.add_chapter(f"Chapter {number}", [body])
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return peak
+
+        # Ten times the text must not need anywhere near ten times the memory
+        assert peak_memory(100) < 2 * peak_memory(10)
@@ -0,0 +1,167 @@
+"""
+Unit tests for the parallel export engine
+"""
+
+import os
+import sys
+import threading
+import zipfile
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.export_formats.engine import ExportEngine, ExportSnapshot, SCENE_BREAK, index_chapters
+from src.export_formats.writers import create_export_engine
+from src.workflow.steps.step_11_completion_export import Step11CompletionExport
+
+STORY = (
+    "=== Chapter 1, Section 1 ===\n\nChapter 1: Arrival\n\nThe train was late.\nIt rained.\n\n"
+    "=== Chapter 1, Section 2 ===\n\nMorning came.\n\n"
+    "=== Chapter 2, Section 1 ===\n\nA letter arrived.\n"
+)
+
+
+class MockWorkflow:
+    """Minimal workflow instance for Step 11"""
+
+    def __init__(self, project_path):
+        self.project_path = project_path
+        self.log = []
+
+    def log_action(self, message, level="INFO"):
+        self.log.append(message)
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "story.txt").write_text(STORY, encoding='utf-8')
+    (tmp_path / "synopsis.txt").write_text("A traveller arrives.", encoding='utf-8')
+    (tmp_path / "characters.txt").write_text("Ann: the traveller", encoding='utf-8')
+    return str(tmp_path)
+
+
+class TestExportSnapshot:
+    """Snapshot loading and chapter access"""
+
+    def test_sources_loaded_once(self, project):
+        snapshot = ExportSnapshot.load(project)
+
+        # Later changes on disk do not affect the snapshot
+        with open(os.path.join(project, "story.txt"), 'a', encoding='utf-8') as f:
+            f.write("Appended later.\n")
+
+        assert snapshot.read_file("synopsis.txt") == "A traveller arrives."
+        assert not snapshot.has_file("themes.txt")
+        assert "".join(snapshot.iter_story_lines()) == STORY
+
+    def test_chapters_and_paragraphs(self, project):
+        snapshot = ExportSnapshot.load(project)
+
+        assert [(c.number, c.title) for c in snapshot.chapters] == [
+            (1, "Chapter 1: Arrival"), (2, "Chapter 2")
+        ]
+        assert list(snapshot.iter_paragraphs(snapshot.chapters[0])) == [
+            "The train was late. It rained.", SCENE_BREAK, "Morning came."
+        ]
+
+    def test_untitled_manuscript(self):
+        chapters = index_chapters(b"Just some prose.\n")
+        assert [(c.number, c.title) for c in chapters] == [(0, "Manuscript")]
+
+
+class TestExportEngine:
+    """Concurrent format writers"""
+
+    def test_formats_run_concurrently(self, project, tmp_path):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def writer(snapshot, path, options, progress):
+            barrier.wait()
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(options['text'])
+            return {'marker': options['text']}
+
+        engine = ExportEngine(ExportSnapshot.load(project), max_workers=2)
+        engine.add_format('a', writer, str(tmp_path / "out" / "a.txt"), {'text': 'A'})
+        engine.add_format('b', writer, str(tmp_path / "out" / "b.txt"), {'text': 'B'})
+
+        updates = []
+        results = engine.run(lambda name, percent, message: updates.append((name, percent)))
+
+        assert [r['format'] for r in results] == ['a', 'b']
+        assert all(r['success'] for r in results)
+        assert results[1]['marker'] == 'B'
+        assert (tmp_path / "out" / "b.txt").read_text() == 'B'
+        assert ('a', 100) in updates and ('b', 0) in updates
+        assert engine.get_overall_progress() == 100
+
+    def test_failed_writer_leaves_no_file(self, project, tmp_path):
+        def writer(snapshot, path, options, progress):
+            with open(path, 'w') as f:
+                f.write("partial")
+            raise RuntimeError("boom")
+
+        engine = ExportEngine(ExportSnapshot.load(project))
+        engine.add_format('broken', writer, str(tmp_path / "broken.txt"))
+
+        result = engine.run()[0]
+
+        assert not result['success']
+        assert result['error'] == "boom"
+        assert not os.path.exists(tmp_path / "broken.txt")
+        assert not os.path.exists(tmp_path / "broken.part.txt")
+
+    def test_cancellation(self, project, tmp_path):
+        engine = ExportEngine(ExportSnapshot.load(project))
+
+        def writer(snapshot, path, options, progress):
+            for percent in range(0, 100, 10):
+                if percent == 30:
+                    engine.cancel()
+                progress(percent, "working")
+            open(path, 'w').close()
+
+        engine.add_format('slow', writer, str(tmp_path / "slow.txt"))
+
+        result = engine.run()[0]
+
+        assert result['cancelled']
+        assert not result['success']
+        assert not os.path.exists(tmp_path / "slow.txt")
+
+    def test_builtin_writers(self, project, tmp_path):
+        pytest.importorskip("docx")
+        pytest.importorskip("reportlab")
+
+        engine = create_export_engine(ExportSnapshot.load(project), ['txt', 'docx', 'pdf'],
+                                      str(tmp_path / "exports"), "novel")
+        results = engine.run()
+
+        assert all(r['success'] for r in results), results
+        assert zipfile.is_zipfile(tmp_path / "exports" / "novel.docx")
+        assert (tmp_path / "exports" / "novel.pdf").read_bytes().startswith(b"%PDF")
+        assert "Morning came." in (tmp_path / "exports" / "novel.txt").read_text()
+
+    def test_unknown_format(self, project, tmp_path):
+        with pytest.raises(ValueError):
+            create_export_engine(ExportSnapshot.load(project), ['mobi'], str(tmp_path))
+
+
+class TestStep11Exports:
+    """Step 11 exports through the engine"""
+
+    def test_create_all_exports(self, project):
+        step = Step11CompletionExport(MockWorkflow(project))
+
+        exports = step.create_all_exports()
+
+        assert [e['format'] for e in exports] == [
+            'txt', 'formatted_txt', 'json', 'markdown', 'zip_package'
+        ]
+        for export in exports:
+            assert os.path.getsize(export['file_path']) == export['file_size']
+
+        with open(exports[3]['file_path'], 'r', encoding='utf-8') as f:
+            markdown = f.read()
+        assert "- **Ann: the traveller**" in markdown
+        assert markdown.endswith(STORY.replace("Chapter", "### Chapter"))
@@ -0,0 +1,142 @@
+"""
+Unit tests for streaming and concurrent export validation
+"""
+
+import io
+import os
+import sys
+import threading
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.export_formats.docx_writer import DOCXStreamWriter
+from src.export_formats.epub_writer import EPUBWriter
+from src.export_formats.validator import (
+    DOCXValidator, EPUBValidator, ExportValidator, PDFValidator, scan_document_text
+)
+
+XHTML = b"""<?xml version="1.0" encoding="utf-8"?>
+<html xmlns="http://www.w3.org/1999/xhtml"><head><title>Ignored words</title></head>
+<body>
+<h1>Heading</h1>
+<p>He said <em>no</em> loudly.</p>
+<p>Second para.</p>
+</body></html>
+"""
+
+
+def write_docx(path, paragraphs):
+    with DOCXStreamWriter(str(path), "Book") as writer:
+        writer.heading("Book", 0)
+        for text in paragraphs:
+            writer.paragraph(text)
+    return str(path)
+
+
+class TestScanDocumentText:
+    """Single-pass text counting"""
+
+    def test_xhtml_counts_text_and_tails(self):
+        counts = scan_document_text(io.BytesIO(XHTML))
+        assert counts['paragraph_count'] == 2
+        # "Heading" is joined to the following paragraph's text, as with ''.join
+        text = "\nHeadingHe said no loudly.Second para.\n"
+        assert counts['character_count'] == len(text)
+        assert counts['word_count'] == len(text.split())
+
+    def test_docx_runs_join_words(self):
+        document = (
+            b'<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+            b'<w:p><w:r><w:t>Hel</w:t></w:r><w:r><w:t>lo there</w:t></w:r></w:p>'
+            b'<w:p><w:r><w:t xml:space="preserve"> again</w:t></w:r></w:p>'
+            b'</w:body></w:document>'
+        )
+        counts = scan_document_text(io.BytesIO(document), text_tags=('t',))
+        assert (counts['paragraph_count'], counts['word_count']) == (2, 3)
+        assert counts['character_count'] == len("Hello there again")
+
+    def test_no_body(self):
+        assert scan_document_text(io.BytesIO(b"<root><p>x</p></root>")) is None
+
+    def test_memory_does_not_grow_with_document(self):
+        def peak_memory(paragraphs):
+            document = io.BytesIO(b"<html><body>" + b"<p>word <em>word</em></p>" * paragraphs
+                                  + b"</body></html>")
+            tracemalloc.start()
+            counts = scan_document_text(document)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            assert counts['paragraph_count'] == paragraphs
+            return peak
+
+        assert peak_memory(50_000) < 2 * peak_memory(5_000)
+
+
+class TestValidators:
+    """Full and quick validation"""
+
+    def test_docx(self, tmp_path):
+        path = write_docx(tmp_path / "book.docx", ["One *two* three.", "Four."])
+
+        full = DOCXValidator.validate(path)
+        assert full.is_valid
+        assert full.metadata['paragraph_count'] == 3
+        assert full.metadata['word_count'] == len("BookOne two three.Four.".split())
+        assert full.metadata['title'] == "Book"
+
+        quick = DOCXValidator.validate(path, quick=True)
+        assert quick.is_valid and quick.metadata['quick']
+        assert 'word_count' not in quick.metadata
+
+    def test_empty_docx_warns(self, tmp_path):
+        with DOCXStreamWriter(str(tmp_path / "empty.docx")):
+            pass
+        result = DOCXValidator.validate(str(tmp_path / "empty.docx"))
+        assert "Document appears to be empty" in result.warnings
+
+    def test_epub(self, tmp_path):
+        path = str(tmp_path / "book.epub")
+        with EPUBWriter(path, "Book") as epub:
+            epub.add_chapter("One", ["<h1>One</h1>\n<p>A b c.</p>\n"])
+            epub.add_chapter("Two", ["<h1>Two</h1>\n<p>D <em>e</em>.</p>\n"])
+
+        full = EPUBValidator.validate(path)
+        assert full.is_valid and not full.warnings
+        assert full.metadata['content_documents'] == 2
+        assert full.metadata['paragraph_count'] == 2
+
+        quick = EPUBValidator.validate(path, quick=True)
+        assert quick.is_valid and 'content_documents' not in quick.metadata
+
+    def test_pdf_quick(self, tmp_path):
+        path = tmp_path / "book.pdf"
+        path.write_bytes(b"%PDF-1.4\n" + b"0" * 5000 + b"\n%%EOF\n")
+        assert PDFValidator.validate(str(path), quick=True).is_valid
+        assert not PDFValidator.validate(str(path), quick=True).warnings
+
+        path.write_bytes(b"%PDF-1.4\n" + b"0" * 5000)
+        assert PDFValidator.validate(str(path), quick=True).warnings
+
+
+class TestValidateMultipleFiles:
+    """Concurrent validation keeps input order"""
+
+    def test_concurrent_and_ordered(self, tmp_path, monkeypatch):
+        paths = [write_docx(tmp_path / f"book{n}.docx", [f"Text {n}."]) for n in range(4)]
+        paths.append(str(tmp_path / "notes.txt"))
+
+        threads = set()
+        original = DOCXValidator.validate
+
+        def tracking_validate(file_path, quick=False):
+            threads.add(threading.get_ident())
+            return original(file_path, quick)
+
+        monkeypatch.setattr(DOCXValidator, 'validate', staticmethod(tracking_validate))
+        results = ExportValidator().validate_multiple_files(paths, max_workers=4)
+
+        assert list(results) == paths
+        assert all(results[path].is_valid for path in paths[:4])
+        assert not results[paths[4]].is_valid
+        assert threading.get_ident() not in threads
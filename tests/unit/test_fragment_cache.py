@@ -0,0 +1,134 @@
+"""
+Unit tests for the per-chapter export fragment cache
+"""
+
+import os
+import sys
+import zipfile
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.export_formats.fragment_cache import FragmentCache, get_fragment_cache, open_fragment_session
+from src.workflow.steps.step_11_completion_export import Step11CompletionExport
+from tests.conftest import export_project
+
+STORY = "".join(
+    f"=== Chapter {n}, Section 1 ===\n\nChapter {n} opens.\nIt goes on.\n\n" for n in range(1, 5)
+)
+
+
+class MockWorkflow:
+    """Minimal workflow instance for Step 11"""
+
+    def __init__(self, project_path):
+        self.project_path = project_path
+
+    def log_action(self, message, level="INFO"):
+        pass
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "story.txt").write_text("\n" + STORY, encoding='utf-8')
+    return str(tmp_path)
+
+
+def edit_chapter(project, number):
+    path = os.path.join(project, "story.txt")
+    with open(path, 'r', encoding='utf-8') as f:
+        story = f.read()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(story.replace(f"Chapter {number} opens.", f"Chapter {number} opens again."))
+
+
+class TestFragmentCache:
+    """Fragment keys, reuse and pruning"""
+
+    def test_session_reuses_fragments(self, tmp_path):
+        cache = FragmentCache(str(tmp_path / "cache"))
+        calls = []
+
+        def render(text):
+            calls.append(text)
+            return text.upper()
+
+        with cache.session('txt') as fragments:
+            assert fragments.render(b"a", lambda: render(b"a")) == b"A"
+            assert fragments.render(b"b", lambda: render(b"b")) == b"B"
+
+        with cache.session('txt') as fragments:
+            assert fragments.render(b"a", lambda: render(b"a")) == b"A"
+            assert fragments.get_stats() == {'fragments_rendered': 0, 'fragments_reused': 1}
+
+        assert calls == [b"a", b"b"]
+        # The unused fragment for b was pruned
+        assert len(os.listdir(tmp_path / "cache" / "txt")) == 1
+
+    def test_options_and_version_change_the_key(self):
+        key = FragmentCache.make_key('docx', 1, {'a': 1}, b"text")
+        assert key == FragmentCache.make_key('docx', 1, {'a': 1}, b"text")
+        assert key != FragmentCache.make_key('docx', 2, {'a': 1}, b"text")
+        assert key != FragmentCache.make_key('docx', 1, {'a': 2}, b"text")
+        assert key != FragmentCache.make_key('pdf', 1, {'a': 1}, b"text")
+
+    def test_cache_can_be_bypassed(self, project):
+        with open_fragment_session(project, 'txt', 1, {'use_cache': False}) as fragments:
+            fragments.render(b"a", lambda: b"A")
+        assert fragments.cache is None
+        assert not os.path.exists(get_fragment_cache(project).cache_dir)
+
+
+class TestIncrementalExports:
+    """Exports re-render only changed chapters"""
+
+    def test_txt_export(self, project):
+        first = export_project(project, ['txt'])[0]
+        with open(first['file_path'], 'rb') as f:
+            first_output = f.read()
+
+        second = export_project(project, ['txt'])[0]
+        with open(second['file_path'], 'rb') as f:
+            assert f.read() == first_output
+        assert second['fragments_reused'] == 4
+
+        edit_chapter(project, 3)
+        third = export_project(project, ['txt'])[0]
+        assert (third['fragments_rendered'], third['fragments_reused']) == (1, 3)
+        with open(third['file_path'], 'r', encoding='utf-8') as f:
+            assert "Chapter 3 opens again." in f.read()
+
+    def test_docx_export(self, project):
+        pytest.importorskip("docx")
+
+        def document_xml(result):
+            with zipfile.ZipFile(result['file_path']) as docx_zip:
+                return docx_zip.read('word/document.xml')
+
+        first = export_project(project, ['docx'])[0]
+        first_xml = document_xml(first)
+        second = export_project(project, ['docx'])[0]
+
+        assert second['fragments_reused'] == 4
+        assert document_xml(second) == first_xml
+
+        edit_chapter(project, 1)
+        third = export_project(project, ['docx'])[0]
+        assert third['fragments_rendered'] == 1
+        assert b"Chapter 1 opens again." in document_xml(third)
+
+    def test_markdown_export(self, project):
+        step = Step11CompletionExport(MockWorkflow(project))
+        exports_dir = os.path.join(project, "exports")
+
+        def story_part(result):
+            with open(result['file_path'], 'r', encoding='utf-8') as f:
+                return f.read().split("## Story\n\n", 1)[1]
+
+        first = step.create_markdown_export(exports_dir)
+        assert story_part(first) == ("\n" + STORY).replace("Chapter", "### Chapter")
+
+        edit_chapter(project, 2)
+        second = step.create_markdown_export(exports_dir)
+        assert (second['fragments_rendered'], second['fragments_reused']) == (1, 3)
+        assert "### Chapter 2 opens again." in story_part(second)
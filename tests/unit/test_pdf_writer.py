@@ -0,0 +1,128 @@
+"""
+Unit tests for the chapter-parallel PDF writer
+"""
+
+import os
+import re
+import sys
+import zlib
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+pytest.importorskip("reportlab")
+
+from src.export_formats.engine import ExportSnapshot
+from src.export_formats.pdf_writer import layout_chapter, TOC_LINES_PER_PAGE
+from src.export_formats.validator import PDFValidator
+from tests.conftest import export_project
+
+PARAGRAPH = " ".join(["word"] * 99) + " (end).\n\n"
+
+
+def write_story(project, chapters=3, paragraphs=40):
+    with open(os.path.join(project, "story.txt"), 'w', encoding='utf-8') as f:
+        for number in range(1, chapters + 1):
+            f.write(f"=== Chapter {number}, Section 1 ===\n\n" + PARAGRAPH * paragraphs)
+
+
+def page_texts(path):
+    """Text shown on each page, in page order, from an uncompressed export."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    objects = dict(re.findall(rb"(\d+) 0 obj\n(.*?)\nendobj", data, re.S))
+    kids = re.search(rb"/Type /Pages /Kids \[([^\]]*)\]", data).group(1)
+    texts = []
+    for page_id in re.findall(rb"(\d+) 0 R", kids):
+        contents = re.search(rb"/Contents \[([^\]]*)\]", objects[page_id]).group(1)
+        shown = []
+        for stream_id in re.findall(rb"(\d+) 0 R", contents):
+            shown += re.findall(rb"\((.*?)\) Tj", objects[stream_id])
+        texts.append([s.decode('cp1252') for s in shown])
+    return data, texts
+
+
+class TestLayout:
+    """Chapter layout in the worker function"""
+
+    def test_long_chapter_spans_pages(self):
+        pages = layout_chapter("Chapter 1", [PARAGRAPH.strip()] * 40)
+        assert len(pages) > 5
+        assert all(page.startswith(b"BT\n") and page.endswith(b"\nET") for page in pages)
+        assert b"(Chapter 1) Tj" in pages[0]
+
+    def test_text_is_escaped(self):
+        page = layout_chapter("A (b)", ["back\\slash"])[0]
+        assert b"(A \\(b\\)) Tj" in page
+        assert b"back\\\\slash" in page
+
+
+class TestPDFExport:
+    """Assembled books"""
+
+    def test_page_numbers_toc_and_outline(self, tmp_path):
+        project = str(tmp_path)
+        write_story(project)
+
+        progress = []
+        result = export_project(project, ['pdf'],
+                                {'pdf': {'compress': False, 'use_cache': False, 'processes': 1}},
+                                lambda name, percent, message: progress.append(percent))[0]
+        data, texts = page_texts(result['file_path'])
+
+        assert result['pages'] == len(texts)
+        assert texts[0] == [ExportSnapshot.load(project).project_name]
+        # Page 2 is the table of contents; every chapter's entry points at
+        # the page whose footer carries that number
+        toc = texts[1]
+        assert toc[0] == "Contents"
+        for number in (1, 2, 3):
+            entry = toc.index(f"Chapter {number}")
+            page = int(toc[entry + 1])
+            assert texts[page - 1][0] == f"Chapter {number}"
+            assert texts[page - 1][-1] == str(page)
+        assert data.count(b"/Subtype /Link") == 3
+        assert b"/Type /Outlines" in data and b"/Title (Chapter 3)" in data
+
+        # Every cross-reference entry points at its object
+        xref = re.search(rb"xref\n0 (\d+)\n(.*?)trailer", data, re.S)
+        for object_id, line in enumerate(xref.group(2).splitlines()[1:], 1):
+            offset = int(line[:10])
+            assert data[offset:].startswith(f"{object_id} 0 obj".encode())
+
+        assert progress == sorted(progress) and progress[-1] == 100
+        assert PDFValidator.validate(result['file_path']).is_valid
+
+    def test_worker_processes_and_cache(self, tmp_path):
+        project = str(tmp_path)
+        write_story(project, chapters=4, paragraphs=5)
+
+        first = export_project(project, ['pdf'], {'pdf': {'processes': 2}})[0]
+        assert first['processes'] == 2
+        assert first['fragments_rendered'] == 4
+
+        second = export_project(project, ['pdf'], {'pdf': {'processes': 2}})[0]
+        assert second['fragments_reused'] == 4
+        with open(first['file_path'], 'rb') as f:
+            streams = re.findall(rb"stream\n(.*?)\nendstream", f.read(), re.S)
+        assert any(b"Chapter 4" in zlib.decompress(s) for s in streams)
+
+    def test_long_table_of_contents(self, tmp_path):
+        project = str(tmp_path)
+        write_story(project, chapters=TOC_LINES_PER_PAGE + 1, paragraphs=1)
+
+        result = export_project(project, ['pdf'], {'pdf': {
+            'compress': False, 'include_bookmarks': False, 'processes': 1
+        }})[0]
+        data, texts = page_texts(result['file_path'])
+
+        # Title page, two contents pages, one page per chapter
+        assert len(texts) == 3 + TOC_LINES_PER_PAGE + 1
+        assert texts[2][0] == f"Chapter {TOC_LINES_PER_PAGE + 1}"
+        assert b"/Outlines" not in data
+
+    def test_platypus_backend(self, tmp_path):
+        project = str(tmp_path)
+        write_story(project, chapters=1, paragraphs=2)
+        result = export_project(project, ['pdf'], {'pdf': {'platypus': True}})[0]
+        assert PDFValidator.validate(result['file_path']).is_valid
@@ -0,0 +1,121 @@
+"""
+Unit tests for content-addressed recovery checkpoints
+"""
+
+import os
+import sys
+import json
+import tempfile
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.workflow.recovery_store import RecoveryStore
+from src.workflow.steps.step_10_recovery import Step10Recovery
+
+
+class MockWorkflow:
+    """Minimal workflow instance for Step 10"""
+
+    def __init__(self, project_path):
+        self.project_path = project_path
+        self.log = []
+
+    def log_action(self, message, level="INFO"):
+        self.log.append(message)
+
+
+def write(project, name, content):
+    with open(os.path.join(project, name), 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+@pytest.fixture
+def project():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        write(tmpdir, "story.txt", "Once upon a time." * 100)
+        write(tmpdir, "synopsis.txt", "A synopsis.")
+        yield tmpdir
+
+
+class TestRecoveryStore:
+    """Test blob storage and the stat cache"""
+
+    def test_unchanged_files_not_rehashed(self, project):
+        """Test only changed files are read again"""
+        store = RecoveryStore(project, os.path.join(project, "recovery"))
+        first = store.snapshot(["story.txt", "synopsis.txt", "missing.txt"])
+        assert set(first) == {"story.txt", "synopsis.txt"}
+        assert store.files_hashed == 2
+
+        # A fresh store picks up the persisted stat cache
+        store = RecoveryStore(project, os.path.join(project, "recovery"))
+        assert store.snapshot(["story.txt", "synopsis.txt"]) == first
+        assert store.files_hashed == 0
+
+        write(project, "synopsis.txt", "A longer, revised synopsis.")
+        second = store.snapshot(["story.txt", "synopsis.txt"])
+        assert store.files_hashed == 1
+        assert second["story.txt"] == first["story.txt"]
+        assert second["synopsis.txt"]['checksum'] != first["synopsis.txt"]['checksum']
+
+    def test_restore_and_garbage_collection(self, project):
+        """Test a manifest restores stored content and unreferenced blobs are removed"""
+        recovery_dir = os.path.join(project, "recovery")
+        store = RecoveryStore(project, recovery_dir)
+        manifest = os.path.join(recovery_dir, "checkpoints", "cp.json")
+        store.write_manifest(manifest, {'file_states': store.snapshot(["synopsis.txt"])})
+
+        write(project, "synopsis.txt", "Overwritten.")
+        store.snapshot(["synopsis.txt"])
+        store.restore(manifest)
+        with open(os.path.join(project, "synopsis.txt"), 'r', encoding='utf-8') as f:
+            assert f.read() == "A synopsis."
+
+        # The story blob is only referenced by the stat cache
+        store.snapshot(["story.txt"])
+        write(project, "story.txt", "Rewritten story.")
+        store.snapshot(["story.txt"])
+        assert store.collect_garbage([os.path.dirname(manifest)]) == 1
+
+
+class TestStep10Checkpoints:
+    """Test Step 10 checkpoints share one hashing pass"""
+
+    def test_checkpoints_hash_once(self, project):
+        """Test step checkpoints reuse file states and skip unchanged manifests"""
+        for step_num in range(1, 10):
+            write(project, f"step_{step_num:02d}_data.json", "{}")
+
+        step = Step10Recovery(MockWorkflow(project))
+        step.create_recovery_structure()
+        assert step.create_recovery_checkpoints() == 10
+        assert step.recovery_store.files_hashed == 2
+
+        manifest = os.path.join(project, "recovery", "checkpoints", "step_05_checkpoint.json")
+        with open(manifest, 'r', encoding='utf-8') as f:
+            assert set(json.load(f)['file_states']) == {"story.txt", "synopsis.txt"}
+        mtime = os.stat(manifest).st_mtime_ns
+
+        rerun = Step10Recovery(MockWorkflow(project))
+        assert rerun.create_recovery_checkpoints() == 10
+        assert rerun.recovery_store.files_hashed == 0
+        assert os.stat(manifest).st_mtime_ns == mtime
+
+    def test_old_checkpoints_pruned_with_their_blobs(self, project):
+        """Test cleanup keeps the newest checkpoints and drops blobs only old ones used"""
+        step = Step10Recovery(MockWorkflow(project))
+        step.create_recovery_structure()
+        checkpoints_dir = os.path.join(project, "recovery", "checkpoints")
+
+        for n in range(Step10Recovery.MAX_CHECKPOINTS + 2):
+            write(project, "synopsis.txt", f"Synopsis draft {n}.")
+            step.recovery_store.write_manifest(
+                os.path.join(checkpoints_dir, f"checkpoint_20260101_0000{n:02d}.json"),
+                {'file_states': step.recovery_store.snapshot(["synopsis.txt"])}
+            )
+
+        assert step.clean_up_recovery_store() == 2
+        remaining = sorted(os.listdir(checkpoints_dir))
+        assert len(remaining) == Step10Recovery.MAX_CHECKPOINTS
+        assert remaining[0] == "checkpoint_20260101_000002.json"
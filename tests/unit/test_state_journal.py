@@ -0,0 +1,220 @@
+"""
+Unit tests for the write-ahead state journal
+"""
+
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.workflow.state_journal import (
+    StateJournal, JOURNAL_FILENAME, get_state_journal, release_state_journal
+)
+from src.workflow.steps.base_step import BaseWorkflowStep
+from src.workflow.steps.step_manager import WorkflowStepManager
+
+
+class MockWorkflow:
+    """Minimal workflow instance for steps"""
+
+    def __init__(self, project_path):
+        self.project_path = project_path
+
+    def log_action(self, message, level="INFO"):
+        pass
+
+
+class Step02Journaled(BaseWorkflowStep):
+    input_artifacts = []
+    output_artifacts = ["step_02_data.json"]
+
+    def validate_prerequisites(self):
+        return True
+
+    def execute(self):
+        self.save_step_data({'draft': 1})
+        self.save_step_data({'draft': 2})
+        return True
+
+
+def read_json(project, name):
+    with open(os.path.join(project, name), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def journal_lines(project):
+    with open(os.path.join(project, JOURNAL_FILENAME), 'r', encoding='utf-8') as f:
+        return f.readlines()
+
+
+class TestStateJournal:
+    """Journaling, materialization and replay"""
+
+    def test_changes_are_journaled_not_rewritten(self, tmp_path):
+        project = str(tmp_path)
+        journal = StateJournal(project)
+
+        journal.put("state.json", {'step': 1})
+        journal.set("state.json", 'step', 2)
+        journal.append("history.json", {'n': 1})
+        journal.append("history.json", {'n': 2})
+
+        assert not os.path.exists(os.path.join(project, "state.json"))
+        assert len(journal_lines(project)) == 4
+        assert journal.read("state.json") == {'step': 2}
+        assert journal.read("history.json") == [{'n': 1}, {'n': 2}]
+        assert journal.exists("history.json")
+        assert not journal.exists("missing.json")
+
+    def test_materialize_writes_selected_documents(self, tmp_path):
+        project = str(tmp_path)
+        journal = StateJournal(project)
+        journal.put("a.json", {'a': 1})
+        journal.put("b.json", {'b': 1})
+
+        journal.materialize("a.json")
+
+        assert read_json(project, "a.json") == {'a': 1}
+        assert not os.path.exists(os.path.join(project, "b.json"))
+
+    def test_compact_materializes_and_truncates(self, tmp_path):
+        project = str(tmp_path)
+        journal = StateJournal(project)
+        journal.put("a.json", {'a': 1})
+        journal.append("nested/list.json", 'x')
+
+        journal.compact()
+
+        assert read_json(project, "a.json") == {'a': 1}
+        assert read_json(project, os.path.join("nested", "list.json")) == ['x']
+        assert journal_lines(project) == []
+
+    def test_automatic_compaction(self, tmp_path):
+        project = str(tmp_path)
+        journal = StateJournal(project, compact_every=3)
+        for n in range(4):
+            journal.append("history.json", n)
+
+        assert read_json(project, "history.json") == [0, 1, 2]
+        assert len(journal_lines(project)) == 1
+        assert journal.read("history.json") == [0, 1, 2, 3]
+
+    def test_replay_after_crash(self, tmp_path):
+        project = str(tmp_path)
+        crashed = StateJournal(project)
+        crashed.put("state.json", {'step': 3})
+        crashed.append("history.json", 'first')
+        crashed.append("history.json", 'second')
+
+        recovered = StateJournal(project)
+
+        assert recovered.replayed == 3
+        assert read_json(project, "state.json") == {'step': 3}
+        assert read_json(project, "history.json") == ['first', 'second']
+        assert journal_lines(project) == []
+
+    def test_replay_over_materialized_files_is_idempotent(self, tmp_path):
+        project = str(tmp_path)
+        crashed = StateJournal(project)
+        crashed.append("history.json", 'first')
+        crashed.materialize()
+        crashed.append("history.json", 'second')
+
+        StateJournal(project)
+
+        assert read_json(project, "history.json") == ['first', 'second']
+
+    def test_torn_final_record_is_ignored(self, tmp_path):
+        project = str(tmp_path)
+        crashed = StateJournal(project)
+        crashed.put("state.json", {'step': 1})
+        with open(os.path.join(project, JOURNAL_FILENAME), 'a', encoding='utf-8') as f:
+            f.write('{"op":"put","file":"state.json","val')
+
+        recovered = StateJournal(project)
+
+        assert recovered.replayed == 1
+        assert read_json(project, "state.json") == {'step': 1}
+
+    def test_fsync_is_batched(self, tmp_path):
+        project = str(tmp_path)
+        journal = StateJournal(project, sync_every=4, sync_interval=60)
+        for n in range(10):
+            journal.append("history.json", n)
+
+        assert journal.syncs == 2
+        journal.sync()
+        assert journal.syncs == 3
+
+    def test_config_lines(self, tmp_path):
+        project = str(tmp_path)
+        with open(os.path.join(project, "config.txt"), 'w', encoding='utf-8') as f:
+            f.write("Idea: Test\nProgress: 0%")
+
+        journal = StateJournal(project)
+        journal.set("config.txt", "Progress", "50%")
+        journal.set("config.txt", "Status", "Writing", materialize=True)
+
+        with open(os.path.join(project, "config.txt"), 'r', encoding='utf-8') as f:
+            assert f.read() == "Idea: Test\nProgress: 50%\nStatus: Writing\n"
+
+    def test_external_changes_are_picked_up(self, tmp_path):
+        project = str(tmp_path)
+        journal = StateJournal(project)
+        journal.set("config.txt", "Progress", "10%", materialize=True)
+
+        with open(os.path.join(project, "config.txt"), 'a', encoding='utf-8') as f:
+            f.write("Tone: dark\n")
+        os.utime(os.path.join(project, "config.txt"), ns=(0, 0))
+
+        journal.set("config.txt", "Progress", "20%", materialize=True)
+
+        with open(os.path.join(project, "config.txt"), 'r', encoding='utf-8') as f:
+            assert f.read() == "Progress: 20%\nTone: dark\n"
+
+    def test_shared_journal_per_project(self, tmp_path):
+        assert get_state_journal(str(tmp_path)) is get_state_journal(str(tmp_path))
+
+    def test_release_compacts_and_evicts(self, tmp_path):
+        project = str(tmp_path)
+        journal = get_state_journal(project)
+        journal.put("state.json", {'step': 3})
+
+        release_state_journal(project)
+        assert read_json(project, "state.json") == {'step': 3}
+        assert journal_lines(project) == []
+        assert get_state_journal(project) is not journal
+        release_state_journal(project)
+
+
+class TestJournaledWorkflowState:
+    """Workflow components persisting through the journal"""
+
+    def test_step_data_written_when_step_ends(self, tmp_path):
+        project = str(tmp_path)
+        step = Step02Journaled(MockWorkflow(project))
+
+        assert step.run()
+
+        assert read_json(project, "step_02_data.json") == {'draft': 2}
+        assert step.load_step_data() == {'draft': 2}
+
+    def test_execution_history_appended(self, tmp_path):
+        project = str(tmp_path)
+        manager = WorkflowStepManager(MockWorkflow(project), memoize=False)
+        manager.steps = {2: Step02Journaled(manager.workflow)}
+
+        assert manager.execute_step(2)
+        assert manager.execute_step(2)
+
+        history = [json.loads(line) for line in journal_lines(project)
+                   if '"execution_history.json"' in line]
+        assert [record['index'] for record in history] == [0, 1]
+
+        manager.compact_journal()
+        assert len(read_json(project, "execution_history.json")) == 2
+
+        manager.execution_history = []
+        manager.load_execution_history()
+        assert len(manager.execution_history) == 2
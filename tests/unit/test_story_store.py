@@ -0,0 +1,111 @@
+"""
+Unit tests for the section-addressable story store
+"""
+
+import os
+import sys
+import json
+import tempfile
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.workflow.story_store import StoryStore
+
+
+@pytest.fixture
+def store():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield StoryStore(tmpdir)
+
+
+def read_story(store):
+    with open(store.story_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+class TestStoryStoreIndex:
+    """Test index maintenance on append and rebuild"""
+
+    def test_append_indexes_sections(self, store):
+        """Test appended sections are indexed and readable by seeking"""
+        store.append_section(1, 1, "First section.")
+        store.append_section(1, 2, "Second section, with ünïcode.")
+        store.append_section(2, 1, "Next chapter.")
+
+        assert [(e['chapter'], e['section']) for e in store.get_sections()] == [(1, 1), (1, 2), (2, 1)]
+        assert store.read_section(1, 2) == "Second section, with ünïcode."
+        assert store.read_section(3, 1) is None
+
+        chapter = store.read_chapter(1)
+        assert chapter.startswith("=== Chapter 1, Section 1 ===")
+        assert "Second section" in chapter and "Next chapter" not in chapter
+
+    def test_split_header_append(self, store):
+        """Test a header is only indexed at the start of a line"""
+        store.append("Prologue text")
+        store.append("=== Chapter 1, Section 1 === is not a header here\n")
+        store.append("=== Chapter 2, Section 1 ===\nBody")
+
+        assert [(e['chapter'], e['section']) for e in store.get_sections()] == [(2, 1)]
+        assert store.read_section(2, 1) == "Body"
+
+    def test_external_edit_rebuilds_index(self, store):
+        """Test the index is rebuilt when story.txt is changed outside the store"""
+        store.append_section(1, 1, "Original.")
+
+        with open(store.story_path, 'w', encoding='utf-8') as f:
+            f.write("## Chapter 1: Start\nOne\n## Chapter 2: Middle\nTwo\n")
+
+        reopened = StoryStore(store.project_dir)
+        assert [(e['chapter'], e['section']) for e in reopened.get_sections()] == [(1, 0), (2, 0)]
+        assert reopened.read_section(2, 0) == "Two"
+
+        with open(store.index_path, 'r', encoding='utf-8') as f:
+            assert len(json.load(f)['sections']) == 2
+
+
+class TestStoryStoreEditing:
+    """Test in-place section replacement and tail reads"""
+
+    def test_replace_section_shifts_offsets(self, store):
+        """Test replacing a section preserves neighbours byte for byte"""
+        store.append_section(1, 1, "Alpha.")
+        store.append_section(1, 2, "Beta.")
+        store.append_section(1, 3, "Gamma.")
+        before = read_story(store)
+
+        assert store.replace_section(1, 2, "A much longer replacement for beta.")
+        after = read_story(store)
+
+        assert after == before.replace("Beta.", "A much longer replacement for beta.")
+        assert store.read_section(1, 3) == "Gamma."
+        assert StoryStore(store.project_dir).read_section(1, 2) == "A much longer replacement for beta."
+        assert not store.replace_section(9, 9, "Missing")
+
+    def test_replace_chapter_patches_changed_sections(self, store):
+        """Test an edited chapter is written back without touching other chapters"""
+        store.append_section(1, 1, "Alpha.")
+        store.append_section(1, 2, "Beta.")
+        store.append_section(2, 1, "Gamma.")
+
+        chapter = store.read_chapter(1).replace("Beta.", "Beta, refined.")
+        assert store.replace_chapter(1, chapter)
+        assert store.read_section(1, 1) == "Alpha."
+        assert store.read_section(1, 2) == "Beta, refined."
+        assert store.read_section(2, 1) == "Gamma."
+
+        before = read_story(store)
+        assert not store.replace_chapter(1, "Rewritten without any headers")
+        assert read_story(store) == before
+
+    def test_read_tail_words(self, store, tmp_path):
+        """Test the tail read returns the last words without reading everything"""
+        store.append(" ".join(f"word{i}" for i in range(5000)))
+
+        tail = store.read_tail_words(500, chunk_size=256)
+        assert tail.split() == [f"word{i}" for i in range(4500, 5000)]
+
+        small = StoryStore(str(tmp_path))
+        small.append("just a few words")
+        assert small.read_tail_words(500) == "just a few words"
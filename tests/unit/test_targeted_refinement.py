@@ -0,0 +1,152 @@
+"""
+Unit tests for paragraph-targeted refinement in Step 8
+"""
+
+import os
+import sys
+import re
+import json
+import tempfile
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.workflow.steps.step_08_refinement_loop import Step08RefinementLoop
+
+SECTION = (
+    "The harbour woke slowly, gulls wheeling over the grey water.\n\n"
+    "Mara counted the crates twice. [placeholder]\n  \n"
+    "By noon the ship had gone, and with it every answer she had.\n\n\n"
+    "She walked home the long way."
+)
+
+
+class MockAPIManager:
+    """API manager that rewrites every paragraph it is asked to refine"""
+
+    def __init__(self):
+        self.prompts = []
+
+    def is_available(self):
+        return True
+
+    def generate_text(self, prompt):
+        self.prompts.append(prompt)
+        indices = re.findall(r'^\[PARAGRAPH (\d+)\]$', prompt, flags=re.MULTILINE)
+        return "\n".join(f"[PARAGRAPH {i}]\nRewritten paragraph {i}." for i in indices)
+
+
+class MockWorkflow:
+    """Minimal workflow instance for Step 8"""
+
+    def __init__(self, project_path):
+        self.project_path = project_path
+        self.api_manager = MockAPIManager()
+        self.refinement_scope = 'targeted'
+        self.log = []
+
+    def log_action(self, message, level="INFO"):
+        self.log.append(message)
+
+
+@pytest.fixture
+def step():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Step08RefinementLoop(MockWorkflow(tmpdir))
+
+
+class TestTargetedRefinement:
+    """Test feedback mapping and diff-based patching"""
+
+    def test_split_rejoins_exactly(self, step):
+        """Test paragraph splitting keeps the exact separators"""
+        paragraphs, separators = step.split_paragraphs(SECTION)
+        assert len(paragraphs) == 4
+        assert step.patch_paragraphs(paragraphs, separators, {}) == SECTION
+
+    def test_only_flagged_paragraphs_change(self, step):
+        """Test flagged paragraphs are replaced and the rest is byte-identical"""
+        feedback = {
+            'revision_requested': True,
+            'areas_for_improvement': ['placeholder'],
+            'comments': 'The line "every answer she had" feels flat.'
+        }
+
+        refined, ai_applied, manual_applied, stats = step.refine_paragraphs_based_on_feedback(SECTION, feedback)
+
+        assert ai_applied and not manual_applied
+        assert stats['paragraphs'] == [1, 2]
+        assert stats['prompt_tokens_avoided'] > 0
+        assert refined == SECTION.replace(
+            "Mara counted the crates twice. [placeholder]", "Rewritten paragraph 1."
+        ).replace(
+            "By noon the ship had gone, and with it every answer she had.", "Rewritten paragraph 2."
+        )
+
+        prompt = step.workflow.api_manager.prompts[0]
+        assert "She walked home" in prompt  # neighbour context
+        assert "[PARAGRAPH 3]" not in prompt
+
+    def test_whole_section_feedback_falls_back(self, step):
+        """Test section-wide feedback and unmapped feedback use full refinement"""
+        assert step.refine_paragraphs_based_on_feedback(
+            SECTION, {'revision_requested': True, 'areas_for_improvement': ['too short']}
+        ) is None
+        assert step.refine_paragraphs_based_on_feedback(
+            SECTION, {'revision_requested': True, 'comments': 'General pacing issues'}
+        ) is None
+        assert step.workflow.api_manager.prompts == []
+
+
+class MockSignal:
+    def emit(self, *args):
+        pass
+
+
+class ChapterAPIManager:
+    """API manager that returns the chapter with its body rewritten"""
+
+    def is_available(self):
+        return True
+
+    def generate_text(self, prompt):
+        return "Chapter 1: Harbour\n" + "The rewritten harbour scene, told at a steadier pace. " * 3
+
+
+class TestStoryWriteBack:
+    """Test which refinements are written back into story.txt"""
+
+    STORY = "Chapter 1: Harbour\nThe harbour woke slowly.\n\nChapter 2: Home\nShe walked home.\n"
+
+    def run_refinement(self, tmpdir, api_manager):
+        workflow = MockWorkflow(tmpdir)
+        workflow.api_manager = api_manager
+        workflow.refinement_scope = 'full'
+        workflow.status_updated = workflow.progress_updated = workflow.error_occurred = MockSignal()
+        with open(os.path.join(tmpdir, "story.txt"), 'w', encoding='utf-8') as f:
+            f.write(self.STORY)
+        with open(os.path.join(tmpdir, "review_results.json"), 'w', encoding='utf-8') as f:
+            json.dump({
+                'sections_reviewed': ['chapter_1'],
+                'feedback_collected': [{'revision_requested': True, 'areas_for_improvement': ['pacing']}],
+                'revision_requested': ['chapter_1']
+            }, f)
+
+        Step08RefinementLoop(workflow).execute()
+        with open(os.path.join(tmpdir, "story.txt"), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def test_ai_refinement_written_to_story(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            story = self.run_refinement(tmpdir, ChapterAPIManager())
+            assert "steadier pace" in story
+            assert "The harbour woke slowly." not in story
+            assert "She walked home." in story
+
+    def test_manual_fallback_stays_out_of_story(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            story = self.run_refinement(tmpdir, None)
+            assert story == self.STORY
+
+            with open(os.path.join(tmpdir, "sections", "chapter_1_refined.json"), 'r', encoding='utf-8') as f:
+                assert "[DEVELOPMENT NOTE: Address pacing" in json.load(f)['content']
@@ -0,0 +1,262 @@
+"""
+Unit tests for the workflow step manager scheduler
+"""
+
+import os
+import json
+import sys
+import time
+import tempfile
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.workflow.steps.base_step import BaseWorkflowStep
+from src.workflow.steps.step_manager import WorkflowStepManager
+
+
+class MockWorkflow:
+    """Minimal workflow instance for step execution"""
+
+    def __init__(self, project_path):
+        self.project_path = project_path
+
+
+def make_step(number, inputs, outputs, duration=0.0, succeed=True, log=None, write=False):
+    """Create a step class with the given artifact declarations"""
+
+    class _Step(BaseWorkflowStep):
+        input_artifacts = inputs
+        output_artifacts = outputs
+
+        def execute(self):
+            if log is not None:
+                log.append(('start', self.step_number, time.perf_counter()))
+            time.sleep(duration)
+            if write:
+                for artifact in outputs:
+                    with open(os.path.join(self.workflow.project_path, artifact), 'w') as f:
+                        f.write(f"written by step {self.step_number}")
+            if log is not None:
+                log.append(('end', self.step_number, time.perf_counter()))
+            return succeed
+
+        def validate_prerequisites(self):
+            return True
+
+    _Step.__name__ = f"Step{number:02d}Test"
+    return _Step
+
+
+@pytest.fixture
+def manager():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield WorkflowStepManager(MockWorkflow(tmpdir), max_workers=4)
+
+
+def install_steps(manager, steps):
+    """Replace the registered steps with test steps"""
+    manager.steps = {}
+    for step_class in steps:
+        step = step_class(manager.workflow)
+        manager.steps[step.step_number] = step
+    manager.step_order = sorted(manager.steps)
+
+
+class TestDependencyGraph:
+    """Test dependency graph construction from artifacts"""
+
+    def test_real_steps_declare_artifacts(self, manager):
+        """Test the built-in steps declare artifacts and recovery follows steps 4-9"""
+        for step in manager.get_all_steps():
+            assert step.input_artifacts is not None
+
+        graph = manager.build_dependency_graph(manager.step_order)
+        assert {4, 5, 6, 7, 8, 9} <= graph[10]
+        assert {9, 10} <= graph[11]
+        assert 4 in graph[5]
+
+    def test_hazards_create_edges(self, manager):
+        """Test read-after-write, write-after-read and write-after-write edges"""
+        install_steps(manager, [
+            make_step(1, [], ["a.txt"]),
+            make_step(2, ["a.txt"], ["b.txt"]),      # reads 1's output
+            make_step(3, [], ["c.txt"]),             # independent
+            make_step(4, [], ["a.txt"]),             # rewrites what 1 wrote / 2 read
+            make_step(5, ["dir/file.json"], []),     # reads inside a directory
+            make_step(6, [], ["dir/"]),
+        ])
+        graph = manager.build_dependency_graph(manager.step_order)
+        assert graph[2] == {1}
+        assert graph[3] == set()
+        assert graph[4] == {1, 2}
+        assert graph[6] == {5}
+
+    def test_undeclared_step_is_barrier(self, manager):
+        """Test a step without declared inputs depends on all earlier steps"""
+        install_steps(manager, [
+            make_step(1, [], ["a.txt"]),
+            make_step(2, [], ["b.txt"]),
+            make_step(3, None, []),
+            make_step(4, [], ["d.txt"]),
+        ])
+        graph = manager.build_dependency_graph(manager.step_order)
+        assert graph[3] == {1, 2}
+        assert graph[4] == {3}
+
+
+class TestScheduledExecution:
+    """Test concurrent execution of independent steps"""
+
+    def test_independent_steps_overlap(self, manager):
+        """Test independent steps run concurrently and the critical path is recorded"""
+        log = []
+        install_steps(manager, [
+            make_step(1, [], ["a.txt"], 0.05, log=log),
+            make_step(2, ["a.txt"], ["b.txt"], 0.2, log=log),
+            make_step(3, ["a.txt"], ["c.txt"], 0.2, log=log),
+            make_step(4, ["b.txt", "c.txt"], ["d.txt"], 0.05, log=log),
+        ])
+
+        assert manager.execute_all_steps()
+
+        events = {(kind, num): t for kind, num, t in log}
+        assert events[('start', 3)] < events[('end', 2)]
+        assert events[('start', 2)] >= events[('end', 1)]
+        assert events[('start', 4)] >= max(events[('end', 2)], events[('end', 3)])
+
+        schedule = manager.last_schedule
+        assert schedule['critical_path'][0] == 1
+        assert schedule['critical_path'][-1] == 4
+        assert set(schedule['timings']) == {1, 2, 3, 4}
+        assert schedule['wall_seconds'] < 0.45
+        assert os.path.exists(os.path.join(manager.workflow.project_path, "execution_schedule.json"))
+        assert len(manager.execution_history) == 4
+
+    def test_failure_stops_dependents(self, manager):
+        """Test dependents of a failed step are not started"""
+        log = []
+        install_steps(manager, [
+            make_step(1, [], ["a.txt"], succeed=False, log=log),
+            make_step(2, ["a.txt"], ["b.txt"], log=log),
+        ])
+
+        assert not manager.execute_all_steps()
+        assert ('start', 2) not in {(kind, num) for kind, num, _ in log}
+
+    def test_range_execution(self, manager):
+        """Test executing a range only runs steps inside it"""
+        log = []
+        install_steps(manager, [
+            make_step(1, [], ["a.txt"], log=log),
+            make_step(2, ["a.txt"], ["b.txt"], log=log),
+            make_step(3, ["b.txt"], ["c.txt"], log=log),
+        ])
+
+        assert manager.execute_steps_range(2, 3)
+        assert {num for kind, num, _ in log} == {2, 3}
+
+
+class TestMemoizedExecution:
+    """Test skipping steps whose inputs are unchanged"""
+
+    def write_input(self, manager, content):
+        with open(os.path.join(manager.workflow.project_path, "idea.txt"), 'w') as f:
+            f.write(content)
+
+    def install_chain(self, manager, log):
+        install_steps(manager, [
+            make_step(1, ["idea.txt"], ["a.txt"], log=log, write=True),
+            make_step(2, ["a.txt"], ["b.txt"], log=log, write=True),
+        ])
+
+    def started(self, log):
+        return [num for kind, num, _ in log if kind == 'start']
+
+    def test_unchanged_inputs_skip(self, manager):
+        """Test a rerun with unchanged inputs skips every step"""
+        log = []
+        self.write_input(manager, "idea")
+        self.install_chain(manager, log)
+
+        assert manager.execute_all_steps()
+        assert self.started(log) == [1, 2]
+
+        log.clear()
+        assert manager.execute_all_steps()
+        assert self.started(log) == []
+        assert manager.skipped_steps == {1, 2}
+        assert manager.last_schedule['timings'][1]['skipped']
+        assert manager.get_workflow_progress()['completed_steps'] == 2
+
+    def test_changed_input_reruns(self, manager):
+        """Test changing an input reruns only the affected step"""
+        log = []
+        self.write_input(manager, "idea")
+        self.install_chain(manager, log)
+        assert manager.execute_all_steps()
+
+        log.clear()
+        self.write_input(manager, "a different idea")
+        assert manager.execute_all_steps()
+        # Step 1 rewrites a.txt with identical content, so step 2 stays memoized
+        assert self.started(log) == [1]
+
+    def test_force_and_code_change_rerun(self, manager):
+        """Test forcing a step or changing its version bypasses the memo"""
+        log = []
+        self.write_input(manager, "idea")
+        self.install_chain(manager, log)
+        assert manager.execute_all_steps()
+
+        log.clear()
+        assert manager.execute_all_steps(force_steps=[2])
+        assert self.started(log) == [2]
+
+        log.clear()
+        type(manager.get_step(1)).step_version = 2
+        assert manager.execute_all_steps()
+        assert self.started(log) == [1]
+
+        log.clear()
+        manager.invalidate_step(2)
+        assert manager.execute_all_steps()
+        assert self.started(log) == [2]
+
+    def test_skipped_steps_restore_workflow_state(self, manager):
+        """Test memoized control-flow steps re-apply their workflow changes"""
+        project_path = manager.workflow.project_path
+        manager.workflow.current_step = 9
+        with open(os.path.join(project_path, "progression_results.json"), 'w') as f:
+            json.dump({'completion_decision': False}, f)
+        with open(os.path.join(project_path, "final_project_state.json"), 'w') as f:
+            json.dump({'workflow_complete': True}, f)
+
+        manager.get_step(9).restore_from_artifacts()
+        assert manager.workflow.current_step == 3
+
+        manager.get_step(11).restore_from_artifacts()
+        assert manager.workflow.current_step == 11
+        assert manager.workflow.workflow_completed
+
+    @pytest.mark.parametrize("step_number, setting, value", [
+        (6, 'refinement_mode', 'fused'),
+        (8, 'refinement_scope', 'targeted'),
+    ])
+    def test_setting_change_reruns(self, manager, step_number, setting, value):
+        """Test changing a step's declared setting invalidates its memoized result"""
+        step = manager.get_step(step_number)
+        for artifact in step.input_artifacts + step.output_artifacts:
+            path = os.path.join(manager.workflow.project_path, artifact)
+            if artifact.endswith('/'):
+                os.makedirs(path, exist_ok=True)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w') as f:
+                    f.write("{}" if artifact.endswith('.json') else artifact)
+
+        manager._record_memo(step)
+        assert manager._reuse_memoized_result(step)
+
+        setattr(manager.workflow, setting, value)
+        assert not manager._reuse_memoized_result(step)